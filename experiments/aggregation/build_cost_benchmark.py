@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Build cost benchmark metrics from the metered usage of the raw outputs
+Prices each system's usage with the versioned price table, then relates the cost
+to the accuracy reported by the aggregate reports (cost per accuracy point)
+"""
+
+import argparse
+import json
+import sys
+import yaml
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from evaluation.cost import CostEvaluator
+from build_benchmark import (
+    read_accuracy_from_file,
+    CHAR_AGGREGATED_REPORT_BASE_PATH,
+    WORD_AGGREGATED_REPORT_BASE_PATH
+)
+
+RAW_OUTPUTS_PATH = Path("results/raw_outputs")
+OUTPUT_PATH = Path("results/benchmark")
+
+# Columns of the cost benchmark, in table order
+COST_COLUMNS = ["n_images", "n_pages", "total_cost", "cost_per_page", "cost_per_1k_pages",
+                "image_cost_p50", "image_cost_p95", "char_accuracy", "word_accuracy",
+                "cost_per_char_accuracy_point", "cost_per_word_accuracy_point"]
+
+
+def load_config(config_path="config/experiments.yaml"):
+    """
+    Load configuration from experiments.yaml
+    """
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        return config
+    except Exception as e:
+        print(f"[!] Error loading config: {e}")
+        return {}
+
+
+def get_datasets_and_systems(config_path="config/experiments.yaml"):
+    """
+    Get datasets and OCR systems from config file
+    """
+    config = load_config(config_path)
+    
+    # Get datasets from config
+    datasets = []
+    if 'datasets' in config:
+        datasets = [d['name'] for d in config['datasets'] if d.get('name')]
+    
+    # Get systems to evaluate from config
+    ocr_systems = []
+    if 'evaluate_systems' in config:
+        ocr_systems = config['evaluate_systems']
+    
+    print(f"[✓] Loaded from config - Datasets: {datasets}, Systems: {ocr_systems}")
+    
+    return datasets, ocr_systems
+
+
+def cost_per_accuracy_point(cost_per_1k_pages, accuracy):
+    """
+    Cost of 1,000 pages divided by the accuracy in percent
+    
+    Lower is better: what each accuracy point costs at scale. None when either
+    figure is missing or the accuracy is zero.
+    """
+    if cost_per_1k_pages is None or not accuracy:
+        return None
+    return cost_per_1k_pages / accuracy
+
+
+def build_cost_benchmark_metrics(config_path="config/experiments.yaml", price_table=None,
+                                 raw_outputs_dir=RAW_OUTPUTS_PATH):
+    """
+    Build cost benchmark metrics from the raw outputs and the aggregate reports
+    
+    Args:
+        config_path: Experiment config (datasets, evaluate_systems, cost.price_table)
+        price_table: Price table YAML overriding the config's
+        raw_outputs_dir: Base directory containing raw outputs
+    
+    Returns:
+        Tuple of (benchmark, price table version, currency), benchmark having the
+        structure {dataset: {ocr: {cost_metrics}}}
+    """
+    datasets, ocr_systems = get_datasets_and_systems(config_path)
+    evaluator = CostEvaluator(config_path=config_path, price_table=price_table)
+    
+    print(f"Building cost benchmark for {len(datasets)} datasets and {len(ocr_systems)} OCR systems")
+    print()
+    
+    benchmark = {dataset: {ocr: {column: None for column in COST_COLUMNS} for ocr in ocr_systems}
+                 for dataset in datasets}
+    
+    for dataset in datasets:
+        cost_results = evaluator.evaluate_all_tools(dataset, raw_outputs_dir)
+        if cost_results:
+            evaluator.save_results(cost_results, dataset)
+        
+        for ocr in ocr_systems:
+            tool_data = cost_results.get(ocr)
+            if tool_data is None:
+                print(f"[!] No cost data for {dataset} / {ocr}")
+                continue
+            if 'error' in tool_data:
+                print(f"[!] Error in {ocr} data: {tool_data['error']}")
+                continue
+            
+            char_acc = read_accuracy_from_file(CHAR_AGGREGATED_REPORT_BASE_PATH / dataset / f"{dataset}_{ocr}.txt")
+            word_acc = read_accuracy_from_file(WORD_AGGREGATED_REPORT_BASE_PATH / dataset / f"{dataset}_{ocr}_word.txt")
+            if char_acc is None:
+                print(f"[!] Character accuracy not found for {dataset} / {ocr}")
+            
+            benchmark[dataset][ocr] = {
+                "n_images": tool_data['n_images'],
+                "n_pages": tool_data['n_pages'],
+                "total_cost": tool_data['total_cost'],
+                "cost_per_page": tool_data['cost_per_page'],
+                "cost_per_1k_pages": tool_data['cost_per_1k_pages'],
+                "image_cost_p50": tool_data['image_cost']['p50'],
+                "image_cost_p95": tool_data['image_cost']['p95'],
+                "char_accuracy": char_acc,
+                "word_accuracy": word_acc,
+                "cost_per_char_accuracy_point": cost_per_accuracy_point(tool_data['cost_per_1k_pages'], char_acc),
+                "cost_per_word_accuracy_point": cost_per_accuracy_point(tool_data['cost_per_1k_pages'], word_acc),
+                "unpriced_systems": tool_data['unpriced_systems'],
+                "stages": {stage: stage_data['cost'] for stage, stage_data in tool_data['stages'].items()}
+            }
+    
+    return benchmark, evaluator.prices.version, evaluator.prices.currency
+
+
+def benchmark_rows(benchmark_metrics):
+    """
+    Flatten the benchmark into one row per dataset and OCR system
+    """
+    rows = []
+    for dataset, systems in benchmark_metrics.items():
+        for ocr_system, metrics in systems.items():
+            rows.append({
+                "dataset": dataset,
+                "ocr_system": ocr_system,
+                **{column: metrics.get(column) for column in COST_COLUMNS}
+            })
+    return rows
+
+
+def print_cost_metrics_table(benchmark_metrics, currency):
+    """
+    Print cost benchmark metrics as formatted tables
+    """
+    pd.set_option("display.max_columns", None)
+    pd.set_option("display.width", None)
+    
+    df = pd.DataFrame(benchmark_rows(benchmark_metrics))
+    if df.empty:
+        print("[!] No cost metrics to show")
+        return
+    
+    # Pivot tables: rows = dataset, columns = OCR system
+    tables = [
+        ("cost_per_1k_pages", f"COST PER 1,000 PAGES TABLE ({currency})", 4),
+        ("total_cost", f"TOTAL COST TABLE ({currency})", 4),
+        ("image_cost_p95", f"P95 COST PER IMAGE TABLE ({currency})", 6),
+        ("cost_per_char_accuracy_point", f"COST PER CHARACTER ACCURACY POINT TABLE ({currency} per 1k pages per %)", 5)
+    ]
+    for column, title, digits in tables:
+        pivot_df = df.pivot(index="dataset", columns="ocr_system", values=column).astype(float)
+        print("\n" + "="*80)
+        print(title)
+        print("="*80)
+        print(pivot_df.round(digits).to_string())
+    print()
+
+
+def save_cost_benchmark(benchmark_metrics, price_table_version, currency, output_dir=OUTPUT_PATH):
+    """
+    Save cost benchmark metrics to JSON and CSV files
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Generate timestamp
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # The price table version makes past benchmarks comparable after a price change
+    data = {
+        "price_table_version": price_table_version,
+        "currency": currency,
+        "benchmark": benchmark_metrics
+    }
+    
+    # Save JSON
+    json_file = output_dir / f"cost_benchmark_{timestamp}.json"
+    with open(json_file, "w", encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"[✓] Cost benchmark JSON saved to: {json_file}")
+    
+    # Also save as latest
+    json_file_latest = output_dir / "cost_benchmark_latest.json"
+    with open(json_file_latest, "w", encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"[✓] Cost benchmark JSON saved to: {json_file_latest}")
+    
+    # Save as CSV
+    df = pd.DataFrame(benchmark_rows(benchmark_metrics))
+    df["price_table_version"] = price_table_version
+    df["currency"] = currency
+    csv_file = output_dir / f"cost_benchmark_{timestamp}.csv"
+    df.to_csv(csv_file, index=False)
+    print(f"[✓] Cost benchmark CSV saved to: {csv_file}")
+    
+    csv_file_latest = output_dir / "cost_benchmark_latest.csv"
+    df.to_csv(csv_file_latest, index=False)
+    print(f"[✓] Cost benchmark CSV saved to: {csv_file_latest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the cost benchmark from raw outputs and accuracy reports')
+    parser.add_argument('--config', default='config/experiments.yaml')
+    parser.add_argument('--price-table', help='Price table YAML (default: cost.price_table in the config, '
+                                              'else the table shipped with evaluation.cost)')
+    parser.add_argument('--raw-outputs-dir', default=str(RAW_OUTPUTS_PATH))
+    
+    args = parser.parse_args()
+    
+    print("="*80)
+    print("BUILDING COST BENCHMARK METRICS FROM METERED USAGE")
+    print("="*80)
+    print()
+    
+    # Build benchmark metrics
+    benchmark_metrics, version, currency = build_cost_benchmark_metrics(
+        args.config, args.price_table, Path(args.raw_outputs_dir))
+    
+    # Save to files
+    save_cost_benchmark(benchmark_metrics, version, currency)
+    
+    # Print tables
+    print_cost_metrics_table(benchmark_metrics, currency)
+    
+    print("="*80)
+    print("COST BENCHMARK BUILD COMPLETE")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,16 @@ from datetime import datetime
 TIMING_RESULTS_BASE_PATH = Path("results/metrics/time_reports")
 OUTPUT_PATH = Path("results/benchmark")
 
+# Unfiltered tail latency and throughput columns added next to the filtered summary
+PERCENTILE_COLUMNS = ["p50_seconds", "p90_seconds", "p95_seconds", "p99_seconds", "p999_seconds"]
+THROUGHPUT_COLUMNS = ["images_per_second", "effective_concurrency"]
+
+# Cold-start cost, reported apart from the steady-state latency above
+COLD_START_COLUMNS = ["model_load_seconds", "first_inference_seconds"]
+
+# Process-wide resource usage sampled during extraction, stored in the "resources" section
+RESOURCE_COLUMNS = ["cpu_percent_mean", "rss_peak_mb", "threads_max", "gpu_memory_peak_mb"]
+
 
 def load_config(config_path="config/experiments.yaml"):
     """
@@ -78,7 +88,9 @@ def build_time_benchmark_metrics(datasets=None, ocr_systems=None):
                 "min_seconds": 0.0,
                 "max_seconds": 0.0,
                 "std_seconds": 0.0,
-                "n_samples": 0
+                "n_samples": 0,
+                **{column: 0.0 for column in PERCENTILE_COLUMNS + THROUGHPUT_COLUMNS},
+                **{column: None for column in COLD_START_COLUMNS}
             } 
             for ocr in ocr_systems
         } 
@@ -103,6 +115,9 @@ def build_time_benchmark_metrics(datasets=None, ocr_systems=None):
                     
                     if 'error' not in tool_data:
                         timing_stats = tool_data.get('timing_stats', {})
+                        percentiles = tool_data.get('latency_percentiles', {}).get('unfiltered', {})
+                        throughput = tool_data.get('throughput', {})
+                        cold_start = tool_data.get('cold_start', {})
                         
                         benchmark[dataset][ocr] = {
                             "mean_seconds": timing_stats.get('mean_seconds', 0.0),
@@ -110,8 +125,24 @@ def build_time_benchmark_metrics(datasets=None, ocr_systems=None):
                             "min_seconds": timing_stats.get('min_seconds', 0.0),
                             "max_seconds": timing_stats.get('max_seconds', 0.0),
                             "std_seconds": timing_stats.get('std_seconds', 0.0),
-                            "n_samples": tool_data.get('n_samples', 0)
+                            "n_samples": tool_data.get('n_samples', 0),
+                            **{column: percentiles.get(column, 0.0) for column in PERCENTILE_COLUMNS},
+                            **{column: throughput.get(column, 0.0) for column in THROUGHPUT_COLUMNS},
+                            **{column: cold_start.get(column) for column in COLD_START_COLUMNS}
                         }
+                        if 'resources' in tool_data:
+                            usage = tool_data['resources'].get('system', {})
+                            per_image = tool_data['resources'].get('per_image', {})
+                            benchmark[dataset][ocr]["resources"] = {
+                                **{column: usage.get(column) for column in RESOURCE_COLUMNS},
+                                "rss_peak_mb_p95_per_image": per_image.get('rss_peak_mb_p95'),
+                                "cpu_percent_p95_per_image": per_image.get('cpu_percent_p95')
+                            }
+                        if 'latency_percentiles' in tool_data:
+                            benchmark[dataset][ocr]["filtered_percentiles"] = {
+                                column: tool_data['latency_percentiles'].get('filtered', {}).get(column, 0.0)
+                                for column in PERCENTILE_COLUMNS
+                            }
                     else:
                         print(f"[!] Error in {ocr} data: {tool_data['error']}")
                 else:
@@ -142,7 +173,11 @@ def print_time_metrics_table(benchmark_metrics):
                 "min_seconds": round(metrics["min_seconds"], 3),
                 "max_seconds": round(metrics["max_seconds"], 3),
                 "std_seconds": round(metrics["std_seconds"], 3),
-                "n_samples": metrics["n_samples"]
+                "n_samples": metrics["n_samples"],
+                "p99_seconds": round(metrics.get("p99_seconds", 0.0), 3),
+                "images_per_second": round(metrics.get("images_per_second", 0.0), 3),
+                **{column: metrics.get(column) for column in COLD_START_COLUMNS},
+                **{column: metrics.get("resources", {}).get(column) for column in RESOURCE_COLUMNS}
             })
     
     df = pd.DataFrame(rows)
@@ -150,6 +185,8 @@ def print_time_metrics_table(benchmark_metrics):
     # Pivot tables: rows = dataset, columns = OCR system
     mean_df = df.pivot(index="dataset", columns="ocr_system", values="mean_seconds")
     median_df = df.pivot(index="dataset", columns="ocr_system", values="median_seconds")
+    p99_df = df.pivot(index="dataset", columns="ocr_system", values="p99_seconds")
+    throughput_df = df.pivot(index="dataset", columns="ocr_system", values="images_per_second")
     
     print("\n" + "="*80)
     print("MEAN PROCESSING TIME TABLE (seconds)")
@@ -160,6 +197,32 @@ def print_time_metrics_table(benchmark_metrics):
     print("MEDIAN PROCESSING TIME TABLE (seconds)")
     print("="*80)
     print(median_df.round(3).to_string())
+    
+    print("\n" + "="*80)
+    print("P99 PROCESSING TIME TABLE (seconds, unfiltered)")
+    print("="*80)
+    print(p99_df.round(3).to_string())
+    
+    print("\n" + "="*80)
+    print("THROUGHPUT TABLE (images/second)")
+    print("="*80)
+    print(throughput_df.round(3).to_string())
+    
+    cold_start_df = df[df["model_load_seconds"].notna() | df["first_inference_seconds"].notna()]
+    if not cold_start_df.empty:
+        print("\n" + "="*80)
+        print("COLD START TABLE (seconds, excluded from the steady-state tables above)")
+        print("="*80)
+        print(cold_start_df.set_index(["dataset", "ocr_system"])[COLD_START_COLUMNS]
+              .astype(float).round(3).to_string())
+    
+    resource_df = df[df["rss_peak_mb"].notna()]
+    if not resource_df.empty:
+        print("\n" + "="*80)
+        print("RESOURCE USAGE TABLE (CPU % of one core, memory in MB)")
+        print("="*80)
+        print(resource_df.set_index(["dataset", "ocr_system"])[RESOURCE_COLUMNS]
+              .astype(float).round(1).to_string())
     print()
 
 
@@ -197,7 +260,10 @@ def save_time_benchmark(benchmark_metrics, output_dir=OUTPUT_PATH):
                 "min_seconds": metrics["min_seconds"],
                 "max_seconds": metrics["max_seconds"],
                 "std_seconds": metrics["std_seconds"],
-                "n_samples": metrics["n_samples"]
+                "n_samples": metrics["n_samples"],
+                **{column: metrics.get(column, 0.0) for column in PERCENTILE_COLUMNS + THROUGHPUT_COLUMNS},
+                **{column: metrics.get(column) for column in COLD_START_COLUMNS},
+                **{f"resource_{column}": metrics.get("resources", {}).get(column) for column in RESOURCE_COLUMNS}
             })
     
     df = pd.DataFrame(rows)
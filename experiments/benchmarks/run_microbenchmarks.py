@@ -0,0 +1,179 @@
+"""
+Run the micro-benchmarks of parsing, text cleaning and metrics
+Times every benchmark in suite.py, tracks the results and compares them with a
+saved baseline to catch regressions
+"""
+
+import json
+import argparse
+import fnmatch
+import platform
+import subprocess
+import timeit
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from suite import BENCHMARKS
+
+RESULTS_PATH = Path("results/benchmarks")
+BASELINE_FILE = "micro_baseline.json"
+HISTORY_FILE = "micro_history.jsonl"
+
+
+def time_benchmark(fn, repeat: int = 7, min_time: float = 0.2) -> dict:
+    """
+    Time a zero-argument callable like timeit does
+    
+    The number of calls per round is calibrated so that a round takes at least
+    min_time seconds; the minimum over rounds is the least noisy estimate.
+    
+    Returns:
+        Dictionary with per-call min/median/stddev in seconds and the call counts
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    
+    rounds = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        'min_seconds': float(rounds.min()),
+        'median_seconds': float(np.median(rounds)),
+        'stddev_seconds': float(rounds.std()),
+        'number': number,
+        'repeat': repeat
+    }
+
+
+def format_duration(seconds: float) -> str:
+    for unit, scale in [('s', 1), ('ms', 1e-3), ('us', 1e-6)]:
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare min times with a baseline
+    
+    Returns:
+        List of (name, baseline seconds, current seconds, ratio) for benchmarks
+        slower than the baseline by more than threshold (0.2 = 20%)
+    """
+    regressions = []
+    print(f"\n{'Benchmark':<42} {'Baseline':>12} {'Current':>12} {'Change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<42} {'-':>12} {format_duration(result['min_seconds']):>12} {'new':>9}")
+            continue
+        before = baseline[name]['min_seconds']
+        ratio = result['min_seconds'] / before
+        flag = "  [!]" if ratio > 1 + threshold else ""
+        print(f"{name:<42} {format_duration(before):>12} {format_duration(result['min_seconds']):>12} "
+              f"{(ratio - 1) * 100:+8.1f}%{flag}")
+        if ratio > 1 + threshold:
+            regressions.append((name, before, result['min_seconds'], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the parsing, cleaning and metrics micro-benchmarks')
+    parser.add_argument('--filter', nargs='+',
+                       help='Only run benchmarks matching these patterns (e.g. "parse.*")')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    parser.add_argument('--repeat', type=int, default=7, help='Timing rounds per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                       help='Minimum seconds per timing round')
+    parser.add_argument('--output-dir', default=str(RESULTS_PATH), help='Directory for results')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='Save these results as the baseline for --compare')
+    parser.add_argument('--compare', action='store_true',
+                       help='Compare with the baseline and exit with status 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                       help='Slowdown counted as a regression (default: 0.2 = 20%%)')
+    
+    args = parser.parse_args()
+    
+    names = sorted(BENCHMARKS)
+    if args.filter:
+        names = [name for name in names if any(fnmatch.fnmatch(name, pattern) for pattern in args.filter)]
+    if args.list:
+        print('\n'.join(names))
+        return
+    if not names:
+        print("Error: no benchmark matches the filter")
+        sys.exit(1)
+    
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    baseline_path = output_dir / BASELINE_FILE
+    
+    print(f"=== Running {len(names)} micro-benchmarks ===")
+    results = {}
+    for name in names:
+        fn = BENCHMARKS[name]()
+        results[name] = time_benchmark(fn, args.repeat, args.min_time)
+        print(f"{name:<42} {format_duration(results[name]['min_seconds']):>12}  "
+              f"(median {format_duration(results[name]['median_seconds'])}, "
+              f"{results[name]['number']} calls x {args.repeat})")
+    
+    run = {
+        'timestamp': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for path in [output_dir / f"micro_{timestamp}.json", output_dir / "micro_latest.json"]:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    with open(output_dir / HISTORY_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+    print(f"\n[✓] Results saved to {output_dir}")
+    
+    exit_code = 0
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"Warning: no baseline at {baseline_path}, run with --save-baseline first")
+        else:
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            print(f"Baseline: revision {baseline.get('revision')} from {baseline.get('timestamp')}")
+            regressions = compare_with_baseline(results, baseline['results'], args.threshold)
+            if regressions:
+                print(f"\n[✗] {len(regressions)} benchmark(s) more than {args.threshold:.0%} slower than the baseline")
+                exit_code = 1
+            else:
+                print(f"\n[✓] No regression above {args.threshold:.0%}")
+    
+    if args.save_baseline:
+        if baseline_path.exists() and args.filter:
+            # Keep the baseline of the benchmarks that were not run
+            with open(baseline_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            run['results'] = {**previous['results'], **results}
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+        print(f"[✓] Baseline saved to {baseline_path}")
+    
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+End-to-end offline benchmark of the pipeline on a synthetic dataset
+Generates a dataset with known ground truth, runs extract -> generate_text ->
+evaluate -> benchmark with mock OCR providers in a scratch directory and
+reports the wall time and throughput of every stage
+"""
+
+import json
+import argparse
+import importlib.util
+import platform
+import shutil
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import yaml
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from evaluation.time import TimeEvaluator
+
+# The dataset generator is a script, not a module on the path
+_spec = importlib.util.spec_from_file_location(
+    "generate_synthetic_dataset", Path(__file__).parent.parent / "utilities" / "generate_synthetic_dataset.py")
+_generator = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_generator)
+build_mock_config = _generator.build_mock_config
+
+EXPERIMENTS_DIR = Path(__file__).parent.parent
+RESULTS_PATH = Path("results/benchmarks")
+HISTORY_FILE = "synthetic_history.jsonl"
+
+DATASET_NAME = "synthetic"
+# Default config path of the aggregation scripts, relative to the working directory
+CONFIG_FILE = Path("config/experiments.yaml")
+
+
+def run_stage(name: str, cmd: list, workdir: Path, log_dir: Path) -> dict:
+    """Run one stage as a subprocess in the scratch directory, logging its output"""
+    log_file = log_dir / f"{name}.log"
+    start = time.perf_counter()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        returncode = subprocess.run(cmd, cwd=workdir, stdout=log, stderr=subprocess.STDOUT).returncode
+    return {'seconds': time.perf_counter() - start, 'returncode': returncode, 'log': str(log_file)}
+
+
+def run_time_evaluation(workdir: Path) -> dict:
+    """Evaluate timing of the mock systems in-process"""
+    start = time.perf_counter()
+    evaluator = TimeEvaluator(config_path=str(workdir / CONFIG_FILE),
+                              results_base_dir=str(workdir / "results/metrics/time_reports"),
+                              index_path=str(workdir / "results/metrics/timing_index.sqlite"))
+    results = evaluator.evaluate_all_tools(DATASET_NAME, workdir / "results/raw_outputs")
+    evaluator.save_results(results, DATASET_NAME)
+    return {'seconds': time.perf_counter() - start, 'returncode': 0 if results else 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the full pipeline offline with mock OCR providers')
+    parser.add_argument('--count', type=int, default=1000, help='Number of synthetic documents')
+    parser.add_argument('--systems', nargs='+', default=['gpt4o', 'tesseract', 'aws_textract'],
+                       help='Systems to emulate (one mock provider each)')
+    parser.add_argument('--workdir', default='results/synthetic_benchmark',
+                       help='Scratch directory for the dataset and pipeline outputs')
+    parser.add_argument('--reuse-dataset', action='store_true',
+                       help='Keep an existing dataset of the same size instead of regenerating it')
+    parser.add_argument('--font', default='bitmap', help="Rendering font, see generate_synthetic_dataset.py")
+    parser.add_argument('--workers', type=int, default=1, help='Processes rendering the dataset')
+    parser.add_argument('--latency-median', type=float, default=0.0,
+                       help='Median simulated provider latency in seconds (default: none, pipeline overhead only)')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Sigma of the lognormal latency')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='Fraction of failing requests')
+    parser.add_argument('--char-error-rate', type=float, default=0.02,
+                       help='Fraction of characters corrupted in the mock outputs')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight per mock system')
+    parser.add_argument('--output-dir', default=str(RESULTS_PATH), help='Directory for the report')
+    
+    args = parser.parse_args()
+    
+    workdir = Path(args.workdir).resolve()
+    dataset_dir = workdir / "data" / "raw" / DATASET_NAME
+    log_dir = workdir / "logs"
+    
+    # Pipeline outputs of a previous run would be counted again
+    if (workdir / "results").exists():
+        shutil.rmtree(workdir / "results")
+    reuse = False
+    if args.reuse_dataset and (dataset_dir / 'dataset.json').exists():
+        with open(dataset_dir / 'dataset.json', 'r', encoding='utf-8') as f:
+            reuse = len(json.load(f)) == args.count
+    if not reuse and dataset_dir.exists():
+        shutil.rmtree(dataset_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Written where the aggregation scripts look for their config by default
+    config = build_mock_config(DATASET_NAME, dataset_dir.relative_to(workdir), args.systems,
+                               args.latency_median, args.latency_sigma, args.error_rate,
+                               args.char_error_rate, args.concurrency)
+    (workdir / CONFIG_FILE).parent.mkdir(parents=True, exist_ok=True)
+    with open(workdir / CONFIG_FILE, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    
+    n_systems = len(args.systems)
+    stages = {}
+    
+    print(f"=== Synthetic benchmark: {args.count} images x {n_systems} mock systems in {workdir} ===")
+    
+    if not reuse:
+        stages['generate'] = run_stage('generate', [
+            sys.executable, str(EXPERIMENTS_DIR / "utilities" / "generate_synthetic_dataset.py"),
+            "--output", str(dataset_dir), "--count", str(args.count),
+            "--font", args.font, "--workers", str(args.workers)], workdir, log_dir)
+    
+    pipeline_script = str(EXPERIMENTS_DIR / "core" / "run_pipeline.py")
+    for step in ['extract', 'generate_text']:
+        stages[step] = run_stage(step, [sys.executable, pipeline_script, "--config", str(CONFIG_FILE),
+                                        "--step", step], workdir, log_dir)
+    
+    # Accuracy needs the ocreval binaries
+    accuracy_available = shutil.which('accuracy') is not None and shutil.which('wordacc') is not None
+    if accuracy_available:
+        stages['evaluate'] = run_stage('evaluate', [sys.executable, pipeline_script, "--config", str(CONFIG_FILE),
+                                                    "--step", "evaluate"], workdir, log_dir)
+    else:
+        print("[!] ocreval not installed, skipping accuracy evaluation and the accuracy benchmark")
+    
+    stages['time_evaluate'] = run_time_evaluation(workdir)
+    stages['time_benchmark'] = run_stage('time_benchmark', [
+        sys.executable, str(EXPERIMENTS_DIR / "aggregation" / "build_time_benchmark.py")], workdir, log_dir)
+    stages['cost_benchmark'] = run_stage('cost_benchmark', [
+        sys.executable, str(EXPERIMENTS_DIR / "aggregation" / "build_cost_benchmark.py")], workdir, log_dir)
+    if accuracy_available:
+        stages['benchmark'] = run_stage('benchmark', [
+            sys.executable, str(EXPERIMENTS_DIR / "aggregation" / "build_benchmark.py")], workdir, log_dir)
+    
+    # Stages over every (image, system) pair; the others are per image or global
+    per_pair = {'extract', 'generate_text', 'evaluate', 'time_evaluate'}
+    print(f"\n{'Stage':<16} {'Seconds':>10} {'Items/s':>12}  Status")
+    for name, stage in stages.items():
+        items = args.count * (n_systems if name in per_pair else 1)
+        stage['items'] = items
+        stage['items_per_second'] = items / stage['seconds'] if stage['seconds'] > 0 else None
+        status = "ok" if stage['returncode'] == 0 else f"failed ({stage.get('log', 'see output')})"
+        print(f"{name:<16} {stage['seconds']:>10.2f} {stage['items_per_second'] or 0:>12.1f}  {status}")
+    
+    total_seconds = sum(stage['seconds'] for stage in stages.values())
+    print(f"{'total':<16} {total_seconds:>10.2f}")
+    
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'count': args.count,
+        'systems': args.systems,
+        'mock': {
+            'latency_median': args.latency_median,
+            'latency_sigma': args.latency_sigma,
+            'error_rate': args.error_rate,
+            'char_error_rate': args.char_error_rate,
+            'concurrency': args.concurrency
+        },
+        'dataset_reused': reuse,
+        'stages': stages,
+        'total_seconds': total_seconds
+    }
+    
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for path in [output_dir / f"synthetic_{timestamp}.json", output_dir / "synthetic_latest.json"]:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    with open(output_dir / HISTORY_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(report) + '\n')
+    print(f"\n[✓] Report saved to {output_dir}")
+    
+    sys.exit(0 if all(stage['returncode'] == 0 for stage in stages.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Micro-benchmark definitions for the Python hot paths
+Each benchmark is a setup function returning the zero-argument callable to time
+"""
+
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from parsing.parsers import OCRParser
+from parsing.samples import (
+    SYSTEM_FORMATS,
+    DEFAULT_CHAR_WHITELIST,
+    synthetic_receipt_lines,
+    build_raw_output,
+    synthetic_accuracy_report
+)
+from evaluation.accuracy import metrics as accuracy_metrics
+from evaluation.accuracy.evaluator import clean_ground_truth_text
+from evaluation.accuracy.ocreval_wrapper import OCREvalWrapper
+from evaluation.time import metrics as time_metrics
+
+# Receipt-sized documents; SROIE receipts have 20-60 lines
+N_ITEMS = 30
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark setup function under a dotted name"""
+    def register(setup_fn):
+        BENCHMARKS[name] = setup_fn
+        return setup_fn
+    return register
+
+
+def _load_script(name: str, path: Path):
+    """Import an experiments script as a module without running its main()"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _sample_text(seed: int = 0) -> str:
+    return '\n'.join(synthetic_receipt_lines(N_ITEMS, seed))
+
+
+def _noisy_text(text: str, seed: int = 1, error_rate: float = 0.05) -> str:
+    """Corrupt a text like an OCR engine would (substitutions, drops)"""
+    rng = np.random.default_rng(seed)
+    chars = []
+    for char in text:
+        roll = rng.random()
+        if roll < error_rate / 2:
+            continue
+        chars.append(chr(rng.integers(65, 91)) if roll < error_rate else char)
+    return ''.join(chars)
+
+
+# === Parsers ===
+
+def _register_parser_benchmarks():
+    formats_done = set()
+    for system_name, output_format in SYSTEM_FORMATS.items():
+        # Systems sharing a format share a parser
+        if output_format in formats_done:
+            continue
+        formats_done.add(output_format)
+        
+        def setup(system_name=system_name, output_format=output_format):
+            parse = OCRParser.get_parser(system_name)
+            raw_output = build_raw_output(output_format, synthetic_receipt_lines(N_ITEMS))
+            return lambda: parse(raw_output)
+        
+        BENCHMARKS[f"parse.{output_format}"] = setup
+
+
+_register_parser_benchmarks()
+
+
+# === Text cleaning ===
+
+@benchmark("clean.generate_text_whitelist")
+def setup_generate_text_clean():
+    module = _load_script("generate_text", Path(__file__).parent.parent / "utilities" / "generate_text.py")
+    text = _noisy_text(_sample_text()) + " àé€™ ✓"
+    return lambda: module.clean_text(text, DEFAULT_CHAR_WHITELIST)
+
+
+@benchmark("clean.ground_truth_whitelist")
+def setup_ground_truth_clean():
+    module = _load_script("clean_ground_truth", Path(__file__).parent.parent / "utilities" / "clean_ground_truth.py")
+    text = _sample_text() + " àé€™ ✓"
+    return lambda: module.clean_text(text, DEFAULT_CHAR_WHITELIST)
+
+
+@benchmark("clean.clean_ground_truth_text")
+def setup_clean_ground_truth_text():
+    text = '  ' + _sample_text().replace(' ', '   ') + '\n\n'
+    return lambda: clean_ground_truth_text(text)
+
+
+# === Accuracy metrics ===
+
+def _register_accuracy_metric_benchmarks():
+    for function_name in ['calculate_cer', 'calculate_wer', 'calculate_character_accuracy',
+                          'calculate_word_accuracy']:
+        def setup(function_name=function_name):
+            function = getattr(accuracy_metrics, function_name)
+            ground_truth = _sample_text()
+            prediction = _noisy_text(ground_truth)
+            return lambda: function(prediction, ground_truth)
+        
+        BENCHMARKS[f"accuracy.{function_name}"] = setup
+
+
+_register_accuracy_metric_benchmarks()
+
+
+@benchmark("accuracy.normalize_text")
+def setup_normalize_text():
+    text = _sample_text()
+    return lambda: accuracy_metrics.normalize_text(text)
+
+
+@benchmark("accuracy.parse_accuracy_output")
+def setup_parse_accuracy_output():
+    report_file = Path(tempfile.mkdtemp(prefix="microbench_")) / "report.txt"
+    report_file.write_text(synthetic_accuracy_report(), encoding='utf-8')
+    # Parsing does not need the ocreval binaries the constructor checks for
+    wrapper = OCREvalWrapper.__new__(OCREvalWrapper)
+    return lambda: wrapper._parse_accuracy_output(report_file)
+
+
+# === Time metrics (one dataset of timings) ===
+
+def _timings(n: int = 10000) -> np.ndarray:
+    return np.random.default_rng(0).lognormal(mean=0.0, sigma=0.5, size=n)
+
+
+@benchmark("time.calculate_time_statistics")
+def setup_time_statistics():
+    times = _timings().tolist()
+    return lambda: time_metrics.calculate_time_statistics(times)
+
+
+@benchmark("time.calculate_latency_percentiles")
+def setup_latency_percentiles():
+    times = _timings()
+    return lambda: time_metrics.calculate_latency_percentiles(times)
+
+
+@benchmark("time.calculate_phase_statistics")
+def setup_phase_statistics():
+    times = _timings()
+    phases = {name: times * share for name, share in
+              [('load', 0.01), ('encode', 0.04), ('request', 0.9), ('decode', 0.05)]}
+    return lambda: time_metrics.calculate_phase_statistics(phases)
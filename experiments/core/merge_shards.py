@@ -0,0 +1,263 @@
+"""
+Merge sharded extraction outputs into the canonical raw outputs tree
+Combines the shards written by run_pipeline.py --step extract --shard i/N,
+verifies that every shard ran and every image was extracted, and flags
+images produced by more than one shard
+"""
+
+import yaml
+import json
+import argparse
+import shutil
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+import sys
+
+import numpy as np
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from evaluation.resources import RESOURCES_FILE
+from evaluation.resources.monitor import summarize_image_windows
+from evaluation.time.index import TimingIndex, COLD_START_FILE
+from utils.sharding import load_manifests, shard_of, DEFAULT_SHARDS_DIR
+from utils.dataset_sources import index_for_dataset
+
+RAW_OUTPUTS_PATH = Path("results/raw_outputs")
+
+
+def check_shards(manifests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Check that all N shards are present, complete and ran the same config"""
+    counts = sorted({manifest['shard_count'] for manifest in manifests})
+    problems = []
+    if len(counts) > 1:
+        problems.append(f"shards from different splits: N = {counts}")
+    count = counts[-1]
+    present = {manifest['shard_index'] for manifest in manifests if manifest['shard_count'] == count}
+    missing = sorted(set(range(count)) - present)
+    if missing:
+        problems.append(f"missing shards: {missing}")
+    incomplete = sorted(manifest['shard_index'] for manifest in manifests if not manifest.get('complete'))
+    if incomplete:
+        problems.append(f"shards that did not finish: {incomplete}")
+    if len({manifest['config_sha1'] for manifest in manifests}) > 1:
+        problems.append("shards ran with different config files")
+    return {'shard_count': count, 'missing_shards': missing, 'incomplete_shards': incomplete,
+            'problems': problems}
+
+
+def _record_rank(path: Path) -> tuple:
+    """Rank duplicate raw outputs: successful first, then most recent"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return (False, '')
+    return ('error' not in data and bool(data.get('raw_output')), data.get('timestamp') or '')
+
+
+def merge_cold_start(records: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-shard cold-start records: each node paid its own cold start"""
+    def mean(key):
+        values = [record[key] for record in records.values() if record.get(key) is not None]
+        return float(np.mean(values)) if values else None
+    
+    first = records[min(records)]
+    return {
+        'system': first.get('system'),
+        'dataset': first.get('dataset'),
+        'timestamp': datetime.now().isoformat(),
+        'model_load_seconds': mean('model_load_seconds'),
+        'first_inference_seconds': mean('first_inference_seconds'),
+        'warmup_runs': first.get('warmup_runs', 0),
+        'warmup_times_seconds': first.get('warmup_times_seconds', []),
+        'shards': {str(index): record for index, record in sorted(records.items())}
+    }
+
+
+def merge_resources(records: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-shard resource records; peaks are per node, so the max is kept"""
+    images = {}
+    for record in records.values():
+        images.update(record.get('images') or {})
+    
+    systems = [record['system'] for record in records.values() if record.get('system')]
+    system = {}
+    if systems:
+        gpu = [s['gpu_memory_peak_mb'] for s in systems if s.get('gpu_memory_peak_mb') is not None]
+        system = {
+            'cpu_percent_mean': round(float(np.mean([s['cpu_percent_mean'] for s in systems])), 2),
+            'cpu_percent_max': max(s['cpu_percent_max'] for s in systems),
+            'rss_peak_mb': max(s['rss_peak_mb'] for s in systems),
+            'threads_max': max(s['threads_max'] for s in systems),
+            'gpu_memory_peak_mb': max(gpu) if gpu else None,
+            'n_samples': sum(s.get('n_samples', 0) for s in systems),
+            'duration_seconds': max(s.get('duration_seconds', 0) for s in systems),
+            'gpu_backend': systems[0].get('gpu_backend'),
+            'nodes': len(systems)
+        }
+    return {
+        'system': system,
+        'per_image': summarize_image_windows(list(images.values())),
+        'images': images
+    }
+
+
+def merge_slice(dataset: str, system: str, shard_dirs: Dict[int, Path], output_dir: Path,
+                move: bool, dry_run: bool) -> tuple:
+    """
+    Merge the raw outputs of one dataset/system from every shard
+    
+    Returns:
+        Tuple of (dictionary with merged file count and duplicates, set of raw file names merged)
+    """
+    sources: Dict[str, List[tuple]] = defaultdict(list)
+    cold_start, resources = {}, {}
+    for index, raw_dir in sorted(shard_dirs.items()):
+        for raw_file in raw_dir.glob("*_raw.json"):
+            sources[raw_file.name].append((index, raw_file))
+        for name, records in [(COLD_START_FILE, cold_start), (RESOURCES_FILE, resources)]:
+            if (raw_dir / name).exists():
+                with open(raw_dir / name, 'r', encoding='utf-8') as f:
+                    records[index] = json.load(f)
+    
+    duplicates = []
+    target_dir = output_dir / dataset / system
+    if not dry_run:
+        target_dir.mkdir(parents=True, exist_ok=True)
+    
+    for name, candidates in sources.items():
+        if len(candidates) > 1:
+            candidates = sorted(candidates, key=lambda candidate: _record_rank(candidate[1]), reverse=True)
+            duplicates.append({'file': name, 'shards': [index for index, _ in candidates],
+                               'kept': candidates[0][0]})
+        if dry_run:
+            continue
+        source = candidates[0][1]
+        if move:
+            shutil.move(str(source), str(target_dir / name))
+        else:
+            shutil.copy2(source, target_dir / name)
+    
+    if not dry_run:
+        if cold_start:
+            with open(target_dir / COLD_START_FILE, 'w', encoding='utf-8') as f:
+                json.dump(merge_cold_start(cold_start), f, indent=2)
+        if resources:
+            with open(target_dir / RESOURCES_FILE, 'w', encoding='utf-8') as f:
+                json.dump(merge_resources(resources), f, indent=2)
+    
+    return {'files': len(sources), 'duplicates': duplicates}, set(sources)
+
+
+def expected_images(manifests: List[Dict[str, Any]], config: Dict[str, Any], shard_count: int) -> Dict[tuple, Dict[str, int]]:
+    """
+    Images each dataset/system should have: those the shards were assigned, plus
+    (with a config) every image in the dataset.json files, which catches shards that never ran
+    
+    Returns:
+        (dataset, system) -> {image key: shard index}
+    """
+    expected: Dict[tuple, Dict[str, int]] = defaultdict(dict)
+    for manifest in manifests:
+        for dataset, systems in manifest['slices'].items():
+            for system, slice_info in systems.items():
+                for key in slice_info['images']:
+                    expected[(dataset, system)][key] = manifest['shard_index']
+    
+    for dataset in config.get('datasets', []):
+        dataset_index = index_for_dataset(dataset)
+        if dataset_index is None:
+            continue
+        keys = dataset_index.images()
+        dataset_index.close()
+        for system_config in config.get('ocr_systems', []):
+            slice_expected = expected[(dataset['name'], system_config['name'])]
+            for key in keys:
+                slice_expected.setdefault(key, shard_of(key, shard_count))
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge sharded extraction outputs into results/raw_outputs')
+    parser.add_argument('--shards-dir', default=DEFAULT_SHARDS_DIR, help='Directory holding the shard outputs')
+    parser.add_argument('--config', help='Configuration file, to check completeness against the datasets')
+    parser.add_argument('--output-dir', default=str(RAW_OUTPUTS_PATH), help='Canonical raw outputs directory')
+    parser.add_argument('--move', action='store_true', help='Move files instead of copying them')
+    parser.add_argument('--dry-run', action='store_true', help='Only verify the shards and write the report, merge nothing')
+    parser.add_argument('--allow-incomplete', action='store_true',
+                       help='Exit with status 0 even if shards or images are missing')
+    
+    args = parser.parse_args()
+    
+    manifests = load_manifests(args.shards_dir)
+    if not manifests:
+        print(f"Error: no shard manifests found in {args.shards_dir}")
+        sys.exit(1)
+    
+    config = {}
+    if args.config:
+        with open(args.config, 'r') as f:
+            config = yaml.safe_load(f)
+    
+    shard_check = check_shards(manifests)
+    print(f"=== Merging {len(manifests)} of {shard_check['shard_count']} shards from {args.shards_dir} ===")
+    for problem in shard_check['problems']:
+        print(f"[!] {problem}")
+    
+    shard_dirs: Dict[tuple, Dict[int, Path]] = defaultdict(dict)
+    for manifest in manifests:
+        raw_root = Path(manifest['root']) / "raw_outputs"
+        for dataset, systems in manifest['slices'].items():
+            for system in systems:
+                if (raw_root / dataset / system).exists():
+                    shard_dirs[(dataset, system)][manifest['shard_index']] = raw_root / dataset / system
+    
+    expected = expected_images(manifests, config, shard_check['shard_count'])
+    output_dir = Path(args.output_dir)
+    timing_index = None if args.dry_run else TimingIndex()
+    
+    report = {'timestamp': datetime.now().isoformat(), 'shards': shard_check, 'slices': {}}
+    complete = not shard_check['missing_shards'] and not shard_check['incomplete_shards']
+    
+    for dataset, system in sorted(set(shard_dirs) | set(expected)):
+        result, produced = merge_slice(dataset, system, shard_dirs.get((dataset, system), {}), output_dir,
+                                       args.move, args.dry_run)
+        slice_expected = expected.get((dataset, system), {})
+        missing = sorted(key for key in slice_expected if f"{Path(key).stem}_raw.json" not in produced)
+        
+        result['expected'] = len(slice_expected)
+        result['missing'] = missing
+        result['missing_by_shard'] = {str(index): count for index, count in
+                                      sorted(Counter(slice_expected[key] for key in missing).items())}
+        report['slices'].setdefault(dataset, {})[system] = result
+        complete = complete and not missing
+        
+        status = "✓" if not missing else "!"
+        print(f"[{status}] {dataset}/{system}: {result['files']} files merged, "
+              f"{len(missing)} of {len(slice_expected)} expected images missing, "
+              f"{len(result['duplicates'])} duplicates")
+        
+        if timing_index is not None and (output_dir / dataset / system).exists():
+            # The merged slice is re-indexed from its JSON once, here, instead of by every reader
+            timing_index.invalidate(dataset, system)
+            timing_index.rebuild(dataset, system, output_dir / dataset / system)
+    
+    if timing_index is not None:
+        timing_index.close()
+    
+    report['complete'] = complete
+    report_file = Path(args.shards_dir) / "merge_report.json"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[{'✓' if complete else '!'}] Merge {'complete' if complete else 'INCOMPLETE'}; "
+          f"report saved to {report_file}")
+    
+    sys.exit(0 if complete or args.allow_incomplete else 1)
+
+
+if __name__ == "__main__":
+    main()
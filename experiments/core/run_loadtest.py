@@ -0,0 +1,136 @@
+"""
+Load test OCR systems at increasing concurrency
+Measures throughput, latency percentiles and error rate per concurrency level
+and plots the saturation curve of each system
+"""
+
+import yaml
+import json
+import argparse
+import atexit
+import random
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from ocr_systems import get_ocr_system
+from utils.dataset_sources import index_for_dataset, open_dataset_source, ImageSpool
+from evaluation.time.loadtest import LoadTester, DEFAULT_LEVELS, loadtest_table_rows
+from evaluation.time.visualization import create_saturation_plot
+
+RESULTS_PATH = Path("results/metrics/loadtest")
+PLOTS_PATH = Path("results/visualizations/loadtest")
+
+
+def load_image_sample(dataset: dict, sample_size: int, seed: int) -> list:
+    """Pick a reproducible sample of existing images from a dataset"""
+    dataset_path = Path(dataset['path'])
+    dataset_index = index_for_dataset(dataset)
+    if dataset_index is None:
+        print(f"Warning: dataset.json not found in {dataset_path}")
+        return []
+    
+    keys = dataset_index.images()
+    dataset_index.close()
+    if len(keys) > sample_size:
+        keys = random.Random(seed).sample(keys, sample_size)
+    
+    source = open_dataset_source(dataset)
+    if source is None:
+        return [str(dataset_path / key) for key in keys]
+    # The sample is replayed for every level, so it stays spooled until exit
+    spool = ImageSpool(source, window=max(1, len(keys)))
+    atexit.register(spool.close)
+    atexit.register(source.close)
+    return list(spool.paths(keys))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test OCR systems at increasing concurrency')
+    parser.add_argument('--config', default='config/experiments.yaml',
+                       help='Path to configuration file')
+    parser.add_argument('--dataset', help='Dataset to sample images from (default: first in config)')
+    parser.add_argument('--systems', nargs='+', help='OCR systems to test (default: all in config)')
+    parser.add_argument('--levels', default=','.join(str(level) for level in DEFAULT_LEVELS),
+                       help='Comma-separated concurrency levels')
+    parser.add_argument('--sample', type=int, default=50,
+                       help='Number of images to cycle through')
+    parser.add_argument('--requests-per-level', type=int, default=100,
+                       help='Measured requests per concurrency level')
+    parser.add_argument('--warmup', type=int, default=None,
+                       help='Unmeasured requests per level (default: one per worker)')
+    parser.add_argument('--max-error-rate', type=float, default=0.5,
+                       help='Stop escalating once a level exceeds this error rate')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the image sample')
+    
+    args = parser.parse_args()
+    
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    
+    datasets = config['datasets']
+    dataset = next((d for d in datasets if d['name'] == args.dataset), None) if args.dataset else datasets[0]
+    if dataset is None:
+        print(f"Error: dataset '{args.dataset}' not found in {args.config}")
+        sys.exit(1)
+    
+    system_configs = config['ocr_systems']
+    if args.systems:
+        system_configs = [s for s in system_configs if s['name'] in args.systems]
+    if not system_configs:
+        print("Error: no OCR systems selected")
+        sys.exit(1)
+    
+    levels = [int(level) for level in args.levels.split(',') if level.strip()]
+    image_paths = load_image_sample(dataset, args.sample, args.seed)
+    if not image_paths:
+        print(f"Error: no images found for dataset {dataset['name']}")
+        sys.exit(1)
+    
+    dataset_name = dataset['name']
+    output_dir = RESULTS_PATH / dataset_name
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"=== Load test on {dataset_name}: {len(image_paths)} images, levels {levels} ===")
+    
+    rows = []
+    for system_config in system_configs:
+        system_name = system_config['name']
+        print(f"\n--- {system_name} ---")
+        
+        ocr_system = get_ocr_system(system_name, system_config['config'])
+        tester = LoadTester(ocr_system, image_paths, args.requests_per_level, args.warmup)
+        report = tester.run(levels, args.max_error_rate)
+        report['dataset'] = dataset_name
+        report['timestamp'] = datetime.now().isoformat()
+        
+        with open(output_dir / f"{system_name}_loadtest.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        
+        plot_path = create_saturation_plot(report, dataset_name, PLOTS_PATH)
+        if plot_path:
+            print(f"[✓] Saturation plot saved: {plot_path}")
+        
+        saturation = report['saturation']
+        if saturation['recommended_concurrency']:
+            print(f"[✓] {system_name}: peak {saturation['peak_throughput_rps']:.2f} req/s at "
+                  f"concurrency {saturation['peak_concurrency']}, recommended concurrency "
+                  f"{saturation['recommended_concurrency']} "
+                  f"(p95 {saturation['recommended_p95_seconds']:.3f}s)")
+        else:
+            print(f"[!] {system_name}: no level completed without errors")
+        
+        rows.extend(loadtest_table_rows(report))
+    
+    csv_path = output_dir / "loadtest_latest.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    print(f"\n[✓] Load test results saved to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,11 @@ Modular OCR evaluation pipeline
 import yaml
 import json
 import argparse
+import tempfile
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 import sys
 from tqdm import tqdm
 
@@ -16,12 +17,25 @@ from tqdm import tqdm
 sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
 
 from evaluation.accuracy import AccuracyEvaluator
-from ocr_systems import get_ocr_system
+from ocr_systems.pool import AdapterPool
+from ocr_systems.image_cache import configure_shared_image_cache
+from ocr_systems.batch import BatchJobRunner
+from ocr_systems.fanout import FanOutExtractor, DEFAULT_WINDOW
+from ocr_systems.cascade import CascadeOCR
+from ocr_systems.recorder import SliceRecorder
+from evaluation.time.index import TimingIndex
+from evaluation.resources import ResourceMonitor, build_resources_record, RESOURCES_FILE
+from utils.profiling import StepProfiler, PROFILE_MODES, run_script
+from utils.sharding import parse_shard, shard_of, shard_root, ShardManifest, DEFAULT_SHARDS_DIR
+from utils.dataset_index import open_dataset_index
+from utils.dataset_sources import DatasetSource, open_dataset_source, ImageSpool, DEFAULT_SPOOL_WINDOW
+from utils.dedup import DedupPlan, build_dedup_plan, copy_to_duplicates
 
 class OCRPipeline:
     """Modular OCR evaluation pipeline"""
     
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, shard: Optional[str] = None, shards_dir: str = DEFAULT_SHARDS_DIR,
+                 fanout: bool = False, in_process_scripts: bool = False):
         self.config_path = Path(config_path)
         with open(self.config_path, 'r') as f:
             self.config = yaml.safe_load(f)
@@ -31,8 +45,26 @@ class OCRPipeline:
         self.evaluate_systems = self.config.get('evaluate_systems', [])
         self.output_config = self.config['output']
         
+        # A shard (--shard i/N) extracts its slice of every dataset into its own
+        # directory; merge_shards.py combines the shards into results/raw_outputs
+        self.shard = parse_shard(shard) if shard else None
+        self.shard_root = shard_root(shards_dir, *self.shard) if self.shard else None
+        
+        # In fan-out mode every image is extracted by all systems
+        # concurrently, instead of one system after the other
+        self.extraction_config = self.config.get('extraction', {})
+        self.fanout = fanout or self.extraction_config.get('mode') == 'fanout'
+        
+        # With dedup enabled, near-identical images are extracted once per cluster
+        self.dedup_config = self.config.get('dedup', {})
+        self.dedup = self.dedup_config.get('enabled', False)
+        
+        # Steps backed by scripts run them in this process when profiled, so the
+        # profile shows the scripts' work rather than a wait on a child process
+        self.in_process_scripts = in_process_scripts
+        
         # Create output directories
-        self.raw_output_dir = Path("results/raw_outputs")
+        self.raw_output_dir = self.shard_root / "raw_outputs" if self.shard else Path("results/raw_outputs")
         self.eval_output_dir = Path(self.output_config['path'])
         self.raw_output_dir.mkdir(parents=True, exist_ok=True)
         self.eval_output_dir.mkdir(parents=True, exist_ok=True)
@@ -41,109 +73,304 @@ class OCRPipeline:
         """Step 1: Extract text from images using OCR systems"""
         print("=== Step 1: OCR Text Extraction ===")
         
+        # Encoded images are shared by all systems within this run
+        image_cache_config = self.config.get('image_cache', {})
+        image_cache = configure_shared_image_cache(image_cache_config.get('max_mb', 256))
+        image_cache.clear()
+        
+        # Timings are indexed as they are saved so timing analysis never re-reads the raw JSON
+        # (one index per shard: SQLite must not be shared over a network filesystem)
+        timing_index = TimingIndex(str(self.shard_root / "timing_index.sqlite")) if self.shard else TimingIndex()
+        manifest = ShardManifest(self.shard_root, *self.shard, str(self.config_path)) if self.shard else None
+        if self.shard:
+            print(f"Shard {self.shard[0]}/{self.shard[1]}, writing to {self.shard_root}")
+        
+        # Each system is built once and shared by all datasets, then unloaded
+        # after its last dataset so the next local model has the memory
+        self.adapter_pool = AdapterPool()
+        
+        datasets = self.open_datasets()
+        
         # Calculate total number of operations for progress tracking
         total_operations = 0
-        for dataset in self.datasets:
-            dataset_path = Path(dataset['path'])
-            metadata_file = dataset_path / 'dataset.json'
-            if metadata_file.exists():
-                with open(metadata_file, 'r') as f:
-                    dataset_metadata = json.load(f)
-                total_operations += len(self.ocr_systems) * len(dataset_metadata)
+        for _, _, image_keys, _, _ in datasets:
+            total_operations += len(self.ocr_systems) * len(image_keys)
+            for ocr_system_config in self.ocr_systems:
+                self.adapter_pool.plan(ocr_system_config['name'])
         
         # Single progress bar for overall extraction
         with tqdm(total=total_operations, desc="OCR Extraction", unit="images", 
                  bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}] {postfix}") as pbar:
             
-            for dataset in self.datasets:
-                dataset_name = dataset['name']
-                dataset_path = Path(dataset['path'])
-                
-                # Load dataset metadata
-                metadata_file = dataset_path / 'dataset.json'
-                if not metadata_file.exists():
-                    print(f"Warning: dataset.json not found in {dataset_path}")
-                    continue
-                
-                with open(metadata_file, 'r') as f:
-                    dataset_metadata = json.load(f)
-                
-                # Process each OCR system
-                for ocr_system_config in self.ocr_systems:
-                    system_name = ocr_system_config['name']
-                    
-                    # Update progress bar description
-                    pbar.set_postfix_str(f"{dataset_name} - {system_name}")
-                    
-                    # Initialize OCR system
-                    ocr_system = get_ocr_system(system_name, ocr_system_config['config'])
-                    
-                    # Process all images and save raw outputs
-                    image_paths = []
-                    for item in dataset_metadata:
-                        image_path = dataset_path / item['img']
-                        if image_path.exists():
-                            image_paths.append(str(image_path))
-                    
-                    # Process images individually for better progress tracking
-                    for img_path in image_paths:
-                        try:
-                            # Measure processing time if enabled in config
-                            measure_time = ocr_system.config.get('measure_time', False)
-                            
-                            start_time = time.time()
-                            # Extract raw output from single image
-                            raw_output = ocr_system.extract_raw_output(img_path)
-                            end_time = time.time()
-                            
-                            processing_time = end_time - start_time if measure_time else None
-                            timestamp = datetime.now().isoformat()
-                            
-                            # Save individual result (replicate the logic from batch_extract_and_save)
-                            dataset_system_dir = ocr_system.output_dir / dataset_name / system_name
-                            dataset_system_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            # Create filename from image path
-                            image_file = Path(img_path)
-                            output_filename = image_file.stem + "_raw.json"
-                            output_file = dataset_system_dir / output_filename
-                            
-                            # Prepare output data
-                            output_data = {
-                                'image_path': str(image_path),
-                                'system': system_name,
-                                'dataset': dataset_name,
-                                'timestamp': timestamp,
-                                'raw_output': raw_output
-                            }
-                            
-                            if processing_time is not None:
-                                output_data['processing_time_seconds'] = processing_time
-                            
-                            # Save to file
-                            with open(output_file, 'w') as f:
-                                json.dump(output_data, f, indent=2)
-                            
-                            # Update progress
-                            pbar.update(1)
-                            
-                        except Exception as e:
-                            print(f"⚠️  Error processing {img_path}: {e}")
-                            # Still update progress even on error
-                            pbar.update(1)
-                    
-                    print(f"✓ {system_name}: {len(image_paths)} images processed")
+            sequential_systems = self.ocr_systems
+            if self.fanout:
+                # Batch API jobs run on the provider's schedule, they stay sequential
+                sequential_systems = [system for system in self.ocr_systems if self._wants_batch(system)]
+                for dataset_name, dataset_path, image_keys, source, plan in datasets:
+                    self.extract_fanout(dataset_name, dataset_path, image_keys, source, plan,
+                                        [system for system in self.ocr_systems if not self._wants_batch(system)],
+                                        timing_index, manifest, pbar)
+            
+            # Process each OCR system over every dataset, so a local model is
+            # loaded once and unloaded before the next one
+            for ocr_system_config in sequential_systems:
+                for dataset_name, dataset_path, image_keys, source, plan in datasets:
+                    self.extract_sequential(dataset_name, dataset_path, image_keys, source, plan,
+                                            ocr_system_config, timing_index, manifest, pbar)
+        
+        cache_stats = image_cache.stats()
+        print(f"Image cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['file_reads']} file reads")
+        image_cache.clear()
+        for _, _, _, source, _ in datasets:
+            if source is not None:
+                source.close()
+        self.adapter_pool.close()
+        print(f"OCR systems: {self.adapter_pool.loads} loaded, {self.adapter_pool.reuses} reused across datasets")
+        timing_index.close()
+        if manifest is not None:
+            manifest.finish()
+            print(f"Shard manifest: {manifest.path}")
         
         print("\n=== OCR Extraction Complete ===")
     
+    def open_datasets(self) -> List[Tuple[str, Path, List[str], Optional[DatasetSource], Optional[DedupPlan]]]:
+        """
+        Images to extract from each dataset that exists, only this shard's when sharded
+        
+        Returns:
+            List of (name, path, image keys, source or None, dedup plan or None)
+        """
+        # Images come from the compiled dataset index; datasets with a 'source' (archive
+        # or object store) get their metadata extracted to their path and their images
+        # streamed during extraction
+        datasets = []
+        for dataset in self.datasets:
+            dataset_path = Path(dataset['path'])
+            source = open_dataset_source(dataset)
+            if source is not None:
+                try:
+                    extracted = source.materialize_metadata(dataset_path)
+                except (OSError, ValueError) as e:
+                    print(f"Warning: cannot read {dataset['source']}: {e}")
+                    source.close()
+                    continue
+                if extracted:
+                    print(f"{dataset['name']}: extracted {extracted} metadata files from {source.location}")
+            dataset_index = open_dataset_index(dataset['name'], dataset_path, source=source)
+            if dataset_index is None:
+                print(f"Warning: dataset.json not found in {dataset_path}")
+                continue
+            image_keys = self.select_images(dataset_index.images())
+            plan = None
+            if self.dedup:
+                sha1s = {item['img']: item['img_sha1'] for item in dataset_index.items()}
+                plan = build_dedup_plan(dataset['name'], dataset_path, image_keys, self.dedup_config, source, sha1s)
+                stats = plan.stats()
+                print(f"{dataset['name']}: {stats['duplicates']} of {len(image_keys)} images are duplicates "
+                      f"in {stats['clusters']} clusters, extracting {len(image_keys) - stats['duplicates']}")
+                image_keys = plan.representatives(image_keys)
+            datasets.append((dataset['name'], dataset_path, image_keys, source, plan))
+            dataset_index.close()
+        
+        return datasets
+    
+    def extract_sequential(self, dataset_name: str, dataset_path: Path, image_keys: List[str],
+                           source: Optional[DatasetSource], plan: Optional[DedupPlan],
+                           ocr_system_config: Dict[str, Any], timing_index: TimingIndex,
+                           manifest: Optional[ShardManifest], pbar: tqdm):
+        """Extract a dataset with one system, through the provider batch API when configured"""
+        system_name = ocr_system_config['name']
+        pbar.set_postfix_str(f"{dataset_name} - {system_name}")
+        
+        # Initialize OCR system (or reuse it from the previous dataset)
+        ocr_system = self.adapter_pool.get(system_name, ocr_system_config['config'])
+        ocr_system.output_dir = self.raw_output_dir
+        measure_time = ocr_system_config['config'].get('measure_time', False)
+        
+        # Systems configured with a 'batch' section go through the provider
+        # batch API, otherwise images are processed individually
+        batch_mode = BatchJobRunner.is_enabled(ocr_system)
+        
+        # Process all images (of this shard) and save raw outputs; batch jobs
+        # need every image at submission, so their spool holds the whole slice
+        image_paths, spool = self.open_images(
+            dataset_path, image_keys, source,
+            directory=str(self.spool_root() / dataset_name / system_name) if batch_mode else None)
+        
+        if not batch_mode and ocr_system.warmup_runs and not ocr_system.model_reused:
+            self.warmup(ocr_system, dataset_path, image_keys, source)
+        
+        # CPU/memory/GPU sampling while systems with measure_time extract; it starts
+        # after warm-up, so model load and warm-up peaks stay out of the summary
+        resources_config = self.config.get('resources', {})
+        monitor = None
+        if measure_time and resources_config.get('enabled', True) and not batch_mode:
+            monitor = ResourceMonitor(resources_config.get('interval', 0.1),
+                                      resources_config.get('gpu', True)).start()
+        recorder = SliceRecorder(ocr_system, dataset_name, timing_index, measure_time, spool, monitor)
+        
+        if batch_mode:
+            batch_config = dict(ocr_system_config['config']['batch'])
+            if self.shard:
+                # Job state is per shard, nodes must not resume each other's jobs
+                batch_config.setdefault('batch_dir', str(self.shard_root / "batches"))
+            results = BatchJobRunner(ocr_system, dataset_name, batch_config).run(list(image_paths))
+        else:
+            results = ocr_system.iter_extract(image_paths)
+        
+        for spooled_path, raw_output, timing, error in results:
+            recorder.record(spooled_path, raw_output, timing, error)
+            # Update progress (also on error)
+            pbar.update(1)
+        
+        if spool is not None:
+            spool.close()
+        self.finish_slice(recorder, image_keys, plan, manifest, save_cold_start=measure_time and not batch_mode)
+    
+    def finish_slice(self, recorder: SliceRecorder, image_keys: List[str], plan: Optional[DedupPlan],
+                     manifest: Optional[ShardManifest], save_cold_start: bool):
+        """Write the side files and index of a finished (dataset, system) slice and release its system"""
+        ocr_system, dataset_name, raw_dir = recorder.ocr_system, recorder.dataset_name, recorder.raw_dir
+        if save_cold_start:
+            ocr_system.save_cold_start_stats(dataset_name)
+        
+        if recorder.monitor is not None:
+            recorder.monitor.stop()
+            if recorder.monitor.enabled:
+                raw_dir.mkdir(parents=True, exist_ok=True)
+                with open(raw_dir / RESOURCES_FILE, 'w') as f:
+                    json.dump(build_resources_record(recorder.monitor, recorder.image_windows), f, indent=2)
+        
+        if plan is not None:
+            copied = copy_to_duplicates(raw_dir, plan)
+            print(f"  {copied} duplicate outputs of {ocr_system.name} copied from their representatives")
+        
+        recorder.close()
+        print(f"✓ {ocr_system.name}: {len(image_keys)} images processed")
+        
+        if manifest is not None:
+            manifest.record_slice(dataset_name, ocr_system.name, image_keys, len(image_keys), recorder.n_errors)
+        
+        self.report_runtime_stats(ocr_system, dataset_name)
+        self.adapter_pool.finish(ocr_system.name)
+    
+    @staticmethod
+    def _wants_batch(ocr_system_config: Dict[str, Any]) -> bool:
+        batch_config = ocr_system_config['config'].get('batch')
+        return bool(batch_config) and batch_config.get('enabled', True)
+    
+    def spool_root(self) -> Path:
+        """Where images streamed from dataset sources are spooled (extraction: spool_dir)"""
+        spool_dir = self.extraction_config.get('spool_dir')
+        return Path(spool_dir) if spool_dir else Path(tempfile.gettempdir()) / "ocr_spool"
+    
+    def open_images(self, dataset_path: Path, image_keys: List[str], source: Optional[DatasetSource],
+                    consumers: int = 1, directory: Optional[str] = None) -> Tuple[Iterable[str], Optional[ImageSpool]]:
+        """
+        Image paths to extract, streamed through a spool for datasets with a source
+        
+        Args:
+            dataset_path: Local dataset directory
+            image_keys: Dataset-relative image paths
+            source: Dataset source, None for a plain directory
+            consumers: Systems reading each image (spooled files are released once per system)
+            directory: Exact spool directory instead of a temporary one
+        
+        Returns:
+            Tuple of (image paths, spool or None)
+        """
+        if source is None:
+            return [str(dataset_path / key) for key in image_keys], None
+        window = self.extraction_config.get('spool_window', DEFAULT_SPOOL_WINDOW)
+        spool = ImageSpool(source, str(self.spool_root()), consumers,
+                           max(window, len(image_keys)) if directory else window, directory)
+        return spool.paths(image_keys), spool
+    
+    def warmup(self, ocr_system, dataset_path: Path, image_keys: List[str], source: Optional[DatasetSource]):
+        """Warm a system up on the first images of a dataset"""
+        if source is None:
+            ocr_system.warmup([str(dataset_path / key) for key in image_keys])
+            return
+        keys = image_keys[:ocr_system.warmup_runs]
+        spool = ImageSpool(source, str(self.spool_root()), window=max(1, len(keys)))
+        try:
+            ocr_system.warmup(list(spool.paths(keys)))
+        finally:
+            spool.close()
+    
+    def extract_fanout(self, dataset_name: str, dataset_path: Path, image_keys: List[str],
+                       source: Optional[DatasetSource], plan: Optional[DedupPlan],
+                       system_configs: List[Dict[str, Any]], timing_index: TimingIndex,
+                       manifest: Optional[ShardManifest], pbar: tqdm):
+        """
+        Extract a dataset with several systems at once
+        
+        Wall time approaches that of the slowest system instead of the sum over
+        systems. Images of a dataset source are spooled once for all systems. Resource sampling is skipped: the systems share the process, so
+        CPU and memory could not be attributed to one of them.
+        """
+        if not system_configs:
+            return
+        
+        ocr_systems, measure_time = {}, {}
+        for ocr_system_config in system_configs:
+            system_name = ocr_system_config['name']
+            ocr_system = self.adapter_pool.get(system_name, ocr_system_config['config'])
+            ocr_system.output_dir = self.raw_output_dir
+            
+            if ocr_system.warmup_runs and not ocr_system.model_reused:
+                self.warmup(ocr_system, dataset_path, image_keys, source)
+            
+            ocr_systems[system_name] = ocr_system
+            measure_time[system_name] = ocr_system_config['config'].get('measure_time', False)
+        
+        pbar.set_postfix_str(f"{dataset_name} - {len(ocr_systems)} systems (fan-out)")
+        window = self.extraction_config.get('window', DEFAULT_WINDOW)
+        extractor = FanOutExtractor(ocr_systems, window)
+        image_paths, spool = self.open_images(dataset_path, image_keys, source, consumers=len(ocr_systems))
+        recorders = {name: SliceRecorder(ocr_system, dataset_name, timing_index, measure_time[name], spool)
+                     for name, ocr_system in ocr_systems.items()}
+        start = time.perf_counter()
+        
+        for system_name, spooled_path, raw_output, timing, error in extractor.run(image_paths):
+            recorders[system_name].record(spooled_path, raw_output, timing, error)
+            pbar.update(1)
+        
+        elapsed = time.perf_counter() - start
+        if spool is not None:
+            spool.close()
+        for system_name, recorder in recorders.items():
+            self.finish_slice(recorder, image_keys, plan, manifest, save_cold_start=measure_time[system_name])
+        print(f"Fan-out: {len(ocr_systems)} systems x {len(image_keys)} images in {elapsed:.1f}s")
+    
+    def report_runtime_stats(self, ocr_system, dataset_name: str):
+        """Print a system's runtime stats after a dataset; cascades also save their escalation stats"""
+        http_stats = ocr_system.runtime_stats().get('http')
+        if http_stats:
+            print(f"  HTTP: {http_stats['requests']} requests over "
+                  f"{http_stats['connections_opened']} connections "
+                  f"(reuse ratio {http_stats['reuse_ratio']:.2f})")
+        
+        if isinstance(ocr_system, CascadeOCR):
+            stats = ocr_system.runtime_stats()
+            if stats['pages']:
+                print(f"  Cascade: {stats['escalated']} of {stats['pages']} pages escalated from "
+                      f"{stats['first_system']} to {stats['fallback_system']} ({stats['escalation_rate']:.1%})")
+            ocr_system.save_escalation_stats(dataset_name)
+    
+    def select_images(self, keys: List[str]) -> List[str]:
+        """Dataset-relative image paths to process, only this shard's when sharded"""
+        if self.shard is None:
+            return keys
+        index, count = self.shard
+        return [key for key in keys if shard_of(key, count) == index]
+    
     def step_clean_ground_truth(self):
         """Step 2: Clean ground truth files using character whitelist"""
         print("=== Step 2: Clean Ground Truth Files ===")
         
-        # Import and run ground truth cleaning script
-        import subprocess
-        import sys
-        
+        # Run ground truth cleaning script
         clean_gt_script = Path(__file__).parent.parent / "utilities" / "clean_ground_truth.py"
         
         if clean_gt_script.exists():
@@ -152,15 +379,13 @@ class OCRPipeline:
                 dataset_name = dataset['name']
                 print(f"\nCleaning ground truth for dataset: {dataset_name}")
                 
-                result = subprocess.run(
-                    [sys.executable, str(clean_gt_script), 
-                     "--config", str(self.config_path),
-                     "--dataset", dataset_name],
-                    capture_output=False,
-                    text=True
+                returncode = run_script(
+                    clean_gt_script,
+                    ["--config", str(self.config_path), "--dataset", dataset_name],
+                    self.in_process_scripts
                 )
                 
-                if result.returncode == 0:
+                if returncode == 0:
                     print(f"✓ Ground truth cleaned for {dataset_name}")
                 else:
                     print(f"✗ Error cleaning ground truth for {dataset_name}")
@@ -174,20 +399,13 @@ class OCRPipeline:
         """Step 3: Generate cleaned text files from raw OCR outputs"""
         print("=== Step 3: Generate Text Files ===")
         
-        # Import and run text generation script
-        import subprocess
-        import sys
-        
+        # Run text generation script
         text_script = Path(__file__).parent.parent / "utilities" / "generate_text.py"
         
         if text_script.exists():
-            result = subprocess.run(
-                [sys.executable, str(text_script), "--config", str(self.config_path)],
-                capture_output=False,
-                text=True
-            )
+            returncode = run_script(text_script, ["--config", str(self.config_path)], self.in_process_scripts)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("\n=== Text Generation Complete ===")
             else:
                 print("\n=== Error generating text files ===")
@@ -291,20 +509,13 @@ class OCRPipeline:
         """Step 5: Generate benchmark summary from aggregated reports"""
         print("=== Step 5: Generating Benchmark Summary ===")
         
-        # Import and run benchmark builder
-        import subprocess
-        import sys
-        
+        # Run benchmark builder
         build_script = Path(__file__).parent.parent / "aggregation" / "build_benchmark.py"
         
         if build_script.exists():
-            result = subprocess.run(
-                [sys.executable, str(build_script)],
-                capture_output=False,
-                text=True
-            )
+            returncode = run_script(build_script, [], self.in_process_scripts)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("\n=== Summary Complete ===")
             else:
                 print("\n=== Error generating summary ===")
@@ -318,25 +529,49 @@ def main():
                        help='Path to configuration file')
     parser.add_argument('--step', choices=['extract', 'clean_gt', 'generate_text', 'evaluate', 'summary', 'all'], 
                        default='all', help='Which step to run')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=PROFILE_MODES,
+                       help='Profile each step run (cprofile by default, or sampling); '
+                            'writes .prof/.collapsed files to results/profiles/')
+    parser.add_argument('--shard', metavar='i/N',
+                       help='Extract only shard i of N (0 <= i < N), e.g. one per node; '
+                            'combine the shards with experiments/core/merge_shards.py')
+    parser.add_argument('--shards-dir', default=DEFAULT_SHARDS_DIR,
+                       help='Shared directory for shard outputs (default: results/shards)')
+    parser.add_argument('--fanout', action='store_true',
+                       help='Extract each image with all systems concurrently (same as extraction: {mode: fanout})')
     
     args = parser.parse_args()
     
-    pipeline = OCRPipeline(args.config)
+    if args.shard and args.step != 'extract':
+        parser.error("--shard only applies to --step extract; merge the shards before the other steps")
+    
+    try:
+        pipeline = OCRPipeline(args.config, args.shard, args.shards_dir, args.fanout,
+                               in_process_scripts=bool(args.profile))
+    except ValueError as e:
+        parser.error(str(e))
+    
+    def run_step(name, step_fn):
+        if args.profile:
+            with StepProfiler(name, args.profile):
+                step_fn()
+        else:
+            step_fn()
     
     if args.step == 'extract' or args.step == 'all':
-        pipeline.step_extract_ocr()
+        run_step('extract', pipeline.step_extract_ocr)
     
     if args.step == 'clean_gt' or args.step == 'all':
-        pipeline.step_clean_ground_truth()
+        run_step('clean_gt', pipeline.step_clean_ground_truth)
     
     if args.step == 'generate_text' or args.step == 'all':
-        pipeline.step_generate_text()
+        run_step('generate_text', pipeline.step_generate_text)
     
     if args.step == 'evaluate' or args.step == 'all':
-        pipeline.step_evaluate_results()
+        run_step('evaluate', pipeline.step_evaluate_results)
     
     if args.step == 'summary' or args.step == 'all':
-        pipeline.step_generate_summary()
+        run_step('summary', pipeline.step_generate_summary)
 
 if __name__ == "__main__":
     main()
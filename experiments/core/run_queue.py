@@ -0,0 +1,318 @@
+"""
+Work-queue based distributed extraction
+A producer enqueues one task per (dataset, system, image); workers on any node
+lease tasks for the systems they can run, write the raw outputs and ack them.
+Tasks of a crashed worker are handed out again once their visibility timeout
+passes, so faster nodes naturally take more of the work.
+    
+    python experiments/core/run_queue.py enqueue --config config/experiments.yaml
+    python experiments/core/run_queue.py work --systems doctr paddleocr     # GPU node
+    python experiments/core/run_queue.py work --systems tesseract           # CPU node
+    python experiments/core/run_queue.py status
+"""
+
+import yaml
+import json
+import argparse
+import os
+import socket
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from ocr_systems.pool import AdapterPool
+from ocr_systems.recorder import SliceRecorder
+from evaluation.time.index import TimingIndex
+from utils.dataset_sources import index_for_dataset, open_dataset_source, ImageSpool
+from utils.work_queue import (open_work_queue, make_task, WorkQueue, DEFAULT_QUEUE_URL,
+                              DEFAULT_VISIBILITY_TIMEOUT, DEFAULT_MAX_ATTEMPTS)
+
+RAW_OUTPUTS_PATH = Path("results/raw_outputs")
+
+
+def load_config(config_path: str) -> Dict[str, Any]:
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def _has_output(raw_file: Path) -> bool:
+    """Whether a raw output file holds a successful extraction"""
+    try:
+        with open(raw_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return 'error' not in data and bool(data.get('raw_output'))
+
+
+def build_tasks(config: Dict[str, Any], systems: Optional[List[str]], datasets: Optional[List[str]],
+                skip_existing: bool, output_dir: Path) -> List[Dict[str, Any]]:
+    """
+    One task per image of every dataset and system in the config
+    
+    Args:
+        config: Experiment configuration
+        systems: Only these systems (None: all in the config)
+        datasets: Only these datasets (None: all in the config)
+        skip_existing: Skip images that already have a successful raw output
+        output_dir: Raw outputs directory checked by skip_existing
+    """
+    tasks = []
+    system_names = [system['name'] for system in config['ocr_systems']
+                    if systems is None or system['name'] in systems]
+    for dataset in config['datasets']:
+        if datasets is not None and dataset['name'] not in datasets:
+            continue
+        dataset_index = index_for_dataset(dataset)
+        if dataset_index is None:
+            print(f"Warning: dataset.json not found in {dataset['path']}")
+            continue
+        keys = dataset_index.images()
+        dataset_index.close()
+        for system_name in system_names:
+            raw_dir = output_dir / dataset['name'] / system_name
+            for key in keys:
+                if skip_existing and _has_output(raw_dir / f"{Path(key).stem}_raw.json"):
+                    continue
+                tasks.append(make_task(dataset['name'], system_name, key))
+    return tasks
+
+
+class LeaseKeeper:
+    """
+    Renews the leases a worker holds while it extracts, so slow images are not
+    handed to another worker; uses its own queue connection from a background thread
+    """
+    
+    def __init__(self, queue_url: str, queue_kwargs: Dict[str, Any], interval: float):
+        self.queue_url = queue_url
+        self.queue_kwargs = queue_kwargs
+        self.interval = interval
+        self.held: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self) -> 'LeaseKeeper':
+        self._thread.start()
+        return self
+    
+    def hold(self, tasks: List[Dict[str, Any]]):
+        with self.lock:
+            for task in tasks:
+                self.held[task['id']] = task
+    
+    def release(self, task: Dict[str, Any]):
+        with self.lock:
+            self.held.pop(task['id'], None)
+    
+    def _run(self):
+        queue = open_work_queue(self.queue_url, **self.queue_kwargs)
+        while not self._stop.wait(self.interval):
+            with self.lock:
+                tasks = list(self.held.values())
+            for task in tasks:
+                # extend() refreshes the lease token in place (Redis)
+                if not queue.extend(task):
+                    print(f"⚠️  Lease lost for {task['dataset']}/{task['system']}/{task['image']}")
+        queue.close()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(queue: WorkQueue, keeper: LeaseKeeper, config: Dict[str, Any], systems: Optional[List[str]],
+               worker_id: str, output_dir: Path, prefetch: int, poll_interval: float, wait: bool,
+               max_tasks: Optional[int]) -> Dict[str, int]:
+    """
+    Lease and process tasks until the queue is drained (or forever with wait)
+    
+    Returns:
+        Dictionary with done, errors (retried or failed) and lost (lease expired before ack) task counts
+    """
+    system_configs = {system['name']: system['config'] for system in config['ocr_systems']}
+    dataset_paths = {dataset['name']: Path(dataset['path']) for dataset in config['datasets']}
+    # Datasets in an archive or object store: each leased group is spooled to a temp dir
+    sources = {dataset['name']: open_dataset_source(dataset) for dataset in config['datasets']}
+    # Systems this node can run; tasks of other systems are left to other nodes
+    runnable = [name for name in system_configs if systems is None or name in systems]
+    # Models are loaded once per worker and system, and kept until the worker exits
+    pool = AdapterPool()
+    # Workers rewrite raw outputs behind the sync markers of the timing index: rows are
+    # added as images finish and the slices invalidated, so readers re-index them once
+    timing_index = TimingIndex()
+    counts = {'done': 0, 'errors': 0, 'lost': 0}
+    
+    while max_tasks is None or counts['done'] + counts['errors'] < max_tasks:
+        n = prefetch if max_tasks is None else min(prefetch, max_tasks - counts['done'] - counts['errors'])
+        tasks = queue.lease(runnable, worker_id, n)
+        if not tasks:
+            if not wait and queue.pending(runnable) == 0:
+                break
+            # Leased by other workers; wait for them to finish or their leases to expire
+            time.sleep(poll_interval)
+            continue
+        keeper.hold(tasks)
+        
+        groups = defaultdict(list)
+        for task in tasks:
+            groups[(task['dataset'], task['system'])].append(task)
+        
+        for (dataset_name, system_name), group in groups.items():
+            ocr_system = pool.get(system_name, system_configs[system_name])
+            ocr_system.output_dir = output_dir
+            measure_time = system_configs[system_name].get('measure_time', False)
+            
+            source, spool = sources.get(dataset_name), None
+            if source is None:
+                by_path = {str(dataset_paths[dataset_name] / task['image']): task for task in group}
+                missing = [(by_path.pop(path), path) for path in list(by_path) if not Path(path).exists()]
+            else:
+                listing = source.list_files()
+                missing = [(task, source.logical_path(task['image'])) for task in group
+                           if task['image'] not in listing]
+                by_image = {task['image']: task for task in group if task['image'] in listing}
+                spool = ImageSpool(source, window=max(1, len(by_image)))
+                by_path = {path: by_image[spool.name_of(path)] for path in spool.paths(by_image)}
+            for task, path in missing:
+                keeper.release(task)
+                queue.fail(task, f"image not found: {path}")
+                counts['errors'] += 1
+            
+            # Other workers write the same slice, so it is never marked synced
+            recorder = SliceRecorder(ocr_system, dataset_name, timing_index, measure_time, spool, trust_index=False)
+            for spooled_path, raw_output, timing, error in ocr_system.iter_extract(list(by_path)):
+                task = by_path[spooled_path]
+                if error is None and not raw_output:
+                    # Adapters report failures as an empty output
+                    error = "empty output"
+                img_path, error = recorder.record(spooled_path, raw_output, timing, error)
+                
+                keeper.release(task)
+                if error is None:
+                    acked = queue.ack(task)
+                    counts['done' if acked else 'lost'] += 1
+                else:
+                    acked = queue.fail(task, error)
+                    counts['errors' if acked else 'lost'] += 1
+                if not acked:
+                    print(f"⚠️  Lease of {img_path} expired before it finished; "
+                          f"raise --visibility-timeout if extraction is this slow")
+            recorder.close()
+            if spool is not None:
+                spool.close()
+    
+    for source in sources.values():
+        if source is not None:
+            source.close()
+    pool.close()
+    timing_index.close()
+    return counts
+
+
+def print_status(queue: WorkQueue, show_failed: bool):
+    stats = queue.stats()
+    if not stats:
+        print("Queue is empty")
+        return
+    print(f"{'System':<24} {'Queued':>8} {'Leased':>8} {'Done':>8} {'Failed':>8}")
+    for system, counts in sorted(stats.items()):
+        print(f"{system:<24} {counts.get('queued', 0):>8} {counts.get('leased', 0):>8} "
+              f"{counts.get('done', 0):>8} {counts.get('failed', 0):>8}")
+    if show_failed:
+        for task in queue.failed_tasks():
+            print(f"  {task['dataset']}/{task['system']}/{task['image']} "
+                  f"({task['attempts']} attempts): {task.get('error')}")
+
+
+def main():
+    # Queue options are accepted after every subcommand
+    queue_options = argparse.ArgumentParser(add_help=False)
+    queue_options.add_argument('--queue', default=os.environ.get('OCR_QUEUE_URL', DEFAULT_QUEUE_URL),
+                               help='Queue URL: sqlite:///<path>, file:///<shared dir> or redis://host:port/db '
+                                    f'(default: $OCR_QUEUE_URL or {DEFAULT_QUEUE_URL})')
+    queue_options.add_argument('--visibility-timeout', type=float, default=DEFAULT_VISIBILITY_TIMEOUT,
+                               help='Seconds before a leased task that was not renewed is handed out again')
+    queue_options.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                               help='Attempts before a task is marked failed')
+    
+    parser = argparse.ArgumentParser(description='Distributed OCR extraction through a work queue')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    enqueue_parser = subparsers.add_parser('enqueue', parents=[queue_options],
+                                           help='Enqueue the images of the configured datasets')
+    enqueue_parser.add_argument('--config', default='config/experiments.yaml', help='Path to configuration file')
+    enqueue_parser.add_argument('--systems', nargs='+', help='Only these systems')
+    enqueue_parser.add_argument('--datasets', nargs='+', help='Only these datasets')
+    enqueue_parser.add_argument('--skip-existing', action='store_true',
+                               help='Skip images that already have a successful raw output')
+    enqueue_parser.add_argument('--output-dir', default=str(RAW_OUTPUTS_PATH), help='Raw outputs directory')
+    
+    work_parser = subparsers.add_parser('work', parents=[queue_options],
+                                        help='Process tasks until the queue is drained')
+    work_parser.add_argument('--config', default='config/experiments.yaml', help='Path to configuration file')
+    work_parser.add_argument('--systems', nargs='+', help='Systems this node runs (default: all)')
+    work_parser.add_argument('--output-dir', default=str(RAW_OUTPUTS_PATH),
+                            help='Raw outputs directory, shared between nodes')
+    work_parser.add_argument('--prefetch', type=int, default=1,
+                            help='Tasks leased at once; more lets concurrent adapters overlap requests')
+    work_parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help='Seconds between polls while other workers hold the remaining tasks')
+    work_parser.add_argument('--wait', action='store_true', help='Keep polling when the queue is drained')
+    work_parser.add_argument('--max-tasks', type=int, help='Stop after this many tasks')
+    work_parser.add_argument('--worker-id', default=f"{socket.gethostname()}:{os.getpid()}",
+                            help='Worker name recorded with its leases')
+    
+    status_parser = subparsers.add_parser('status', parents=[queue_options], help='Show task counts per system')
+    status_parser.add_argument('--failed', action='store_true', help='List failed tasks and their errors')
+    
+    subparsers.add_parser('retry', parents=[queue_options],
+                          help='Requeue the tasks that exhausted their attempts')
+    
+    args = parser.parse_args()
+    
+    queue_kwargs = {'visibility_timeout': args.visibility_timeout, 'max_attempts': args.max_attempts}
+    try:
+        queue = open_work_queue(args.queue, **queue_kwargs)
+    except (ValueError, RuntimeError) as e:
+        parser.error(str(e))
+    
+    if args.command == 'enqueue':
+        tasks = build_tasks(load_config(args.config), args.systems, args.datasets,
+                            args.skip_existing, Path(args.output_dir))
+        added = queue.enqueue(tasks)
+        print(f"[✓] Enqueued {added} tasks ({len(tasks) - added} already in the queue) at {args.queue}")
+        print_status(queue, False)
+    
+    elif args.command == 'work':
+        print(f"=== Worker {args.worker_id} on {args.queue} (systems: {', '.join(args.systems or ['all'])}) ===")
+        keeper = LeaseKeeper(args.queue, queue_kwargs, args.visibility_timeout / 3).start()
+        start = time.perf_counter()
+        try:
+            counts = run_worker(queue, keeper, load_config(args.config), args.systems, args.worker_id,
+                                Path(args.output_dir), args.prefetch, args.poll_interval, args.wait,
+                                args.max_tasks)
+        finally:
+            keeper.stop()
+        elapsed = time.perf_counter() - start
+        print(f"[✓] {counts['done']} done, {counts['errors']} errors, {counts['lost']} leases lost "
+              f"in {elapsed:.1f}s")
+    
+    elif args.command == 'status':
+        print_status(queue, args.failed)
+    
+    elif args.command == 'retry':
+        print(f"[✓] Requeued {queue.retry_failed()} failed tasks")
+    
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
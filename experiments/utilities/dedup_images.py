@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Dry run of the dedup stage
+Hashes every image of the configured datasets, clusters near-duplicates and
+reports how many extractions (and how much time) dedup would save, without
+extracting anything. Review the clusters before enabling dedup in the config.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from utils.dataset_sources import open_dataset_source
+from utils.dataset_index import open_dataset_index
+from utils.dedup import build_dedup_plan, DEFAULT_DEDUP_DIR, DEFAULT_MAX_DISTANCE, DEFAULT_METHOD, HASH_METHODS
+from evaluation.time.index import TimingIndex
+
+
+def mean_seconds(timing_index: TimingIndex, dataset: str, system: str):
+    """Mean processing time of a system on a dataset, None without timings"""
+    times = timing_index.load_columns(dataset, system)['processing_time_seconds']
+    return float(np.mean(times)) if len(times) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report near-duplicate images and the projected OCR savings')
+    parser.add_argument('--config', default='config/experiments_active.yaml')
+    parser.add_argument('--datasets', nargs='+', help='Only these datasets')
+    parser.add_argument('--method', choices=HASH_METHODS, help='Hash compared (default: config or both)')
+    parser.add_argument('--max-distance', type=int, help='Hamming distance threshold in bits, of 256 (default: config or 16)')
+    parser.add_argument('--output-dir', default=DEFAULT_DEDUP_DIR, help='Where the cluster reports are written')
+    
+    args = parser.parse_args()
+    
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+    dedup_config = dict(config.get('dedup', {}))
+    if args.method:
+        dedup_config['method'] = args.method
+    if args.max_distance is not None:
+        dedup_config['max_distance'] = args.max_distance
+    systems = [system['name'] for system in config['ocr_systems']]
+    timing_index = TimingIndex()
+    
+    totals = {'images': 0, 'duplicates': 0, 'calls_saved': 0, 'seconds_saved': 0.0}
+    for dataset in config['datasets']:
+        if args.datasets and dataset['name'] not in args.datasets:
+            continue
+        source = open_dataset_source(dataset)
+        if source is not None:
+            source.materialize_metadata(Path(dataset['path']))
+        dataset_index = open_dataset_index(dataset['name'], dataset['path'], source=source)
+        if dataset_index is None:
+            print(f"Warning: dataset.json not found in {dataset['path']}")
+            continue
+        items = [item for item in dataset_index.items() if item['img_exists']]
+        dataset_index.close()
+        keys = [item['img'] for item in items]
+        
+        plan = build_dedup_plan(dataset['name'], dataset['path'], keys, dedup_config, source,
+                                {item['img']: item['img_sha1'] for item in items}, args.output_dir)
+        if source is not None:
+            source.close()
+        stats = plan.stats()
+        
+        # Projected savings: every duplicate is one extraction less per system
+        savings = {}
+        for system in systems:
+            seconds = mean_seconds(timing_index, dataset['name'], system)
+            savings[system] = {
+                'calls_saved': stats['duplicates'],
+                'mean_seconds': seconds,
+                'seconds_saved': seconds * stats['duplicates'] if seconds is not None else None
+            }
+        calls_saved = stats['duplicates'] * len(systems)
+        seconds_saved = sum(s['seconds_saved'] or 0.0 for s in savings.values())
+        
+        report = {'dataset': dataset['name'], 'images': len(keys), **plan.to_dict(), 'savings': savings}
+        report_file = Path(args.output_dir) / f"{dataset['name']}_report.json"
+        report_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        share = stats['duplicates'] / len(keys) if keys else 0.0
+        print(f"{dataset['name']}: {stats['duplicates']} of {len(keys)} images are duplicates ({share:.1%}) "
+              f"in {stats['clusters']} clusters (largest: {stats['largest_cluster']})")
+        print(f"  Saves {calls_saved} extractions over {len(systems)} systems"
+              + (f", about {seconds_saved:.1f}s of processing time" if seconds_saved else "")
+              + f"; clusters in {report_file}")
+        
+        totals['images'] += len(keys)
+        totals['duplicates'] += stats['duplicates']
+        totals['calls_saved'] += calls_saved
+        totals['seconds_saved'] += seconds_saved
+    
+    timing_index.close()
+    settings = (f"method={dedup_config.get('method', DEFAULT_METHOD)}, "
+                f"max_distance={dedup_config.get('max_distance', DEFAULT_MAX_DISTANCE)}")
+    print(f"\nTotal ({settings}): {totals['duplicates']} duplicates of {totals['images']} images, "
+          f"{totals['calls_saved']} extractions saved")
+
+
+if __name__ == "__main__":
+    main()
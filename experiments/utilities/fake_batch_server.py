@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Fake provider batch server for testing batch extraction locally
+Implements the file upload, job creation, status and result endpoints of the
+OpenAI Batch, Anthropic Message Batches and Mistral batch APIs. Jobs complete
+--latency seconds after submission with a canned OCR response per request.
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class FakeBatchState:
+    """Uploaded files and submitted jobs shared by all handlers"""
+    
+    def __init__(self, latency: float, response_text: str, fail_every: int):
+        self.latency = latency
+        self.response_text = response_text
+        self.fail_every = fail_every
+        self.files = {}
+        self.jobs = {}
+        self.lock = threading.Lock()
+    
+    def add_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex[:16]}"
+        record = {
+            'id': file_id,
+            'object': 'file',
+            'bytes': len(content),
+            'created_at': int(time.time()),
+            'filename': filename,
+            'purpose': purpose,
+            'status': 'processed',
+            'sample_type': 'batch_request',
+            'source': 'upload',
+            'num_lines': content.count(b'\n')
+        }
+        with self.lock:
+            self.files[file_id] = (record, content)
+        return record
+    
+    def add_job(self, provider: str, requests: list, meta: dict) -> dict:
+        job = {
+            'id': f"batch_{uuid.uuid4().hex[:16]}",
+            'provider': provider,
+            'requests': requests,
+            'created_at': time.time(),
+            'meta': meta,
+            'output_file_id': None,
+            'error_file_id': None
+        }
+        with self.lock:
+            self.jobs[job['id']] = job
+        return job
+    
+    def is_done(self, job: dict) -> bool:
+        return time.time() - job['created_at'] >= self.latency
+    
+    def should_fail(self, index: int) -> bool:
+        return self.fail_every > 0 and (index + 1) % self.fail_every == 0
+    
+    def finish(self, job: dict):
+        """Generate result files for an OpenAI/Mistral job once it is done"""
+        with self.lock:
+            if job['output_file_id'] is not None:
+                return
+        
+        outputs, errors = [], []
+        for index, request in enumerate(job['requests']):
+            custom_id = request.get('custom_id')
+            if self.should_fail(index):
+                errors.append({
+                    'id': f"batch_req_{uuid.uuid4().hex[:12]}",
+                    'custom_id': custom_id,
+                    'response': {'status_code': 500, 'body': {'error': {'message': 'Simulated failure'}}},
+                    'error': None
+                })
+                continue
+            body = self.chat_completion(request['body'].get('model', 'fake-model')) \
+                if job['provider'] == 'openai' else self.ocr_response(job['meta'].get('model'))
+            outputs.append({
+                'id': f"batch_req_{uuid.uuid4().hex[:12]}",
+                'custom_id': custom_id,
+                'response': {'status_code': 200, 'request_id': uuid.uuid4().hex, 'body': body},
+                'error': None
+            })
+        
+        def to_jsonl(lines):
+            return ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8')
+        
+        output_file = self.add_file(to_jsonl(outputs), 'output.jsonl', 'batch_output')
+        error_file = self.add_file(to_jsonl(errors), 'errors.jsonl', 'batch_output') if errors else None
+        with self.lock:
+            job['output_file_id'] = output_file['id']
+            job['error_file_id'] = error_file['id'] if error_file else None
+    
+    def chat_completion(self, model: str) -> dict:
+        return {
+            'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': self.response_text},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 256, 'completion_tokens': 16, 'total_tokens': 272}
+        }
+    
+    def anthropic_message(self, model: str) -> dict:
+        return {
+            'id': f"msg_{uuid.uuid4().hex[:16]}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': [{'type': 'text', 'text': self.response_text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': 256, 'output_tokens': 16}
+        }
+    
+    def ocr_response(self, model: str) -> dict:
+        return {
+            'pages': [{
+                'index': 0,
+                'markdown': self.response_text,
+                'images': [],
+                'dimensions': {'dpi': 200, 'height': 1000, 'width': 800}
+            }],
+            'model': model or 'fake-ocr',
+            'usage_info': {'pages_processed': 1, 'doc_size_bytes': None}
+        }
+
+
+def make_handler(state: FakeBatchState):
+    """Build a request handler bound to the shared state"""
+    
+    class FakeBatchHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, format, *args):
+            pass
+        
+        # --- routing ---
+        
+        def do_GET(self):
+            parts = self.path.split('?')[0].strip('/').split('/')
+            if parts[:2] == ['v1', 'files'] and len(parts) == 4 and parts[3] == 'content':
+                self._file_content(parts[2])
+            elif parts[:2] == ['v1', 'batches'] and len(parts) == 3:
+                self._openai_batch(parts[2])
+            elif parts[:3] == ['v1', 'messages', 'batches'] and len(parts) == 4:
+                self._anthropic_batch(parts[3])
+            elif parts[:3] == ['v1', 'messages', 'batches'] and len(parts) == 5 and parts[4] == 'results':
+                self._anthropic_results(parts[3])
+            elif parts[:3] == ['v1', 'batch', 'jobs'] and len(parts) == 4:
+                self._mistral_job(parts[3])
+            else:
+                self._send_error(404, f"Unknown endpoint {self.path}")
+        
+        def do_POST(self):
+            path = self.path.split('?')[0].rstrip('/')
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            
+            if path == '/v1/files':
+                self._upload_file(body)
+            elif path == '/v1/batches':
+                self._create_openai_batch(json.loads(body))
+            elif path == '/v1/messages/batches':
+                self._create_anthropic_batch(json.loads(body))
+            elif path == '/v1/batch/jobs':
+                self._create_mistral_job(json.loads(body))
+            else:
+                self._send_error(404, f"Unknown endpoint {self.path}")
+        
+        # --- files ---
+        
+        def _upload_file(self, body: bytes):
+            header = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode('latin-1')
+            message = BytesParser(policy=HTTP).parsebytes(header + body)
+            content, filename, purpose = b'', 'upload.jsonl', 'batch'
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                if name == 'file':
+                    content = part.get_payload(decode=True) or b''
+                    filename = part.get_filename() or filename
+                elif name == 'purpose':
+                    purpose = part.get_content().strip()
+            self._send_json(state.add_file(content, filename, purpose))
+        
+        def _file_content(self, file_id: str):
+            if file_id not in state.files:
+                self._send_error(404, f"No such file {file_id}")
+                return
+            self._send_bytes(state.files[file_id][1], 'application/octet-stream')
+        
+        def _read_requests(self, file_id: str) -> list:
+            content = state.files[file_id][1].decode('utf-8')
+            return [json.loads(line) for line in content.splitlines() if line.strip()]
+        
+        def _job(self, job_id: str):
+            job = state.jobs.get(job_id)
+            if job is None:
+                self._send_error(404, f"No such batch {job_id}")
+            return job
+        
+        # --- OpenAI ---
+        
+        def _create_openai_batch(self, payload: dict):
+            job = state.add_job('openai', self._read_requests(payload['input_file_id']), payload)
+            self._send_json(self._openai_object(job))
+        
+        def _openai_batch(self, job_id: str):
+            job = self._job(job_id)
+            if job is not None:
+                self._send_json(self._openai_object(job))
+        
+        def _openai_object(self, job: dict) -> dict:
+            done = state.is_done(job)
+            if done:
+                state.finish(job)
+            total = len(job['requests'])
+            failed = sum(state.should_fail(i) for i in range(total)) if done else 0
+            return {
+                'id': job['id'],
+                'object': 'batch',
+                'endpoint': job['meta'].get('endpoint'),
+                'input_file_id': job['meta'].get('input_file_id'),
+                'completion_window': job['meta'].get('completion_window', '24h'),
+                'status': 'completed' if done else 'in_progress',
+                'output_file_id': job['output_file_id'],
+                'error_file_id': job['error_file_id'],
+                'created_at': int(job['created_at']),
+                'request_counts': {
+                    'total': total,
+                    'completed': total - failed if done else 0,
+                    'failed': failed
+                }
+            }
+        
+        # --- Anthropic ---
+        
+        def _create_anthropic_batch(self, payload: dict):
+            job = state.add_job('anthropic', payload.get('requests', []), {})
+            self._send_json(self._anthropic_object(job))
+        
+        def _anthropic_batch(self, job_id: str):
+            job = self._job(job_id)
+            if job is not None:
+                self._send_json(self._anthropic_object(job))
+        
+        def _anthropic_object(self, job: dict) -> dict:
+            done = state.is_done(job)
+            total = len(job['requests'])
+            errored = sum(state.should_fail(i) for i in range(total)) if done else 0
+            host, port = self.server.server_address[:2]
+            created = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(job['created_at']))
+            return {
+                'id': job['id'],
+                'type': 'message_batch',
+                'processing_status': 'ended' if done else 'in_progress',
+                'request_counts': {
+                    'processing': 0 if done else total,
+                    'succeeded': total - errored if done else 0,
+                    'errored': errored,
+                    'canceled': 0,
+                    'expired': 0
+                },
+                'created_at': created,
+                'expires_at': created,
+                'ended_at': created if done else None,
+                'archived_at': None,
+                'cancel_initiated_at': None,
+                'results_url': f"http://{host}:{port}/v1/messages/batches/{job['id']}/results" if done else None
+            }
+        
+        def _anthropic_results(self, job_id: str):
+            job = self._job(job_id)
+            if job is None:
+                return
+            lines = []
+            for index, request in enumerate(job['requests']):
+                if state.should_fail(index):
+                    result = {'type': 'errored',
+                              'error': {'type': 'error', 'error': {'type': 'api_error', 'message': 'Simulated failure'}}}
+                else:
+                    result = {'type': 'succeeded',
+                              'message': state.anthropic_message(request['params'].get('model', 'fake-model'))}
+                lines.append(json.dumps({'custom_id': request['custom_id'], 'result': result}) + '\n')
+            self._send_bytes(''.join(lines).encode('utf-8'), 'application/binary')
+        
+        # --- Mistral ---
+        
+        def _create_mistral_job(self, payload: dict):
+            requests = []
+            for file_id in payload.get('input_files', []):
+                requests.extend(self._read_requests(file_id))
+            job = state.add_job('mistral', requests, payload)
+            self._send_json(self._mistral_object(job))
+        
+        def _mistral_job(self, job_id: str):
+            job = self._job(job_id)
+            if job is not None:
+                self._send_json(self._mistral_object(job))
+        
+        def _mistral_object(self, job: dict) -> dict:
+            done = state.is_done(job)
+            if done:
+                state.finish(job)
+            total = len(job['requests'])
+            failed = sum(state.should_fail(i) for i in range(total)) if done else 0
+            return {
+                'id': job['id'],
+                'object': 'batch',
+                'input_files': job['meta'].get('input_files', []),
+                'endpoint': job['meta'].get('endpoint'),
+                'model': job['meta'].get('model'),
+                'metadata': None,
+                'errors': [],
+                'status': 'SUCCESS' if done else 'RUNNING',
+                'created_at': int(job['created_at']),
+                'started_at': int(job['created_at']),
+                'completed_at': int(time.time()) if done else None,
+                'total_requests': total,
+                'completed_requests': total if done else 0,
+                'succeeded_requests': total - failed if done else 0,
+                'failed_requests': failed,
+                'output_file': job['output_file_id'],
+                'error_file': job['error_file_id']
+            }
+        
+        # --- responses ---
+        
+        def _send_json(self, body: dict, status: int = 200):
+            self._send_bytes(json.dumps(body).encode('utf-8'), 'application/json', status)
+        
+        def _send_error(self, status: int, message: str):
+            self._send_json({'error': {'type': 'not_found_error', 'message': message}}, status)
+        
+        def _send_bytes(self, data: bytes, content_type: str, status: int = 200):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+    return FakeBatchHandler
+
+
+def start_server(host: str = '127.0.0.1', port: int = 8100, latency: float = 2.0,
+                 response_text: str = 'TOTAL 12.50 THANK YOU', fail_every: int = 0) -> ThreadingHTTPServer:
+    """Start the fake batch server in a background thread and return it"""
+    state = FakeBatchState(latency, response_text, fail_every)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake OpenAI/Anthropic/Mistral batch server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency', type=float, default=2.0,
+                        help='Seconds from submission until a batch completes')
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='Make every Nth request in a batch fail (0 disables)')
+    parser.add_argument('--response-text', default='TOTAL 12.50 THANK YOU')
+    
+    args = parser.parse_args()
+    
+    server = start_server(args.host, args.port, args.latency, args.response_text, args.fail_every)
+    base_url = f"http://{args.host}:{server.server_port}"
+    print(f"Fake batch server listening on {base_url}")
+    print(f"Set base_url to {base_url}/v1 (OpenAI) or {base_url} (Anthropic, Mistral)")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
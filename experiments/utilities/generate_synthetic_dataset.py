@@ -0,0 +1,168 @@
+"""
+Generate a synthetic OCR dataset with known ground truth
+Renders receipt-like text onto images and writes the dataset layout used by
+the pipeline (dataset.json, images/, gt/), plus an optional config running the
+mock OCR providers on it, so the whole pipeline can be benchmarked offline
+"""
+
+import json
+import argparse
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sys
+
+import yaml
+from PIL import Image, ImageDraw, ImageFont
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent.parent / 'src'))
+
+from parsing.samples import SYSTEM_FORMATS, DEFAULT_CHAR_WHITELIST, synthetic_receipt_lines
+
+FONT_SIZE = 16
+MARGIN = 20
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(font: str):
+    """
+    Load the rendering font, once per process
+    
+    'truetype' is Pillow's built-in FreeType font (anti-aliased, readable by
+    real OCR engines); 'bitmap' is its bitmap font, about 50x faster to render,
+    for large datasets meant for the mock providers; anything else is a font file.
+    """
+    if font == 'truetype':
+        return ImageFont.load_default(size=FONT_SIZE)
+    if font == 'bitmap':
+        return ImageFont.load_default_imagefont()
+    return ImageFont.truetype(font, FONT_SIZE)
+
+
+def render_document(index: int, images_dir: Path, gt_dir: Path, seed: int, min_items: int, max_items: int,
+                    font: str = 'truetype') -> str:
+    """
+    Render one document and write its image and ground truth
+    
+    Returns:
+        Image path relative to the dataset directory
+    """
+    doc_seed = seed * 1_000_003 + index
+    lines = synthetic_receipt_lines(min_items + doc_seed % (max_items - min_items + 1), doc_seed)
+    file_id = f"synth_{index:06d}"
+    
+    image_font = load_font(font)
+    left, top, right, bottom = image_font.getbbox("Ag")
+    line_height = int((bottom - top) * 1.4) + 1
+    width = MARGIN * 2 + int(max(image_font.getlength(line) for line in lines))
+    height = MARGIN * 2 + line_height * len(lines)
+    image = Image.new('L', (width, height), color=255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((MARGIN, MARGIN + i * line_height), line, fill=0, font=image_font)
+    
+    # Fast compression; the images are regenerated rather than archived
+    image.save(images_dir / f"{file_id}.png", compress_level=1)
+    with open(gt_dir / f"{file_id}.txt", 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return f"images/{file_id}.png"
+
+
+def _render_range(args) -> list:
+    start, end, images_dir, gt_dir, seed, min_items, max_items, font = args
+    return [render_document(i, images_dir, gt_dir, seed, min_items, max_items, font) for i in range(start, end)]
+
+
+def build_mock_config(dataset_name: str, dataset_path: Path, systems: list, latency_median: float = 0.01,
+                      latency_sigma: float = 0.5, error_rate: float = 0.01, char_error_rate: float = 0.02,
+                      concurrency: int = 8) -> dict:
+    """Build a pipeline config running mock providers on the synthetic dataset"""
+    if latency_median > 0:
+        latency = {'distribution': 'lognormal', 'median': latency_median, 'sigma': latency_sigma}
+    else:
+        latency = {'distribution': 'constant', 'seconds': 0.0}
+    return {
+        'datasets': [{'name': dataset_name, 'path': str(dataset_path)}],
+        'ocr_systems': [{
+            'name': f"mock_{system}",
+            'type': 'mock',
+            'config': {
+                'measure_time': True,
+                'latency': latency,
+                'error_rate': error_rate,
+                'char_error_rate': char_error_rate,
+                'concurrency': concurrency
+            }
+        } for system in systems],
+        'evaluate_systems': [f"mock_{system}" for system in systems],
+        'text_cleaning': {'enabled': True, 'char_whitelist': DEFAULT_CHAR_WHITELIST},
+        'output': {'path': 'results'}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic OCR dataset with known ground truth')
+    parser.add_argument('--output', default='data/raw/synthetic',
+                       help='Dataset directory to create')
+    parser.add_argument('--count', type=int, default=1000, help='Number of documents')
+    parser.add_argument('--min-items', type=int, default=5, help='Minimum line items per receipt')
+    parser.add_argument('--max-items', type=int, default=30, help='Maximum line items per receipt')
+    parser.add_argument('--seed', type=int, default=0, help='Seed, the same seed gives the same dataset')
+    parser.add_argument('--font', default='truetype',
+                       help="'truetype' (default), 'bitmap' (fast, for mock-only runs) or a .ttf path")
+    parser.add_argument('--workers', type=int, default=1, help='Processes rendering in parallel')
+    parser.add_argument('--write-config',
+                       help='Also write a pipeline config running mock providers on the dataset to this path')
+    parser.add_argument('--systems', nargs='+', default=['gpt4o', 'tesseract', 'aws_textract'],
+                       help='Systems to emulate in the written config')
+    parser.add_argument('--latency-median', type=float, default=0.01,
+                       help='Median simulated latency in seconds (lognormal, 0 for none)')
+    parser.add_argument('--latency-sigma', type=float, default=0.5,
+                       help='Sigma of the lognormal latency (tail weight)')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='Fraction of failing requests')
+    parser.add_argument('--char-error-rate', type=float, default=0.02,
+                       help='Fraction of characters corrupted in the mock outputs')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight per mock system')
+    
+    args = parser.parse_args()
+    
+    unknown = [system for system in args.systems if system not in SYSTEM_FORMATS]
+    if unknown:
+        print(f"Error: no response format for {', '.join(unknown)}")
+        sys.exit(1)
+    
+    dataset_path = Path(args.output)
+    images_dir = dataset_path / 'images'
+    gt_dir = dataset_path / 'gt'
+    images_dir.mkdir(parents=True, exist_ok=True)
+    gt_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"Rendering {args.count} documents to {dataset_path}...")
+    chunk = 500
+    tasks = [(start, min(start + chunk, args.count), images_dir, gt_dir, args.seed,
+              args.min_items, args.max_items, args.font)
+             for start in range(0, args.count, chunk)]
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            chunks = list(executor.map(_render_range, tasks))
+    else:
+        chunks = [_render_range(task) for task in tasks]
+    
+    metadata = [{'img': image} for image_list in chunks for image in image_list]
+    with open(dataset_path / 'dataset.json', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+    print(f"[✓] {len(metadata)} images and ground truth files written to {dataset_path}")
+    
+    if args.write_config:
+        config = build_mock_config(dataset_path.name, dataset_path, args.systems, args.latency_median,
+                                   args.latency_sigma, args.error_rate, args.char_error_rate, args.concurrency)
+        config_path = Path(args.write_config)
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config, f, sort_keys=False)
+        print(f"[✓] Mock pipeline config written to {config_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Mock S3-compatible object store for testing dataset sources locally
+Serves a directory as buckets (one per subdirectory) with path-style
+ListObjectsV2 and GetObject; authentication is ignored
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote
+from xml.sax.saxutils import escape
+
+S3_NAMESPACE = 'http://s3.amazonaws.com/doc/2006-03-01/'
+MAX_KEYS = 1000
+
+
+def make_handler(root: Path, latency: float):
+    """Build a request handler serving the buckets under root"""
+    
+    class MockS3Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            bucket, _, key = unquote(parsed.path).lstrip('/').partition('/')
+            bucket_dir = root / bucket
+            if not bucket or not bucket_dir.is_dir():
+                self._send_error('NoSuchBucket', 404)
+                return
+            if latency:
+                time.sleep(latency)
+            if key:
+                self._get_object(bucket_dir, key)
+            else:
+                self._list_objects(bucket, bucket_dir, parse_qs(parsed.query))
+        
+        def _get_object(self, bucket_dir: Path, key: str):
+            object_file = (bucket_dir / key).resolve()
+            if bucket_dir.resolve() not in object_file.parents or not object_file.is_file():
+                self._send_error('NoSuchKey', 404)
+                return
+            data = object_file.read_bytes()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('ETag', f'"{hashlib.md5(data).hexdigest()}"')
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def _list_objects(self, bucket: str, bucket_dir: Path, query: dict):
+            prefix = query.get('prefix', [''])[0]
+            start_after = query.get('continuation-token', [''])[0]
+            keys = sorted(path.relative_to(bucket_dir).as_posix() for path in bucket_dir.rglob('*')
+                          if path.is_file())
+            keys = [key for key in keys if key.startswith(prefix) and key > start_after]
+            page, truncated = keys[:MAX_KEYS], len(keys) > MAX_KEYS
+            
+            contents = []
+            for key in page:
+                stat = (bucket_dir / key).stat()
+                # A cheap stand-in for the content MD5 real stores return
+                etag = hashlib.md5(f"{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8')).hexdigest()
+                contents.append(f"<Contents><Key>{escape(key)}</Key><Size>{stat.st_size}</Size>"
+                                f"<ETag>&quot;{etag}&quot;</ETag></Contents>")
+            body = (f'<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<ListBucketResult xmlns="{S3_NAMESPACE}"><Name>{escape(bucket)}</Name>'
+                    f'<Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>'
+                    f'<IsTruncated>{"true" if truncated else "false"}</IsTruncated>'
+                    + (f'<NextContinuationToken>{escape(page[-1])}</NextContinuationToken>' if truncated else '')
+                    + ''.join(contents) + '</ListBucketResult>')
+            self._send_xml(body)
+        
+        def _send_error(self, code: str, status: int):
+            self._send_xml(f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code></Error>', status)
+        
+        def _send_xml(self, body: str, status: int = 200):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/xml')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+    return MockS3Handler
+
+
+def start_server(root: str, host: str = '127.0.0.1', port: int = 9000, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the mock server in a background thread and return it"""
+    server = ThreadingHTTPServer((host, port), make_handler(Path(root), latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock S3-compatible object store')
+    parser.add_argument('root', help='Directory whose subdirectories are served as buckets')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds added to every request, to emulate a remote store')
+    
+    args = parser.parse_args()
+    
+    server = start_server(args.root, args.host, args.port, args.latency)
+    print(f"Mock S3 server listening on http://{args.host}:{server.server_port} (buckets in {args.root})")
+    print("Use it with source_options: {endpoint_url: http://%s:%d, anonymous: true}"
+          % (args.host, server.server_port))
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Mock OpenAI-compatible vLLM server for testing concurrent extraction locally
+Emulates continuous batching: requests run at full speed up to --capacity
+concurrent sequences, beyond that latency grows with the number in flight
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class MockVLLMState:
+    """Shared server state: in-flight counter and latency model"""
+    
+    def __init__(self, capacity: int, base_latency: float, ttft: float,
+                 tokens: int, response_text: str):
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.ttft = ttft
+        self.tokens = tokens
+        self.response_text = response_text
+        self.in_flight = 0
+        self.served = 0
+        self.lock = threading.Lock()
+    
+    def enter(self) -> float:
+        """Register a request and return its slowdown factor"""
+        with self.lock:
+            self.in_flight += 1
+            return max(1.0, self.in_flight / self.capacity)
+    
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+            self.served += 1
+
+
+def make_handler(state: MockVLLMState):
+    """Build a request handler bound to the shared state"""
+    
+    class MockVLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def log_message(self, format, *args):
+            pass
+        
+        def do_GET(self):
+            if self.path.rstrip('/') in ('/health', '/v1/models'):
+                self._send_json({'status': 'ok', 'served': state.served, 'in_flight': state.in_flight})
+            else:
+                self.send_error(404)
+        
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self.send_error(404)
+                return
+            
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            model = payload.get('model', 'mock-model')
+            
+            slowdown = state.enter()
+            try:
+                if payload.get('stream'):
+                    self._stream_completion(model, slowdown)
+                else:
+                    time.sleep(state.base_latency * slowdown)
+                    self._send_json(self._completion(model))
+            finally:
+                state.leave()
+        
+        def _completion(self, model: str) -> dict:
+            return {
+                'id': f'chatcmpl-{uuid.uuid4().hex[:12]}',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': state.response_text},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': 256, 'completion_tokens': state.tokens,
+                          'total_tokens': 256 + state.tokens}
+            }
+        
+        def _stream_completion(self, model: str, slowdown: float):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            
+            completion_id = f'chatcmpl-{uuid.uuid4().hex[:12]}'
+            words = state.response_text.split(' ')
+            per_token = max(state.base_latency - state.ttft, 0.0) * slowdown / max(len(words), 1)
+            
+            time.sleep(state.ttft * slowdown)
+            for i, word in enumerate(words):
+                chunk = {
+                    'id': completion_id,
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{
+                        'index': 0,
+                        'delta': {'content': word if i == 0 else ' ' + word},
+                        'finish_reason': 'stop' if i == len(words) - 1 else None
+                    }]
+                }
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                if i < len(words) - 1:
+                    time.sleep(per_token)
+            
+            usage_chunk = {
+                'id': completion_id, 'object': 'chat.completion.chunk', 'model': model, 'choices': [],
+                'usage': {'prompt_tokens': 256, 'completion_tokens': len(words),
+                          'total_tokens': 256 + len(words)}
+            }
+            self._write_chunk(f"data: {json.dumps(usage_chunk)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        
+        def _write_chunk(self, text: str):
+            data = text.encode('utf-8')
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+        
+        def _send_json(self, body: dict):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+    
+    return MockVLLMHandler
+
+
+def start_server(host: str = '127.0.0.1', port: int = 8000, capacity: int = 8,
+                 base_latency: float = 0.5, ttft: float = 0.1, tokens: int = 32,
+                 response_text: str = 'TOTAL 12.50 THANK YOU') -> ThreadingHTTPServer:
+    """Start the mock server in a background thread and return it"""
+    state = MockVLLMState(capacity, base_latency, ttft, tokens, response_text)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock OpenAI-compatible vLLM server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--capacity', type=int, default=8,
+                        help='Concurrent sequences served without slowdown')
+    parser.add_argument('--base-latency', type=float, default=0.5,
+                        help='Request latency in seconds at or below capacity')
+    parser.add_argument('--ttft', type=float, default=0.1,
+                        help='Time to first token in seconds at or below capacity')
+    parser.add_argument('--tokens', type=int, default=32,
+                        help='Completion tokens reported in usage')
+    parser.add_argument('--response-text', default='TOTAL 12.50 THANK YOU')
+    
+    args = parser.parse_args()
+    
+    server = start_server(args.host, args.port, args.capacity, args.base_latency,
+                          args.ttft, args.tokens, args.response_text)
+    print(f"Mock vLLM server listening on http://{args.host}:{server.server_port}/v1/chat/completions")
+    print(f"Capacity: {args.capacity}, base latency: {args.base_latency}s, TTFT: {args.ttft}s")
+    
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
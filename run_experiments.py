@@ -39,11 +39,22 @@ def main():
         print("  summary     - Generate benchmark summary")
         print("  all         - Run complete pipeline (extract + clean_gt + generate_text + evaluate + summary)")
         print("  benchmark   - Generate benchmark from existing results")
+        print("  loadtest    - Measure throughput vs. concurrency for each OCR system")
+        print("  microbench  - Run micro-benchmarks of parsing, cleaning and metrics")
+        print("  merge_shards - Merge sharded extraction outputs (extract --shard i/N) into results/raw_outputs")
+        print("  queue       - Work-queue extraction: queue enqueue | work | status | retry")
+        print("  dedup       - Dry run: report near-duplicate images and projected OCR savings")
+        print("  cost        - Price metered usage: cost per page, per 1k pages and per accuracy point")
         print("  help        - Show this help message")
         print("\nExamples:")
         print("  python run_experiments.py all")
         print("  python run_experiments.py evaluate")
         print("  python run_experiments.py benchmark")
+        print("  python run_experiments.py extract --profile            # cProfile + flamegraph stacks")
+        print("  python run_experiments.py evaluate --profile sampling  # low-overhead sampling")
+        print("  python run_experiments.py extract --shard 0/4          # one node's slice of the images")
+        print("  python run_experiments.py extract --fanout             # all systems at once, each image read once")
+        print("  python run_experiments.py queue work --systems tesseract  # pull tasks for one system")
         sys.exit(1)
     
     command = sys.argv[1].lower()
@@ -55,8 +66,30 @@ def main():
         if config_idx + 1 < len(sys.argv):
             config_file = sys.argv[config_idx + 1]
     
+    # Profile the pipeline steps (--profile [cprofile|sampling])
+    profile_args = []
+    if "--profile" in sys.argv:
+        profile_idx = sys.argv.index("--profile")
+        profile_args = ["--profile"]
+        if profile_idx + 1 < len(sys.argv) and sys.argv[profile_idx + 1] in ("cprofile", "sampling"):
+            profile_args.append(sys.argv[profile_idx + 1])
+    
+    # Extract a deterministic slice of the images (--shard i/N [--shards-dir DIR])
+    shard_args = []
+    for option in ("--shard", "--shards-dir"):
+        if option in sys.argv:
+            option_idx = sys.argv.index(option)
+            if option_idx + 1 < len(sys.argv):
+                shard_args += [option, sys.argv[option_idx + 1]]
+    
     pipeline_script = Path(__file__).parent / "experiments" / "core" / "run_pipeline.py"
     benchmark_script = Path(__file__).parent / "experiments" / "aggregation" / "build_benchmark.py"
+    loadtest_script = Path(__file__).parent / "experiments" / "core" / "run_loadtest.py"
+    microbench_script = Path(__file__).parent / "experiments" / "benchmarks" / "run_microbenchmarks.py"
+    merge_shards_script = Path(__file__).parent / "experiments" / "core" / "merge_shards.py"
+    queue_script = Path(__file__).parent / "experiments" / "core" / "run_queue.py"
+    dedup_script = Path(__file__).parent / "experiments" / "utilities" / "dedup_images.py"
+    cost_script = Path(__file__).parent / "experiments" / "aggregation" / "build_cost_benchmark.py"
     
     if not pipeline_script.exists():
         print(f"Error: Pipeline script not found at {pipeline_script}")
@@ -65,27 +98,28 @@ def main():
     success = True
     
     if command == "extract":
-        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "extract"]
+        fanout_args = ["--fanout"] if "--fanout" in sys.argv else []
+        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "extract"] + profile_args + shard_args + fanout_args
         success = run_command(cmd, "OCR Text Extraction")
         
     elif command == "clean_gt":
-        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "clean_gt"]
+        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "clean_gt"] + profile_args
         success = run_command(cmd, "Ground Truth Cleaning")
         
     elif command == "generate_text":
-        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "generate_text"]
+        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "generate_text"] + profile_args
         success = run_command(cmd, "Text File Generation")
         
     elif command == "evaluate":
-        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "evaluate"]
+        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "evaluate"] + profile_args
         success = run_command(cmd, "Accuracy Evaluation")
         
     elif command == "summary":
-        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "summary"]
+        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "summary"] + profile_args
         success = run_command(cmd, "Benchmark Summary Generation")
         
     elif command == "all":
-        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "all"]
+        cmd = [sys.executable, str(pipeline_script), "--config", config_file, "--step", "all"] + profile_args
         success = run_command(cmd, "Complete OCR Evaluation Pipeline")
         
     elif command == "benchmark":
@@ -95,6 +129,47 @@ def main():
         cmd = [sys.executable, str(benchmark_script)]
         success = run_command(cmd, "Benchmark Generation")
         
+    elif command == "loadtest":
+        # Remaining arguments (e.g. --systems, --levels) are passed through
+        extra_args = [arg for i, arg in enumerate(sys.argv[2:], start=2)
+                      if arg != "--config" and sys.argv[i - 1] != "--config"
+                      and arg not in profile_args]
+        cmd = [sys.executable, str(loadtest_script), "--config", config_file] + extra_args
+        success = run_command(cmd, "Load Test")
+        
+    elif command == "microbench":
+        # Micro-benchmarks need no config; e.g. --compare, --save-baseline, --filter
+        cmd = [sys.executable, str(microbench_script)] + sys.argv[2:]
+        success = run_command(cmd, "Micro-benchmarks")
+        
+    elif command == "merge_shards":
+        # Remaining arguments (e.g. --shards-dir, --move, --dry-run) are passed through
+        extra_args = [arg for i, arg in enumerate(sys.argv[2:], start=2)
+                      if arg != "--config" and sys.argv[i - 1] != "--config"]
+        cmd = [sys.executable, str(merge_shards_script), "--config", config_file] + extra_args
+        success = run_command(cmd, "Shard Merge")
+        
+    elif command == "queue":
+        # queue <enqueue|work|status|retry> [options]; enqueue and work read the active config
+        cmd = [sys.executable, str(queue_script)] + sys.argv[2:]
+        if len(sys.argv) > 2 and sys.argv[2] in ("enqueue", "work") and "--config" not in sys.argv:
+            cmd += ["--config", config_file]
+        success = run_command(cmd, "Work Queue")
+        
+    elif command == "dedup":
+        # Remaining arguments (e.g. --max-distance, --method, --datasets) are passed through
+        extra_args = [arg for i, arg in enumerate(sys.argv[2:], start=2)
+                      if arg != "--config" and sys.argv[i - 1] != "--config"]
+        cmd = [sys.executable, str(dedup_script), "--config", config_file] + extra_args
+        success = run_command(cmd, "Duplicate Report")
+        
+    elif command == "cost":
+        # Remaining arguments (e.g. --price-table, --raw-outputs-dir) are passed through
+        extra_args = [arg for i, arg in enumerate(sys.argv[2:], start=2)
+                      if arg != "--config" and sys.argv[i - 1] != "--config"]
+        cmd = [sys.executable, str(cost_script), "--config", config_file] + extra_args
+        success = run_command(cmd, "Cost Benchmark")
+        
     elif command == "help":
         print("OCR Evaluation Experiments - Convenience Script")
         print("\nThis script provides easy access to common OCR evaluation tasks.")
@@ -102,6 +177,12 @@ def main():
         print("\nFor more advanced usage, use the individual scripts directly:")
         print("  python experiments/core/run_pipeline.py --help")
         print("  python experiments/aggregation/build_benchmark.py --help")
+        print("  python experiments/core/run_loadtest.py --help")
+        print("  python experiments/benchmarks/run_microbenchmarks.py --help")
+        print("  python experiments/core/merge_shards.py --help")
+        print("  python experiments/core/run_queue.py --help")
+        print("  python experiments/utilities/dedup_images.py --help")
+        print("  python experiments/aggregation/build_cost_benchmark.py --help")
         sys.exit(0)
         
     else:
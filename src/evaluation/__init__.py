@@ -5,5 +5,6 @@ Contains accuracy, time, and cost evaluation components
 
 from .accuracy import AccuracyEvaluator
 from .time import TimeEvaluator
+from .cost import CostEvaluator
 
-__all__ = ['AccuracyEvaluator', 'TimeEvaluator']
+__all__ = ['AccuracyEvaluator', 'TimeEvaluator', 'CostEvaluator']
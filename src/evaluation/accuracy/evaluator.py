@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 # Removed NED calculation - using only ocreval
 from .ocreval_wrapper import OCREvalWrapper
+from utils.dataset_index import DatasetIndex, list_files
 
 
 def clean_ground_truth_text(text: str) -> str:
@@ -81,6 +82,31 @@ class AccuracyEvaluator:
             print(f"[!] Error loading config: {e}")
             return []
     
+    def _match_files(self, dataset_name: str, text_outputs_dir: Path, ground_truth_dir: Path,
+                     dataset_json: Path) -> tuple:
+        """
+        Ground truth and prediction files of the dataset's images, by file ID
+        
+        Uses the compiled dataset index and one directory scan per side
+        instead of an exists() call per image and file.
+        
+        Returns:
+            Tuple of (gt_files, pred_files) dictionaries of file ID -> path
+        """
+        index = DatasetIndex(dataset_name, dataset_json.parent)
+        file_ids = index.ids()
+        if Path(ground_truth_dir).resolve() == index.gt_dir.resolve():
+            gt_ids = index.ground_truth_ids()
+        else:
+            gt_ids = {Path(name).stem for name in list_files(ground_truth_dir, '.txt')}
+        index.close()
+        pred_names = list_files(text_outputs_dir, '.txt')
+        
+        gt_files = {file_id: ground_truth_dir / f"{file_id}.txt" for file_id in file_ids if file_id in gt_ids}
+        pred_files = {file_id: text_outputs_dir / f"{file_id}.txt" for file_id in file_ids
+                      if f"{file_id}.txt" in pred_names}
+        return gt_files, pred_files
+    
     def generate_partial_reports(self, dataset_name: str, ocr_tool_name: str,
                                 text_outputs_dir: Path, ground_truth_dir: Path,
                                 dataset_json: Path) -> list:
@@ -100,27 +126,7 @@ class AccuracyEvaluator:
         """
         print(f"\nGenerating partial reports for {dataset_name}/{ocr_tool_name}...")
         
-        # Load dataset metadata
-        with open(dataset_json, 'r', encoding='utf-8') as f:
-            dataset_metadata = json.load(f)
-        
-        # Build file dictionaries
-        gt_files = {}
-        pred_files = {}
-        
-        for item in dataset_metadata:
-            # Get file ID (without extension)
-            file_id = Path(item['img']).stem
-            
-            # Check prediction file
-            pred_file = text_outputs_dir / f"{file_id}.txt"
-            if pred_file.exists():
-                pred_files[file_id] = pred_file
-            
-            # Check ground truth file
-            gt_file = ground_truth_dir / f"{file_id}.txt"
-            if gt_file.exists():
-                gt_files[file_id] = gt_file
+        gt_files, pred_files = self._match_files(dataset_name, text_outputs_dir, ground_truth_dir, dataset_json)
         
         # Determine output directory for partial reports
         partial_dir = self.partials_base_dir / dataset_name / ocr_tool_name
@@ -168,27 +174,7 @@ class AccuracyEvaluator:
         """
         print(f"\nGenerating word accuracy partial reports for {dataset_name}/{ocr_tool_name}...")
         
-        # Load dataset metadata
-        with open(dataset_json, 'r', encoding='utf-8') as f:
-            dataset_metadata = json.load(f)
-        
-        # Build file dictionaries
-        gt_files = {}
-        pred_files = {}
-        
-        for item in dataset_metadata:
-            # Get file ID (without extension)
-            file_id = Path(item['img']).stem
-            
-            # Check prediction file
-            pred_file = text_outputs_dir / f"{file_id}.txt"
-            if pred_file.exists():
-                pred_files[file_id] = pred_file
-            
-            # Check ground truth file
-            gt_file = ground_truth_dir / f"{file_id}.txt"
-            if gt_file.exists():
-                gt_files[file_id] = gt_file
+        gt_files, pred_files = self._match_files(dataset_name, text_outputs_dir, ground_truth_dir, dataset_json)
         
         # Determine output directory for word accuracy partial reports
         partial_word_dir = self.partials_word_base_dir / dataset_name / ocr_tool_name
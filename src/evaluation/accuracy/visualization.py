@@ -50,7 +50,8 @@ CATEGORY_COLORS = {
     "OPEN_OCR": "#3de7f9",  # blu medio
     "COMMERCIAL_OCR": "#38b6ff",  # blu
     "COMMERCIAL_VLM": "#ffde59",  # giallo
-    "OPEN_VLM": "#ffbd59"  # arancione
+    "OPEN_VLM": "#ffbd59",  # arancione
+    "CASCADE": "#7ed957"  # verde
 }
 
 def darken_color(hex_color, factor=0.8):
@@ -105,8 +106,12 @@ def get_system_category(system_name: str, system_types: Dict[str, str] = None) -
             return "COMMERCIAL_VLM"
         elif system_type == "opensource_llm":
             return "OPEN_VLM"
+        elif system_type == "cascade":
+            return "CASCADE"
     
     # Fallback to direct mapping
+    if system_name.startswith("cascade_"):
+        return "CASCADE"
     return SOLUTIONS_CATEGORY_MAP.get(system_name, "OPEN_OCR")
 
 def load_accuracy_data_from_results(accuracy_results_file: Path) -> List[Dict[str, Any]]:
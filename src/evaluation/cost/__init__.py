@@ -1,6 +1,21 @@
 """
 Cost evaluation module for OCR systems
+Meters requests, pages and tokens from raw outputs and prices them
 """
 
-# To be implemented
+from .usage import record_usage, raw_output_usage, response_usage, USAGE_FIELDS
+from .prices import PriceTable, DEFAULT_PRICE_TABLE
+from .index import UsageIndex, load_usage_columns
+from .evaluator import CostEvaluator
 
+__all__ = [
+    'record_usage',
+    'raw_output_usage',
+    'response_usage',
+    'USAGE_FIELDS',
+    'PriceTable',
+    'DEFAULT_PRICE_TABLE',
+    'UsageIndex',
+    'load_usage_columns',
+    'CostEvaluator'
+]
@@ -0,0 +1,209 @@
+"""
+Cost evaluation for OCR systems
+Prices the metered usage of the raw outputs with the versioned price table
+"""
+
+import json
+import yaml
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+import numpy as np
+
+from .index import load_usage_columns, DEFAULT_INDEX_PATH
+from .prices import PriceTable
+
+
+class CostEvaluator:
+    """
+    Evaluator for the cost of OCR systems
+    """
+    
+    def __init__(self, config_path: str = "config/experiments.yaml",
+                 results_base_dir: str = "results/metrics/cost_reports",
+                 index_path: str = DEFAULT_INDEX_PATH,
+                 price_table: Optional[str] = None):
+        self.config_path = Path(config_path)
+        self.results_base_dir = Path(results_base_dir)
+        self.index_path = index_path
+        
+        config = self._load_config()
+        self.evaluate_systems = config.get('evaluate_systems', [])
+        print(f"[✓] Loaded evaluate_systems: {self.evaluate_systems}")
+        
+        # An explicit price table wins over the config's cost.price_table
+        self.prices = PriceTable.load(price_table or (config.get('cost') or {}).get('price_table'))
+        print(f"[✓] Loaded price table {self.prices.version} ({self.prices.currency}) from {self.prices.source}")
+        
+        # Create results directory
+        self.results_base_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _load_config(self) -> Dict[str, Any]:
+        """
+        Load the experiment config file
+        
+        Returns:
+            Config dictionary (empty when the file is missing or invalid)
+        """
+        if not self.config_path.exists():
+            print(f"[!] Config file not found: {self.config_path}")
+            return {}
+        
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                return yaml.safe_load(f) or {}
+        except Exception as e:
+            print(f"[!] Error loading config: {e}")
+            return {}
+    
+    def evaluate_dataset(self, dataset_name: str, ocr_tool_name: str,
+                         raw_outputs_dir: Path) -> Dict[str, Any]:
+        """
+        Evaluate the cost of a specific dataset and OCR tool
+        
+        Args:
+            dataset_name: Name of the dataset
+            ocr_tool_name: Name of the OCR tool
+            raw_outputs_dir: Base directory containing raw outputs
+        
+        Returns:
+            Dictionary with usage and cost per billed system, total cost, cost
+            per page and per 1k pages, and per-image cost percentiles
+        """
+        print(f"\n--- Evaluating cost for {ocr_tool_name} on {dataset_name} ---")
+        
+        columns = load_usage_columns(raw_outputs_dir, dataset_name, ocr_tool_name, self.index_path)
+        if columns['images'] == 0:
+            return {
+                'dataset': dataset_name,
+                'ocr_tool': ocr_tool_name,
+                'error': 'No billed usage found'
+            }
+        
+        image_costs = np.zeros(columns['images'])
+        stages = {}
+        unpriced = []
+        for stage, usage in columns['stages'].items():
+            stage_results = {
+                'images': int(usage['image_index'].size),
+                'requests': int(usage['requests'].sum()),
+                'pages': int(usage['pages'].sum()),
+                'input_tokens': int(usage['input_tokens'].sum()),
+                'output_tokens': int(usage['output_tokens'].sum()),
+                'compute_seconds': float(usage['compute_seconds'].sum()),
+                'batch_images': int(usage['batch'].sum()),
+                'cost': None
+            }
+            cost = self.prices.cost(stage, usage)
+            if cost is None:
+                unpriced.append(stage)
+            else:
+                stage_results['cost'] = float(cost.sum())
+                image_costs += np.bincount(usage['image_index'], weights=cost, minlength=columns['images'])
+            stages[stage] = stage_results
+        
+        pages = int(columns['pages'])
+        total_cost = float(image_costs.sum())
+        results = {
+            'dataset': dataset_name,
+            'ocr_tool': ocr_tool_name,
+            'price_table_version': self.prices.version,
+            'currency': self.prices.currency,
+            'n_images': int(columns['images']),
+            'n_pages': pages,
+            'total_cost': total_cost,
+            'cost_per_page': total_cost / pages if pages else None,
+            'cost_per_1k_pages': total_cost * 1000 / pages if pages else None,
+            'image_cost': {
+                'mean': float(image_costs.mean()),
+                'p50': float(np.percentile(image_costs, 50)),
+                'p95': float(np.percentile(image_costs, 95)),
+                'max': float(image_costs.max())
+            },
+            'stages': stages,
+            # Costs leave out the billed systems the price table does not list
+            'unpriced_systems': unpriced
+        }
+        
+        print(f"[✓] {ocr_tool_name}: {results['n_images']} images, {pages} pages, "
+              f"total={total_cost:.4f} {self.prices.currency}, "
+              f"per 1k pages={results['cost_per_1k_pages']:.4f}")
+        if len(stages) > 1:
+            print("    stages: " + ', '.join(f"{stage}={stage_results['pages']} pages"
+                                            for stage, stage_results in stages.items()))
+        if unpriced:
+            print(f"[!] Not in price table {self.prices.version}: {unpriced}")
+        
+        return results
+    
+    def evaluate_all_tools(self, dataset_name: str, raw_outputs_base_dir: Path) -> Dict[str, Any]:
+        """
+        Evaluate the cost of all configured OCR tools
+        
+        Args:
+            dataset_name: Name of the dataset
+            raw_outputs_base_dir: Base directory containing raw outputs
+        
+        Returns:
+            Dictionary with cost evaluation results for all tools
+        """
+        print(f"\nEvaluating cost for configured OCR tools on {dataset_name} dataset...")
+        
+        if not self.evaluate_systems:
+            print("[!] No systems configured for evaluation in config file")
+            return {}
+        
+        raw_outputs_dir = Path(raw_outputs_base_dir)
+        dataset_dir = raw_outputs_dir / dataset_name
+        if not dataset_dir.exists():
+            print(f"[!] Dataset directory not found: {dataset_dir}")
+            return {}
+        
+        available_tools = [d.name for d in dataset_dir.iterdir() if d.is_dir()]
+        tools_to_evaluate = [tool for tool in self.evaluate_systems if tool in available_tools]
+        missing_tools = [tool for tool in self.evaluate_systems if tool not in available_tools]
+        
+        if missing_tools:
+            print(f"[!] Missing configured tools: {missing_tools}")
+        
+        if not tools_to_evaluate:
+            print("[!] No configured tools found in available tools")
+            return {}
+        
+        results = {}
+        
+        for ocr_tool_name in tools_to_evaluate:
+            try:
+                results[ocr_tool_name] = self.evaluate_dataset(
+                    dataset_name=dataset_name,
+                    ocr_tool_name=ocr_tool_name,
+                    raw_outputs_dir=raw_outputs_dir
+                )
+            except Exception as e:
+                print(f"[!] Error evaluating {ocr_tool_name}: {e}")
+                results[ocr_tool_name] = {
+                    'dataset': dataset_name,
+                    'ocr_tool': ocr_tool_name,
+                    'error': str(e)
+                }
+        
+        return results
+    
+    def save_results(self, results: Dict[str, Any], dataset_name: str) -> Path:
+        """
+        Save cost evaluation results to JSON file
+        
+        Args:
+            results: Results dictionary
+            dataset_name: Name of the dataset
+        
+        Returns:
+            Path to saved results file
+        """
+        output_file = self.results_base_dir / f"{dataset_name}_cost_results.json"
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        
+        print(f"[✓] Cost results saved to: {output_file}")
+        return output_file
@@ -0,0 +1,211 @@
+"""
+Usage index for OCR raw outputs
+Keeps one SQLite row per extracted image and billed system so cost reports do
+not have to open every raw JSON file
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+
+from .usage import record_usage, USAGE_FIELDS
+from ..time.index import COLD_START_FILE, create_sources_table, raw_dir_signature
+from ..resources.monitor import RESOURCES_FILE
+
+
+DEFAULT_INDEX_PATH = "results/metrics/usage_index.sqlite"
+
+# Side files next to the raw outputs that are not extraction records
+SIDE_FILES = ("summary.json", COLD_START_FILE, RESOURCES_FILE, "cascade.json")
+
+
+class UsageIndex:
+    """
+    SQLite index of the metered usage of each image
+    
+    Rows are keyed by (dataset, system, image, stage), where stage is the billed
+    system: the system itself, or one of the two stages of a cascade. Usage is
+    stored unpriced. Like the timing index, each (dataset, system) slice
+    remembers the signature of its raw output records at its last sync and is
+    rebuilt from the raw JSON files when it changed.
+    """
+    
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, flush_every: int = 2000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self._pending: List[tuple] = []
+        
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        usage_columns = ', '.join(f"{field} INTEGER NOT NULL" for field in USAGE_FIELDS)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS usage (
+                dataset TEXT NOT NULL,
+                system TEXT NOT NULL,
+                image TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                {usage_columns},
+                batch INTEGER NOT NULL,
+                PRIMARY KEY (dataset, system, image, stage)
+            ) WITHOUT ROWID;
+        """)
+        create_sources_table(self.conn)
+        self.conn.commit()
+    
+    def add(self, dataset: str, system: str, image_path: str, record: Dict[str, Any]) -> int:
+        """
+        Queue the usage of one raw output record
+        
+        Returns:
+            Number of billed stages queued (0 for failed or deduplicated images)
+        """
+        stages = record_usage(system, record)
+        image = Path(image_path).name
+        for stage, usage in stages.items():
+            self._pending.append((dataset, system, image, stage,
+                                  *(int(usage.get(field, 0)) for field in USAGE_FIELDS), usage['batch']))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return len(stages)
+    
+    def flush(self):
+        """Write queued rows in one transaction"""
+        if not self._pending:
+            return
+        placeholders = ', '.join('?' * (5 + len(USAGE_FIELDS)))
+        with self.conn:
+            self.conn.executemany(f"INSERT OR REPLACE INTO usage VALUES ({placeholders})", self._pending)
+        self._pending = []
+    
+    def mark_synced(self, dataset: str, system: str, raw_dir: Path):
+        """Record that the index matches the raw output directory as it is now"""
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                (dataset, system, raw_dir_signature(raw_dir), time.time())
+            )
+    
+    def is_fresh(self, dataset: str, system: str, raw_dir: Path) -> bool:
+        """Whether the slice was synced and no raw output was added, removed or rewritten since"""
+        row = self.conn.execute(
+            "SELECT raw_dir_signature FROM sources WHERE dataset = ? AND system = ?", (dataset, system)
+        ).fetchone()
+        return row is not None and row[0] == raw_dir_signature(raw_dir)
+    
+    def load_columns(self, dataset: str, system: str) -> Dict[str, Any]:
+        """
+        Load the usage of one dataset and system as numpy columns
+        
+        Returns:
+            Dictionary with:
+                images: number of images with billed usage
+                pages: pages read, counting each page once across cascade stages
+                stages: billed system -> columns (image_index, requests, pages,
+                    input_tokens, output_tokens, compute_seconds, batch), one
+                    entry per image billed by that stage
+        """
+        self.flush()
+        # Primary key order: one scan of the slice, no sort
+        rows = self.conn.execute(
+            f"SELECT image, stage, {', '.join(USAGE_FIELDS)}, batch FROM usage "
+            f"WHERE dataset = ? AND system = ? ORDER BY image, stage", (dataset, system)
+        ).fetchall()
+        if not rows:
+            return {'images': 0, 'pages': 0, 'stages': {}}
+        
+        image_names, stage_names, *value_columns = zip(*rows)
+        values = {field: np.fromiter(column, dtype=np.int64, count=len(rows))
+                  for field, column in zip(USAGE_FIELDS + ('batch',), value_columns)}
+        
+        # Position of each row's image, so per-image costs can be summed across stages
+        image_names = np.array(image_names)
+        new_image = np.concatenate(([True], image_names[1:] != image_names[:-1]))
+        image_index = np.cumsum(new_image) - 1
+        # A cascade's stages read the same page: count it once
+        pages = int(np.maximum.reduceat(values['pages'], np.flatnonzero(new_image)).sum())
+        
+        stage_names = np.array(stage_names)
+        stages: Dict[str, Dict[str, np.ndarray]] = {}
+        for stage in np.unique(stage_names):
+            mask = stage_names == stage
+            columns = {'image_index': image_index[mask]}
+            for field in USAGE_FIELDS:
+                columns[field] = values[field][mask]
+            columns['compute_seconds'] = columns.pop('compute_ns') / 1e9
+            columns['batch'] = values['batch'][mask].astype(bool)
+            stages[str(stage)] = columns
+        
+        images = int(image_index[-1]) + 1
+        return {'images': images, 'pages': pages, 'stages': stages}
+    
+    def rebuild(self, dataset: str, system: str, raw_dir: Path) -> int:
+        """
+        Re-index one dataset and system from its raw JSON files
+        
+        Returns:
+            Number of usage rows indexed
+        """
+        raw_dir = Path(raw_dir)
+        self.flush()
+        with self.conn:
+            self.conn.execute("DELETE FROM usage WHERE dataset = ? AND system = ?", (dataset, system))
+        
+        count = 0
+        for json_file in raw_dir.glob("*.json"):
+            if json_file.name in SIDE_FILES:
+                continue
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"[!] Error reading {json_file}: {e}")
+                continue
+            if not isinstance(data, dict):
+                continue
+            image = data.get('image_filename') or data.get('image_path') or json_file.name
+            count += self.add(dataset, system, image, data)
+        
+        self.mark_synced(dataset, system, raw_dir)
+        return count
+    
+    def close(self):
+        """Flush pending rows and close the connection"""
+        self.flush()
+        self.conn.close()
+
+
+def load_usage_columns(raw_outputs_dir: Path, dataset_name: str, system_name: str,
+                       index_path: str = DEFAULT_INDEX_PATH) -> Dict[str, Any]:
+    """
+    Load usage columns from the index, re-indexing from raw JSON when stale
+    
+    Args:
+        raw_outputs_dir: Base directory containing raw outputs
+        dataset_name: Name of the dataset
+        system_name: Name of the OCR system
+        index_path: Path to the SQLite usage index
+    
+    Returns:
+        Usage columns (see UsageIndex.load_columns), empty when the raw output
+        directory does not exist
+    """
+    raw_dir = Path(raw_outputs_dir) / dataset_name / system_name
+    if not raw_dir.exists():
+        print(f"[!] Tool directory not found: {raw_dir}")
+        return {'images': 0, 'pages': 0, 'stages': {}}
+    
+    index = UsageIndex(index_path)
+    try:
+        if not index.is_fresh(dataset_name, system_name, raw_dir):
+            print(f"[i] Indexing usage for {dataset_name}/{system_name} from raw outputs...")
+            index.rebuild(dataset_name, system_name, raw_dir)
+        return index.load_columns(dataset_name, system_name)
+    finally:
+        index.close()
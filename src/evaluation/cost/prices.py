@@ -0,0 +1,73 @@
+"""
+Versioned price table of the OCR systems
+Prices are applied to the metered usage at report time, so a new table
+re-prices past runs without re-reading their raw outputs
+"""
+
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+import yaml
+
+DEFAULT_PRICE_TABLE = Path(__file__).parent / "prices.yaml"
+
+# Price keys of a system entry
+PRICE_KEYS = ('per_1k_pages', 'input_per_mtok', 'output_per_mtok', 'per_compute_hour', 'batch_discount')
+
+
+class PriceTable:
+    """
+    Prices per system, loaded from YAML
+    
+    Each system entry may combine per_1k_pages, input_per_mtok, output_per_mtok
+    and per_compute_hour; batch_discount is the fraction taken off results of a
+    batch API job. Mock providers (mock_<system>) are priced like the system
+    they emulate, so offline runs give realistic figures.
+    """
+    
+    def __init__(self, prices: Dict[str, Any], source: str = ''):
+        self.version = str(prices.get('version', 'unversioned'))
+        self.currency = prices.get('currency', 'USD')
+        self.systems: Dict[str, Dict[str, float]] = {}
+        for name, entry in (prices.get('systems') or {}).items():
+            unknown = set(entry) - set(PRICE_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown price keys for {name} in {source or 'price table'}: {sorted(unknown)}")
+            self.systems[name] = {key: float(entry.get(key) or 0.0) for key in PRICE_KEYS}
+        self.source = source
+    
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'PriceTable':
+        """Load a price table, the one shipped with this module by default"""
+        path = Path(path) if path else DEFAULT_PRICE_TABLE
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(yaml.safe_load(f) or {}, str(path))
+    
+    def lookup(self, system_name: str) -> Optional[Dict[str, float]]:
+        """Prices of a system, None when the table does not list it"""
+        if system_name not in self.systems and system_name.startswith('mock_'):
+            system_name = system_name[len('mock_'):]
+        return self.systems.get(system_name)
+    
+    def cost(self, system_name: str, columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Cost of each usage row of one billed system
+        
+        Args:
+            system_name: Billed system
+            columns: Usage columns (see UsageIndex.load_columns), one row per image
+        
+        Returns:
+            Array of costs in the table's currency, None when the system is not priced
+        """
+        prices = self.lookup(system_name)
+        if prices is None:
+            return None
+        cost = (columns['pages'] * prices['per_1k_pages'] / 1e3
+                + columns['input_tokens'] * prices['input_per_mtok'] / 1e6
+                + columns['output_tokens'] * prices['output_per_mtok'] / 1e6
+                + columns['compute_seconds'] * prices['per_compute_hour'] / 3600)
+        if prices['batch_discount']:
+            cost = np.where(columns['batch'], cost * (1 - prices['batch_discount']), cost)
+        return cost
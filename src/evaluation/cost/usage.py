@@ -0,0 +1,143 @@
+"""
+Usage metering of OCR raw outputs
+Per-provider extractors read the billed quantities (requests, pages, input and
+output tokens, compute time) from the saved raw output records
+"""
+
+from typing import Dict, Any, Optional
+
+from parsing.samples import system_output_format
+
+# Metered quantities, in the order of the usage index columns
+USAGE_FIELDS = ('requests', 'pages', 'input_tokens', 'output_tokens', 'compute_ns')
+
+
+def _tokens(usage: Dict[str, Any], *keys: str) -> int:
+    return sum(int(usage.get(key) or 0) for key in keys)
+
+
+def response_usage(output_format_name: Optional[str], raw_output: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Usage of one provider response
+    
+    Args:
+        output_format_name: One of the values of SYSTEM_FORMATS (None for unknown systems)
+        raw_output: Raw output of one request
+    
+    Returns:
+        Dictionary of requests, pages, input_tokens and output_tokens
+    """
+    usage = {'requests': 1, 'pages': 1, 'input_tokens': 0, 'output_tokens': 0}
+    
+    if output_format_name == 'openai':
+        tokens = raw_output.get('usage') or {}
+        usage['input_tokens'] = _tokens(tokens, 'prompt_tokens')
+        usage['output_tokens'] = _tokens(tokens, 'completion_tokens')
+    
+    elif output_format_name == 'claude_haiku':
+        tokens = raw_output.get('usage') or {}
+        # Prompt caching reports cached input apart from input_tokens
+        usage['input_tokens'] = _tokens(tokens, 'input_tokens', 'cache_creation_input_tokens',
+                                        'cache_read_input_tokens')
+        usage['output_tokens'] = _tokens(tokens, 'output_tokens')
+    
+    elif output_format_name == 'gemini_flash':
+        # model_dump() of the SDK response is snake_case, the REST API camelCase
+        tokens = raw_output.get('usage_metadata') or raw_output.get('usageMetadata') or {}
+        usage['input_tokens'] = _tokens(tokens, 'prompt_token_count', 'promptTokenCount')
+        usage['output_tokens'] = _tokens(tokens, 'candidates_token_count', 'candidatesTokenCount',
+                                         'thoughts_token_count', 'thoughtsTokenCount')
+    
+    elif output_format_name == 'mistral_ocr':
+        pages = (raw_output.get('usage_info') or {}).get('pages_processed')
+        usage['pages'] = int(pages or len(raw_output.get('pages', [])) or 1)
+    
+    elif output_format_name == 'aws_textract':
+        usage['pages'] = int((raw_output.get('DocumentMetadata') or {}).get('Pages') or 1)
+    
+    elif output_format_name == 'azure_document':
+        usage['pages'] = len(raw_output.get('pages') or []) or 1
+    
+    elif output_format_name == 'google_document':
+        usage['pages'] = len((raw_output.get('document') or {}).get('pages') or []) or 1
+    
+    return usage
+
+
+def _add(total: Dict[str, int], usage: Dict[str, int]):
+    # Fields a usage does not have (e.g. compute_ns of a single stage) stay unset
+    for field in USAGE_FIELDS:
+        if field in usage:
+            total[field] = total.get(field, 0) + usage[field]
+
+
+def raw_output_usage(system_name: str, raw_output: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """
+    Usage of a raw output per billed system
+    
+    A cascade bills its first stage for every page and its fallback for the
+    escalated ones; a document extracted page by page is one request per page.
+    
+    Returns:
+        Billed system name -> usage; empty when the output is empty (failed request)
+    """
+    if not raw_output:
+        return {}
+    
+    stages: Dict[str, Dict[str, int]] = {}
+    if 'document_pages' in raw_output:
+        for page in raw_output['document_pages']:
+            for stage, usage in raw_output_usage(system_name, page).items():
+                _add(stages.setdefault(stage, {}), usage)
+        return stages
+    
+    cascade = raw_output.get('cascade')
+    if cascade is not None and system_name.startswith('cascade_'):
+        answered, output = cascade.get('system'), raw_output.get('output') or {}
+        stage_seconds = cascade.get('stage_seconds', {})
+        for role in ('first', 'fallback'):
+            stage = cascade.get(f'{role}_system')
+            if role not in stage_seconds or not stage:
+                continue
+            if stage == answered and output:
+                usage = response_usage(system_output_format(stage), output)
+            elif role == 'first':
+                # The first stage's output is dropped on escalation; it still read the page
+                usage = {'requests': 1, 'pages': 1, 'input_tokens': 0, 'output_tokens': 0}
+            else:
+                # A failed fallback request is not billed
+                continue
+            usage['compute_ns'] = int(stage_seconds[role] * 1e9)
+            stages[stage] = usage
+        return stages
+    
+    return {system_name: response_usage(system_output_format(system_name), raw_output)}
+
+
+def record_usage(system_name: str, record: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """
+    Usage of one saved raw output record (a *_raw.json file)
+    
+    Records copied by the dedup stage (duplicate_of) and failed extractions
+    made no billed request. Compute time comes from the record's processing
+    time, so it is only known with measure_time: true.
+    
+    Returns:
+        Billed system name -> usage, with compute_ns and a 'batch' flag (1 for
+        results of a batch API job, whose timing fields hold the batch_id)
+    """
+    if record.get('duplicate_of') or record.get('error'):
+        return {}
+    stages = raw_output_usage(system_name, record.get('raw_output') or {})
+    
+    if record.get('processing_time_ns'):
+        compute_ns = int(record['processing_time_ns'])
+    elif isinstance(record.get('processing_time_seconds'), (int, float)):
+        compute_ns = int(record['processing_time_seconds'] * 1e9)
+    else:
+        compute_ns = 0
+    batch = 1 if record.get('batch_id') else 0
+    for usage in stages.values():
+        usage.setdefault('compute_ns', compute_ns)
+        usage['batch'] = batch
+    return stages
@@ -0,0 +1,20 @@
+"""
+Resource evaluation module for OCR systems
+Samples CPU, memory and GPU usage during extraction
+"""
+
+from .monitor import (
+    ResourceMonitor,
+    GPUMemoryProbe,
+    summarize_image_windows,
+    build_resources_record,
+    RESOURCES_FILE
+)
+
+__all__ = [
+    'ResourceMonitor',
+    'GPUMemoryProbe',
+    'summarize_image_windows',
+    'build_resources_record',
+    'RESOURCES_FILE'
+]
@@ -0,0 +1,267 @@
+"""
+Sampling resource monitor for OCR extraction
+Records CPU, memory, thread count and (when available) GPU memory of the
+current process in a background thread, and summarizes any time window
+"""
+
+import bisect
+import sys
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Written next to the raw outputs of each dataset and system
+RESOURCES_FILE = "resources.json"
+
+MIN_CPU_INTERVAL = 0.02
+
+
+class GPUMemoryProbe:
+    """
+    Read used GPU memory through NVML, or through torch when it is already loaded
+    
+    NVML reports device memory used by every process (the whole footprint of a
+    local engine including the CUDA context), torch only its own allocations.
+    """
+    
+    def __init__(self):
+        self.backend = None
+        self._handles = []
+        try:
+            import pynvml
+            pynvml.nvmlInit()
+            self._handles = [pynvml.nvmlDeviceGetHandleByIndex(i)
+                             for i in range(pynvml.nvmlDeviceGetCount())]
+            self._pynvml = pynvml
+            self.backend = 'nvml' if self._handles else None
+        except Exception:
+            self._handles = []
+        
+        # Never import torch just to probe it, it takes seconds
+        if self.backend is None and 'torch' in sys.modules:
+            torch = sys.modules['torch']
+            try:
+                if torch.cuda.is_available():
+                    self._torch = torch
+                    self.backend = 'torch'
+            except Exception:
+                pass
+    
+    def used_bytes(self) -> Optional[int]:
+        """Used GPU memory summed over devices, None when no GPU is visible"""
+        try:
+            if self.backend == 'nvml':
+                return sum(self._pynvml.nvmlDeviceGetMemoryInfo(handle).used for handle in self._handles)
+            if self.backend == 'torch':
+                return sum(self._torch.cuda.memory_allocated(i) for i in range(self._torch.cuda.device_count()))
+        except Exception:
+            return None
+        return None
+
+
+class ResourceMonitor:
+    """
+    Background sampler of the current process's resource usage
+    
+    Every ``interval`` seconds it records CPU utilization (percent of one core,
+    including finished child processes such as the tesseract binary), resident
+    memory of the process and its live children, thread count and GPU memory.
+    Samples are timestamped with time.time() so they can be matched to the
+    extraction window of each image.
+    
+    Usage:
+        with ResourceMonitor(interval=0.1) as monitor:
+            ...
+            monitor.window_stats(start, end)
+    """
+    
+    def __init__(self, interval: float = 0.1, gpu: bool = True):
+        self.interval = interval
+        self.enabled = psutil is not None
+        if not self.enabled:
+            print("psutil not installed, resource monitoring disabled. Install with: pip install psutil")
+        self.process = psutil.Process() if self.enabled else None
+        self.gpu = GPUMemoryProbe() if (gpu and self.enabled) else None
+        
+        self.timestamps: List[float] = []
+        self.samples: List[tuple] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_cpu = None
+    
+    def _cpu_seconds(self) -> float:
+        times = self.process.cpu_times()
+        return (times.user + times.system
+                + getattr(times, 'children_user', 0.0) + getattr(times, 'children_system', 0.0))
+    
+    def _rss_bytes(self) -> int:
+        rss = self.process.memory_info().rss
+        try:
+            for child in self.process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+        return rss
+    
+    def sample(self):
+        """Take one sample now"""
+        now = time.time()
+        cpu_seconds = self._cpu_seconds()
+        cpu_percent = self.samples[-1][0] if self.samples else 0.0
+        if self._last_cpu is None or now - self._last_cpu[0] >= MIN_CPU_INTERVAL:
+            # CPU times tick in 10ms steps, shorter intervals give meaningless percentages
+            if self._last_cpu is not None:
+                cpu_percent = 100.0 * (cpu_seconds - self._last_cpu[1]) / (now - self._last_cpu[0])
+            self._last_cpu = (now, cpu_seconds)
+        
+        gpu_bytes = self.gpu.used_bytes() if self.gpu is not None and self.gpu.backend else None
+        with self._lock:
+            self.timestamps.append(now)
+            self.samples.append((cpu_percent, self._rss_bytes(), self.process.num_threads(),
+                                 gpu_bytes if gpu_bytes is not None else -1))
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                # The process may be shutting down; keep the samples taken so far
+                pass
+    
+    def start(self) -> 'ResourceMonitor':
+        """Start sampling in a daemon thread"""
+        if self.enabled and self._thread is None:
+            self._stop.clear()
+            self.sample()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="resource-monitor")
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop sampling, taking one last sample"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.sample()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def window_stats(self, start: float, end: float) -> Optional[Dict[str, Any]]:
+        """
+        Summarize usage between two time.time() instants
+        
+        A window shorter than the sampling interval has no sample of its own; the
+        samples around it are used instead, so short extractions still get a value.
+        When several images are in flight (concurrent adapters) their windows
+        overlap and share the same process-wide samples.
+        
+        Returns:
+            Dictionary with mean CPU percent, peak RSS, peak threads and peak GPU
+            memory, or None when monitoring is disabled
+        """
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            if not self.samples:
+                return None
+            lo = bisect.bisect_left(self.timestamps, start)
+            hi = bisect.bisect_right(self.timestamps, end)
+            # CPU percent of a sample covers the interval before it, so the first
+            # sample after the window also counts towards the window's CPU use
+            cpu_window = self.samples[min(lo, len(self.samples) - 1):hi + 1]
+            # Fall back to the nearest sample for windows with none inside
+            window = self.samples[lo:hi] or cpu_window[:1]
+        
+        result = _summarize(np.array(window, dtype=np.float64))
+        cpu = np.array([sample[0] for sample in cpu_window])
+        result['cpu_percent_mean'] = round(float(cpu.mean()), 2)
+        result['cpu_percent_max'] = round(float(cpu.max()), 2)
+        return result
+    
+    def summary(self) -> Optional[Dict[str, Any]]:
+        """Summarize all samples taken so far"""
+        if not self.enabled or not self.samples:
+            return None
+        with self._lock:
+            values = np.array(self.samples, dtype=np.float64)
+        result = _summarize(values)
+        result['n_samples'] = len(values)
+        result['duration_seconds'] = round(self.timestamps[-1] - self.timestamps[0], 3)
+        result['gpu_backend'] = self.gpu.backend if self.gpu is not None else None
+        return result
+
+
+def _summarize(values: np.ndarray) -> Dict[str, Any]:
+    """Aggregate sample rows of (cpu_percent, rss_bytes, threads, gpu_bytes)"""
+    gpu = values[:, 3][values[:, 3] >= 0]
+    return {
+        'cpu_percent_mean': round(float(values[:, 0].mean()), 2),
+        'cpu_percent_max': round(float(values[:, 0].max()), 2),
+        'rss_peak_mb': round(float(values[:, 1].max()) / 2**20, 2),
+        'threads_max': int(values[:, 2].max()),
+        'gpu_memory_peak_mb': round(float(gpu.max()) / 2**20, 2) if gpu.size else None
+    }
+
+
+def summarize_image_windows(windows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate per-image window stats into per-system figures
+    
+    Args:
+        windows: window_stats() results, one per image
+    
+    Returns:
+        Dictionary with mean/p95 CPU percent and mean/p95/max peak RSS per image
+    """
+    windows = [window for window in windows if window]
+    if not windows:
+        return {}
+    
+    cpu = np.array([window['cpu_percent_mean'] for window in windows])
+    rss = np.array([window['rss_peak_mb'] for window in windows])
+    return {
+        'n_images': len(windows),
+        'cpu_percent_mean': round(float(cpu.mean()), 2),
+        'cpu_percent_p95': round(float(np.percentile(cpu, 95)), 2),
+        'rss_peak_mb_mean': round(float(rss.mean()), 2),
+        'rss_peak_mb_p95': round(float(np.percentile(rss, 95)), 2),
+        'rss_peak_mb_max': round(float(rss.max()), 2)
+    }
+
+
+def build_resources_record(monitor: ResourceMonitor, image_windows: Dict[str, tuple]) -> Dict[str, Any]:
+    """
+    Build the resources.json record of one dataset and system run
+    
+    Args:
+        monitor: Monitor that sampled the run (stopped)
+        image_windows: Image filename -> (start, end) time.time() window of its extraction
+    
+    Returns:
+        Dictionary with process-wide 'system' usage, per-image aggregates and
+        the usage of every image window
+    """
+    images = {image: monitor.window_stats(start, end) for image, (start, end) in image_windows.items()}
+    return {
+        'system': monitor.summary(),
+        'per_image': summarize_image_windows(list(images.values())),
+        'images': images
+    }
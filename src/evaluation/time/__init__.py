@@ -5,14 +5,25 @@ Analyzes processing time from raw outputs
 
 from .metrics import (
     calculate_time_statistics,
-    filter_outliers
+    calculate_phase_statistics,
+    calculate_latency_percentiles,
+    calculate_throughput,
+    filter_outliers,
+    LatencyHistogram
 )
 from .evaluator import TimeEvaluator
+from .index import TimingIndex, load_timing_columns
 from .visualization import generate_timing_visualizations
 
 __all__ = [
     'calculate_time_statistics',
+    'calculate_phase_statistics',
+    'calculate_latency_percentiles',
+    'calculate_throughput',
     'filter_outliers',
+    'LatencyHistogram',
     'TimeEvaluator',
+    'TimingIndex',
+    'load_timing_columns',
     'generate_timing_visualizations'
 ]
\ No newline at end of file
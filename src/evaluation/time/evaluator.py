@@ -7,7 +7,14 @@ import json
 import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-from .metrics import calculate_time_statistics
+from .metrics import (
+    calculate_time_statistics,
+    calculate_phase_statistics,
+    calculate_latency_percentiles,
+    calculate_throughput
+)
+from .index import load_timing_columns, DEFAULT_INDEX_PATH, COLD_START_FILE
+from ..resources.monitor import RESOURCES_FILE
 
 
 class TimeEvaluator:
@@ -16,9 +23,11 @@ class TimeEvaluator:
     """
     
     def __init__(self, config_path: str = "config/experiments.yaml",
-                 results_base_dir: str = "results/metrics/time_reports"):
+                 results_base_dir: str = "results/metrics/time_reports",
+                 index_path: str = DEFAULT_INDEX_PATH):
         self.config_path = Path(config_path)
         self.results_base_dir = Path(results_base_dir)
+        self.index_path = index_path
         self.evaluate_systems = self._load_evaluate_systems()
         
         # Create results directory
@@ -47,6 +56,26 @@ class TimeEvaluator:
             print(f"[!] Error loading config: {e}")
             return []
     
+    def extract_timing_columns(self, raw_outputs_dir: Path,
+                               dataset_name: str, ocr_tool_name: str) -> Dict[str, Any]:
+        """
+        Extract timing columns from the timing index
+        
+        The index is filled during extraction; when it is missing or out of date
+        for this dataset and tool it is rebuilt from the raw JSON outputs once.
+        
+        Args:
+            raw_outputs_dir: Base directory containing raw outputs
+            dataset_name: Name of the dataset
+            ocr_tool_name: Name of the OCR tool
+            
+        Returns:
+            Dictionary of numpy arrays: 'processing_time_seconds', 'end_timestamp'
+            (epoch seconds) and 'phases' (phase name -> seconds, over the images
+            that recorded phase spans)
+        """
+        return load_timing_columns(raw_outputs_dir, dataset_name, ocr_tool_name, self.index_path)
+    
     def extract_processing_times(self, raw_outputs_dir: Path, 
                                 dataset_name: str, ocr_tool_name: str) -> List[float]:
         """
@@ -60,34 +89,68 @@ class TimeEvaluator:
         Returns:
             List of processing times in seconds
         """
-        tool_dir = raw_outputs_dir / dataset_name / ocr_tool_name
+        columns = self.extract_timing_columns(raw_outputs_dir, dataset_name, ocr_tool_name)
+        processing_times = columns['processing_time_seconds'].tolist()
         
-        if not tool_dir.exists():
-            print(f"[!] Tool directory not found: {tool_dir}")
-            return []
+        print(f"[✓] Extracted {len(processing_times)} processing times for {ocr_tool_name}")
+        return processing_times
+    
+    def load_cold_start(self, raw_outputs_dir: Path,
+                        dataset_name: str, ocr_tool_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the cold-start record (model load time, first inference, warm-up runs)
+        
+        Args:
+            raw_outputs_dir: Base directory containing raw outputs
+            dataset_name: Name of the dataset
+            ocr_tool_name: Name of the OCR tool
+            
+        Returns:
+            Cold-start record, or None when the extraction did not save one
+        """
+        cold_start_file = raw_outputs_dir / dataset_name / ocr_tool_name / COLD_START_FILE
+        if not cold_start_file.exists():
+            return None
+        
+        try:
+            with open(cold_start_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[!] Error reading {cold_start_file}: {e}")
+            return None
         
-        processing_times = []
+        return {
+            'model_load_seconds': data.get('model_load_seconds'),
+            'first_inference_seconds': data.get('first_inference_seconds'),
+            'warmup_runs': data.get('warmup_runs', 0)
+        }
+    
+    def load_resources(self, raw_outputs_dir: Path,
+                       dataset_name: str, ocr_tool_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the resource usage sampled during extraction
         
-        # Look for individual JSON files (not summary.json)
-        json_files = [f for f in tool_dir.glob("*.json") if f.name != "summary.json"]
+        Args:
+            raw_outputs_dir: Base directory containing raw outputs
+            dataset_name: Name of the dataset
+            ocr_tool_name: Name of the OCR tool
+            
+        Returns:
+            Process-wide ('system') and per-image ('per_image') usage, or None when
+            the extraction was not monitored
+        """
+        resources_file = raw_outputs_dir / dataset_name / ocr_tool_name / RESOURCES_FILE
+        if not resources_file.exists():
+            return None
         
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Extract processing time
-                if isinstance(data, dict) and 'processing_time_seconds' in data:
-                    time_val = data['processing_time_seconds']
-                    if isinstance(time_val, (int, float)) and time_val > 0:
-                        processing_times.append(float(time_val))
-                
-            except Exception as e:
-                print(f"[!] Error reading {json_file}: {e}")
-                continue
+        try:
+            with open(resources_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[!] Error reading {resources_file}: {e}")
+            return None
         
-        print(f"[✓] Extracted {len(processing_times)} processing times for {ocr_tool_name}")
-        return processing_times
+        return {'system': data.get('system') or {}, 'per_image': data.get('per_image') or {}}
     
     def evaluate_dataset(self, dataset_name: str, ocr_tool_name: str,
                         raw_outputs_dir: Path) -> Dict[str, Any]:
@@ -104,12 +167,12 @@ class TimeEvaluator:
         """
         print(f"\n--- Evaluating time for {ocr_tool_name} on {dataset_name} ---")
         
-        # Extract processing times
-        processing_times = self.extract_processing_times(
-            raw_outputs_dir, dataset_name, ocr_tool_name
-        )
+        # Extract processing times and phase spans
+        columns = self.extract_timing_columns(raw_outputs_dir, dataset_name, ocr_tool_name)
+        processing_times = columns['processing_time_seconds']
+        print(f"[✓] Extracted {len(processing_times)} processing times for {ocr_tool_name}")
         
-        if not processing_times:
+        if processing_times.size == 0:
             return {
                 'dataset': dataset_name,
                 'ocr_tool': ocr_tool_name,
@@ -134,8 +197,48 @@ class TimeEvaluator:
             }
         }
         
+        # Tail latency (histogram based) and throughput; timing_stats above stays the
+        # outlier-filtered summary, percentiles are reported unfiltered and filtered
+        results['latency_percentiles'] = calculate_latency_percentiles(processing_times)
+        results['throughput'] = calculate_throughput(processing_times, columns['end_timestamp'])
+        
+        # Per-phase breakdown (unfiltered, from images that recorded spans)
+        phase_times = columns['phases']
+        if phase_times:
+            results['n_phase_samples'] = len(next(iter(phase_times.values())))
+            results['phase_stats'] = calculate_phase_statistics(phase_times)
+        
+        # Cold start (model load, first inference) is kept out of the steady-state stats above
+        cold_start = self.load_cold_start(raw_outputs_dir, dataset_name, ocr_tool_name)
+        if cold_start:
+            results['cold_start'] = cold_start
+        
+        resources = self.load_resources(raw_outputs_dir, dataset_name, ocr_tool_name)
+        if resources:
+            results['resources'] = resources
+        
+        tail = results['latency_percentiles']['unfiltered']
         print(f"[✓] {ocr_tool_name}: {stats['count']} samples, "
               f"mean={stats['mean']:.3f}s, median={stats['median']:.3f}s")
+        print(f"    p90={tail['p90_seconds']:.3f}s, p99={tail['p99_seconds']:.3f}s, "
+              f"p99.9={tail['p999_seconds']:.3f}s, "
+              f"throughput={results['throughput']['images_per_second']:.2f} img/s")
+        if phase_times:
+            breakdown = ', '.join(f"{name}={phase['share']:.1%}"
+                                  for name, phase in results['phase_stats'].items())
+            print(f"    phases: {breakdown}")
+        if cold_start:
+            parts = [f"{label}={cold_start[key]:.3f}s"
+                     for key, label in [('model_load_seconds', 'model load'),
+                                        ('first_inference_seconds', 'first inference')]
+                     if cold_start[key] is not None]
+            print(f"    cold start: {', '.join(parts)}, warm-up runs={cold_start['warmup_runs']}")
+        if resources and resources['system']:
+            usage = resources['system']
+            gpu = usage.get('gpu_memory_peak_mb')
+            print(f"    resources: cpu={usage['cpu_percent_mean']:.0f}% mean, "
+                  f"peak rss={usage['rss_peak_mb']:.0f} MB, threads={usage['threads_max']}"
+                  + (f", peak gpu={gpu:.0f} MB" if gpu is not None else ""))
         
         return results
     
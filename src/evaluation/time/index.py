@@ -0,0 +1,299 @@
+"""
+Timing index for OCR raw outputs
+Keeps one SQLite row per extracted image so timing analysis does not have to
+open every raw JSON file
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from ..resources.monitor import RESOURCES_FILE
+
+
+DEFAULT_INDEX_PATH = "results/metrics/timing_index.sqlite"
+
+# Cold-start record written next to the raw outputs by OCRSystem.save_cold_start_stats
+COLD_START_FILE = "cold_start.json"
+
+# Phases stored as columns; any other phase name goes to the phases_extra JSON column
+KNOWN_PHASES = ('load', 'preprocess', 'encode', 'request', 'inference', 'decode', 'other')
+
+
+class TimingIndex:
+    """
+    SQLite index of per-image timings written during extraction
+    
+    Rows are keyed by (dataset, system, image) and replaced when an image is
+    re-extracted. For every (dataset, system) the index also remembers the
+    number of raw output records and the newest record's mtime at the last
+    sync: if records were added, removed or rewritten since, readers rebuild
+    that slice from the raw JSON files.
+    """
+    
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH, flush_every: int = 500):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self._pending: List[tuple] = []
+        
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        phase_columns = ', '.join(f"{phase}_ns INTEGER" for phase in KNOWN_PHASES)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS timings (
+                dataset TEXT NOT NULL,
+                system TEXT NOT NULL,
+                image TEXT NOT NULL,
+                processing_time_ns INTEGER NOT NULL,
+                end_timestamp REAL,
+                {phase_columns},
+                phases_extra TEXT,
+                PRIMARY KEY (dataset, system, image)
+            ) WITHOUT ROWID;
+        """)
+        create_sources_table(self.conn)
+        self.conn.commit()
+    
+    def add(self, dataset: str, system: str, image_path: str, timing: Dict[str, Any],
+            end_timestamp: Optional[float] = None) -> bool:
+        """
+        Queue one image's timing (the fields saved in its raw output record)
+        
+        Returns:
+            False when the record has no processing time (e.g. batch-mode outputs)
+            or is the cold-start extraction, which is reported separately
+        """
+        if timing.get('cold_start'):
+            return False
+        if timing.get('processing_time_ns'):
+            processing_time_ns = int(timing['processing_time_ns'])
+        elif isinstance(timing.get('processing_time_seconds'), (int, float)):
+            processing_time_ns = int(timing['processing_time_seconds'] * 1e9)
+        else:
+            return False
+        if processing_time_ns <= 0:
+            return False
+        
+        phases = dict(timing.get('phase_times_ns') or {})
+        known = [phases.pop(phase, None) for phase in KNOWN_PHASES]
+        self._pending.append((
+            dataset, system, Path(image_path).name, processing_time_ns,
+            end_timestamp if end_timestamp is not None else time.time(),
+            *known, json.dumps(phases) if phases else None
+        ))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return True
+    
+    def flush(self):
+        """Write queued rows in one transaction"""
+        if not self._pending:
+            return
+        placeholders = ', '.join('?' * (6 + len(KNOWN_PHASES)))
+        with self.conn:
+            self.conn.executemany(f"INSERT OR REPLACE INTO timings VALUES ({placeholders})", self._pending)
+        self._pending = []
+    
+    def invalidate(self, dataset: str, system: str):
+        """Mark a slice as out of sync (e.g. while its raw outputs are being rewritten)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM sources WHERE dataset = ? AND system = ?", (dataset, system))
+    
+    def mark_synced(self, dataset: str, system: str, raw_dir: Path):
+        """Record that the index matches the raw output directory as it is now"""
+        self.flush()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                (dataset, system, raw_dir_signature(raw_dir), time.time())
+            )
+    
+    def is_fresh(self, dataset: str, system: str, raw_dir: Path) -> bool:
+        """Whether the slice was synced and no raw output was added, removed or rewritten since"""
+        row = self.conn.execute(
+            "SELECT raw_dir_signature FROM sources WHERE dataset = ? AND system = ?", (dataset, system)
+        ).fetchone()
+        return row is not None and row[0] == raw_dir_signature(raw_dir)
+    
+    def load_columns(self, dataset: str, system: str) -> Dict[str, Any]:
+        """
+        Load timings for one dataset and system as numpy columns
+        
+        Returns:
+            Dictionary with:
+                processing_time_seconds: array of processing times
+                end_timestamp: array of epoch completion times (NaN when unknown)
+                phases: phase name -> array of seconds, over the images that
+                    recorded phase spans (0 where an image has no such phase)
+        """
+        self.flush()
+        phase_columns = ', '.join(f"COALESCE({phase}_ns, -1)" for phase in KNOWN_PHASES)
+        where = "WHERE dataset = ? AND system = ?"
+        rows = self.conn.execute(
+            f"SELECT processing_time_ns, COALESCE(end_timestamp, -1), {phase_columns} FROM timings {where} "
+            f"ORDER BY image", (dataset, system)
+        ).fetchall()
+        values = np.array(rows, dtype=np.float64).reshape(-1, 2 + len(KNOWN_PHASES))
+        
+        end_timestamp = values[:, 1].copy()
+        end_timestamp[end_timestamp < 0] = np.nan
+        columns = {
+            'processing_time_seconds': values[:, 0] / 1e9,
+            'end_timestamp': end_timestamp,
+            'phases': {}
+        }
+        
+        phase_values = values[:, 2:]
+        extra = dict(self.conn.execute(
+            f"SELECT image, phases_extra FROM timings {where} AND phases_extra IS NOT NULL",
+            (dataset, system)
+        ).fetchall())
+        
+        has_phases = (phase_values >= 0).any(axis=1)
+        if extra:
+            images = [row[0] for row in self.conn.execute(
+                f"SELECT image FROM timings {where} ORDER BY image", (dataset, system)
+            )]
+            extra_phases: Dict[str, np.ndarray] = {}
+            for i, image in enumerate(images):
+                if image in extra:
+                    has_phases[i] = True
+                    for phase, ns in json.loads(extra[image]).items():
+                        extra_phases.setdefault(phase, np.zeros(len(images)))[i] = ns / 1e9
+        else:
+            extra_phases = {}
+        
+        for i, phase in enumerate(KNOWN_PHASES):
+            column = phase_values[has_phases, i]
+            if (column >= 0).any():
+                columns['phases'][phase] = np.where(column >= 0, column, 0.0) / 1e9
+        for phase, column in extra_phases.items():
+            columns['phases'][phase] = column[has_phases]
+        
+        return columns
+    
+    def rebuild(self, dataset: str, system: str, raw_dir: Path) -> int:
+        """
+        Re-index one dataset and system from its raw JSON files
+        
+        Returns:
+            Number of timing rows indexed
+        """
+        raw_dir = Path(raw_dir)
+        self.flush()
+        with self.conn:
+            self.conn.execute("DELETE FROM timings WHERE dataset = ? AND system = ?", (dataset, system))
+        
+        count = 0
+        for json_file in raw_dir.glob("*.json"):
+            if json_file.name in ("summary.json", COLD_START_FILE, RESOURCES_FILE):
+                continue
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"[!] Error reading {json_file}: {e}")
+                continue
+            if not isinstance(data, dict):
+                continue
+            
+            end_timestamp = None
+            if data.get('timestamp'):
+                try:
+                    end_timestamp = datetime.fromisoformat(data['timestamp']).timestamp()
+                except (TypeError, ValueError):
+                    pass
+            
+            image = data.get('image_filename') or data.get('image_path') or json_file.name
+            if end_timestamp is None:
+                end_timestamp = json_file.stat().st_mtime
+            count += self.add(dataset, system, image, data, end_timestamp)
+        
+        self.mark_synced(dataset, system, raw_dir)
+        return count
+    
+    def close(self):
+        """Flush pending rows and close the connection"""
+        self.flush()
+        self.conn.close()
+
+
+def create_sources_table(conn: sqlite3.Connection):
+    """
+    Create the sync markers table of an index
+    
+    Indexes written before markers were signatures keyed slices on the
+    directory mtime; their markers are dropped, so every slice is re-indexed once.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sources)")]
+    if columns and 'raw_dir_signature' not in columns:
+        conn.execute("DROP TABLE sources")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sources (
+            dataset TEXT NOT NULL,
+            system TEXT NOT NULL,
+            raw_dir_signature TEXT,
+            synced_at REAL,
+            PRIMARY KEY (dataset, system)
+        )""")
+
+
+def raw_dir_signature(raw_dir: Path) -> Optional[str]:
+    """
+    Signature of the raw output records (*_raw.json) of a directory
+    
+    Record count and newest mtime: unlike the directory's own mtime, it also
+    changes when an existing record is rewritten in place (re-runs, queue
+    retries). Side files such as cold_start.json are left out.
+    
+    Returns:
+        "<count>:<newest mtime ns>", None when the directory does not exist
+    """
+    count, newest_ns = 0, 0
+    try:
+        with os.scandir(raw_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('_raw.json'):
+                    count += 1
+                    newest_ns = max(newest_ns, entry.stat().st_mtime_ns)
+    except OSError:
+        return None
+    return f"{count}:{newest_ns}"
+
+
+def load_timing_columns(raw_outputs_dir: Path, dataset_name: str, system_name: str,
+                        index_path: str = DEFAULT_INDEX_PATH) -> Dict[str, Any]:
+    """
+    Load timing columns from the index, re-indexing from raw JSON when stale
+    
+    Args:
+        raw_outputs_dir: Base directory containing raw outputs
+        dataset_name: Name of the dataset
+        system_name: Name of the OCR system
+        index_path: Path to the SQLite timing index
+    
+    Returns:
+        Timing columns (see TimingIndex.load_columns), empty when the raw
+        output directory does not exist
+    """
+    raw_dir = Path(raw_outputs_dir) / dataset_name / system_name
+    if not raw_dir.exists():
+        print(f"[!] Tool directory not found: {raw_dir}")
+        return {'processing_time_seconds': np.array([]), 'end_timestamp': np.array([]), 'phases': {}}
+    
+    index = TimingIndex(index_path)
+    try:
+        if not index.is_fresh(dataset_name, system_name, raw_dir):
+            print(f"[i] Indexing timings for {dataset_name}/{system_name} from raw outputs...")
+            index.rebuild(dataset_name, system_name, raw_dir)
+        return index.load_columns(dataset_name, system_name)
+    finally:
+        index.close()
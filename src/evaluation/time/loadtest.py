@@ -0,0 +1,206 @@
+"""
+Load testing for OCR systems
+Drives an OCR system at increasing concurrency levels and records throughput,
+latency percentiles and error rate at each level
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence
+
+from .metrics import LatencyHistogram, DEFAULT_PERCENTILES, percentile_key
+
+
+DEFAULT_LEVELS = (1, 2, 4, 8, 16, 32)
+
+
+class LoadTester:
+    """
+    Closed-loop load generator for one OCR system
+    
+    At each concurrency level N, N workers send requests back to back (each
+    starts as soon as the previous one returns), cycling over the image sample.
+    The first requests of a level warm connections and caches and are left out
+    of the statistics. An extraction that raises or returns an empty output
+    (the adapters' convention for a failed call) counts as an error.
+    
+    Systems that are not thread-safe (thread_safe = False, e.g. PaddleOCR) run
+    one extraction at a time: higher levels only add queueing, which their
+    latencies include, and the results are marked as serialized.
+    """
+    
+    def __init__(self, ocr_system, image_paths: List[str],
+                 requests_per_level: int = 100, warmup_requests: Optional[int] = None):
+        if not image_paths:
+            raise ValueError("Load test needs at least one image")
+        self.ocr_system = ocr_system
+        self.image_paths = list(image_paths)
+        self.requests_per_level = max(1, requests_per_level)
+        self.warmup_requests = warmup_requests
+        self.serialized = not getattr(ocr_system, 'thread_safe', True)
+        self._engine_lock = threading.Lock() if self.serialized else None
+    
+    def _run_one(self, image_path: str):
+        """Run one extraction, returning (elapsed_seconds, error)"""
+        start_ns = time.perf_counter_ns()
+        try:
+            if self._engine_lock is not None:
+                with self._engine_lock:
+                    raw_output = self.ocr_system.extract_image(image_path)
+            else:
+                raw_output = self.ocr_system.extract_image(image_path)
+            error = None if raw_output else "empty output"
+        except Exception as e:
+            error = str(e)
+        return (time.perf_counter_ns() - start_ns) / 1e9, error
+    
+    def run_level(self, concurrency: int) -> Dict[str, Any]:
+        """
+        Run one concurrency level
+        
+        Args:
+            concurrency: Number of concurrent workers
+        
+        Returns:
+            Dictionary with throughput, latency percentiles and error rate
+        """
+        warmup = self.warmup_requests if self.warmup_requests is not None else concurrency
+        total = warmup + max(self.requests_per_level, concurrency)
+        
+        lock = threading.Lock()
+        counter = {'next': 0}
+        histogram = LatencyHistogram()
+        errors: List[str] = []
+        window = {'start': None, 'end': None, 'measured': 0}
+        
+        def worker():
+            while True:
+                with lock:
+                    index = counter['next']
+                    if index >= total:
+                        return
+                    counter['next'] += 1
+                    if index == warmup and window['start'] is None:
+                        window['start'] = time.perf_counter()
+                
+                elapsed, error = self._run_one(self.image_paths[index % len(self.image_paths)])
+                if index < warmup:
+                    continue
+                
+                with lock:
+                    window['measured'] += 1
+                    window['end'] = time.perf_counter()
+                    if error is None:
+                        histogram.record(elapsed)
+                    else:
+                        errors.append(error)
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        
+        wall_seconds = (window['end'] - window['start']) if window['start'] is not None else 0.0
+        measured = window['measured']
+        successes = histogram.count
+        
+        result = {
+            'concurrency': concurrency,
+            'serialized': self.serialized,
+            'requests': measured,
+            'successes': successes,
+            'errors': len(errors),
+            'error_rate': round(len(errors) / measured, 4) if measured else 0.0,
+            'wall_seconds': round(wall_seconds, 4),
+            'throughput_rps': round(successes / wall_seconds, 4) if wall_seconds > 0 else 0.0,
+            'latency': histogram.summary() if successes else {},
+        }
+        if errors:
+            # Keep a few distinct messages, the full list can be thousands of repeats
+            result['error_samples'] = sorted(set(errors))[:5]
+        return result
+    
+    def run(self, levels: Sequence[int] = DEFAULT_LEVELS,
+            max_error_rate: float = 0.5) -> Dict[str, Any]:
+        """
+        Run all concurrency levels in increasing order
+        
+        Args:
+            levels: Concurrency levels to test
+            max_error_rate: Stop escalating once a level's error rate exceeds this
+        
+        Returns:
+            Dictionary with per-level results and the saturation analysis
+        """
+        if self.serialized:
+            print(f"  {self.ocr_system.name} is not thread-safe: extractions are serialized at every level")
+        results = []
+        for concurrency in sorted(set(levels)):
+            print(f"  concurrency={concurrency}...", end=' ', flush=True)
+            level = self.run_level(concurrency)
+            results.append(level)
+            p95 = level['latency'].get(percentile_key(95), 0.0)
+            print(f"{level['throughput_rps']:.2f} req/s, p95={p95:.3f}s, "
+                  f"errors={level['error_rate']:.1%}")
+            if level['error_rate'] > max_error_rate:
+                print(f"  Error rate above {max_error_rate:.0%}, not testing higher concurrency")
+                break
+        
+        return {
+            'system': self.ocr_system.name,
+            'n_images': len(self.image_paths),
+            'requests_per_level': self.requests_per_level,
+            'serialized': self.serialized,
+            'levels': results,
+            'saturation': find_saturation(results)
+        }
+
+
+def find_saturation(levels: List[Dict[str, Any]], throughput_fraction: float = 0.9,
+                    max_error_rate: float = 0.01) -> Dict[str, Any]:
+    """
+    Find the concurrency at which a system saturates
+    
+    The recommended concurrency is the lowest level reaching the given fraction
+    of the peak throughput among levels with an acceptable error rate; past it,
+    extra workers mostly add queueing latency.
+    
+    Args:
+        levels: Per-level results from LoadTester.run_level, in increasing concurrency
+        throughput_fraction: Fraction of peak throughput considered saturated
+        max_error_rate: Highest error rate a level may have to be recommended
+    
+    Returns:
+        Dictionary with peak throughput, its concurrency and the recommended concurrency
+    """
+    healthy = [level for level in levels if level['error_rate'] <= max_error_rate and level['successes']]
+    if not healthy:
+        return {'peak_throughput_rps': 0.0, 'peak_concurrency': None, 'recommended_concurrency': None}
+    
+    peak = max(healthy, key=lambda level: level['throughput_rps'])
+    recommended = next(level for level in healthy
+                       if level['throughput_rps'] >= throughput_fraction * peak['throughput_rps'])
+    return {
+        'peak_throughput_rps': peak['throughput_rps'],
+        'peak_concurrency': peak['concurrency'],
+        'recommended_concurrency': recommended['concurrency'],
+        'recommended_p95_seconds': recommended['latency'].get(percentile_key(95), 0.0)
+    }
+
+
+def loadtest_table_rows(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a load test report into one row per concurrency level"""
+    rows = []
+    for level in report['levels']:
+        row = {
+            'system': report['system'],
+            'concurrency': level['concurrency'],
+            'throughput_rps': level['throughput_rps'],
+            'error_rate': level['error_rate'],
+            'requests': level['requests'],
+        }
+        for percentile in DEFAULT_PERCENTILES:
+            key = percentile_key(percentile)
+            row[key] = level['latency'].get(key, 0.0)
+        rows.append(row)
+    return rows
@@ -2,11 +2,117 @@
 Time evaluation metrics implementation
 """
 
-import statistics
-from typing import List, Dict, Any
+import math
+from typing import List, Dict, Any, Iterable, Optional, Sequence
 import numpy as np
 
 
+# Percentiles reported for every system; p99.9 is stored under the 'p999' key
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def percentile_key(percentile: float) -> str:
+    """Result key for a percentile, e.g. 99 -> 'p99_seconds', 99.9 -> 'p999_seconds'"""
+    label = f"{percentile:g}".replace('.', '')
+    return f"p{label}_seconds"
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram in the style of HdrHistogram
+    
+    Values are counted in buckets whose width grows geometrically, so memory is
+    bounded by the dynamic range rather than the number of samples and any
+    percentile is reported within ``relative_precision`` of the true value.
+    Histograms can be merged, e.g. across shards or workers.
+    """
+    
+    def __init__(self, relative_precision: float = 0.001, lowest_value: float = 1e-6):
+        self.relative_precision = relative_precision
+        self.lowest_value = lowest_value
+        self._log_base = math.log1p(2 * relative_precision)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def _bucket(self, value: float) -> int:
+        if value <= self.lowest_value:
+            return 0
+        return int(math.log(value / self.lowest_value) / self._log_base) + 1
+    
+    def _bucket_value(self, index: int) -> float:
+        """Geometric midpoint of a bucket"""
+        if index == 0:
+            return self.lowest_value
+        lower = self.lowest_value * math.exp((index - 1) * self._log_base)
+        return lower * math.exp(self._log_base / 2)
+    
+    def record(self, value: float, count: int = 1):
+        """Record a latency in seconds"""
+        index = self._bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def record_many(self, values: Iterable[float]):
+        """Record many latencies at once (vectorized)"""
+        values = np.fromiter(values, dtype=float) if not isinstance(values, np.ndarray) else values.astype(float)
+        if values.size == 0:
+            return
+        clipped = np.maximum(values, self.lowest_value)
+        indices = (np.log(clipped / self.lowest_value) / self._log_base).astype(np.int64) + 1
+        indices[values <= self.lowest_value] = 0
+        unique, counts = np.unique(indices, return_counts=True)
+        for index, count in zip(unique.tolist(), counts.tolist()):
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+    
+    def merge(self, other: 'LatencyHistogram'):
+        """Add the counts of another histogram with the same precision"""
+        if (other.relative_precision, other.lowest_value) != (self.relative_precision, self.lowest_value):
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def percentile(self, percentile: float) -> float:
+        """Value at the given percentile (0-100), clamped to the observed min/max"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+    
+    def mean(self) -> float:
+        """Exact mean of the recorded values"""
+        return self.total / self.count if self.count else 0.0
+    
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """Percentiles, mean, min, max and count, rounded like the other timing stats"""
+        result = {percentile_key(p): round(self.percentile(p), 4) for p in percentiles}
+        result.update({
+            'mean_seconds': round(self.mean(), 4),
+            'min_seconds': round(self.min, 4) if self.count else 0.0,
+            'max_seconds': round(self.max, 4) if self.count else 0.0,
+            'count': self.count
+        })
+        return result
+
+
 def filter_outliers(times: List[float], iqr_factor: float = 1.5) -> List[float]:
     """
     Filter outliers from timing data using IQR method
@@ -25,9 +131,10 @@ def filter_outliers(times: List[float], iqr_factor: float = 1.5) -> List[float]:
     lower_bound = q1 - iqr_factor * iqr
     upper_bound = q3 + iqr_factor * iqr
     
-    filtered_times = [t for t in times if lower_bound <= t <= upper_bound]
+    times = np.asarray(times, dtype=float)
+    filtered_times = times[(times >= lower_bound) & (times <= upper_bound)]
     
-    return filtered_times
+    return filtered_times.tolist()
 
 
 def calculate_time_statistics(times: List[float], filter_outliers_flag: bool = True) -> Dict[str, Any]:
@@ -41,7 +148,7 @@ def calculate_time_statistics(times: List[float], filter_outliers_flag: bool = T
     Returns:
         Dictionary with timing statistics
     """
-    if not times:
+    if len(times) == 0:
         return {
             'mean': 0.0,
             'median': 0.0,
@@ -57,7 +164,7 @@ def calculate_time_statistics(times: List[float], filter_outliers_flag: bool = T
     if filter_outliers_flag and len(times) >= 4:
         filtered_times = filter_outliers(times)
     
-    if not filtered_times:
+    if len(filtered_times) == 0:
         return {
             'mean': 0.0,
             'median': 0.0,
@@ -68,14 +175,107 @@ def calculate_time_statistics(times: List[float], filter_outliers_flag: bool = T
             'filtered_count': 0
         }
     
+    # numpy rather than the statistics module, which sums exactly and is slow on large runs
+    filtered_array = np.asarray(filtered_times, dtype=float)
     return {
-        'mean': round(statistics.mean(filtered_times), 4),
-        'median': round(statistics.median(filtered_times), 4),
-        'min': round(min(filtered_times), 4),
-        'max': round(max(filtered_times), 4),
-        'std': round(statistics.stdev(filtered_times) if len(filtered_times) > 1 else 0.0, 4),
+        'mean': round(float(filtered_array.mean()), 4),
+        'median': round(float(np.median(filtered_array)), 4),
+        'min': round(float(filtered_array.min()), 4),
+        'max': round(float(filtered_array.max()), 4),
+        'std': round(float(filtered_array.std(ddof=1)) if len(filtered_array) > 1 else 0.0, 4),
         'count': len(times),
         'filtered_count': len(filtered_times)
     }
 
 
+def calculate_phase_statistics(phase_times: Dict[str, Sequence[float]]) -> Dict[str, Any]:
+    """
+    Calculate per-phase timing statistics from the spans recorded per image
+    
+    Args:
+        phase_times: Phase name -> seconds per image (aligned across phases,
+            0 where an image has no such phase)
+        
+    Returns:
+        Dictionary mapping each phase to its mean/median/p95 in seconds and its
+        share of the summed processing time
+    """
+    if not phase_times:
+        return {}
+    
+    phase_arrays = {name: np.asarray(values, dtype=float) for name, values in phase_times.items()}
+    grand_total = sum(float(values.sum()) for values in phase_arrays.values())
+    
+    phase_stats = {}
+    for name in sorted(phase_arrays):
+        values = phase_arrays[name]
+        phase_stats[name] = {
+            'mean_seconds': round(float(values.mean()), 6),
+            'median_seconds': round(float(np.median(values)), 6),
+            'p95_seconds': round(float(np.percentile(values, 95)), 6),
+            'share': round(float(values.sum()) / grand_total, 4) if grand_total > 0 else 0.0
+        }
+    
+    return phase_stats
+
+
+def calculate_latency_percentiles(times: List[float], filter_outliers_flag: bool = True,
+                                  percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """
+    Calculate tail latency percentiles, unfiltered and after IQR outlier removal
+    
+    Args:
+        times: List of timing values in seconds
+        filter_outliers_flag: Whether to also report the outlier-filtered view
+        percentiles: Percentiles to report
+        
+    Returns:
+        Dictionary with 'unfiltered' and (optionally) 'filtered' histogram summaries
+    """
+    histogram = LatencyHistogram()
+    histogram.record_many(times)
+    result = {'unfiltered': histogram.summary(percentiles)}
+    
+    if filter_outliers_flag:
+        filtered_histogram = LatencyHistogram()
+        filtered_histogram.record_many(filter_outliers(times) if len(times) >= 4 else times)
+        result['filtered'] = filtered_histogram.summary(percentiles)
+    
+    return result
+
+
+def calculate_throughput(times: List[float], end_timestamps: Optional[List[float]] = None) -> Dict[str, Any]:
+    """
+    Calculate throughput in images per second
+    
+    With completion timestamps, the wall-clock window runs from the earliest start
+    (end - duration) to the latest end, which accounts for images processed
+    concurrently; effective_concurrency is the mean number of images in flight.
+    Without timestamps the images are assumed to run sequentially.
+    
+    Args:
+        times: Processing time per image in seconds
+        end_timestamps: Epoch completion time per image, aligned with times
+            (ignored if any is NaN)
+        
+    Returns:
+        Dictionary with images_per_second, wall_seconds and effective_concurrency
+    """
+    times = np.asarray(times, dtype=float)
+    if times.size == 0:
+        return {'images_per_second': 0.0, 'wall_seconds': 0.0, 'effective_concurrency': 0.0}
+    
+    busy_seconds = float(times.sum())
+    wall_seconds = busy_seconds
+    if end_timestamps is not None and len(end_timestamps) == times.size:
+        end_timestamps = np.asarray(end_timestamps, dtype=float)
+        if not np.isnan(end_timestamps).any():
+            window = float(end_timestamps.max() - (end_timestamps - times).min())
+            # Never below the slowest image, never above fully sequential processing
+            wall_seconds = min(max(window, float(times.max())), busy_seconds)
+    
+    return {
+        'images_per_second': round(times.size / wall_seconds, 4) if wall_seconds > 0 else 0.0,
+        'wall_seconds': round(wall_seconds, 4),
+        'effective_concurrency': round(busy_seconds / wall_seconds, 2) if wall_seconds > 0 else 0.0
+    }
@@ -14,6 +14,8 @@ from matplotlib.patches import Patch
 import glob
 import numpy as np
 from typing import Dict, List, Any, Optional
+from .metrics import calculate_latency_percentiles
+from .index import load_timing_columns
 
 # === FONT SIZE CONFIG ===
 plt.rcParams.update({
@@ -111,6 +113,7 @@ def load_timing_data_from_results(timing_results_file: Path) -> List[Dict[str, A
             
             timing_stats = system_data.get('timing_stats', {})
             n_samples = system_data.get('n_samples', 0)
+            percentiles = system_data.get('latency_percentiles', {}).get('unfiltered', {})
             
             data.append({
                 "System": system_name,
@@ -122,7 +125,15 @@ def load_timing_data_from_results(timing_results_file: Path) -> List[Dict[str, A
                 "Std": timing_stats.get('std_seconds', 0.0),
                 "Count": n_samples,
                 "Color": get_system_color(system_name, system_types),
-                "Dataset": system_data.get('dataset', 'unknown')
+                "Dataset": system_data.get('dataset', 'unknown'),
+                "Phases": {name: phase.get('mean_seconds', 0.0)
+                           for name, phase in system_data.get('phase_stats', {}).items()},
+                "Percentiles": system_data.get('latency_percentiles', {}),
+                "P50": percentiles.get('p50_seconds'),
+                "P95": percentiles.get('p95_seconds'),
+                "P99": percentiles.get('p99_seconds'),
+                "P99.9": percentiles.get('p999_seconds'),
+                "Throughput": system_data.get('throughput', {}).get('images_per_second')
             })
     
     except Exception as e:
@@ -133,7 +144,7 @@ def load_timing_data_from_results(timing_results_file: Path) -> List[Dict[str, A
 def load_timing_data_from_raw_outputs(raw_outputs_dir: Path, dataset_name: str, 
                                      systems: List[str]) -> List[Dict[str, Any]]:
     """
-    Load timing data directly from raw outputs
+    Load timing data from the timing index of the raw outputs
     
     Args:
         raw_outputs_dir: Base directory containing raw outputs
@@ -149,29 +160,8 @@ def load_timing_data_from_raw_outputs(raw_outputs_dir: Path, dataset_name: str,
     system_types = load_system_types()
     
     for system_name in systems:
-        system_dir = raw_outputs_dir / dataset_name / system_name
-        
-        if not system_dir.exists():
-            print(f"[!] System directory not found: {system_dir}")
-            continue
-        
-        # Load individual JSON files (not summary.json)
-        json_files = [f for f in system_dir.glob("*.json") if f.name != "summary.json"]
-        times = []
-        
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    file_data = json.load(f)
-                
-                if isinstance(file_data, dict) and 'processing_time_seconds' in file_data:
-                    time_val = file_data['processing_time_seconds']
-                    if isinstance(time_val, (int, float)) and time_val > 0:
-                        times.append(float(time_val))
-            
-            except Exception as e:
-                print(f"[!] Error reading {json_file}: {e}")
-                continue
+        # Read from the timing index (rebuilt from the JSON files if stale)
+        times = load_timing_columns(raw_outputs_dir, dataset_name, system_name)['processing_time_seconds'].tolist()
         
         if not times:
             print(f"[!] No timing data found for {system_name}")
@@ -179,6 +169,8 @@ def load_timing_data_from_raw_outputs(raw_outputs_dir: Path, dataset_name: str,
         
         # Calculate statistics
         times_array = np.array(times)
+        percentiles = calculate_latency_percentiles(times)
+        unfiltered = percentiles['unfiltered']
         
         data.append({
             "System": system_name,
@@ -190,7 +182,12 @@ def load_timing_data_from_raw_outputs(raw_outputs_dir: Path, dataset_name: str,
             "Std": times_array.std(),
             "Count": len(times),
             "Color": get_system_color(system_name, system_types),
-            "Dataset": dataset_name
+            "Dataset": dataset_name,
+            "Percentiles": percentiles,
+            "P50": unfiltered['p50_seconds'],
+            "P95": unfiltered['p95_seconds'],
+            "P99": unfiltered['p99_seconds'],
+            "P99.9": unfiltered['p999_seconds']
         })
     
     return data
@@ -267,6 +264,161 @@ def create_timing_comparison_plot(data: List[Dict[str, Any]], dataset_name: str,
     
     return plot_path
 
+def create_phase_breakdown_plot(data: List[Dict[str, Any]], dataset_name: str,
+                               output_dir: Path) -> Path:
+    """
+    Create stacked bar plot of mean time per extraction phase
+    
+    Args:
+        data: List of timing data records (with "Phases" from the timing results)
+        dataset_name: Name of the dataset
+        output_dir: Output directory for plots
+    
+    Returns:
+        Path to saved plot, or None when no system recorded phase spans
+    """
+    records = [record for record in data if record.get("Phases")]
+    if not records:
+        return None
+    
+    records = sorted(records, key=lambda record: sum(record["Phases"].values()))
+    phase_order = ['load', 'preprocess', 'encode', 'request', 'inference', 'decode', 'other']
+    phases = [name for name in phase_order if any(name in r["Phases"] for r in records)]
+    phases += sorted({name for r in records for name in r["Phases"]} - set(phases))
+    
+    fig, ax = plt.subplots(figsize=(12, 8))
+    cmap = plt.get_cmap("tab10")
+    labels = [record["Label"] for record in records]
+    bottoms = np.zeros(len(records))
+    
+    for i, name in enumerate(phases):
+        values = np.array([record["Phases"].get(name, 0.0) for record in records])
+        ax.bar(labels, values, bottom=bottoms, color=cmap(i % 10), label=name, alpha=0.85)
+        bottoms += values
+    
+    ax.set_title(f"Time per Extraction Phase - {dataset_name.upper()}", fontweight='bold')
+    ax.set_ylabel("Mean time (seconds)")
+    ax.set_xlabel("OCR System")
+    ax.legend(title="Phase", loc="upper left")
+    
+    plt.tight_layout()
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plot_path = output_dir / f"{dataset_name}_timing_phases.png"
+    plt.savefig(plot_path, bbox_inches='tight', dpi=300)
+    plt.close()
+    
+    return plot_path
+
+def create_latency_percentile_plot(data: List[Dict[str, Any]], dataset_name: str,
+                                   output_dir: Path) -> Path:
+    """
+    Create latency percentile plot (p50 to p99.9) per system, unfiltered and filtered
+    
+    Args:
+        data: List of timing data records (with "Percentiles" from the timing results)
+        dataset_name: Name of the dataset
+        output_dir: Output directory for plots
+        
+    Returns:
+        Path to saved plot, or None when no percentiles are available
+    """
+    records = [record for record in data if record.get("Percentiles", {}).get("unfiltered")]
+    if not records:
+        return None
+    
+    keys = ["p50_seconds", "p90_seconds", "p95_seconds", "p99_seconds", "p999_seconds"]
+    x_labels = ["p50", "p90", "p95", "p99", "p99.9"]
+    
+    fig, axes = plt.subplots(1, 2, figsize=(18, 8), sharey=True)
+    for ax, view in zip(axes, ["unfiltered", "filtered"]):
+        for record in records:
+            values = record["Percentiles"].get(view, {})
+            if not values:
+                continue
+            ax.plot(x_labels, [values.get(key, np.nan) for key in keys], marker='o',
+                    linewidth=2, color=record["Color"], label=record["System"])
+        ax.set_yscale("log")
+        ax.set_title(f"{view.title()}", fontweight='bold')
+        ax.set_xlabel("Percentile")
+        ax.grid(True, which="both", alpha=0.3)
+    
+    axes[0].set_ylabel("Time (seconds)")
+    axes[1].legend(title="OCR System", loc="upper left")
+    fig.suptitle(f"Latency Percentiles - {dataset_name.upper()}", fontweight='bold', fontsize=22)
+    
+    plt.tight_layout()
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plot_path = output_dir / f"{dataset_name}_timing_percentiles.png"
+    plt.savefig(plot_path, bbox_inches='tight', dpi=300)
+    plt.close()
+    
+    return plot_path
+
+def create_saturation_plot(report: Dict[str, Any], dataset_name: str,
+                           output_dir: Path) -> Optional[Path]:
+    """
+    Create throughput and latency vs. concurrency plot from a load test report
+    
+    Args:
+        report: Load test report (see evaluation.time.loadtest.LoadTester.run)
+        dataset_name: Name of the dataset
+        output_dir: Output directory for plots
+        
+    Returns:
+        Path to saved plot, or None when the report has no levels
+    """
+    levels = report.get('levels', [])
+    if not levels:
+        return None
+    
+    system_name = report['system']
+    concurrency = [level['concurrency'] for level in levels]
+    
+    fig, (ax_throughput, ax_latency) = plt.subplots(1, 2, figsize=(18, 8))
+    
+    ax_throughput.plot(concurrency, [level['throughput_rps'] for level in levels], marker='o',
+                       linewidth=2, color=get_system_color(system_name), label="Throughput")
+    ax_throughput.set_xlabel("Concurrency")
+    ax_throughput.set_ylabel("Requests / second")
+    ax_errors = ax_throughput.twinx()
+    ax_errors.bar(concurrency, [level['error_rate'] * 100 for level in levels],
+                  width=[c * 0.2 for c in concurrency], color="#d62728", alpha=0.3, label="Errors")
+    ax_errors.set_ylabel("Error rate (%)", fontsize=16)
+    ax_errors.tick_params(axis='y', labelsize=14)
+    ax_errors.set_ylim(0, 100)
+    ax_throughput.set_title("Throughput", fontweight='bold')
+    
+    for key, label in [("p50_seconds", "p50"), ("p95_seconds", "p95"), ("p99_seconds", "p99")]:
+        ax_latency.plot(concurrency, [level['latency'].get(key, np.nan) for level in levels],
+                        marker='o', linewidth=2, label=label)
+    ax_latency.set_xlabel("Concurrency")
+    ax_latency.set_ylabel("Time (seconds)")
+    ax_latency.set_title("Latency", fontweight='bold')
+    ax_latency.legend(loc="upper left")
+    
+    recommended = report.get('saturation', {}).get('recommended_concurrency')
+    for ax in (ax_throughput, ax_latency):
+        ax.set_xscale("log", base=2)
+        ax.set_xticks(concurrency)
+        ax.set_xticklabels([str(c) for c in concurrency])
+        ax.grid(True, which="both", alpha=0.3)
+        if recommended:
+            ax.axvline(recommended, color="#333333", linestyle="--", linewidth=1.5)
+    
+    fig.suptitle(f"Saturation - {system_name} on {dataset_name.upper()}"
+                 + (f" (recommended concurrency {recommended})" if recommended else ""),
+                 fontweight='bold', fontsize=22)
+    plt.tight_layout()
+    
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plot_path = output_dir / f"{dataset_name}_{system_name}_saturation.png"
+    plt.savefig(plot_path, bbox_inches='tight', dpi=300)
+    plt.close()
+    
+    return plot_path
+
 def create_timing_boxplot(data: List[Dict[str, Any]], dataset_name: str, 
                          output_dir: Path) -> Path:
     """
@@ -308,12 +460,14 @@ def save_timing_statistics_table(data: List[Dict[str, Any]], dataset_name: str,
     
     df = pd.DataFrame(data)
     
-    # Select columns for table
+    # Select columns for table (tail latency and throughput when available)
     table_columns = ["System", "Label", "Mean", "Median", "Min", "Max", "Std", "Count"]
-    table_df = df[table_columns].copy()
+    extra_columns = [col for col in ["P50", "P95", "P99", "P99.9", "Throughput"]
+                     if col in df.columns and df[col].notna().any()]
+    table_df = df[table_columns + extra_columns].copy()
     
     # Round numeric columns
-    numeric_columns = ["Mean", "Median", "Min", "Max", "Std"]
+    numeric_columns = ["Mean", "Median", "Min", "Max", "Std"] + extra_columns
     for col in numeric_columns:
         table_df[col] = table_df[col].round(3)
     
@@ -387,6 +541,18 @@ def generate_timing_visualizations(dataset_name: str, timing_results_file: Optio
         results['comparison_plot'] = plot_path
         print(f"[✓] Comparison plot saved: {plot_path}")
     
+    # Create latency percentile plot (tail latency, unfiltered vs filtered)
+    percentile_plot_path = create_latency_percentile_plot(data, dataset_name, plots_dir)
+    if percentile_plot_path:
+        results['percentile_plot'] = percentile_plot_path
+        print(f"[✓] Percentile plot saved: {percentile_plot_path}")
+    
+    # Create phase breakdown plot (only when phase spans were recorded)
+    phase_plot_path = create_phase_breakdown_plot(data, dataset_name, plots_dir)
+    if phase_plot_path:
+        results['phase_plot'] = phase_plot_path
+        print(f"[✓] Phase breakdown plot saved: {phase_plot_path}")
+    
     # Save statistics table
     table_path = save_timing_statistics_table(data, dataset_name, tables_dir)
     if table_path:
@@ -403,6 +569,12 @@ def generate_timing_visualizations(dataset_name: str, timing_results_file: Optio
         print(f"  Max: {record['Max']:.3f}s")
         print(f"  Std: {record['Std']:.3f}s")
         print(f"  Samples: {record['Count']}")
+        if record.get('P99') is not None:
+            print(f"  P99: {record['P99']:.3f}s, P99.9: {record['P99.9']:.3f}s")
+        if record.get('Throughput') is not None:
+            print(f"  Throughput: {record['Throughput']:.2f} images/s")
+        for name, mean_seconds in record.get('Phases', {}).items():
+            print(f"  Phase {name}: {mean_seconds:.3f}s")
         print()
     
     return results
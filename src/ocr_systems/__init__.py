@@ -23,6 +23,10 @@ from .commercial_llm.mistral_ocr import MistralOCR
 
 #from .opensource_llm.vllm_openai import VLLMOpenAIOCR
 
+from .mock.mock_provider import MockOCR, MOCK_PREFIX
+from .cascade import CascadeOCR, CASCADE_PREFIX
+from parsing.samples import SYSTEM_FORMATS
+
 # Register all available OCR systems
 #OCRSystemFactory.register_system('doctr', DocTROCR)
 #OCRSystemFactory.register_system('paddleocr', PaddleOCROCR)
@@ -43,6 +47,13 @@ OCRSystemFactory.register_system('tesseract', TesseractOCR)
 #OCRSystemFactory.register_system('qwen25vl', VLLMOpenAIOCR)
 #OCRSystemFactory.register_system('gemma3', VLLMOpenAIOCR)
 
+# Mock providers for offline benchmarks: mock_<system> emulates <system>'s response format
+for emulated_system in SYSTEM_FORMATS:
+    OCRSystemFactory.register_system(MOCK_PREFIX + emulated_system, MockOCR)
+
+# Cascades combine two of the systems above: cascade_<name>
+OCRSystemFactory.register_prefix(CASCADE_PREFIX, CascadeOCR)
+
 
 
 
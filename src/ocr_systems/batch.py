@@ -0,0 +1,182 @@
+"""
+Provider batch-API mode for offline bulk extraction
+Builds a JSONL of requests, submits it to the provider's batch endpoint, polls
+until the job ends and fans the results back out per image. Job state is kept
+on disk so an interrupted run resumes polling instead of resubmitting.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+DEFAULT_BATCH_DIR = "results/batches"
+
+# Normalized job states returned by OCRSystem.get_batch_status
+BATCH_PENDING = 'pending'
+BATCH_ENDED = 'ended'
+BATCH_FAILED = 'failed'
+
+
+class BatchJobRunner:
+    """
+    Run one OCR system over a dataset through its provider batch API
+    
+    Supported options (``batch`` section of an OCR system config):
+        enabled: Use the batch API instead of synchronous calls (default True when the section exists)
+        poll_interval: Seconds between status checks (default 30)
+        timeout: Stop polling after this many seconds, leaving the job to resume later (default 86400)
+        max_requests: Maximum requests per submitted job, larger datasets are split (default 10000)
+        batch_dir: Directory for request files and job state (default results/batches)
+    """
+    
+    def __init__(self, ocr_system, dataset_name: str, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.ocr_system = ocr_system
+        self.dataset_name = dataset_name
+        self.poll_interval = float(config.get('poll_interval', 30))
+        self.timeout = float(config.get('timeout', 86400))
+        self.max_requests = max(1, int(config.get('max_requests', 10000)))
+        self.work_dir = Path(config.get('batch_dir', DEFAULT_BATCH_DIR)) / dataset_name / ocr_system.name
+        self.state_file = self.work_dir / "state.json"
+    
+    @staticmethod
+    def is_enabled(ocr_system) -> bool:
+        """Whether the system is configured for, and capable of, batch extraction"""
+        config = ocr_system.config.get('batch')
+        if not config or not config.get('enabled', True):
+            return False
+        return getattr(ocr_system, 'supports_batch', False)
+    
+    def run(self, image_paths: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Dict[str, Any], Optional[str]]]:
+        """
+        Submit (or resume) batch jobs for the images and yield their results
+        
+        Args:
+            image_paths: Paths of the images to process
+        
+        Yields:
+            Tuple of (image_path, raw_output, timing, error) per image, in the same
+            shape as OCRSystem.iter_extract; raw_output is {} for failed requests
+        """
+        state = self._load_state(image_paths)
+        
+        for job in state['jobs']:
+            if job['status'] == 'collected':
+                continue
+            
+            if not job.get('batch_id'):
+                self._submit(job, state)
+            
+            status = self._wait(job, state)
+            if status == BATCH_PENDING:
+                print(f"Batch {job['batch_id']} still running after {self.timeout:.0f}s, "
+                      f"rerun to resume from {self.state_file}")
+                continue
+            
+            yield from self._collect(job, state, status)
+    
+    def _load_state(self, image_paths: List[str]) -> Dict[str, Any]:
+        """Load the saved job state, or plan new jobs when the image list changed"""
+        fingerprint = hashlib.sha256(
+            '\n'.join([self.ocr_system.name] + list(image_paths)).encode('utf-8')
+        ).hexdigest()[:16]
+        
+        if self.state_file.exists():
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if state.get('fingerprint') == fingerprint:
+                return state
+            print(f"Image list changed since the last batch run, starting new jobs in {self.work_dir}")
+        
+        # Custom ids must be short and alphanumeric for every provider
+        requests = {f"img-{i:06d}": str(path) for i, path in enumerate(image_paths)}
+        custom_ids = list(requests.keys())
+        jobs = []
+        for start in range(0, len(custom_ids), self.max_requests):
+            jobs.append({
+                'index': len(jobs),
+                'custom_ids': custom_ids[start:start + self.max_requests],
+                'batch_id': None,
+                'status': 'planned'
+            })
+        
+        state = {
+            'system': self.ocr_system.name,
+            'dataset': self.dataset_name,
+            'fingerprint': fingerprint,
+            'requests': requests,
+            'jobs': jobs
+        }
+        self._save_state(state)
+        return state
+    
+    def _save_state(self, state: Dict[str, Any]):
+        """Write the state file atomically"""
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+    
+    def _submit(self, job: Dict[str, Any], state: Dict[str, Any]):
+        """Write the job's request JSONL and submit it"""
+        requests_file = self.work_dir / f"requests_{job['index']:03d}.jsonl"
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        
+        with open(requests_file, 'w') as f:
+            for custom_id in job['custom_ids']:
+                image_path = state['requests'][custom_id]
+                # Documents go whole to systems that accept them, images are preprocessed
+                if Path(image_path).suffix.lower() not in self.ocr_system.document_suffixes:
+                    image_path = self.ocr_system.prepare_image(image_path)
+                request = self.ocr_system.build_batch_request(custom_id, image_path)
+                f.write(json.dumps(request) + '\n')
+        
+        job['batch_id'] = self.ocr_system.submit_batch(str(requests_file))
+        job['requests_file'] = str(requests_file)
+        job['submitted_at'] = time.time()
+        job['status'] = BATCH_PENDING
+        self._save_state(state)
+        print(f"Submitted batch {job['batch_id']} ({len(job['custom_ids'])} requests)")
+    
+    def _wait(self, job: Dict[str, Any], state: Dict[str, Any]) -> str:
+        """Poll the job until it ends or the timeout expires"""
+        deadline = time.time() + self.timeout
+        while True:
+            status = self.ocr_system.get_batch_status(job['batch_id'])
+            if status != job['status']:
+                job['status'] = status
+                self._save_state(state)
+            if status != BATCH_PENDING or time.time() >= deadline:
+                return status
+            time.sleep(self.poll_interval)
+    
+    def _collect(self, job: Dict[str, Any], state: Dict[str, Any], status: str):
+        """Yield the results of an ended job, reporting requests without a result as errors"""
+        turnaround = time.time() - job.get('submitted_at', time.time())
+        timing = {'batch_id': job['batch_id'], 'batch_turnaround_seconds': turnaround}
+        remaining = set(job['custom_ids'])
+        
+        if status == BATCH_ENDED:
+            for custom_id, raw_output, error in self.ocr_system.iter_batch_results(job['batch_id']):
+                if custom_id not in remaining:
+                    continue
+                remaining.discard(custom_id)
+                yield state['requests'][custom_id], raw_output if error is None else {}, dict(timing), error
+        
+        for custom_id in job['custom_ids']:
+            if custom_id in remaining:
+                yield state['requests'][custom_id], {}, dict(timing), f"No result in batch {job['batch_id']} ({status})"
+        
+        if status == BATCH_FAILED:
+            # Resubmit on the next run rather than keeping the failure
+            job.setdefault('failed_batch_ids', []).append(job['batch_id'])
+            job['batch_id'] = None
+            job['status'] = 'planned'
+        else:
+            job['status'] = 'collected'
+        self._save_state(state)
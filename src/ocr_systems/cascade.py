@@ -0,0 +1,256 @@
+"""
+Early-exit cascade of two OCR systems
+A cheap engine (typically a local one) reads every page first; pages whose
+word confidence falls below a threshold are escalated to a second, more
+expensive system. The cascade is a system of its own (cascade_<name>), so its
+accuracy, latency and escalation rate are benchmarked like any other system's.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .models import OCRSystem, OCRSystemFactory
+from parsing.samples import system_output_format
+
+CASCADE_PREFIX = "cascade_"
+# Escalation statistics written next to the raw outputs of each dataset
+CASCADE_FILE = "cascade.json"
+# Escalation reasons recorded in the raw outputs
+REASON_CONFIDENT = 'confident'
+REASON_NO_TEXT = 'no_text'
+REASON_MEAN = 'mean_confidence'
+REASON_MIN = 'min_confidence'
+REASON_ERROR = 'first_stage_error'
+
+
+def word_confidences(output_format_name: str, raw_output: Dict[str, Any]) -> List[float]:
+    """
+    Per-word confidences of a raw output, scaled to [0, 1]
+    
+    Args:
+        output_format_name: One of CONFIDENCE_FORMATS
+        raw_output: Raw output of a single page
+    
+    Returns:
+        Confidence of every recognized word (empty when nothing was read)
+    """
+    if output_format_name == 'tesseract':
+        # image_to_data reports -1 for the page/block/line levels and empty words
+        data = raw_output.get('data', {})
+        return [float(conf) / 100 for conf, text in zip(data.get('conf', []), data.get('text', []))
+                if str(text).strip() and float(conf) >= 0]
+    
+    if output_format_name == 'doctr':
+        return [float(word['confidence'])
+                for page in raw_output.get('pages', [])
+                for block in page.get('blocks', [])
+                for line in block.get('lines', [])
+                for word in line.get('words', []) if 'confidence' in word]
+    
+    if output_format_name == 'paddleocr':
+        return [float(score) for score in raw_output.get('rec_scores', [])]
+    
+    if output_format_name == 'aws_textract':
+        return [float(block['Confidence']) / 100 for block in raw_output.get('Blocks', [])
+                if block.get('BlockType') == 'WORD' and 'Confidence' in block]
+    
+    if output_format_name == 'azure_vision':
+        return [float(word['confidence'])
+                for block in raw_output.get('readResult', {}).get('blocks', [])
+                for line in block.get('lines', [])
+                for word in line.get('words', []) if 'confidence' in word]
+    
+    raise ValueError(f"No word confidences in the {output_format_name} format")
+
+
+# Formats word_confidences can read, i.e. systems usable as the first stage
+CONFIDENCE_FORMATS = ('tesseract', 'doctr', 'paddleocr', 'aws_textract', 'azure_vision')
+
+
+class CascadeOCR(OCRSystem):
+    """
+    Two-stage cascade: first system on every page, fallback on the doubtful ones
+    
+    Registered for every name starting with cascade_. Multi-page documents are
+    split into pages, so each page is escalated on its own.
+    
+    Config:
+        first: First stage, {name: <system>, config: {...}} (or just the name)
+        fallback: Second stage, same form
+        escalate_below: Thresholds on the first stage's word confidences in [0, 1]:
+                        {mean: 0.85, min: null}; a page is escalated when any is missed
+        min_words: Pages with fewer recognized words are escalated (default 1)
+    
+    Raw output:
+        {'cascade': {system, escalated, reason, confidence, stage_seconds, ...},
+         'output': raw output of the system that answered}
+    """
+    
+    def __init__(self, name: str, config: dict):
+        super().__init__(name, config)
+        self.first_name, first_config = self._stage_config(config, 'first')
+        self.fallback_name, fallback_config = self._stage_config(config, 'fallback')
+        self.first_format = system_output_format(self.first_name)
+        if self.first_format not in CONFIDENCE_FORMATS:
+            raise ValueError(f"Cascade {name}: first stage {self.first_name} reports no word confidences "
+                             f"(supported: {', '.join(CONFIDENCE_FORMATS)})")
+        
+        thresholds = config.get('escalate_below', {'mean': 0.85})
+        self.mean_threshold = thresholds.get('mean')
+        self.min_threshold = thresholds.get('min')
+        self.min_words = int(config.get('min_words', 1))
+        
+        self.first = OCRSystemFactory.create_system(self.first_name, first_config)
+        self.fallback = OCRSystemFactory.create_system(self.fallback_name, fallback_config)
+        # Pages run concurrently only when both stages allow it
+        self.thread_safe = self.first.thread_safe and self.fallback.thread_safe
+        
+        self._stats_lock = threading.Lock()
+        self._reasons: Counter = Counter()
+        self._stage_seconds = {'first': 0.0, 'fallback': 0.0}
+    
+    @staticmethod
+    def _stage_config(config: Dict[str, Any], stage: str) -> Tuple[str, Dict[str, Any]]:
+        stage_config = config.get(stage)
+        if not stage_config:
+            raise ValueError(f"Cascade config needs a '{stage}' system")
+        if isinstance(stage_config, str):
+            return stage_config, {}
+        return stage_config['name'], dict(stage_config.get('config', {}))
+    
+    def _run_stage(self, stage: OCRSystem, image_path: str) -> Tuple[Optional[Dict[str, Any]], float, Optional[str]]:
+        """
+        Extract a page with one stage, adding its phase spans to the cascade's
+        
+        Returns:
+            Tuple of (raw_output, seconds, error); raw_output is None when the stage raised
+        """
+        outer_spans = getattr(self._phase_local, 'spans', None)
+        start_ns = time.perf_counter_ns()
+        with stage.collect_phases() as spans:
+            try:
+                raw_output, error = stage.extract_raw_output(stage.prepare_image(image_path)), None
+            except Exception as e:
+                raw_output, error = None, str(e)
+        seconds = (time.perf_counter_ns() - start_ns) / 1e9
+        
+        if outer_spans is not None:
+            for name, elapsed_ns in spans.items():
+                outer_spans[name] = outer_spans.get(name, 0) + elapsed_ns
+        return raw_output, seconds, error
+    
+    def escalation_reason(self, confidences: List[float]) -> str:
+        """Why a page with these word confidences is escalated, or REASON_CONFIDENT"""
+        if len(confidences) < self.min_words:
+            return REASON_NO_TEXT
+        if not confidences:
+            return REASON_CONFIDENT
+        if self.mean_threshold is not None and sum(confidences) / len(confidences) < self.mean_threshold:
+            return REASON_MEAN
+        if self.min_threshold is not None and min(confidences) < self.min_threshold:
+            return REASON_MIN
+        return REASON_CONFIDENT
+    
+    def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
+        """Read the page with the first stage, and with the fallback when confidence is low"""
+        first_output, first_seconds, error = self._run_stage(self.first, image_path)
+        confidences = word_confidences(self.first_format, first_output) if first_output else []
+        reason = REASON_ERROR if error else self.escalation_reason(confidences)
+        
+        record = {
+            'first_system': self.first_name,
+            'fallback_system': self.fallback_name,
+            'system': self.first_name,
+            'escalated': reason != REASON_CONFIDENT,
+            'reason': reason,
+            'confidence': {
+                'words': len(confidences),
+                'mean': sum(confidences) / len(confidences) if confidences else None,
+                'min': min(confidences) if confidences else None
+            },
+            'stage_seconds': {'first': first_seconds}
+        }
+        if error:
+            record['first_error'] = error
+        output = first_output or {}
+        
+        if record['escalated']:
+            fallback_output, fallback_seconds, fallback_error = self._run_stage(self.fallback, image_path)
+            record['stage_seconds']['fallback'] = fallback_seconds
+            # Adapters return {} on failure: keep the first stage's answer then
+            if fallback_output:
+                record['system'] = self.fallback_name
+                output = fallback_output
+            else:
+                record['fallback_error'] = fallback_error or 'empty fallback output'
+        
+        with self._stats_lock:
+            self._reasons[reason] += 1
+            for stage, seconds in record['stage_seconds'].items():
+                self._stage_seconds[stage] += seconds
+        return {'cascade': record, 'output': output}
+    
+    def warmup(self, image_paths: List[str]) -> List[float]:
+        """Run the warm-up extractions, leaving them out of the escalation statistics"""
+        times = super().warmup(image_paths)
+        self._reset_stats()
+        return times
+    
+    def _reset_stats(self):
+        with self._stats_lock:
+            self._reasons.clear()
+            self._stage_seconds = {'first': 0.0, 'fallback': 0.0}
+    
+    def runtime_stats(self) -> Dict[str, Any]:
+        """Return the escalation rate and per-stage time, with both stages' own stats"""
+        with self._stats_lock:
+            pages = sum(self._reasons.values())
+            escalated = pages - self._reasons[REASON_CONFIDENT]
+            return {
+                'first_system': self.first_name,
+                'fallback_system': self.fallback_name,
+                'pages': pages,
+                'escalated': escalated,
+                'escalation_rate': escalated / pages if pages else None,
+                'reasons': dict(self._reasons),
+                'stage_seconds': dict(self._stage_seconds),
+                'first': self.first.runtime_stats(),
+                'fallback': self.fallback.runtime_stats()
+            }
+    
+    def save_escalation_stats(self, dataset_name: str) -> Path:
+        """
+        Save the escalation statistics of the pages extracted since the last save
+        
+        Written next to the raw outputs as cascade.json; the counters restart, so
+        each dataset gets its own figures when the instance is reused.
+        """
+        dataset_system_dir = self.output_dir / dataset_name / self.name
+        dataset_system_dir.mkdir(parents=True, exist_ok=True)
+        
+        stats = self.runtime_stats()
+        output_file = dataset_system_dir / CASCADE_FILE
+        with open(output_file, 'w') as f:
+            json.dump({
+                'system': self.name,
+                'dataset': dataset_name,
+                'timestamp': datetime.now().isoformat(),
+                'escalate_below': {'mean': self.mean_threshold, 'min': self.min_threshold},
+                'min_words': self.min_words,
+                **stats
+            }, f, indent=2)
+        self._reset_stats()
+        return output_file
+    
+    def unload(self):
+        """Release both stages"""
+        for stage in (self.first, self.fallback):
+            try:
+                stage.unload()
+            except Exception as e:
+                print(f"Error unloading {stage.name}: {e}")
@@ -2,14 +2,17 @@
 Anthropic Claude Haiku Vision OCR implementation
 """
 
-import base64
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Iterator, Optional, Tuple
 from ..models import OCRSystem
+from ..batch import BATCH_PENDING, BATCH_ENDED
 
 
 class ClaudeHaikuOCR(OCRSystem):
     """Anthropic Claude Haiku Vision OCR implementation"""
     
+    supports_batch = True
+    
     def __init__(self, name: str, config: dict):
         super().__init__(name, config)
         self.model = None
@@ -21,7 +24,8 @@ class ClaudeHaikuOCR(OCRSystem):
             import anthropic
             
             self.model = anthropic.Anthropic(
-                api_key=self.config.get('api_key')
+                api_key=self.config.get('api_key'),
+                base_url=self.config.get('base_url')
             )
         except ImportError:
             print("Anthropic package not installed. Please install with: pip install anthropic")
@@ -30,48 +34,87 @@ class ClaudeHaikuOCR(OCRSystem):
             print(f"Error initializing Anthropic Claude client: {e}")
             raise
     
+    def _build_request(self, image_path: str) -> Dict[str, Any]:
+        """Build the Messages API parameters, shared by the synchronous and batch paths"""
+        # Read and encode image (shared across adapters)
+        img, mime_type = self.encode_image(image_path)
+        
+        # Determine image type (Claude only accepts jpeg, png, gif, webp)
+        img_type = mime_type.split('/')[-1]
+        if img_type not in ['jpeg', 'png', 'gif', 'webp']:
+            img, mime_type = self.encode_image(image_path, 'png_base64')
+            img_type = 'png'
+        
+        # Prepare prompt
+        prompt = self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
+        
+        return {
+            'model': self.config.get('model', 'claude-3-5-haiku-20241022'),
+            'max_tokens': self.config.get('max_tokens', 4096),
+            'temperature': self.config.get('temperature', 0.0),
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': [
+                        {
+                            'type': 'image',
+                            'source': {
+                                'type': 'base64',
+                                'media_type': f'image/{img_type}',
+                                'data': img
+                            }
+                        },
+                        {
+                            'type': 'text',
+                            'text': prompt
+                        }
+                    ]
+                }
+            ]
+        }
+    
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw output from Claude Haiku Vision"""
         try:
-            # Read and encode image
-            with open(image_path, 'rb') as img_file:
-                img = base64.b64encode(img_file.read()).decode('utf-8')
-            
-            # Determine image type (Claude only accepts jpeg, png, gif, webp)
-            img_type = image_path.split('.')[-1].lower()
-            if img_type not in ['jpeg', 'png', 'gif', 'webp']:
-                img_type = 'jpeg'
-            
-            # Prepare prompt
-            prompt = self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
+            request = self._build_request(image_path)
             
             # Call Claude API
-            response = self.model.messages.create(
-                model=self.config.get('model', 'claude-3-5-haiku-20241022'),
-                max_tokens=self.config.get('max_tokens', 4096),
-                temperature=self.config.get('temperature', 0.0),
-                messages=[
-                    {
-                        'role': 'user',
-                        'content': [
-                            {
-                                'type': 'image',
-                                'source': {
-                                    'type': 'base64',
-                                    'media_type': f'image/{img_type}',
-                                    'data': img
-                                }
-                            },
-                            {
-                                'type': 'text',
-                                'text': prompt
-                            }
-                        ]
-                    }
-                ]
-            )
+            with self.phase('request'):
+                response = self.model.messages.create(**request)
             
-            return response.model_dump()
+            with self.phase('decode'):
+                return response.model_dump()
         except Exception as e:
             print(f"Error extracting raw output with Claude Haiku: {e}")
             return {}
+    
+    def build_batch_request(self, custom_id: str, image_path: str) -> Dict[str, Any]:
+        """Build one Message Batches API request"""
+        return {
+            'custom_id': custom_id,
+            'params': self._build_request(image_path)
+        }
+    
+    def submit_batch(self, requests_file: str) -> str:
+        """Create a message batch from the request file (sent inline, no file upload)"""
+        with open(requests_file, 'r') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        
+        batch = self.model.messages.batches.create(requests=requests)
+        return batch.id
+    
+    def get_batch_status(self, batch_id: str) -> str:
+        """Map the message batch processing status onto pending/ended"""
+        batch = self.model.messages.batches.retrieve(batch_id)
+        # Individual request failures are reported per result once the batch has ended
+        return BATCH_ENDED if batch.processing_status == 'ended' else BATCH_PENDING
+    
+    def iter_batch_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield results from the batch results stream"""
+        for entry in self.model.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == 'succeeded':
+                yield entry.custom_id, result.message.model_dump(), None
+            else:
+                error = getattr(result, 'error', None)
+                yield entry.custom_id, None, f"{result.type}: {error.model_dump() if error is not None else ''}"
@@ -34,26 +34,29 @@ class GeminiFlashOCR(OCRSystem):
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw output from Gemini Flash Vision"""
         try:
-            from PIL import Image
             from google.genai import types
             
-            # Open image
-            img = Image.open(image_path)
+            # Read image bytes (shared across adapters)
+            img_bytes, mime_type = self.encode_image(image_path, 'raw')
+            with self.phase('encode'):
+                img = types.Part.from_bytes(data=img_bytes, mime_type=mime_type)
             
             # Prepare prompt
             prompt = self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
             
             # Call Gemini API
-            response = self.model.models.generate_content(
-                model=self.config.get('model', 'gemini-2.0-flash-exp'),
-                contents=[img, prompt],
-                config=types.GenerateContentConfig(
-                    max_output_tokens=self.config.get('max_tokens', 8192),
-                    temperature=self.config.get('temperature', 0.0)
+            with self.phase('request'):
+                response = self.model.models.generate_content(
+                    model=self.config.get('model', 'gemini-2.0-flash-exp'),
+                    contents=[img, prompt],
+                    config=types.GenerateContentConfig(
+                        max_output_tokens=self.config.get('max_tokens', 8192),
+                        temperature=self.config.get('temperature', 0.0)
+                    )
                 )
-            )
             
-            return response.model_dump()
+            with self.phase('decode'):
+                return response.model_dump()
         except Exception as e:
             print(f"Error extracting raw output with Gemini Flash: {e}")
             return {}
@@ -2,14 +2,17 @@
 OpenAI GPT-4o Vision OCR implementation
 """
 
-import base64
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Iterator, Optional, Tuple
 from ..models import OCRSystem
+from ..batch import BATCH_PENDING, BATCH_ENDED, BATCH_FAILED
 
 
 class GPT4oOCR(OCRSystem):
     """OpenAI GPT-4o Vision OCR implementation"""
     
+    supports_batch = True
+    
     def __init__(self, name: str, config: dict):
         super().__init__(name, config)
         self.model = None
@@ -21,7 +24,8 @@ class GPT4oOCR(OCRSystem):
             from openai import OpenAI as OpenAIClient
             
             self.model = OpenAIClient(
-                api_key=self.config.get('api_key')
+                api_key=self.config.get('api_key'),
+                base_url=self.config.get('base_url')
             )
         except ImportError:
             print("OpenAI package not installed. Please install with: pip install openai")
@@ -30,38 +34,94 @@ class GPT4oOCR(OCRSystem):
             print(f"Error initializing OpenAI client: {e}")
             raise
     
+    def _build_request(self, image_path: str) -> Dict[str, Any]:
+        """Build the chat completion request body, shared by the synchronous and batch paths"""
+        # Read and encode image (shared across adapters)
+        img, mime_type = self.encode_image(image_path)
+        
+        return {
+            'model': self.config.get('model', 'gpt-4o'),
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': [
+                        {
+                            'type': 'text',
+                            'text': self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
+                        },
+                        {
+                            'type': 'image_url',
+                            'image_url': {
+                                'url': f'data:{mime_type};base64,{img}'
+                            }
+                        }
+                    ]
+                }
+            ],
+            'max_tokens': self.config.get('max_tokens', 4096),
+            'temperature': self.config.get('temperature', 0.0)
+        }
+    
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw output from GPT-4o Vision"""
         try:
-            # Read and encode image
-            with open(image_path, 'rb') as img_file:
-                img = base64.b64encode(img_file.read()).decode('utf-8')
+            request = self._build_request(image_path)
             
             # Call GPT-4o Vision API
-            response = self.model.chat.completions.create(
-                model=self.config.get('model', 'gpt-4o'),
-                messages=[
-                    {
-                        'role': 'user',
-                        'content': [
-                            {
-                                'type': 'text',
-                                'text': self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
-                            },
-                            {
-                                'type': 'image_url',
-                                'image_url': {
-                                    'url': f'data:image/jpeg;base64,{img}'
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=self.config.get('max_tokens', 4096),
-                temperature=self.config.get('temperature', 0.0)
-            )
+            with self.phase('request'):
+                response = self.model.chat.completions.create(**request)
             
-            return response.model_dump()
+            with self.phase('decode'):
+                return response.model_dump()
         except Exception as e:
             print(f"Error extracting raw output with GPT-4o: {e}")
             return {}
+    
+    def build_batch_request(self, custom_id: str, image_path: str) -> Dict[str, Any]:
+        """Build one line of the OpenAI Batch API input file"""
+        return {
+            'custom_id': custom_id,
+            'method': 'POST',
+            'url': '/v1/chat/completions',
+            'body': self._build_request(image_path)
+        }
+    
+    def submit_batch(self, requests_file: str) -> str:
+        """Upload the request file and create a batch job"""
+        with open(requests_file, 'rb') as f:
+            input_file = self.model.files.create(file=f, purpose='batch')
+        
+        batch = self.model.batches.create(
+            input_file_id=input_file.id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h'
+        )
+        return batch.id
+    
+    def get_batch_status(self, batch_id: str) -> str:
+        """Map the OpenAI batch status onto pending/ended/failed"""
+        status = self.model.batches.retrieve(batch_id).status
+        # Expired batches still return the requests completed in time
+        if status in ('completed', 'expired'):
+            return BATCH_ENDED
+        if status in ('failed', 'cancelled'):
+            return BATCH_FAILED
+        return BATCH_PENDING
+    
+    def iter_batch_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield results from the batch output and error files"""
+        batch = self.model.batches.retrieve(batch_id)
+        
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = self.model.files.content(file_id).text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    yield entry['custom_id'], None, str(entry.get('error') or response.get('body'))
+                else:
+                    yield entry['custom_id'], response.get('body'), None
@@ -2,14 +2,20 @@
 Mistral OCR Vision implementation
 """
 
-import base64
-from typing import Dict, Any
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Tuple
 from ..models import OCRSystem
+from ..batch import BATCH_PENDING, BATCH_ENDED, BATCH_FAILED
 
 
 class MistralOCR(OCRSystem):
     """Mistral OCR implementation"""
     
+    supports_batch = True
+    # PDFs are sent whole as a document_url, the response has one entry per page
+    document_suffixes = ('.pdf',)
+    
     def __init__(self, name: str, config: dict):
         super().__init__(name, config)
         self.model = None
@@ -21,7 +27,8 @@ class MistralOCR(OCRSystem):
             from mistralai import Mistral
             
             self.model = Mistral(
-                api_key=self.config.get('api_key')
+                api_key=self.config.get('api_key'),
+                server_url=self.config.get('base_url')
             )
         except ImportError:
             print("Mistral AI package not installed. Please install with: pip install mistralai")
@@ -30,23 +37,90 @@ class MistralOCR(OCRSystem):
             print(f"Error initializing Mistral client: {e}")
             raise
     
+    def _build_document(self, image_path: str) -> Dict[str, Any]:
+        """Build the OCR document payload, shared by the synchronous and batch paths"""
+        # Read and encode image (shared across adapters)
+        img, mime_type = self.encode_image(image_path)
+        
+        if mime_type == 'application/pdf':
+            return {
+                'type': 'document_url',
+                'document_url': f'data:{mime_type};base64,{img}'
+            }
+        return {
+            'type': 'image_url',
+            'image_url': f'data:{mime_type};base64,{img}'
+        }
+    
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw output from Mistral OCR"""
         try:
-            # Read and encode image
-            with open(image_path, 'rb') as img_file:
-                img = base64.b64encode(img_file.read()).decode('utf-8')
+            document = self._build_document(image_path)
             
             # Call Mistral OCR API
-            ocr_response = self.model.ocr.process(
-                model=self.config.get('model', 'pixtral-12b-2409'),
-                document={
-                    'type': 'image_url',
-                    'image_url': f'data:image/jpeg;base64,{img}'
-                }
-            )
+            with self.phase('request'):
+                ocr_response = self.model.ocr.process(
+                    model=self.config.get('model', 'pixtral-12b-2409'),
+                    document=document
+                )
             
-            return ocr_response.model_dump()
+            with self.phase('decode'):
+                return ocr_response.model_dump()
         except Exception as e:
             print(f"Error extracting raw output with Mistral OCR: {e}")
             return {}
+    
+    def build_batch_request(self, custom_id: str, image_path: str) -> Dict[str, Any]:
+        """Build one line of the Mistral batch input file (model is set on the job)"""
+        return {
+            'custom_id': custom_id,
+            'body': {'document': self._build_document(image_path)}
+        }
+    
+    def submit_batch(self, requests_file: str) -> str:
+        """Upload the request file and create an OCR batch job"""
+        with open(requests_file, 'rb') as f:
+            input_file = self.model.files.upload(
+                file={'file_name': Path(requests_file).name, 'content': f},
+                purpose='batch'
+            )
+        
+        job = self.model.batch.jobs.create(
+            input_files=[input_file.id],
+            model=self.config.get('model', 'pixtral-12b-2409'),
+            endpoint='/v1/ocr'
+        )
+        return job.id
+    
+    def get_batch_status(self, batch_id: str) -> str:
+        """Map the Mistral job status onto pending/ended/failed"""
+        status = self.model.batch.jobs.get(job_id=batch_id).status
+        # Timed out jobs still return the requests completed in time
+        if status in ('SUCCESS', 'TIMEOUT_EXCEEDED'):
+            return BATCH_ENDED
+        if status in ('FAILED', 'CANCELLED'):
+            return BATCH_FAILED
+        return BATCH_PENDING
+    
+    def iter_batch_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield results from the job output and error files"""
+        job = self.model.batch.jobs.get(job_id=batch_id)
+        
+        for file_id in (job.output_file, job.error_file):
+            if not file_id:
+                continue
+            # download() returns a streaming response that must be read explicitly
+            response = self.model.files.download(file_id=file_id)
+            try:
+                content = response.read().decode('utf-8')
+            finally:
+                response.close()
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if entry.get('error') or response.get('status_code') != 200:
+                    yield entry['custom_id'], None, str(entry.get('error') or response.get('body'))
+                else:
+                    yield entry['custom_id'], response.get('body'), None
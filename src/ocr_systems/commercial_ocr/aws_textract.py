@@ -32,15 +32,17 @@ class AWSTextractOCR(OCRSystem):
         """Extract raw output from AWS Textract"""
         try:
             # Read image file
-            with open(image_path, 'rb') as img:
-                img_bytes = img.read()
+            with self.phase('load'):
+                with open(image_path, 'rb') as img:
+                    img_bytes = img.read()
             
-            # Call Textract API
-            response = self.model.detect_document_text(
-                Document={
-                    'Bytes': img_bytes
-                }
-            )
+            # Call Textract API (boto3 already returns a decoded dict)
+            with self.phase('request'):
+                response = self.model.detect_document_text(
+                    Document={
+                        'Bytes': img_bytes
+                    }
+                )
             
             return response
         except Exception as e:
@@ -9,6 +9,9 @@ from ..models import OCRSystem
 class AzureDocumentOCR(OCRSystem):
     """Microsoft Azure Document Intelligence OCR implementation"""
     
+    # Multi-page PDFs and TIFFs are analyzed in one request
+    document_suffixes = ('.pdf', '.tif', '.tiff')
+    
     def __init__(self, name: str, config: dict):
         super().__init__(name, config)
         self.model = None
@@ -37,17 +40,20 @@ class AzureDocumentOCR(OCRSystem):
         """Extract raw output from Azure Document Intelligence"""
         try:
             # Read image file
-            with open(image_path, 'rb') as image_file:
-                content = image_file.read()
+            with self.phase('load'):
+                with open(image_path, 'rb') as image_file:
+                    content = image_file.read()
             
-            # Call Azure Document Intelligence API
-            poller = self.model.begin_analyze_document(
-                model_id=self.config.get('model_id', 'prebuilt-read'),
-                body=content
-            )
+            # Call Azure Document Intelligence API (includes polling for the result)
+            with self.phase('request'):
+                poller = self.model.begin_analyze_document(
+                    model_id=self.config.get('model_id', 'prebuilt-read'),
+                    body=content
+                )
+                result = poller.result()
             
-            result = poller.result()
-            return result.as_dict()
+            with self.phase('decode'):
+                return result.as_dict()
         except Exception as e:
             print(f"Error extracting raw output with Azure Document Intelligence: {e}")
             return {}
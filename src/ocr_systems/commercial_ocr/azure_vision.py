@@ -41,17 +41,20 @@ class AzureVisionOCR(OCRSystem):
         """Extract raw output from Azure Vision"""
         try:
             # Read image file
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            with self.phase('load'):
+                with open(image_path, 'rb') as f:
+                    image_data = f.read()
             
             # Call Azure Vision API
-            result = self.model.analyze(
-                image_data=image_data,
-                visual_features=[self.visual_features.READ],
-                model_version=self.config.get('model_version', 'latest')
-            )
+            with self.phase('request'):
+                result = self.model.analyze(
+                    image_data=image_data,
+                    visual_features=[self.visual_features.READ],
+                    model_version=self.config.get('model_version', 'latest')
+                )
             
-            return result.as_dict()
+            with self.phase('decode'):
+                return result.as_dict()
         except Exception as e:
             print(f"Error extracting raw output with Azure Vision: {e}")
             return {}
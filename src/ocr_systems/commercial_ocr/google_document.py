@@ -4,11 +4,15 @@ Google Cloud Document AI OCR implementation
 
 from typing import Dict, Any
 from ..models import OCRSystem
+from ..image_cache import guess_mime_type
 
 
 class GoogleDocumentOCR(OCRSystem):
     """Google Cloud Document AI OCR implementation"""
     
+    # Multi-page PDFs and TIFFs are processed in one request
+    document_suffixes = ('.pdf', '.tif', '.tiff')
+    
     def __init__(self, name: str, config: dict):
         super().__init__(name, config)
         self.model = None
@@ -78,51 +82,45 @@ class GoogleDocumentOCR(OCRSystem):
                 )
             
             # Read image file
-            with open(image_path, 'rb') as image:
-                image_content = image.read()
-            
-            # Determine MIME type from file extension
-            img_type = image_path.split('.')[-1].lower()
-            mime_type_map = {
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'gif': 'image/gif',
-                'webp': 'image/webp'
-            }
-            mime_type = mime_type_map.get(img_type, 'image/jpeg')
+            with self.phase('load'):
+                with open(image_path, 'rb') as image:
+                    image_content = image.read()
             
-            # Create raw document
+            # Create raw document (MIME type from the file extension)
             raw_document = documentai.RawDocument(
                 content=image_content,
-                mime_type=mime_type
+                mime_type=guess_mime_type(image_path)
             )
             
-            # Create process options
-            process_options = documentai.ProcessOptions(
-                individual_page_selector=documentai.ProcessOptions.IndividualPageSelector(
-                    pages=[1]
+            # All pages are processed unless a selection is configured (e.g. pages: [1])
+            process_options = None
+            if self.config.get('pages'):
+                process_options = documentai.ProcessOptions(
+                    individual_page_selector=documentai.ProcessOptions.IndividualPageSelector(
+                        pages=self.config['pages']
+                    )
                 )
-            )
             
             # Call Google Document AI API
-            result = self.model.process_document(
-                request=documentai.ProcessRequest(
-                    name=name,
-                    raw_document=raw_document,
-                    field_mask=self.config.get('field_mask'),
-                    process_options=process_options
+            with self.phase('request'):
+                result = self.model.process_document(
+                    request=documentai.ProcessRequest(
+                        name=name,
+                        raw_document=raw_document,
+                        field_mask=self.config.get('field_mask'),
+                        process_options=process_options
+                    )
                 )
-            )
             
-            # Convert protobuf response to dict
-            json_result = json.loads(MessageToJson(result._pb))
+            with self.phase('decode'):
+                # Convert protobuf response to dict
+                json_result = json.loads(MessageToJson(result._pb))
             
-            # Remove image data to save space
-            if 'document' in json_result and 'pages' in json_result['document']:
-                for page in json_result['document']['pages']:
-                    if 'image' in page:
-                        del page['image']
+                # Remove image data to save space
+                if 'document' in json_result and 'pages' in json_result['document']:
+                    for page in json_result['document']['pages']:
+                        if 'image' in page:
+                            del page['image']
             
             return json_result
         except Exception as e:
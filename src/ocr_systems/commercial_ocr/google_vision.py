@@ -55,16 +55,20 @@ class GoogleVisionOCR(OCRSystem):
             import json
             
             # Read image file
-            with open(image_path, 'rb') as image_file:
-                content = image_file.read()
+            with self.phase('load'):
+                with open(image_path, 'rb') as image_file:
+                    content = image_file.read()
             
-            image = vision.Image(content=content)
+            with self.phase('encode'):
+                image = vision.Image(content=content)
             
             # Call Google Vision API
-            response = self.model.text_detection(image=image)
+            with self.phase('request'):
+                response = self.model.text_detection(image=image)
             
             # Convert protobuf response to dict
-            return json.loads(MessageToJson(response._pb))
+            with self.phase('decode'):
+                return json.loads(MessageToJson(response._pb))
         except Exception as e:
             print(f"Error extracting raw output with Google Vision: {e}")
             return {}
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Multi-page documents (PDF and multi-frame TIFF)
+Pages are rasterized on demand into a disk cache, one PNG per page at the
+configured DPI, so page-level engines receive ordinary images.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+DOCUMENT_SUFFIXES = ('.pdf', '.tif', '.tiff')
+DEFAULT_DPI = 200
+DEFAULT_CACHE_DIR = "results/cache/pages"
+
+# PDFium is not thread-safe; renders from page workers are serialized
+_pdfium_lock = threading.Lock()
+
+
+def is_document(path: str) -> bool:
+    """Whether a file may hold several pages (PDF or TIFF)"""
+    return Path(path).suffix.lower() in DOCUMENT_SUFFIXES
+
+
+def page_count(path: str) -> int:
+    """Number of pages of a PDF or TIFF (1 for other images)"""
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.tif', '.tiff'):
+        from PIL import Image
+        with Image.open(path) as image:
+            return getattr(image, 'n_frames', 1)
+    if suffix == '.pdf':
+        if pdfium is not None:
+            with _pdfium_lock:
+                document = pdfium.PdfDocument(path)
+                try:
+                    return len(document)
+                finally:
+                    document.close()
+        if fitz is not None:
+            with fitz.open(path) as document:
+                return document.page_count
+        raise RuntimeError("Reading PDFs requires pypdfium2 or PyMuPDF. Install with: pip install pypdfium2")
+    return 1
+
+
+class PageRasterizer:
+    """
+    Renders document pages to images, cached by file, page and DPI
+    
+    Supported options (``documents`` section of an OCR system config):
+        dpi: Resolution PDF pages are rendered at (default 200); TIFF frames
+             keep their own resolution
+        workers: Pages of one document extracted concurrently (default: CPU count);
+                 engines that are not thread-safe always use one
+        mode: 'auto' sends whole documents to systems that accept them and
+              splits them into pages for the others; 'pages' always splits
+        cache_dir: Directory for rendered pages (default results/cache/pages)
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.dpi = int(config.get('dpi', DEFAULT_DPI))
+        self.workers = max(1, int(config.get('workers', os.cpu_count() or 1)))
+        self.mode = config.get('mode', 'auto')
+        self.cache_dir = Path(config.get('cache_dir', DEFAULT_CACHE_DIR))
+        if self.mode not in ('auto', 'pages'):
+            raise ValueError(f"Unsupported documents mode: {self.mode}")
+    
+    def page_path(self, path: str, page_index: int) -> Path:
+        """Cache file of a page, keyed by the document's path, mtime, size and the DPI"""
+        stat = os.stat(path)
+        key = f"{Path(path).resolve()}:{stat.st_mtime_ns}:{stat.st_size}:{self.dpi}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{Path(path).stem}_{digest}_p{page_index + 1:04d}.png"
+    
+    def render(self, path: str, page_index: int) -> str:
+        """
+        Rasterize one page (zero-based) unless it is already cached
+        
+        Returns:
+            Path to the page image
+        """
+        output_file = self.page_path(path, page_index)
+        if output_file.exists():
+            return str(output_file)
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Written atomically, concurrent workers may render the same page
+        tmp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        suffix = Path(path).suffix.lower()
+        if suffix in ('.tif', '.tiff'):
+            from PIL import Image
+            with Image.open(path) as image:
+                image.seek(page_index)
+                image.save(tmp_file, format='PNG')
+        elif pdfium is not None:
+            with _pdfium_lock:
+                document = pdfium.PdfDocument(path)
+                try:
+                    bitmap = document[page_index].render(scale=self.dpi / 72)
+                    bitmap.to_pil().save(tmp_file, format='PNG')
+                finally:
+                    document.close()
+        elif fitz is not None:
+            with fitz.open(path) as document:
+                document[page_index].get_pixmap(dpi=self.dpi).save(str(tmp_file), output='png')
+        else:
+            raise RuntimeError("Reading PDFs requires pypdfium2 or PyMuPDF. Install with: pip install pypdfium2")
+        os.replace(tmp_file, output_file)
+        return str(output_file)
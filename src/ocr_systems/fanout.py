@@ -0,0 +1,133 @@
+"""
+Cross-system fan-out extraction
+Hands each image to every OCR system at the same time, so a dataset takes about
+as long as its slowest system instead of the sum of all.
+"""
+
+import queue
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .image_cache import get_shared_image_cache
+
+
+DEFAULT_WINDOW = 32
+
+
+class FanOutExtractor:
+    """
+    Run several OCR systems over the same images concurrently
+    
+    Each system consumes the images in its own thread(s) through its own
+    iter_extract, so adapters keep their concurrency settings (e.g. the in-flight
+    limit of vLLM or mock providers). A reader thread loads every image into the
+    shared image cache once and feeds it to all systems; at most ``window``
+    images are in flight, which bounds memory and how far the fastest system
+    runs ahead of the slowest.
+    
+    Only adapters that encode through the cache (the API and vLLM adapters,
+    without preprocessing) skip the file read. Local engines (Tesseract, DocTR,
+    PaddleOCR) and preprocessed images still read the file themselves.
+    
+    Supported options (``fanout`` section of an OCR system config):
+        workers: Threads calling iter_extract for this system (default 1);
+                 systems that are not thread-safe always get one
+    """
+    
+    def __init__(self, ocr_systems: Dict[str, Any], window: int = DEFAULT_WINDOW):
+        self.ocr_systems = ocr_systems
+        self.window = max(1, int(window))
+        self.workers = {}
+        for name, system in ocr_systems.items():
+            workers = max(1, int((system.config.get('fanout') or {}).get('workers', 1)))
+            if workers > 1 and not system.thread_safe:
+                print(f"Warning: {name} is not thread-safe, fan-out uses 1 worker instead of {workers}")
+                workers = 1
+            self.workers[name] = workers
+    
+    def run(self, image_paths: List[str]) -> Iterator[Tuple[str, str, Optional[Dict[str, Any]], Dict[str, Any], Optional[str]]]:
+        """
+        Extract every image with every system
+        
+        Args:
+            image_paths: Paths of the images to process
+        
+        Yields:
+            Tuple of (system_name, image_path, raw_output, timing, error) in completion order
+        """
+        cache = get_shared_image_cache()
+        slots = threading.Semaphore(self.window)
+        remaining: Dict[str, int] = {}
+        remaining_lock = threading.Lock()
+        results: "queue.Queue" = queue.Queue()
+        done = object()
+        inputs = {name: queue.Queue() for name in self.ocr_systems}
+        
+        def finished(image_path: str):
+            # The slot is freed once every system is done with the image
+            with remaining_lock:
+                remaining[image_path] -= 1
+                if remaining[image_path] > 0:
+                    return
+                del remaining[image_path]
+            slots.release()
+        
+        def reader():
+            try:
+                for image_path in image_paths:
+                    slots.acquire()
+                    try:
+                        cache.get(image_path, 'raw')
+                    except OSError:
+                        # Each system reports the unreadable image itself
+                        pass
+                    with remaining_lock:
+                        remaining[image_path] = remaining.get(image_path, 0) + len(self.ocr_systems)
+                    for name in self.ocr_systems:
+                        inputs[name].put(image_path)
+            finally:
+                for name, count in self.workers.items():
+                    for _ in range(count):
+                        inputs[name].put(done)
+        
+        def feed(name: str, taken: set):
+            while True:
+                image_path = inputs[name].get()
+                if image_path is done:
+                    return
+                taken.add(image_path)
+                yield image_path
+        
+        def consumer(name: str):
+            ocr_system = self.ocr_systems[name]
+            taken = set()
+            images = feed(name, taken)
+            try:
+                for image_path, raw_output, timing, error in ocr_system.iter_extract(images):
+                    taken.discard(image_path)
+                    results.put((name, image_path, raw_output, timing, error))
+                    finished(image_path)
+            except Exception as e:
+                # The system is out; fail its images in flight and the rest of
+                # its feed, so the window keeps moving for the other systems
+                error = f"{name} stopped: {e}"
+                for image_path in list(taken) + list(images):
+                    taken.discard(image_path)
+                    results.put((name, image_path, None, {}, error))
+                    finished(image_path)
+            finally:
+                results.put(done)
+        
+        threads = [threading.Thread(target=reader, daemon=True)]
+        for name, count in self.workers.items():
+            threads += [threading.Thread(target=consumer, args=(name,), daemon=True) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        
+        n_consumers = sum(self.workers.values())
+        while n_consumers:
+            entry = results.get()
+            if entry is done:
+                n_consumers -= 1
+                continue
+            yield entry
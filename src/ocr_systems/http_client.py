@@ -0,0 +1,137 @@
+"""
+Pooled HTTP client for OCR systems that talk to HTTP endpoints
+Keeps connections alive across images and exposes connection metrics
+"""
+
+import threading
+import time
+from typing import Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report every new TCP connection"""
+    
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_new_connection = self._on_new_connection
+        
+        def counting(pool_class):
+            class CountingPool(pool_class):
+                def _new_conn(self):
+                    on_new_connection()
+                    return super()._new_conn()
+            return CountingPool
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: counting(pool_class) for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class PooledHTTPClient:
+    """
+    requests.Session with a tuned connection pool and keep-alive
+    
+    Supported options (``http`` section of an OCR system config):
+        pool_connections: Number of host pools to cache (default 4)
+        pool_maxsize: Max connections kept alive per host (default 16)
+        pool_block: Block instead of opening extra connections when the pool is full (default False)
+        max_retries: Retries on connection errors and 429/5xx responses (default 0)
+        backoff_factor: Retry backoff factor in seconds (default 0.5)
+        timeout: Request timeout in seconds (default 120)
+    """
+    
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or {}
+        self.pool_connections = int(config.get('pool_connections', 4))
+        self.pool_maxsize = int(config.get('pool_maxsize', 16))
+        self.pool_block = bool(config.get('pool_block', False))
+        self.timeout = config.get('timeout', 120)
+        
+        retries = Retry(
+            total=int(config.get('max_retries', 0)),
+            backoff_factor=float(config.get('backoff_factor', 0.5)),
+            status_forcelist=self.RETRY_STATUS_CODES,
+            allowed_methods=None,
+            raise_on_status=False
+        )
+        
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+        self._request_seconds = 0.0
+        self._connections_opened = 0
+        
+        self.adapter = _CountingAdapter(
+            self._count_connection,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=retries
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+    
+    def _count_connection(self):
+        with self._lock:
+            self._connections_opened += 1
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the pooled session and record metrics"""
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._requests += 1
+                self._request_seconds += elapsed
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST through the pooled session"""
+        return self.request('POST', url, **kwargs)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the pooled session"""
+        return self.request('GET', url, **kwargs)
+    
+    def connection_stats(self) -> Dict[str, Any]:
+        """
+        Return connection metrics
+        
+        ``connections_opened`` counts TCP connections created by urllib3 across all
+        host pools, including pools the pool manager has since evicted, so
+        ``requests - connections_opened`` is the number of requests served over
+        a reused keep-alive connection.
+        """
+        with self._lock:
+            n_requests = self._requests
+            connections_opened = self._connections_opened
+            return {
+                'requests': n_requests,
+                'errors': self._errors,
+                'connections_opened': connections_opened,
+                'connections_reused': max(n_requests - connections_opened, 0),
+                'reuse_ratio': round(1 - connections_opened / n_requests, 4) if n_requests else 0.0,
+                'mean_request_seconds': round(self._request_seconds / n_requests, 4) if n_requests else 0.0,
+                'pool_maxsize': self.pool_maxsize
+            }
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
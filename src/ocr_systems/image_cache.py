@@ -0,0 +1,206 @@
+"""
+Shared cache of encoded image payloads
+Lets every OCR adapter in one extraction run reuse the same file read and base64 encoding
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple, Union
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+MIME_TYPES = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'tif': 'image/tiff',
+    'tiff': 'image/tiff',
+    'bmp': 'image/bmp',
+    'pdf': 'application/pdf'
+}
+
+# Target formats understood by EncodedImageCache.get
+#   raw:        original file bytes
+#   base64:     base64 of the original file bytes
+#   png_base64: image decoded and re-encoded as PNG, then base64
+TARGET_FORMATS = ('raw', 'base64', 'png_base64')
+
+
+def guess_mime_type(image_path: str) -> str:
+    """Guess the image MIME type from the file extension (defaults to JPEG)"""
+    img_type = str(image_path).split('.')[-1].lower()
+    return MIME_TYPES.get(img_type, 'image/jpeg')
+
+
+class EncodedImageCache:
+    """
+    Memory-bounded LRU cache of encoded image payloads
+    
+    Entries are keyed by (content hash, target format), so the same image reached
+    through different paths is only encoded once. A small stat index maps
+    (path, mtime, size) to the content hash so cache hits do not touch the file.
+    The cache is thread-safe and each file is read at most once even when several
+    workers ask for it concurrently.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Union[bytes, str], str]]" = OrderedDict()
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, int, int], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.file_reads = 0
+    
+    def get(self, image_path: str, target_format: str = 'base64') -> Tuple[Union[bytes, str], str]:
+        """
+        Get the encoded payload for an image
+        
+        Args:
+            image_path: Path to the image file
+            target_format: One of TARGET_FORMATS
+        
+        Returns:
+            Tuple of (payload, mime_type)
+        """
+        if target_format not in TARGET_FORMATS:
+            raise ValueError(f"Unknown target format: {target_format}")
+        
+        stat_key = self._stat_key(image_path)
+        
+        with self._lock:
+            digest = self._digests.get(stat_key)
+            if digest is not None:
+                entry = self._lookup(digest, target_format)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+            key_lock = self._key_locks.setdefault(stat_key, threading.Lock())
+        
+        # Only one worker per file does the read/encode, the others wait for it
+        with key_lock:
+            with self._lock:
+                digest = self._digests.get(stat_key)
+                if digest is not None:
+                    entry = self._lookup(digest, target_format)
+                    if entry is not None:
+                        self.hits += 1
+                        return entry
+                raw_entry = self._lookup(digest, 'raw') if digest is not None else None
+                self.misses += 1
+            
+            if raw_entry is not None:
+                content = raw_entry[0]
+            else:
+                with open(image_path, 'rb') as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).hexdigest()
+                with self._lock:
+                    self.file_reads += 1
+                    self._digests[stat_key] = digest
+                    self._store(digest, 'raw', content, guess_mime_type(image_path))
+            
+            entry = self._encode(content, image_path, target_format)
+            
+            with self._lock:
+                if target_format != 'raw':
+                    self._store(digest, target_format, *entry)
+                self._key_locks.pop(stat_key, None)
+        
+        return entry
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache usage counters"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'file_reads': self.file_reads
+            }
+    
+    def resize(self, max_bytes: int):
+        """Change the memory bound, evicting least recently used entries if needed"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+    
+    def clear(self):
+        """Drop all cached payloads and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self._key_locks.clear()
+            self._current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.file_reads = 0
+    
+    @staticmethod
+    def _stat_key(image_path: str) -> Tuple[str, int, int]:
+        path = os.path.abspath(image_path)
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size)
+    
+    @staticmethod
+    def _encode(content: bytes, image_path: str, target_format: str) -> Tuple[Union[bytes, str], str]:
+        if target_format == 'raw':
+            return content, guess_mime_type(image_path)
+        if target_format == 'base64':
+            return base64.b64encode(content).decode('utf-8'), guess_mime_type(image_path)
+        
+        from PIL import Image
+        with Image.open(io.BytesIO(content)) as img:
+            buf = io.BytesIO()
+            img.convert('RGB').save(buf, format='PNG')
+        return base64.b64encode(buf.getvalue()).decode('utf-8'), 'image/png'
+    
+    def _lookup(self, digest: str, target_format: str):
+        """Return a cached entry and mark it as recently used (caller holds the lock)"""
+        entry = self._entries.get((digest, target_format))
+        if entry is not None:
+            self._entries.move_to_end((digest, target_format))
+        return entry
+    
+    def _store(self, digest: str, target_format: str, payload: Union[bytes, str], mime_type: str):
+        """Insert an entry and evict least recently used ones (caller holds the lock)"""
+        key = (digest, target_format)
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._current_bytes -= len(self._entries.pop(key)[0])
+        self._entries[key] = (payload, mime_type)
+        self._current_bytes += size
+        self._evict()
+    
+    def _evict(self):
+        """Evict least recently used entries until under the bound (caller holds the lock)"""
+        while self._current_bytes > self.max_bytes and self._entries:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._current_bytes -= len(evicted)
+
+
+_shared_cache = EncodedImageCache()
+
+
+def get_shared_image_cache() -> EncodedImageCache:
+    """Get the process-wide cache shared by all OCR adapters"""
+    return _shared_cache
+
+
+def configure_shared_image_cache(max_mb: float) -> EncodedImageCache:
+    """Set the memory bound of the shared cache in megabytes"""
+    _shared_cache.resize(int(max_mb * 1024 * 1024))
+    return _shared_cache
@@ -0,0 +1 @@
+# Mock OCR providers for offline benchmarks
@@ -0,0 +1,158 @@
+"""
+Mock OCR provider for offline benchmarks
+Answers with the ground truth of the image in the response format of the
+emulated provider, after a simulated latency, with configurable errors
+"""
+
+import math
+import random
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from PIL import Image
+
+from ocr_systems.models import OCRSystem
+from ocr_systems.opensource_llm.dispatcher import AdaptiveConcurrencyLimiter, ConcurrentRequestDispatcher
+from parsing.samples import SYSTEM_FORMATS, build_raw_output, corrupt_lines
+
+MOCK_PREFIX = "mock_"
+
+# Emulated systems that run locally; the others are remote APIs
+LOCAL_FORMATS = ('doctr', 'paddleocr', 'tesseract')
+
+
+class LatencyModel:
+    """
+    Draw simulated latencies from a configured distribution
+    
+    Config examples:
+        {distribution: constant, seconds: 0.5}
+        {distribution: uniform, low: 0.2, high: 0.8}
+        {distribution: normal, mean: 0.5, std: 0.1}
+        {distribution: lognormal, median: 0.5, sigma: 0.4}   (long right tail, like real APIs)
+    """
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.distribution = config.get('distribution', 'constant')
+        self.config = config
+        if self.distribution not in ('constant', 'uniform', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+    
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == 'constant':
+            return float(self.config.get('seconds', 0.0))
+        if self.distribution == 'uniform':
+            return rng.uniform(self.config.get('low', 0.0), self.config.get('high', 1.0))
+        if self.distribution == 'normal':
+            return max(0.0, rng.gauss(self.config.get('mean', 0.5), self.config.get('std', 0.1)))
+        return rng.lognormvariate(math.log(self.config.get('median', 0.5)), self.config.get('sigma', 0.4))
+
+
+class MockOCR(OCRSystem):
+    """
+    Mock OCR system emulating one provider's response format
+    
+    Registered as mock_<system> for every system with a parser (mock_gpt4o,
+    mock_tesseract, ...). The text returned is the image's ground truth file,
+    found by stem in ground_truth_dir (default: the gt/ folder next to or above
+    the image folder), so the whole pipeline can run without API keys.
+    
+    Config:
+        latency: LatencyModel config (default: no latency)
+        error_rate: Fraction of requests that fail like a provider error
+        char_error_rate: Fraction of characters corrupted in the returned text
+        concurrency: Requests in flight at once (default: sequential)
+        ground_truth_dir: Directory of <stem>.txt ground truth files
+        seed: Seed of the per-image random draws (results are reproducible)
+    """
+    
+    def __init__(self, name: str, config: dict):
+        super().__init__(name, config)
+        emulated = name[len(MOCK_PREFIX):] if name.startswith(MOCK_PREFIX) else name
+        if emulated not in SYSTEM_FORMATS:
+            raise ValueError(f"Mock system {name} emulates unknown system: {emulated}")
+        self.emulates = emulated
+        self.output_format = SYSTEM_FORMATS[emulated]
+        self.latency = LatencyModel(config.get('latency'))
+        self.error_rate = float(config.get('error_rate', 0.0))
+        self.char_error_rate = float(config.get('char_error_rate', 0.0))
+        self.concurrency = int(config.get('concurrency', 1))
+        self.ground_truth_dir = Path(config['ground_truth_dir']) if config.get('ground_truth_dir') else None
+        self.seed = config.get('seed', 0)
+        self.limiter: Optional[AdaptiveConcurrencyLimiter] = None
+    
+    def _ground_truth_lines(self, image_path: str) -> List[str]:
+        image_file = Path(image_path)
+        candidates = ([self.ground_truth_dir] if self.ground_truth_dir else
+                      [image_file.parent.parent / 'gt', image_file.parent / 'gt'])
+        for gt_dir in candidates:
+            gt_file = gt_dir / f"{image_file.stem}.txt"
+            if gt_file.exists():
+                with open(gt_file, 'r', encoding='utf-8') as f:
+                    return f.read().splitlines()
+        return []
+    
+    def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
+        """
+        Return the ground truth of the image in the emulated provider format
+        
+        Simulated provider errors are raised, like the errors of a real adapter,
+        so the record is saved with its error and left out of latency and cost.
+        """
+        # Same draws for the same image on every run, whatever the processing order
+        rng = random.Random(f"{self.seed}:{Path(image_path).stem}")
+        
+        with self.phase('load'):
+            if self.output_format in LOCAL_FORMATS:
+                image = Image.open(image_path)
+                image.load()
+            else:
+                self.encode_image(image_path)
+        
+        with self.phase('inference' if self.output_format in LOCAL_FORMATS else 'request'):
+            time.sleep(self.latency.sample(rng))
+            if rng.random() < self.error_rate:
+                raise RuntimeError("simulated provider error (HTTP 500)")
+            lines = corrupt_lines(self._ground_truth_lines(image_path), self.char_error_rate, rng)
+        
+        with self.phase('decode'):
+            return build_raw_output(self.output_format, lines, rng.randrange(2**31))
+    
+    def iter_extract(self, image_paths: List[str]):
+        """Extract raw outputs with 'concurrency' requests in flight"""
+        if self.concurrency <= 1:
+            yield from super().iter_extract(image_paths)
+            return
+        
+        self.limiter = AdaptiveConcurrencyLimiter(initial=self.concurrency, minimum=self.concurrency,
+                                                  maximum=self.concurrency, adaptive=False)
+        
+        def request_fn(image_path):
+            with self.collect_phases() as phases:
+                start_ns = time.perf_counter_ns()
+                raw_output = self.extract_image(image_path)
+                elapsed_ns = time.perf_counter_ns() - start_ns
+            return (raw_output, self.timing_record(elapsed_ns, phases)), None
+        
+        dispatcher = ConcurrentRequestDispatcher(request_fn, self.limiter)
+        
+        for image_path, result, request_timing, error in dispatcher.run(image_paths):
+            if error is not None:
+                raw_output = None
+                timing = {'processing_time_seconds': request_timing['total_seconds']}
+            else:
+                raw_output, timing = result
+            self.mark_cold_start(timing)
+            yield image_path, raw_output, timing, error
+    
+    def runtime_stats(self) -> Dict[str, Any]:
+        """Return the emulated system and the mock settings"""
+        return {
+            'emulates': self.emulates,
+            'latency': self.latency.config,
+            'error_rate': self.error_rate,
+            'char_error_rate': self.char_error_rate,
+            'concurrency': self.concurrency
+        }
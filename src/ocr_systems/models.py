@@ -3,26 +3,333 @@ Base OCR system interface and factory
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import json
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
+from .preprocessing import ImagePreprocessor
+from .image_cache import get_shared_image_cache
+from .documents import PageRasterizer, is_document, page_count
+from evaluation.time.index import COLD_START_FILE
 
 class OCRSystem(ABC):
     """Base class for OCR systems"""
     
+    # Systems that implement the batch methods below set this to True
+    supports_batch = False
+    # Multi-page document types the engine accepts whole, e.g. ('.pdf',)
+    document_suffixes: Tuple[str, ...] = ()
+    # Engines that cannot run from several threads extract document pages one by one
+    thread_safe = True
+    
     def __init__(self, name: str, config: Dict[str, Any]):
         self.name = name
         self.config = config
+        # Created on the first save, not for every instance
         self.output_dir = Path("results/raw_outputs")
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.preprocessor = ImagePreprocessor.from_config(config.get('preprocessing'))
+        self.documents = PageRasterizer(config.get('documents'))
+        self._phase_local = threading.local()
+        
+        # Cold-start tracking: model load time is set by OCRSystemFactory, the first
+        # extraction (or the warm-up runs) is recorded apart from steady-state timings
+        self.warmup_runs = int(config.get('warmup_runs', 0))
+        self.model_load_seconds: Optional[float] = None
+        # Set by AdapterPool when the instance is handed out again for another dataset
+        self.model_reused = False
+        self._warmup_times: List[float] = []
+        self._first_inference_seconds: Optional[float] = None
     
     @abstractmethod
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw OCR output from image"""
         pass
     
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time a phase of the current extraction with perf_counter_ns
+        
+        Phases used by the adapters: load, preprocess, encode, request (remote APIs),
+        inference (local engines) and decode. Repeated phases are summed. Outside
+        of collect_phases() this is a no-op.
+        """
+        spans = getattr(self._phase_local, 'spans', None)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            if spans is not None:
+                spans[name] = spans.get(name, 0) + time.perf_counter_ns() - start
+    
+    @contextmanager
+    def collect_phases(self):
+        """Collect the phase spans recorded in this thread into a dict of name -> nanoseconds"""
+        spans: Dict[str, int] = {}
+        self._phase_local.spans = spans
+        try:
+            yield spans
+        finally:
+            self._phase_local.spans = None
+    
+    @staticmethod
+    def timing_record(elapsed_ns: int, phases: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Build the timing fields saved in a raw output record
+        
+        Time not covered by any phase is reported as 'other'.
+        """
+        phases = dict(phases)
+        phases['other'] = max(elapsed_ns - sum(phases.values()), 0)
+        return {
+            'processing_time_seconds': elapsed_ns / 1e9,
+            'processing_time_ns': elapsed_ns,
+            'phase_times_ns': phases
+        }
+    
+    def prepare_image(self, image_path: str) -> str:
+        """Run the configured preprocessing stage and return the path to send to the engine"""
+        if self.preprocessor is None:
+            return image_path
+        with self.phase('preprocess'):
+            return self.preprocessor.process(image_path)
+    
+    def extract_image(self, image_path: str) -> Dict[str, Any]:
+        """
+        Extract one dataset item, an image or a multi-page document
+        
+        Documents of a type the system accepts whole (document_suffixes) are sent
+        as they are; others are split into pages that are extracted concurrently
+        (see extract_pages). Single-frame TIFFs are ordinary images.
+        """
+        suffix = Path(image_path).suffix.lower()
+        if is_document(image_path):
+            if self.documents.mode == 'auto' and suffix in self.document_suffixes:
+                return self.extract_raw_output(image_path)
+            with self.phase('rasterize'):
+                n_pages = page_count(image_path)
+            if n_pages > 1 or suffix == '.pdf':
+                return self.extract_pages(image_path, n_pages)
+        return self.extract_raw_output(self.prepare_image(image_path))
+    
+    def extract_pages(self, document_path: str, n_pages: int) -> Dict[str, Any]:
+        """
+        Rasterize and extract the pages of a document, several at a time
+        
+        Phase times are summed over pages, so with several workers they can add
+        up to more than the document's wall time.
+        
+        Returns:
+            Raw output {'document_pages': [raw output of each page], 'page_count': n}
+        """
+        outer_spans = getattr(self._phase_local, 'spans', None)
+        
+        def extract_page(page_index: int):
+            # Phase spans are thread-local, so each page collects its own
+            with self.collect_phases() as spans:
+                with self.phase('rasterize'):
+                    page_path = self.documents.render(document_path, page_index)
+                raw_output = self.extract_raw_output(self.prepare_image(page_path))
+            return raw_output, spans
+        
+        workers = min(self.documents.workers if self.thread_safe else 1, max(n_pages, 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = list(executor.map(extract_page, range(n_pages)))
+        
+        if outer_spans is not None:
+            for _, spans in pages:
+                for name, elapsed_ns in spans.items():
+                    outer_spans[name] = outer_spans.get(name, 0) + elapsed_ns
+        return {'document_pages': [raw_output for raw_output, _ in pages], 'page_count': n_pages}
+    
+    def encode_image(self, image_path: str, target_format: str = 'base64'):
+        """
+        Get the encoded image from the cache shared by all adapters
+        
+        Returns:
+            Tuple of (payload, mime_type)
+        """
+        cache = get_shared_image_cache()
+        if target_format == 'raw':
+            with self.phase('load'):
+                return cache.get(image_path, 'raw')
+        
+        # Warm the raw entry first so file read and encoding are timed separately
+        with self.phase('load'):
+            cache.get(image_path, 'raw')
+        with self.phase('encode'):
+            return cache.get(image_path, target_format)
+    
+    def runtime_stats(self) -> Dict[str, Any]:
+        """Return adapter-specific runtime metrics (e.g. connection reuse)"""
+        return {}
+    
+    def build_batch_request(self, custom_id: str, image_path: str) -> Dict[str, Any]:
+        """Build one line of the provider batch request JSONL"""
+        raise NotImplementedError(f"{self.name} does not support batch extraction")
+    
+    def submit_batch(self, requests_file: str) -> str:
+        """Submit a request JSONL to the provider batch API and return the batch id"""
+        raise NotImplementedError(f"{self.name} does not support batch extraction")
+    
+    def get_batch_status(self, batch_id: str) -> str:
+        """Return the normalized batch state: 'pending', 'ended' or 'failed'"""
+        raise NotImplementedError(f"{self.name} does not support batch extraction")
+    
+    def iter_batch_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Yield (custom_id, raw_output, error) for every result of an ended batch"""
+        raise NotImplementedError(f"{self.name} does not support batch extraction")
+    
+    def warmup(self, image_paths: List[str]) -> List[float]:
+        """
+        Run the configured number of discarded extractions before measuring
+        
+        Args:
+            image_paths: Images to warm up on (cycled if fewer than warmup_runs)
+        
+        Returns:
+            Time of each warm-up run in seconds
+        """
+        if not image_paths:
+            return []
+        
+        for i in range(self.warmup_runs):
+            image_path = image_paths[i % len(image_paths)]
+            start_ns = time.perf_counter_ns()
+            try:
+                self.extract_image(image_path)
+            except Exception as e:
+                print(f"Warm-up run failed on {image_path}: {e}")
+            self._warmup_times.append((time.perf_counter_ns() - start_ns) / 1e9)
+        
+        if self._warmup_times and self._first_inference_seconds is None:
+            self._first_inference_seconds = self._warmup_times[0]
+        return list(self._warmup_times)
+    
+    def unload(self):
+        """
+        Release models and connections once the system has no work left
+        
+        Subclasses holding models or sessions override this; the instance is not
+        used afterwards.
+        """
+        pass
+    
+    def cold_start_stats(self) -> Dict[str, Any]:
+        """Return model load time, first-inference latency and warm-up run times"""
+        return {
+            # A reused instance did not load its model for this dataset
+            'model_load_seconds': None if self.model_reused else self.model_load_seconds,
+            'model_reused': self.model_reused,
+            'first_inference_seconds': self._first_inference_seconds,
+            'warmup_runs': len(self._warmup_times),
+            'warmup_times_seconds': list(self._warmup_times)
+        }
+    
+    def save_cold_start_stats(self, dataset_name: str) -> Path:
+        """Save cold_start_stats() next to the raw outputs as cold_start.json"""
+        dataset_system_dir = self.output_dir / dataset_name / self.name
+        dataset_system_dir.mkdir(parents=True, exist_ok=True)
+        
+        output_file = dataset_system_dir / COLD_START_FILE
+        with open(output_file, 'w') as f:
+            json.dump({
+                'system': self.name,
+                'dataset': dataset_name,
+                'timestamp': datetime.now().isoformat(),
+                **self.cold_start_stats()
+            }, f, indent=2)
+        
+        return output_file
+    
+    def iter_extract(self, image_paths: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Dict[str, Any], Optional[str]]]:
+        """
+        Extract raw outputs for several images
+        
+        Subclasses may override this to process images concurrently, in which
+        case results are yielded in completion order.
+        
+        Args:
+            image_paths: Paths of the images to process
+        
+        Yields:
+            Tuple of (image_path, raw_output, timing, error) per image;
+            raw_output is None when extraction raised
+        """
+        for image_path in image_paths:
+            with self.collect_phases() as phases:
+                start_ns = time.perf_counter_ns()
+                try:
+                    raw_output = self.extract_image(image_path)
+                    error = None
+                except Exception as e:
+                    raw_output = None
+                    error = str(e)
+                elapsed_ns = time.perf_counter_ns() - start_ns
+            
+            timing = self.timing_record(elapsed_ns, phases)
+            self.mark_cold_start(timing)
+            
+            yield image_path, raw_output, timing, error
+    
+    def mark_cold_start(self, timing: Dict[str, Any]):
+        """
+        Mark the first completed extraction of a run without warm-up as cold start
+        
+        Without warm-up runs the first image pays the cold-start cost; it is
+        reported as the first-inference latency and kept out of steady-state
+        statistics. Concurrent iter_extract overrides call this on every record
+        in completion order.
+        """
+        if self._first_inference_seconds is None:
+            self._first_inference_seconds = timing['processing_time_seconds']
+            timing['cold_start'] = True
+    
+    def save_raw_output(self, dataset_name: str, image_path: str, raw_output: Optional[Dict[str, Any]],
+                        timing: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> Path:
+        """
+        Save one raw output record to results/raw_outputs/<dataset>/<system>/<stem>_raw.json
+        
+        Args:
+            dataset_name: Name of the dataset
+            image_path: Path of the source image
+            raw_output: Raw OCR output (None on error)
+            timing: Timing fields, saved only if measure_time is enabled
+            error: Error message, if extraction failed
+        
+        Returns:
+            Path to the saved file
+        """
+        dataset_system_dir = self.output_dir / dataset_name / self.name
+        dataset_system_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Create filename from image path
+        image_file = Path(image_path)
+        output_file = dataset_system_dir / (image_file.stem + "_raw.json")
+        
+        file_data = {
+            'image_path': str(image_path),
+            'image_filename': image_file.name,
+            'system': self.name,
+            'dataset': dataset_name,
+            'timestamp': datetime.now().isoformat(),
+            # Failed extractions are saved with an empty output and their error
+            'raw_output': raw_output if raw_output is not None else {}
+        }
+        
+        if error is not None:
+            file_data['error'] = error
+        elif timing and self.config.get('measure_time', False):
+            file_data.update(timing)
+        
+        with open(output_file, 'w') as f:
+            json.dump(file_data, f, indent=2)
+        
+        return output_file
     
     def batch_extract_and_save(self, image_paths: List[str], dataset_name: str) -> str:
         """Extract text from multiple images and save raw outputs individually"""
@@ -32,57 +339,9 @@ class OCRSystem(ABC):
         
         saved_files = []
         
-        for image_path in image_paths:
-            try:
-                # Measure processing time if enabled in config
-                measure_time = self.config.get('measure_time', False)
-                
-                start_time = time.time()
-                raw_output = self.extract_raw_output(image_path)
-                end_time = time.time()
-                
-                processing_time = end_time - start_time if measure_time else None
-                timestamp = datetime.now().isoformat()
-                
-                # Create filename from image path
-                image_file = Path(image_path)
-                output_filename = image_file.stem + "_raw.json"
-                output_file = dataset_system_dir / output_filename
-                
-                # Save individual file with timing info
-                file_data = {
-                    'image_path': str(image_path),
-                    'image_filename': image_file.name,
-                    'raw_output': raw_output,
-                    'timestamp': timestamp
-                }
-                
-                if measure_time:
-                    file_data['processing_time_seconds'] = processing_time
-                
-                with open(output_file, 'w') as f:
-                    json.dump(file_data, f, indent=2)
-                
-                saved_files.append(str(output_file))
-                
-            except Exception as e:
-                # Save error file
-                image_file = Path(image_path)
-                output_filename = image_file.stem + "_raw.json"
-                output_file = dataset_system_dir / output_filename
-                
-                error_data = {
-                    'image_path': str(image_path),
-                    'image_filename': image_file.name,
-                    'raw_output': None,
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-                with open(output_file, 'w') as f:
-                    json.dump(error_data, f, indent=2)
-                
-                saved_files.append(str(output_file))
+        for image_path, raw_output, timing, error in self.iter_extract(image_paths):
+            output_file = self.save_raw_output(dataset_name, image_path, raw_output, timing, error)
+            saved_files.append(str(output_file))
         
         # Create summary file
         summary_file = dataset_system_dir / "summary.json"
@@ -91,7 +350,8 @@ class OCRSystem(ABC):
             'system': self.name,
             'total_images': len(image_paths),
             'processed_files': saved_files,
-            'output_directory': str(dataset_system_dir)
+            'output_directory': str(dataset_system_dir),
+            'runtime_stats': self.runtime_stats()
         }
         
         with open(summary_file, 'w') as f:
@@ -103,21 +363,33 @@ class OCRSystemFactory:
     """Factory for creating OCR systems"""
     
     _systems = {}
+    _prefixes = {}
     
     @classmethod
     def register_system(cls, name: str, system_class):
         """Register a new OCR system"""
         cls._systems[name] = system_class
     
+    @classmethod
+    def register_prefix(cls, prefix: str, system_class):
+        """Register a system class for every name starting with prefix (e.g. cascade_<name>)"""
+        cls._prefixes[prefix] = system_class
+    
     @classmethod
     def create_system(cls, name: str, config: Dict[str, Any]) -> OCRSystem:
         """Create OCR system instance"""
-        if name not in cls._systems:
+        system_class = cls._systems.get(name) or next(
+            (prefix_class for prefix, prefix_class in cls._prefixes.items() if name.startswith(prefix)), None)
+        if system_class is None:
             raise ValueError(f"Unknown OCR system: {name}")
         
-        return cls._systems[name](name, config)
+        # Local engines load their models in the constructor
+        start_ns = time.perf_counter_ns()
+        system = system_class(name, config)
+        system.model_load_seconds = (time.perf_counter_ns() - start_ns) / 1e9
+        return system
     
     @classmethod
     def get_available_systems(cls) -> List[str]:
         """Get list of available systems"""
-        return list(cls._systems.keys())
+        return list(cls._systems.keys()) + [f"{prefix}*" for prefix in cls._prefixes]
@@ -0,0 +1,175 @@
+"""
+Concurrent request dispatcher for OpenAI-compatible vLLM servers
+Keeps several requests in flight so the server can batch them, tuning the
+number of in-flight requests from observed latency and throughput
+"""
+
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit on in-flight requests with additive-increase / multiplicative-decrease tuning
+    
+    After every ``window`` completions the limiter compares throughput with the best
+    window seen so far. It grows the limit while throughput keeps improving, shrinks
+    it when latency rises above ``latency_tolerance`` x the best observed median
+    without a throughput gain (the server is saturated), and backs off sharply on errors.
+    """
+    
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 64,
+                 adaptive: bool = True, window: int = 16, latency_tolerance: float = 1.5):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = min(max(int(initial), self.minimum), self.maximum)
+        self.adaptive = adaptive
+        self.window = max(1, int(window))
+        self.latency_tolerance = latency_tolerance
+        
+        self.history: List[Dict[str, Any]] = []
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._window_start = time.perf_counter()
+        self._best_throughput = 0.0
+        self._best_latency: Optional[float] = None
+    
+    def acquire(self) -> Tuple[int, int]:
+        """Block until a slot is free; returns (in_flight, limit) after acquiring"""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            return self._in_flight, self.limit
+    
+    def release(self, latency: float, ok: bool):
+        """Free a slot and feed the completed request into the tuner"""
+        with self._cond:
+            self._in_flight -= 1
+            self._latencies.append(latency)
+            if not ok:
+                self._errors += 1
+            if len(self._latencies) >= self.window:
+                self._adjust()
+            self._cond.notify_all()
+    
+    def _adjust(self):
+        """Retune the limit from the last window (caller holds the lock)"""
+        now = time.perf_counter()
+        elapsed = max(now - self._window_start, 1e-9)
+        throughput = len(self._latencies) / elapsed
+        median_latency = statistics.median(self._latencies)
+        previous_limit = self.limit
+        
+        if self.adaptive:
+            if self._errors:
+                self.limit = max(self.minimum, int(self.limit * 0.75))
+            elif throughput > self._best_throughput * 1.05:
+                self.limit = min(self.maximum, self.limit + max(1, self.limit // 4))
+            elif (self._best_latency is not None
+                  and median_latency > self._best_latency * self.latency_tolerance):
+                self.limit = max(self.minimum, self.limit - 1)
+        
+        if throughput > self._best_throughput:
+            self._best_throughput = throughput
+        if self._best_latency is None or median_latency < self._best_latency:
+            self._best_latency = median_latency
+        
+        self.history.append({
+            'limit': previous_limit,
+            'next_limit': self.limit,
+            'throughput_rps': round(throughput, 4),
+            'median_latency_seconds': round(median_latency, 4),
+            'errors': self._errors
+        })
+        
+        self._latencies = []
+        self._errors = 0
+        self._window_start = now
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit and tuning history"""
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'best_throughput_rps': round(self._best_throughput, 4),
+                'history': list(self.history)
+            }
+
+
+class ConcurrentRequestDispatcher:
+    """
+    Run a request function over many items with a bounded number in flight
+    
+    ``request_fn(item)`` must return ``(result, ttft_seconds)``; ``ttft_seconds`` may
+    be None when the response is not streamed. For every item the dispatcher records:
+        queue_seconds: time spent waiting for an in-flight slot
+        ttft_seconds: time to first token (streaming only)
+        total_seconds: request latency from dispatch to completion
+        in_flight: requests in flight when this one was dispatched
+        concurrency_limit: limit in effect when this one was dispatched
+    """
+    
+    def __init__(self, request_fn: Callable[[Any], Tuple[Any, Optional[float]]],
+                 limiter: AdaptiveConcurrencyLimiter):
+        self.request_fn = request_fn
+        self.limiter = limiter
+    
+    def run(self, items: Iterable[Any]) -> Iterator[Tuple[Any, Any, Dict[str, Any], Optional[str]]]:
+        """
+        Dispatch all items and yield (item, result, timing, error) in completion order
+        """
+        results: "queue.Queue" = queue.Queue()
+        done = object()
+        executor = ThreadPoolExecutor(max_workers=self.limiter.maximum)
+        
+        def worker(item, queue_seconds, in_flight, limit):
+            start = time.perf_counter()
+            result, ttft, error = None, None, None
+            try:
+                result, ttft = self.request_fn(item)
+            except Exception as e:
+                error = str(e)
+            total = time.perf_counter() - start
+            self.limiter.release(total, error is None)
+            results.put((item, result, {
+                'queue_seconds': queue_seconds,
+                'ttft_seconds': ttft,
+                'total_seconds': total,
+                'in_flight': in_flight,
+                'concurrency_limit': limit
+            }, error))
+        
+        def submitter():
+            failure = None
+            try:
+                for item in items:
+                    enqueued = time.perf_counter()
+                    in_flight, limit = self.limiter.acquire()
+                    executor.submit(worker, item, time.perf_counter() - enqueued, in_flight, limit)
+            except Exception as e:
+                # E.g. an unreadable image or a spool error: the remaining items were never
+                # dispatched, so the consumer must not end as if the run were complete
+                failure = e
+            finally:
+                # In-flight requests finish (and are yielded) before the failure is raised
+                executor.shutdown(wait=True)
+                if failure is not None:
+                    results.put(failure)
+                results.put(done)
+        
+        threading.Thread(target=submitter, daemon=True).start()
+        
+        while True:
+            entry = results.get()
+            if entry is done:
+                break
+            if isinstance(entry, Exception):
+                raise entry
+            yield entry
@@ -3,12 +3,17 @@ Generic vLLM OCR implementation via OpenAI-compatible API
 Supports any vision-language model served by vLLM
 """
 
-import base64
-import requests
-from typing import Dict, Any
-from PIL import Image
-import io
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from ..models import OCRSystem
+from ..documents import is_document
+from ..http_client import PooledHTTPClient
+from .dispatcher import AdaptiveConcurrencyLimiter, ConcurrentRequestDispatcher
+
+
+# Formats that can be sent to vLLM as-is; anything else is converted to PNG
+PASSTHROUGH_FORMATS = ('jpg', 'jpeg', 'png', 'webp')
 
 
 class VLLMOpenAIOCR(OCRSystem):
@@ -21,40 +26,184 @@ class VLLMOpenAIOCR(OCRSystem):
         
         if not self.hf_model_name:
             raise ValueError("hf_model_name is required for vLLM OCR systems")
+        
+        # Streaming responses are needed to measure time to first token
+        self.stream = config.get('stream', False)
+        self.concurrency_config = config.get('concurrency')
+        self.limiter = None
+        
+        # Keep-alive connection pool reused across images, large enough for
+        # every request that may be in flight
+        http_config = dict(config.get('http', {}))
+        if self.concurrency_config:
+            http_config.setdefault('pool_maxsize', self.concurrency_config.get('max', 64))
+        self.http = PooledHTTPClient(http_config)
+    
+    def _build_payload(self, image_path: str) -> Dict[str, Any]:
+        """Build the OpenAI-compatible chat completion payload for an image"""
+        # Send the source bytes directly when the format is supported,
+        # re-encoding to PNG is often larger than the original JPEG
+        img_type = image_path.split('.')[-1].lower()
+        target_format = 'base64' if img_type in PASSTHROUGH_FORMATS else 'png_base64'
+        image_b64, mime_type = self.encode_image(image_path, target_format)
+        
+        prompt = self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
+        
+        return {
+            'model': self.hf_model_name,
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': [
+                        {'type': 'text', 'text': prompt},
+                        {'type': 'image_url', 'image_url': {'url': f'data:{mime_type};base64,{image_b64}'}}
+                    ]
+                }
+            ],
+            'max_tokens': self.config.get('max_tokens', 1024),
+            'temperature': self.config.get('temperature', 0.0)
+        }
+    
+    def _request_completion(self, image_path: str) -> Tuple[Dict[str, Any], Optional[float]]:
+        """
+        Send one chat completion request
+        
+        Returns:
+            Tuple of (response in chat.completion format, time to first token in
+            seconds or None when not streaming)
+        """
+        payload = self._build_payload(image_path)
+        
+        if not self.stream:
+            with self.phase('request'):
+                response = self.http.post(self.api_url, json=payload)
+                response.raise_for_status()
+                body = response.content
+            with self.phase('decode'):
+                return json.loads(body), None
+        
+        payload['stream'] = True
+        payload['stream_options'] = {'include_usage': True}
+        
+        start = time.perf_counter()
+        ttft = None
+        chunks = []
+        # Chunks are parsed while they arrive, so decoding overlaps the request phase
+        with self.phase('request'):
+            response = self.http.post(self.api_url, json=payload, stream=True)
+            try:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    chunk = json.loads(data)
+                    if ttft is None and any(
+                        choice.get('delta', {}).get('content') for choice in chunk.get('choices', [])
+                    ):
+                        ttft = time.perf_counter() - start
+                    chunks.append(chunk)
+            finally:
+                response.close()
+        
+        with self.phase('decode'):
+            return self._assemble_stream(chunks), ttft
+    
+    @staticmethod
+    def _assemble_stream(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Rebuild a chat.completion response from streamed chunks"""
+        contents: Dict[int, List[str]] = {}
+        finish_reasons: Dict[int, Optional[str]] = {}
+        usage = None
+        for chunk in chunks:
+            if chunk.get('usage'):
+                usage = chunk['usage']
+            for choice in chunk.get('choices', []):
+                index = choice.get('index', 0)
+                contents.setdefault(index, []).append(choice.get('delta', {}).get('content') or '')
+                if choice.get('finish_reason'):
+                    finish_reasons[index] = choice['finish_reason']
+        
+        first = chunks[0] if chunks else {}
+        return {
+            'id': first.get('id'),
+            'object': 'chat.completion',
+            'created': first.get('created'),
+            'model': first.get('model'),
+            'choices': [
+                {
+                    'index': index,
+                    'message': {'role': 'assistant', 'content': ''.join(parts)},
+                    'finish_reason': finish_reasons.get(index)
+                }
+                for index, parts in sorted(contents.items())
+            ],
+            'usage': usage
+        }
     
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw output from vLLM via OpenAI-compatible API"""
         try:
-            # Read and encode image to base64
-            with Image.open(image_path).convert('RGB') as img:
-                buf = io.BytesIO()
-                img.save(buf, format='PNG')
-                image_b64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-            
-            # Prepare payload
-            prompt = self.config.get('prompt', 'Extract all visible text from this document image. Return only the text')
-            
-            payload = {
-                'model': self.hf_model_name,
-                'messages': [
-                    {
-                        'role': 'user',
-                        'content': [
-                            {'type': 'text', 'text': prompt},
-                            {'type': 'image_url', 'image_url': {'url': f'data:image/png;base64,{image_b64}'}}
-                        ]
-                    }
-                ],
-                'max_tokens': self.config.get('max_tokens', 1024),
-                'temperature': self.config.get('temperature', 0.0)
-            }
-            
-            # Call vLLM API
-            response = requests.post(self.api_url, json=payload, timeout=120)
-            response.raise_for_status()
-            
-            return response.json()
+            raw_output, _ = self._request_completion(image_path)
+            return raw_output
         except Exception as e:
             print(f"Error extracting raw output with vLLM ({self.hf_model_name}): {e}")
             return {}
-
+    
+    def iter_extract(self, image_paths: List[str]):
+        """
+        Extract raw outputs, keeping several requests in flight when 'concurrency' is configured
+        
+        The server's continuous batching only pays off with concurrent requests, so
+        the number in flight is tuned from observed latency and throughput.
+        """
+        if not self.concurrency_config:
+            yield from super().iter_extract(image_paths)
+            return
+        
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial=self.concurrency_config.get('initial', 4),
+            minimum=self.concurrency_config.get('min', 1),
+            maximum=self.concurrency_config.get('max', 64),
+            adaptive=self.concurrency_config.get('adaptive', True),
+            window=self.concurrency_config.get('window', 16),
+            latency_tolerance=self.concurrency_config.get('latency_tolerance', 1.5)
+        )
+        
+        def request_fn(image_path):
+            # Phase spans are thread-local, so each worker collects its own
+            with self.collect_phases() as phases:
+                start_ns = time.perf_counter_ns()
+                if is_document(image_path):
+                    # Pages go through extract_raw_output, no single time to first token
+                    raw_output, ttft = self.extract_image(image_path), None
+                else:
+                    raw_output, ttft = self._request_completion(self.prepare_image(image_path))
+                elapsed_ns = time.perf_counter_ns() - start_ns
+            return (raw_output, self.timing_record(elapsed_ns, phases)), ttft
+        
+        dispatcher = ConcurrentRequestDispatcher(request_fn, self.limiter)
+        
+        for image_path, result, request_timing, error in dispatcher.run(image_paths):
+            if error is not None:
+                print(f"Error extracting raw output with vLLM ({self.hf_model_name}): {error}")
+                raw_output = {}
+                timing = {'processing_time_seconds': request_timing['total_seconds']}
+            else:
+                raw_output, timing = result
+            self.mark_cold_start(timing)
+            timing['request_timing'] = request_timing
+            yield image_path, raw_output, timing, error
+    
+    def runtime_stats(self) -> Dict[str, Any]:
+        """Return HTTP connection pool and concurrency tuning metrics"""
+        stats = {'http': self.http.connection_stats()}
+        if self.limiter is not None:
+            stats['concurrency'] = self.limiter.stats()
+        return stats
+    
+    def unload(self):
+        """Close the pooled connections (the model lives in the vLLM server)"""
+        self.http.close()
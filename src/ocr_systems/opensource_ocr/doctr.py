@@ -8,6 +8,7 @@ import torch
 import time
 from typing import List, Dict, Any, Tuple
 from ocr_systems.models import OCRSystem
+from ocr_systems.tiling import Tiler, merge_doctr_pages
 
 class DocTROCR(OCRSystem):
     """DocTR OCR system implementation"""
@@ -18,6 +19,8 @@ class DocTROCR(OCRSystem):
         self.reco_arch = config.get('reco_arch', 'crnn_vgg16_bn')
         self.pretrained = config.get('pretrained', True)
         self.device = config.get('device', 'cuda' if torch.cuda.is_available() else 'cpu')
+        # Large pages are recognized as overlapping tiles instead of being downscaled
+        self.tiler = Tiler.from_config(config.get('tiling'))
         
         # Initialize DocTR predictor
         self.predictor = ocr_predictor(
@@ -29,11 +32,38 @@ class DocTROCR(OCRSystem):
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw DocTR output from image"""
         # Load image
-        doc = DocumentFile.from_images(image_path)
+        with self.phase('load'):
+            doc = DocumentFile.from_images(image_path)
+        
+        height, width = doc[0].shape[:2]
+        if self.tiler is not None and self.tiler.applies(width, height):
+            return self._extract_tiled(doc[0])
         
         # Run OCR
-        result = self.predictor(doc)
+        with self.phase('inference'):
+            result = self.predictor(doc)
         
         # Return raw result export
-        return result.export()
+        with self.phase('decode'):
+            return result.export()
+    
+    def _extract_tiled(self, page) -> Dict[str, Any]:
+        """Recognize a large page tile by tile, batch_size tiles per predictor call"""
+        height, width = page.shape[:2]
+        tiles = self.tiler.tiles(width, height)
+        tile_pages = []
+        for batch in self.tiler.batches(tiles):
+            with self.phase('inference'):
+                result = self.predictor([page[tile.y0:tile.y1, tile.x0:tile.x1] for tile in batch])
+            with self.phase('decode'):
+                tile_pages.extend(result.export()['pages'])
+        
+        with self.phase('decode'):
+            return merge_doctr_pages(tiles, tile_pages, width, height)
+    
+    def unload(self):
+        """Drop the predictor and return its GPU memory to the driver"""
+        self.predictor = None
+        if str(self.device).startswith('cuda'):
+            torch.cuda.empty_cache()
 
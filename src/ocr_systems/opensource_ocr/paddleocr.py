@@ -4,14 +4,20 @@ PaddleOCR implementation
 
 from typing import Dict, Any
 from ..models import OCRSystem
+from ..tiling import Tiler, merge_paddle_results
 
 
 class PaddleOCROCR(OCRSystem):
     """PaddleOCR implementation"""
     
+    # The Paddle predictor must not be called from several threads
+    thread_safe = False
+    
     def __init__(self, name: str, config: dict):
         super().__init__(name, config)
         self.model = None
+        # Large pages are recognized as overlapping tiles instead of being downscaled
+        self.tiler = Tiler.from_config(config.get('tiling'))
         self._init_predictor()
     
     def _init_predictor(self):
@@ -33,11 +39,56 @@ class PaddleOCROCR(OCRSystem):
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw output from PaddleOCR"""
         try:
-            result = self.model.predict(image_path)
+            if self.tiler is not None:
+                from PIL import Image
+                with Image.open(image_path) as image:
+                    size = image.size
+                if self.tiler.applies(*size):
+                    return self._extract_tiled(image_path)
+            
+            # PaddleOCR reads the image itself, so load time is part of inference
+            with self.phase('inference'):
+                result = self.model.predict(image_path)
             if result and len(result) > 0:
                 # Convert to JSON format
-                return result[0]._to_json().get("res", {})
+                with self.phase('decode'):
+                    return result[0]._to_json().get("res", {})
             return {}
         except Exception as e:
             print(f"Error extracting raw output with PaddleOCR: {e}")
             return {}
+    
+    def _extract_tiled(self, image_path: str) -> Dict[str, Any]:
+        """Recognize a large page tile by tile, batch_size tiles per predict() call"""
+        import numpy as np
+        from PIL import Image
+        
+        with self.phase('load'):
+            with Image.open(image_path) as image:
+                # PaddleOCR takes arrays in OpenCV (BGR) channel order
+                page = np.asarray(image.convert('RGB'))[:, :, ::-1]
+        height, width = page.shape[:2]
+        tiles = self.tiler.tiles(width, height)
+        
+        tile_results = []
+        for batch in self.tiler.batches(tiles):
+            with self.phase('inference'):
+                results = self.model.predict([np.ascontiguousarray(page[tile.y0:tile.y1, tile.x0:tile.x1])
+                                              for tile in batch])
+            with self.phase('decode'):
+                tile_results.extend(result._to_json().get("res", {}) for result in results)
+        
+        with self.phase('decode'):
+            merged = merge_paddle_results(tiles, tile_results)
+            merged['input_path'] = image_path
+            return merged
+    
+    def unload(self):
+        """Drop the PaddleOCR pipeline and free cached GPU memory"""
+        self.model = None
+        try:
+            import paddle
+            if paddle.device.is_compiled_with_cuda():
+                paddle.device.cuda.empty_cache()
+        except ImportError:
+            pass
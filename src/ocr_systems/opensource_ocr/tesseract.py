@@ -18,22 +18,25 @@ class TesseractOCR(OCRSystem):
     
     def extract_raw_output(self, image_path: str) -> Dict[str, Any]:
         """Extract raw Tesseract output from image"""
-        image = Image.open(image_path)
+        with self.phase('load'):
+            image = Image.open(image_path)
+            image.load()
         
-        # Get detailed data from Tesseract
-        data = pytesseract.image_to_data(
-            image,
-            lang=self.language,
-            config=f'--psm {self.psm} --oem {self.oem}',
-            output_type=pytesseract.Output.DICT
-        )
+        with self.phase('inference'):
+            # Get detailed data from Tesseract
+            data = pytesseract.image_to_data(
+                image,
+                lang=self.language,
+                config=f'--psm {self.psm} --oem {self.oem}',
+                output_type=pytesseract.Output.DICT
+            )
         
-        # Get text
-        text = pytesseract.image_to_string(
-            image,
-            lang=self.language,
-            config=f'--psm {self.psm} --oem {self.oem}'
-        )
+            # Get text
+            text = pytesseract.image_to_string(
+                image,
+                lang=self.language,
+                config=f'--psm {self.psm} --oem {self.oem}'
+            )
         
         # Return comprehensive raw output
         return {
@@ -0,0 +1,71 @@
+"""
+Per-process pool of OCR system instances
+Builds each system once and shares it across datasets, and unloads its models
+as soon as it has no work left, so many local models can run in sequence
+without holding all of them in (GPU) memory at once.
+"""
+
+import gc
+from typing import Dict, Any, Optional
+
+from .models import OCRSystem, OCRSystemFactory
+
+
+class AdapterPool:
+    """
+    OCR system instances keyed by system name
+    
+    Callers announce how many dataset slices each system will process with
+    plan(); every finish() counts one down and the system is unloaded when it
+    reaches zero. Systems never planned stay loaded until close().
+    """
+    
+    def __init__(self):
+        self._systems: Dict[str, OCRSystem] = {}
+        self._remaining: Dict[str, int] = {}
+        self.loads = 0
+        self.reuses = 0
+    
+    def plan(self, name: str, slices: int = 1):
+        """Announce slices of work for a system"""
+        self._remaining[name] = self._remaining.get(name, 0) + slices
+    
+    def get(self, name: str, config: Dict[str, Any]) -> OCRSystem:
+        """Return the system's instance, creating (and loading) it on first use"""
+        system = self._systems.get(name)
+        if system is None:
+            system = OCRSystemFactory.create_system(name, config)
+            self._systems[name] = system
+            self.loads += 1
+        else:
+            system.model_reused = True
+            self.reuses += 1
+        return system
+    
+    def finish(self, name: str):
+        """Record a finished slice; unloads the system once its planned work is done"""
+        if name not in self._remaining:
+            return
+        self._remaining[name] -= 1
+        if self._remaining[name] <= 0:
+            del self._remaining[name]
+            self.unload(name)
+    
+    def unload(self, name: str):
+        """Release a system's models and connections"""
+        system: Optional[OCRSystem] = self._systems.pop(name, None)
+        if system is None:
+            return
+        try:
+            system.unload()
+        except Exception as e:
+            print(f"Error unloading {name}: {e}")
+        del system
+        # Model weights are often in reference cycles; free them before the next system loads
+        gc.collect()
+    
+    def close(self):
+        """Unload every system still loaded"""
+        for name in list(self._systems):
+            self.unload(name)
+        self._remaining.clear()
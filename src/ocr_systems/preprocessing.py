@@ -0,0 +1,145 @@
+"""
+Image preprocessing stage applied before OCR extraction
+Normalizes, downscales and re-encodes images, caching results on disk by content hash
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+DEFAULT_CACHE_DIR = "results/cache/preprocessed"
+
+FORMAT_EXTENSIONS = {
+    'jpeg': '.jpg',
+    'webp': '.webp',
+    'png': '.png'
+}
+
+
+class ImagePreprocessor:
+    """
+    Configurable image normalization with a content-addressed disk cache
+    
+    Supported options (``preprocessing`` section of an OCR system config):
+        enabled: Turn the stage on/off (default True when the section exists)
+        max_side: Downscale so that the longest side is at most this many pixels
+        grayscale: Convert to 8-bit grayscale
+        exif_transpose: Apply the EXIF orientation tag (default True)
+        format: Output encoding, one of 'jpeg', 'webp', 'png' (default 'jpeg')
+        quality: Encoder quality for JPEG/WebP (default 85)
+        cache_dir: Directory for cached outputs (default results/cache/preprocessed)
+    """
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.enabled = config.get('enabled', True)
+        self.max_side = config.get('max_side')
+        self.grayscale = config.get('grayscale', False)
+        self.exif_transpose = config.get('exif_transpose', True)
+        self.format = str(config.get('format', 'jpeg')).lower()
+        self.quality = int(config.get('quality', 85))
+        self.cache_dir = Path(config.get('cache_dir', DEFAULT_CACHE_DIR))
+        
+        if self.format == 'jpg':
+            self.format = 'jpeg'
+        if self.format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported preprocessing format: {self.format}")
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['ImagePreprocessor']:
+        """Build a preprocessor from config, or None when preprocessing is disabled"""
+        if not config:
+            return None
+        preprocessor = cls(config)
+        return preprocessor if preprocessor.enabled else None
+    
+    def settings_digest(self) -> str:
+        """Short hash of the options that affect the output image"""
+        settings = {
+            'max_side': self.max_side,
+            'grayscale': self.grayscale,
+            'exif_transpose': self.exif_transpose,
+            'format': self.format,
+            'quality': self.quality
+        }
+        encoded = json.dumps(settings, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:12]
+    
+    def process(self, image_path: str) -> str:
+        """
+        Preprocess an image and return the path to send to the OCR engine
+        
+        Args:
+            image_path: Path to the original image
+        
+        Returns:
+            Path to the cached preprocessed image, or the original path when
+            re-encoding would not make the upload smaller
+        """
+        with open(image_path, 'rb') as f:
+            content = f.read()
+        
+        digest = hashlib.sha256(content).hexdigest()
+        cache_stem = f"{digest}_{self.settings_digest()}"
+        cached_file = self.cache_dir / f"{cache_stem}{FORMAT_EXTENSIONS[self.format]}"
+        passthrough_marker = self.cache_dir / f"{cache_stem}.original"
+        
+        if cached_file.exists():
+            return str(cached_file)
+        if passthrough_marker.exists():
+            return image_path
+        
+        encoded, transformed = self._transform(content)
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Re-encoding alone is not worth it if it grows the payload
+        if not transformed and len(encoded) >= len(content):
+            passthrough_marker.touch()
+            return image_path
+        
+        # Write atomically so concurrent workers never read a partial file
+        tmp_file = cached_file.with_name(f"{cached_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(encoded)
+        os.replace(tmp_file, cached_file)
+        
+        return str(cached_file)
+    
+    def _transform(self, content: bytes):
+        """Apply the configured transformations, returning (encoded_bytes, transformed)"""
+        from PIL import Image, ImageOps
+        
+        with Image.open(io.BytesIO(content)) as original:
+            img = original
+            transformed = False
+            
+            # 0x0112 is the EXIF orientation tag, 1 means already upright
+            if self.exif_transpose and original.getexif().get(0x0112, 1) != 1:
+                img = ImageOps.exif_transpose(img)
+                transformed = True
+            
+            if self.max_side and max(img.size) > self.max_side:
+                img = img.copy()
+                img.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+                transformed = True
+            
+            if self.grayscale and img.mode != 'L':
+                img = img.convert('L')
+                transformed = True
+            elif img.mode not in ('RGB', 'L'):
+                # JPEG cannot store alpha or palette images
+                img = img.convert('RGB')
+            
+            buf = io.BytesIO()
+            save_kwargs = {}
+            if self.format in ('jpeg', 'webp'):
+                save_kwargs['quality'] = self.quality
+            if self.format in ('jpeg', 'png'):
+                save_kwargs['optimize'] = True
+            img.save(buf, format=self.format.upper(), **save_kwargs)
+        
+        return buf.getvalue(), transformed
@@ -0,0 +1,92 @@
+"""
+Raw output recording for one dataset and system
+Saves each extraction result, indexes its timing and counts its errors, so the
+sequential, fan-out and queue extraction paths handle records the same way.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from .models import OCRSystem
+
+
+class SliceRecorder:
+    """
+    Record the extraction results of one (dataset, system) slice
+
+    The slice's timing-index rows are invalidated on creation: raw outputs are
+    rewritten behind the index's sync marker. close() marks the slice synced
+    again when it matched its raw outputs before the run, otherwise readers
+    re-index it from the JSON once.
+
+    Args:
+        ocr_system: System whose raw outputs are saved (output_dir set)
+        dataset_name: Name of the dataset
+        timing_index: Index receiving the timings of successful extractions
+        measure_time: Whether the system's timings are saved and indexed
+        spool: Spool of a streamed dataset; images are recorded under their
+            source path and released once saved
+        monitor: Resource monitor, whose per-image windows are collected
+        trust_index: Whether close() may mark the slice synced (False when
+            other workers write the same slice)
+    """
+
+    def __init__(self, ocr_system: OCRSystem, dataset_name: str, timing_index, measure_time: bool = False,
+                 spool=None, monitor=None, trust_index: bool = True):
+        self.ocr_system = ocr_system
+        self.dataset_name = dataset_name
+        self.timing_index = timing_index
+        self.measure_time = measure_time
+        self.spool = spool
+        self.monitor = monitor
+        self.raw_dir = Path(ocr_system.output_dir) / dataset_name / ocr_system.name
+        self.n_errors = 0
+        self.image_windows: Dict[str, Tuple[float, float]] = {}
+
+        self.index_trusted = trust_index and (
+            not self.raw_dir.exists() or timing_index.is_fresh(dataset_name, ocr_system.name, self.raw_dir))
+        timing_index.invalidate(dataset_name, ocr_system.name)
+
+    def record(self, spooled_path: str, raw_output: Optional[Dict[str, Any]], timing: Dict[str, Any],
+               error: Optional[str]) -> Tuple[str, Optional[str]]:
+        """
+        Save one result of iter_extract (or of a batch job)
+
+        Failed extractions are saved with their error and kept out of the
+        latency, resource and cost statistics.
+
+        Returns:
+            Tuple of (image path as recorded, error or None); a failure to save
+            is returned as the error
+        """
+        # Streamed images are recorded under their source path
+        img_path = self.spool.logical_path(spooled_path) if self.spool is not None else spooled_path
+        system_name = self.ocr_system.name
+        if error is not None:
+            print(f"⚠️  Error processing {img_path} with {system_name}: {error}")
+
+        if self.monitor is not None and error is None and timing.get('processing_time_seconds'):
+            end = time.time()
+            self.image_windows[Path(img_path).name] = (end - timing['processing_time_seconds'], end)
+
+        try:
+            self.ocr_system.save_raw_output(self.dataset_name, img_path, raw_output, timing, error=error)
+            if self.measure_time and timing and error is None and raw_output:
+                self.timing_index.add(self.dataset_name, system_name, img_path, timing)
+        except Exception as e:
+            print(f"⚠️  Error saving {img_path}: {e}")
+            error = f"saving raw output failed: {e}"
+
+        if error is not None:
+            self.n_errors += 1
+        if self.spool is not None:
+            self.spool.release(spooled_path)
+        return img_path, error
+
+    def close(self):
+        """Write the slice's pending index rows, marking it synced when trusted"""
+        if self.index_trusted:
+            self.timing_index.mark_synced(self.dataset_name, self.ocr_system.name, self.raw_dir)
+        else:
+            self.timing_index.flush()
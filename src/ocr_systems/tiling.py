@@ -0,0 +1,212 @@
+"""
+Region tiling for very large images in local engines
+Splits a page into overlapping tiles that are recognized in batches, then
+merges the tile outputs into one page. Every word belongs to the tile whose
+core (the tile minus half of each overlap with a neighbour) holds its centre,
+so text in an overlap is kept exactly once.
+"""
+
+from statistics import median
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
+
+DEFAULT_TILE_SIZE = 2048
+DEFAULT_OVERLAP = 256
+DEFAULT_BATCH_SIZE = 4
+
+
+class Tile(NamedTuple):
+    """Tile bounds and core bounds in page pixels (x1/y1 exclusive)"""
+    x0: int
+    y0: int
+    x1: int
+    y1: int
+    core_x0: float
+    core_y0: float
+    core_x1: float
+    core_y1: float
+    
+    def owns(self, x: float, y: float) -> bool:
+        """Whether a point (page pixels) falls in this tile's core"""
+        return self.core_x0 <= x < self.core_x1 and self.core_y0 <= y < self.core_y1
+
+
+def _spans(length: int, size: int, overlap: int) -> List[tuple]:
+    """Start/end of the tiles along one axis, with the core boundary between neighbours"""
+    if length <= size:
+        return [(0, length, 0, length)]
+    step = max(size - overlap, 1)
+    starts = list(range(0, length - size, step)) + [length - size]
+    ends = [start + size for start in starts]
+    # Neighbouring tiles split their overlap in the middle
+    bounds = [0] + [(starts[i + 1] + ends[i]) / 2 for i in range(len(starts) - 1)] + [length]
+    return [(starts[i], ends[i], bounds[i], bounds[i + 1]) for i in range(len(starts))]
+
+
+class Tiler:
+    """
+    Tile plan for large pages
+    
+    Supported options (``tiling`` section of a DocTR or PaddleOCR config):
+        enabled: Turn tiling on/off (default True when the section exists)
+        tile_size: Tile side in pixels (default 2048)
+        overlap: Pixels shared by neighbouring tiles (default 256); should exceed
+                 the widest word, which would otherwise be cut on a tile edge
+        min_side: Only tile pages whose longest side exceeds this (default 2 x tile_size)
+        batch_size: Tiles per engine call (default 4), bounds peak memory
+    """
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.tile_size = int(config.get('tile_size', DEFAULT_TILE_SIZE))
+        self.overlap = int(config.get('overlap', DEFAULT_OVERLAP))
+        self.min_side = int(config.get('min_side', 2 * self.tile_size))
+        self.batch_size = max(1, int(config.get('batch_size', DEFAULT_BATCH_SIZE)))
+        if not 0 <= self.overlap < self.tile_size:
+            raise ValueError(f"Tiling overlap must be in [0, tile_size), got {self.overlap}")
+    
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['Tiler']:
+        """Build a tiler from config, or None when tiling is disabled"""
+        if not config or not config.get('enabled', True):
+            return None
+        return cls(config)
+    
+    def applies(self, width: int, height: int) -> bool:
+        return max(width, height) > self.min_side
+    
+    def tiles(self, width: int, height: int) -> List[Tile]:
+        """Tiles covering the page, row by row"""
+        return [Tile(x0, y0, x1, y1, core_x0, core_y0, core_x1, core_y1)
+                for y0, y1, core_y0, core_y1 in _spans(height, self.tile_size, self.overlap)
+                for x0, x1, core_x0, core_x1 in _spans(width, self.tile_size, self.overlap)]
+    
+    def batches(self, tiles: List[Tile]) -> Iterator[List[Tile]]:
+        for start in range(0, len(tiles), self.batch_size):
+            yield tiles[start:start + self.batch_size]
+
+
+def _group_lines(items: List[tuple]) -> Tuple[List[List[tuple]], float]:
+    """
+    Group boxes into text lines, whatever tile they came from
+    
+    A box joins the current line when its centre is within half a band (the
+    median box height) of the line's mean centre, so a line is never split by a
+    fixed grid boundary.
+    
+    Args:
+        items: Tuples starting with the box (x0, y0, x1, y1) in page pixels
+    
+    Returns:
+        Tuple of (lines top to bottom, each sorted left to right; band height)
+    """
+    band = max(median(item[3] - item[1] for item in items), 1) if items else 1
+    lines = []
+    for item in sorted(items, key=lambda item: (item[1] + item[3]) / 2):
+        center_y = (item[1] + item[3]) / 2
+        if lines and center_y - lines[-1]['center_y'] <= band / 2:
+            line = lines[-1]
+            line['items'].append(item)
+            line['center_y'] += (center_y - line['center_y']) / len(line['items'])
+        else:
+            lines.append({'center_y': center_y, 'items': [item]})
+    lines.sort(key=lambda line: line['center_y'])
+    return [sorted(line['items'], key=lambda item: item[0]) for line in lines], band
+
+
+def merge_doctr_pages(tiles: List[Tile], tile_pages: List[Dict[str, Any]], width: int,
+                      height: int) -> Dict[str, Any]:
+    """
+    Merge DocTR exports of the tiles into the export of one page
+    
+    Args:
+        tiles: Tiles in the order they were recognized
+        tile_pages: Exported page of each tile (relative geometries)
+        width: Page width in pixels
+        height: Page height in pixels
+    
+    Returns:
+        DocTR export with a single page of the full size
+    """
+    def to_page(geometry, tile: Tile):
+        tile_w, tile_h = tile.x1 - tile.x0, tile.y1 - tile.y0
+        return [[(tile.x0 + x * tile_w) / width, (tile.y0 + y * tile_h) / height] for x, y in geometry]
+    
+    # Words owned by each tile, in page pixels: (x0, y0, x1, y1, word)
+    items = []
+    for tile, tile_page in zip(tiles, tile_pages):
+        for block in tile_page.get('blocks', []):
+            for line in block.get('lines', []):
+                for word in line.get('words', []):
+                    geometry = to_page(word['geometry'], tile)
+                    xs = [x * width for x, _ in geometry]
+                    ys = [y * height for _, y in geometry]
+                    if tile.owns(sum(xs) / len(xs), sum(ys) / len(ys)):
+                        items.append((min(xs), min(ys), max(xs), max(ys), {**word, 'geometry': geometry}))
+    
+    # Tile lines end on tile edges: re-group the words into lines across tiles
+    lines, band = _group_lines(items)
+    
+    def bounds(boxes) -> List[List[float]]:
+        boxes = list(boxes)
+        return [[min(box[0] for box in boxes) / width, min(box[1] for box in boxes) / height],
+                [max(box[2] for box in boxes) / width, max(box[3] for box in boxes) / height]]
+    
+    # Blocks: runs of lines separated by less than one line height
+    blocks = []
+    block_lines, block_boxes, previous_bottom = [], [], None
+    for line_items in lines:
+        top = min(item[1] for item in line_items)
+        if block_lines and top - previous_bottom > band:
+            blocks.append({'geometry': bounds(block_boxes), 'lines': block_lines, 'artefacts': []})
+            block_lines, block_boxes = [], []
+        block_lines.append({'geometry': bounds(line_items), 'words': [item[4] for item in line_items]})
+        block_boxes.extend(line_items)
+        previous_bottom = max(item[3] for item in line_items)
+    if block_lines:
+        blocks.append({'geometry': bounds(block_boxes), 'lines': block_lines, 'artefacts': []})
+    
+    first = tile_pages[0] if tile_pages else {}
+    return {'pages': [{
+        'page_idx': 0,
+        'dimensions': [height, width],
+        'orientation': first.get('orientation', {'value': None, 'confidence': None}),
+        'language': first.get('language', {'value': None, 'confidence': None}),
+        'blocks': blocks,
+        'tiles': len(tiles)
+    }]}
+
+
+def merge_paddle_results(tiles: List[Tile], tile_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge PaddleOCR results of the tiles into the result of one page
+    
+    Args:
+        tiles: Tiles in the order they were recognized
+        tile_results: 'res' dictionary of each tile (boxes in tile pixels)
+    
+    Returns:
+        Result with rec_texts, rec_scores and rec_boxes in page pixels
+    """
+    items = []
+    for tile, result in zip(tiles, tile_results):
+        texts = result.get('rec_texts', [])
+        scores = result.get('rec_scores', [])
+        boxes = result.get('rec_boxes') or [
+            [min(x for x, _ in poly), min(y for _, y in poly), max(x for x, _ in poly), max(y for _, y in poly)]
+            for poly in result.get('rec_polys', [])]
+        for i, text in enumerate(texts):
+            if i >= len(boxes):
+                break
+            x0, y0, x1, y1 = boxes[i]
+            box = [x0 + tile.x0, y0 + tile.y0, x1 + tile.x0, y1 + tile.y0]
+            if tile.owns((box[0] + box[2]) / 2, (box[1] + box[3]) / 2):
+                items.append((box, text, scores[i] if i < len(scores) else None))
+    
+    # Reading order: lines across tiles, then left to right
+    lines, _ = _group_lines([(*box, text, score) for box, text, score in items])
+    items = [(list(item[:4]), item[4], item[5]) for line in lines for item in line]
+    return {
+        'rec_texts': [text for _, text, _ in items],
+        'rec_scores': [score for _, _, score in items],
+        'rec_boxes': [box for box, _, _ in items],
+        'tiles': len(tiles)
+    }
@@ -121,6 +121,12 @@ class OCRParser:
         ]
         return ' '.join(contents).replace('\n', ' ')
     
+    @staticmethod
+    def parse_cascade(raw_data: Dict[str, Any]) -> str:
+        """Parse a cascade raw output with the parser of the stage that answered"""
+        system_name = raw_data.get('cascade', {}).get('system', '')
+        return OCRParser.get_parser(system_name)(raw_data.get('output') or {})
+    
     
     @staticmethod
     def get_parser(system_name: str):
@@ -143,4 +149,21 @@ class OCRParser:
             'gemma3': OCRParser.parse_vllm_openai,
         }
         
-        return parsers.get(system_name, lambda x: "")
+        # Mock providers (mock_<system>) answer in the emulated system's format
+        if system_name not in parsers and system_name.startswith('mock_'):
+            system_name = system_name[len('mock_'):]
+        
+        # Cascades (cascade_<name>) store the output of whichever stage answered
+        if system_name not in parsers and system_name.startswith('cascade_'):
+            parse_func = OCRParser.parse_cascade
+        else:
+            parse_func = parsers.get(system_name, lambda x: "")
+        return lambda raw_data: OCRParser.parse_document_pages(parse_func, raw_data)
+    
+    @staticmethod
+    def parse_document_pages(parse_func, raw_data: Dict[str, Any]) -> str:
+        """Parse a raw output, joining the pages of a document extracted page by page"""
+        if 'document_pages' not in raw_data:
+            return parse_func(raw_data)
+        texts = [parse_func(page) for page in raw_data['document_pages'] if page]
+        return ' '.join(text for text in texts if text)
@@ -0,0 +1,231 @@
+"""
+Synthetic OCR raw outputs in each provider's response format
+Used by the micro-benchmarks and the mock OCR systems; the shapes mirror what
+the adapters save and what OCRParser reads
+"""
+
+import random
+from typing import Dict, Any, List, Optional
+
+
+# System name -> response format; open-source LLMs served by vLLM use the OpenAI format
+SYSTEM_FORMATS = {
+    'doctr': 'doctr',
+    'paddleocr': 'paddleocr',
+    'tesseract': 'tesseract',
+    'aws_textract': 'aws_textract',
+    'azure_vision': 'azure_vision',
+    'azure_document': 'azure_document',
+    'google_vision': 'google_vision',
+    'google_document': 'google_document',
+    'gpt4o': 'openai',
+    'gemini_flash': 'gemini_flash',
+    'claude_haiku': 'claude_haiku',
+    'mistral_ocr': 'mistral_ocr',
+    'qwen25vl': 'openai',
+    'gemma3': 'openai',
+}
+
+
+def system_output_format(system_name: str) -> Optional[str]:
+    """Response format of a system; mock providers answer in the format they emulate"""
+    if system_name not in SYSTEM_FORMATS and system_name.startswith('mock_'):
+        system_name = system_name[len('mock_'):]
+    return SYSTEM_FORMATS.get(system_name)
+
+# Whitelist in the text_cleaning.char_whitelist config format
+DEFAULT_CHAR_WHITELIST = {
+    'letters': {
+        'uppercase': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+        'lowercase': 'abcdefghijklmnopqrstuvwxyz'
+    },
+    'digits': '0123456789',
+    'whitespace': ' ',
+    'punctuation': '!"#$%&\'()*+,-./:;<=>?@[]_'
+}
+
+_SHOPS = ['SANYU STATIONERY SHOP', 'MR. D.I.Y. (M) SDN BHD', 'GARDENIA BAKERIES (KL) SDN BHD',
+          'UNIHAKKA INTERNATIONAL SDN BHD', 'BOOK TA .K (TAMAN DAYA) SDN BHD']
+_ITEMS = ['CHICKEN RICE', 'ICE LEMON TEA', 'A4 PAPER 80GSM', 'CLEAR TAPE 18MM', 'WHITE BREAD 400G',
+          'KOPI O', 'NASI LEMAK', 'STAPLER NO.10', 'PEN BLUE 0.5', 'MINERAL WATER 1.5L']
+
+
+def synthetic_receipt_lines(n_items: int = 12, seed: int = 0) -> List[str]:
+    """
+    Generate the text lines of a receipt-like document
+    
+    Args:
+        n_items: Number of line items
+        seed: Random seed, the same seed always gives the same lines
+    
+    Returns:
+        List of text lines
+    """
+    rng = random.Random(seed)
+    lines = [rng.choice(_SHOPS), f"CO. REG NO: {rng.randint(100000, 999999)}-{rng.choice('ABCDXKTW')}",
+             f"NO. {rng.randint(1, 99)}, JALAN {rng.choice(['MERANTI', 'BUNGA RAYA', 'PUCHONG'])} "
+             f"{rng.randint(1, 20)}, {rng.randint(40000, 81000)} SELANGOR",
+             f"TEL: 03-{rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+             f"DATE: {rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2018  TIME: "
+             f"{rng.randint(8, 21):02d}:{rng.randint(0, 59):02d}"]
+    total = 0.0
+    for _ in range(n_items):
+        quantity = rng.randint(1, 5)
+        price = rng.randint(50, 5000) / 100
+        total += quantity * price
+        lines.append(f"{rng.choice(_ITEMS)} {quantity} X {price:.2f} {quantity * price:.2f}")
+    lines += [f"TOTAL: RM {total:.2f}", f"CASH: RM {total + rng.randint(0, 50):.2f}",
+              "THANK YOU & PLEASE COME AGAIN"]
+    return lines
+
+
+def _bbox(rng: random.Random) -> List[List[float]]:
+    x, y = rng.random(), rng.random()
+    return [[round(x, 4), round(y, 4)], [round(min(x + 0.1, 1.0), 4), round(min(y + 0.02, 1.0), 4)]]
+
+
+def build_raw_output(output_format: str, lines: List[str], seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a raw output containing the given text lines in a provider format
+    
+    Args:
+        output_format: One of the values of SYSTEM_FORMATS
+        lines: Text lines of the document
+        seed: Random seed for geometry and confidence values
+    
+    Returns:
+        Raw output dictionary as saved under 'raw_output' in the raw JSON files
+    """
+    rng = random.Random(seed)
+    text = '\n'.join(lines)
+    
+    if output_format == 'doctr':
+        blocks = []
+        for start in range(0, len(lines), 4):
+            blocks.append({'geometry': _bbox(rng), 'lines': [{
+                'geometry': _bbox(rng),
+                'words': [{'value': word, 'confidence': round(rng.uniform(0.8, 1.0), 4),
+                           'geometry': _bbox(rng)} for word in line.split()]
+            } for line in lines[start:start + 4]], 'artefacts': []})
+        return {'pages': [{'page_idx': 0, 'dimensions': [1600, 800], 'orientation': {'value': None},
+                           'language': {'value': None}, 'blocks': blocks}]}
+    
+    if output_format == 'paddleocr':
+        return {'input_path': 'image.jpg', 'page_index': None, 'rec_texts': lines,
+                'rec_scores': [round(rng.uniform(0.8, 1.0), 4) for _ in lines],
+                'rec_polys': [[[10, 20 * i], [400, 20 * i], [400, 20 * i + 18], [10, 20 * i + 18]]
+                              for i in range(len(lines))]}
+    
+    if output_format == 'tesseract':
+        words = [word for line in lines for word in line.split()]
+        return {'text': text + '\n', 'language': 'eng', 'psm': 3, 'oem': 3, 'data': {
+            'level': [5] * len(words), 'text': words,
+            'conf': [round(rng.uniform(60, 96), 2) for _ in words],
+            'left': [rng.randint(0, 800) for _ in words], 'top': [rng.randint(0, 1600) for _ in words],
+            'width': [rng.randint(10, 200) for _ in words], 'height': [rng.randint(10, 30) for _ in words]
+        }}
+    
+    if output_format == 'aws_textract':
+        blocks = [{'BlockType': 'PAGE', 'Id': 'page-0'}]
+        for i, line in enumerate(lines):
+            blocks.append({'BlockType': 'LINE', 'Id': f'line-{i}', 'Text': line,
+                           'Confidence': round(rng.uniform(80, 100), 4)})
+            blocks.extend({'BlockType': 'WORD', 'Id': f'word-{i}-{j}', 'Text': word,
+                           'Confidence': round(rng.uniform(80, 100), 4)}
+                          for j, word in enumerate(line.split()))
+        return {'DocumentMetadata': {'Pages': 1}, 'Blocks': blocks}
+    
+    if output_format == 'azure_vision':
+        return {'modelVersion': '2023-10-01', 'readResult': {'blocks': [{'lines': [
+            {'text': line, 'boundingPolygon': [], 'words': [
+                {'text': word, 'confidence': round(rng.uniform(0.8, 1.0), 3)} for word in line.split()]}
+            for line in lines]}]}}
+    
+    if output_format == 'azure_document':
+        return {'content': text, 'pages': [{'pageNumber': 1, 'lines': [
+            {'content': line, 'polygon': []} for line in lines]}]}
+    
+    if output_format == 'google_vision':
+        return {'textAnnotations': [{'description': text}],
+                'fullTextAnnotation': {'text': text + '\n', 'pages': [{'blocks': []}]}}
+    
+    if output_format == 'google_document':
+        return {'document': {'text': text + '\n', 'pages': [{'pageNumber': 1}]}}
+    
+    if output_format == 'openai':
+        return {'id': f'chatcmpl-{seed}', 'object': 'chat.completion', 'choices': [{
+            'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 1100, 'completion_tokens': len(text) // 4,
+                      'total_tokens': 1100 + len(text) // 4}}
+    
+    if output_format == 'gemini_flash':
+        return {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'},
+                                'finishReason': 'STOP'}],
+                'usageMetadata': {'promptTokenCount': 1100, 'candidatesTokenCount': len(text) // 4}}
+    
+    if output_format == 'claude_haiku':
+        return {'id': f'msg_{seed}', 'type': 'message', 'role': 'assistant',
+                'content': [{'type': 'text', 'text': text}], 'stop_reason': 'end_turn',
+                'usage': {'input_tokens': 1100, 'output_tokens': len(text) // 4}}
+    
+    if output_format == 'mistral_ocr':
+        return {'pages': [{'index': 0, 'markdown': text, 'images': [],
+                           'dimensions': {'dpi': 200, 'height': 1600, 'width': 800}}],
+                'model': 'mistral-ocr-latest', 'usage_info': {'pages_processed': 1}}
+    
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def synthetic_accuracy_report(n_chars: int = 228159, n_errors: int = 12365, seed: int = 0) -> str:
+    """
+    Build an ocreval accuracy/accsum report with the summary block and a
+    per-character confusion table, as parsed by OCREvalWrapper
+    """
+    rng = random.Random(seed)
+    report = ["UNLV-ISRI OCR Accuracy Report Version 5.1",
+              "-----------------------------------------",
+              f"{n_chars:8d}   Characters", f"{n_errors:8d}   Errors",
+              f"{100 * (n_chars - n_errors) / n_chars:8.2f}%  Accuracy", "",
+              f"{rng.randint(0, 200):8d}   Reject Characters", f"{rng.randint(0, 50):8d}   Suspect Markers",
+              f"{rng.randint(0, 50):8d}   False Marks", "", "",
+              "   Errors   Marked   Correct-Generated"]
+    alphabet = DEFAULT_CHAR_WHITELIST['letters']['uppercase'] + DEFAULT_CHAR_WHITELIST['digits'] + '.,:-'
+    for _ in range(200):
+        report.append(f"{rng.randint(1, 300):9d}{0:9d}   {{{rng.choice(alphabet)}}}-{{{rng.choice(alphabet)}}}")
+    report += ["", "   Count   Missed   %Right"]
+    for char in alphabet:
+        count = rng.randint(100, 10000)
+        missed = rng.randint(0, count // 20)
+        report.append(f"{count:8d}{missed:9d}{100 * (count - missed) / count:9.2f}   {char}")
+    return '\n'.join(report) + '\n'
+
+
+def corrupt_lines(lines: List[str], char_error_rate: float, rng: random.Random) -> List[str]:
+    """
+    Introduce OCR-like character errors (substitutions, deletions, insertions)
+    
+    Args:
+        lines: Text lines of the document
+        char_error_rate: Probability of an error at each character
+        rng: Random generator to draw the errors from
+    
+    Returns:
+        Corrupted text lines
+    """
+    if char_error_rate <= 0:
+        return list(lines)
+    
+    alphabet = DEFAULT_CHAR_WHITELIST['letters']['uppercase'] + DEFAULT_CHAR_WHITELIST['digits']
+    corrupted = []
+    for line in lines:
+        chars = []
+        for char in line:
+            roll = rng.random()
+            if roll >= char_error_rate:
+                chars.append(char)
+            elif roll < char_error_rate / 2:
+                chars.append(rng.choice(alphabet))
+            elif roll < char_error_rate * 3 / 4:
+                chars.append(char + rng.choice(alphabet))
+        corrupted.append(''.join(chars))
+    return corrupted
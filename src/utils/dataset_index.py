@@ -0,0 +1,241 @@
+"""
+Compiled dataset index
+One SQLite table per dataset with every dataset.json entry, its image and
+ground-truth paths, sizes, content hash and existence flags, so pipeline steps
+read a small indexed file instead of parsing dataset.json and calling exists()
+per image. The index is rebuilt when dataset.json, the image/gt directories or
+an indexed image change.
+Datasets streamed from an archive or object store (utils.dataset_sources) take
+image existence and sizes from the source listing instead.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+DEFAULT_INDEX_DIR = "results/dataset_index"
+# Bump when the table layout changes, older indexes are rebuilt
+INDEX_VERSION = 1
+# SQLite maps up to this much of the file instead of reading it through syscalls
+MMAP_BYTES = 256 * 1024 * 1024
+# Written next to metadata extracted from a dataset source (utils.dataset_sources)
+SOURCE_STAMP = '.source.json'
+
+
+def _stat_signature(path: Path) -> Optional[List[int]]:
+    """mtime and size of a file or directory, None if missing"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _file_sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetIndex:
+    """
+    Read-only view of a dataset's compiled index, rebuilt on open when stale
+    
+    The signature checked on open is the mtime and size of dataset.json and the
+    mtime of every directory holding images or ground truth: adding or removing
+    a file changes its directory's mtime. An image rewritten in place does not,
+    so the mtime and size of every indexed image are compared too (one stat per
+    image, no read), keeping its hash from going stale. A rebuild writes a new file and
+    atomically replaces the old one, so readers on other processes (or nodes)
+    never see a half-written index; hashes of unchanged images are carried over.
+    With a ``source``, its signature replaces the image directory mtimes and
+    images are not hashed (that would mean reading the whole archive).
+    """
+    
+    def __init__(self, dataset_name: str, dataset_path: str, index_dir: str = DEFAULT_INDEX_DIR,
+                 gt_dirname: str = 'gt', source=None):
+        self.dataset_name = dataset_name
+        self.source = source
+        self.dataset_path = Path(dataset_path)
+        self.metadata_file = self.dataset_path / 'dataset.json'
+        self.gt_dir = self.dataset_path / gt_dirname
+        self.db_path = Path(index_dir) / f"{dataset_name}.sqlite"
+        self.rebuilt = False
+        
+        if not self.metadata_file.exists():
+            raise FileNotFoundError(f"dataset.json not found in {self.dataset_path}")
+        
+        # Metadata extracted from an archive/object store names its source
+        owns_source = False
+        stamp_file = self.dataset_path / SOURCE_STAMP
+        if self.source is None and stamp_file.exists():
+            from .dataset_sources import open_dataset_source
+            with open(stamp_file, 'r', encoding='utf-8') as f:
+                self.source = open_dataset_source(json.load(f))
+            owns_source = True
+        
+        try:
+            self.conn = self._connect()
+            if self.conn is None or not self._is_fresh():
+                if self.conn is not None:
+                    self.conn.close()
+                self.rebuild()
+                self.conn = self._connect()
+        finally:
+            if owns_source:
+                self.source.close()
+            self.source = None
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path.exists():
+            return None
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+        return conn
+    
+    def _meta(self, conn: sqlite3.Connection, key: str):
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return json.loads(row[0]) if row else None
+    
+    def _signature(self, directories: List[str]) -> Dict[str, Any]:
+        return {
+            'version': INDEX_VERSION,
+            'dataset_path': str(self.dataset_path.resolve()),
+            'dataset_json': _stat_signature(self.metadata_file),
+            'directories': {directory: _stat_signature(self.dataset_path / directory)
+                            for directory in directories},
+            'source': [self.source.location, self.source.signature()] if self.source is not None else None
+        }
+    
+    def _is_fresh(self) -> bool:
+        stored = self._meta(self.conn, 'signature')
+        if stored is None:
+            return False
+        return stored == self._signature(list(stored['directories'])) and self._images_unchanged()
+    
+    def _images_unchanged(self) -> bool:
+        """Whether every indexed image still has its indexed mtime and size"""
+        # Source images have no mtime, the source signature covers them
+        rows = self.conn.execute(
+            "SELECT img, img_size, img_mtime_ns FROM items WHERE img_exists AND img_mtime_ns IS NOT NULL")
+        return all(_stat_signature(self.dataset_path / img) == [mtime_ns, size] for img, size, mtime_ns in rows)
+    
+    def rebuild(self):
+        """Compile the index from dataset.json and the files on disk"""
+        with open(self.metadata_file, 'r', encoding='utf-8') as f:
+            dataset_metadata = json.load(f)
+        
+        # Hashes of images unchanged since the previous index are reused
+        previous = {}
+        if self.db_path.exists():
+            try:
+                old = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+                previous = {(img, size, mtime_ns): sha1 for img, size, mtime_ns, sha1 in old.execute(
+                    "SELECT img, img_size, img_mtime_ns, img_sha1 FROM items WHERE img_exists")}
+                old.close()
+            except sqlite3.DatabaseError:
+                previous = {}
+        
+        source_files = self.source.list_files() if self.source is not None else None
+        gt_dirname = os.path.relpath(self.gt_dir, self.dataset_path)
+        directories = {gt_dirname}
+        rows = []
+        for position, item in enumerate(dataset_metadata):
+            img = item['img'].replace('\\', '/')
+            image_file = self.dataset_path / img
+            if source_files is not None:
+                image_stat = [None, source_files[img]] if img in source_files else None
+            else:
+                directories.add(os.path.dirname(img) or '.')
+                image_stat = _stat_signature(image_file)
+            gt_file = self.gt_dir / f"{Path(img).stem}.txt"
+            gt_stat = _stat_signature(gt_file)
+            
+            sha1 = None
+            if image_stat is not None and source_files is None:
+                mtime_ns, size = image_stat
+                sha1 = previous.get((img, size, mtime_ns)) or _file_sha1(image_file)
+            rows.append((position, Path(img).stem, img,
+                         image_stat is not None, image_stat[1] if image_stat else None,
+                         image_stat[0] if image_stat else None, sha1,
+                         f"{gt_dirname}/{Path(img).stem}.txt", gt_stat is not None))
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.parent / f".{self.db_path.name}.{uuid.uuid4().hex}.tmp"
+        conn = sqlite3.connect(str(tmp_path))
+        conn.executescript("""
+            CREATE TABLE items (
+                position INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                img TEXT NOT NULL,
+                img_exists INTEGER NOT NULL,
+                img_size INTEGER,
+                img_mtime_ns INTEGER,
+                img_sha1 TEXT,
+                gt TEXT NOT NULL,
+                gt_exists INTEGER NOT NULL
+            );
+            CREATE INDEX items_id ON items (id);
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        conn.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT INTO meta VALUES ('signature', ?)",
+                     (json.dumps(self._signature(sorted(directories))),))
+        conn.commit()
+        conn.close()
+        os.replace(tmp_path, self.db_path)
+        self.rebuilt = True
+    
+    def images(self, existing_only: bool = True) -> List[str]:
+        """Dataset-relative image paths in dataset.json order"""
+        condition = "WHERE img_exists" if existing_only else ""
+        return [row[0] for row in self.conn.execute(f"SELECT img FROM items {condition} ORDER BY position")]
+    
+    def ground_truth_ids(self) -> set:
+        """Ids (image stems) whose ground-truth file exists"""
+        return {row[0] for row in self.conn.execute("SELECT id FROM items WHERE gt_exists")}
+    
+    def ids(self) -> List[str]:
+        """Ids (image stems) of every entry, in dataset.json order"""
+        return [row[0] for row in self.conn.execute("SELECT id FROM items ORDER BY position")]
+    
+    def items(self) -> List[Dict[str, Any]]:
+        """Every entry as a dictionary of the index columns"""
+        cursor = self.conn.execute("SELECT * FROM items ORDER BY position")
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+    
+    def stats(self) -> Dict[str, int]:
+        total, images, gt, size = self.conn.execute(
+            "SELECT COUNT(*), SUM(img_exists), SUM(gt_exists), SUM(img_size) FROM items").fetchone()
+        return {'entries': total, 'images': images or 0, 'ground_truth': gt or 0, 'image_bytes': size or 0}
+    
+    def close(self):
+        self.conn.close()
+
+
+def open_dataset_index(dataset_name: str, dataset_path: str, index_dir: str = DEFAULT_INDEX_DIR,
+                       source=None) -> Optional[DatasetIndex]:
+    """Open (building or refreshing if needed) a dataset's index; None without dataset.json"""
+    try:
+        return DatasetIndex(dataset_name, dataset_path, index_dir, source=source)
+    except FileNotFoundError:
+        return None
+
+
+def list_files(directory: Path, suffix: str = '') -> set:
+    """Names of the files in a directory, from a single scan instead of one stat per file"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries if entry.name.endswith(suffix)}
+    except FileNotFoundError:
+        return set()
@@ -0,0 +1,466 @@
+"""
+Dataset sources: read images straight from tar/zip archives or an S3-compatible store
+Only the small metadata files (dataset.json and the ground truth) are extracted
+into the dataset's local path; images are streamed to the adapters through a
+spool directory holding just the images in flight.
+
+Dataset config:
+    - name: sroie
+      path: data/raw/sroie                       # metadata is extracted here
+      source: data/archives/sroie.tar            # .tar, .tar.gz, .tgz, .zip, s3://bucket/prefix
+      source_options:                            # S3 only
+        endpoint_url: http://localhost:9000      # MinIO or experiments/utilities/mock_s3_server.py
+        anonymous: false                         # unsigned requests, no boto3 needed
+"""
+
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse, quote
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+from .dataset_index import DatasetIndex, DEFAULT_INDEX_DIR, SOURCE_STAMP, open_dataset_index
+
+METADATA_FILE = 'dataset.json'
+# Files extracted next to dataset.json; everything else stays in the source
+METADATA_SUFFIXES = ('.json', '.txt')
+# Streamed images on disk at once
+DEFAULT_SPOOL_WINDOW = 64
+
+
+def safe_join(base_dir: Path, name: str) -> Path:
+    """
+    Join a source file name onto a local directory, refusing names that escape it
+    
+    Archive members and object keys come from outside: an absolute name or one
+    with '..' segments would otherwise be written anywhere (tar-slip).
+    
+    Raises:
+        ValueError: When the name is absolute, has '..' segments or resolves
+            outside base_dir
+    """
+    if not name or name.startswith(('/', '\\')) or Path(name).is_absolute() \
+            or '..' in name.replace('\\', '/').split('/'):
+        raise ValueError(f"Unsafe file name in dataset source: {name!r}")
+    # Symlinks already in the directory could still point outside it
+    base = Path(base_dir).resolve()
+    if base not in (base / name).resolve().parents:
+        raise ValueError(f"Unsafe file name in dataset source: {name!r}")
+    return Path(base_dir) / name
+
+
+class DatasetSource(ABC):
+    """
+    Read-only view of a dataset stored as one archive or object prefix
+    
+    Names are relative to the dataset root, the directory holding dataset.json
+    (archives often wrap everything in a top-level folder, which is skipped).
+    """
+    
+    def __init__(self, location: str, options: Optional[Dict[str, Any]] = None):
+        self.location = location
+        self.options = options or {}
+        self._files: Optional[Dict[str, int]] = None
+        self._root = ''
+    
+    @abstractmethod
+    def _list(self) -> Dict[str, int]:
+        """Every file in the source by full name, with its size"""
+    
+    @abstractmethod
+    def _read(self, full_name: str) -> bytes:
+        """Read one file by full name"""
+    
+    @abstractmethod
+    def signature(self) -> Any:
+        """Value that changes when the source changes"""
+    
+    def _iter(self, full_names: List[str]) -> Iterator[Tuple[str, bytes]]:
+        """Read several files by full name; sources override this with a sequential pass"""
+        for full_name in full_names:
+            yield full_name, self._read(full_name)
+    
+    def list_files(self) -> Dict[str, int]:
+        """Files under the dataset root, name -> size"""
+        if self._files is None:
+            listing = self._list()
+            candidates = sorted((name for name in listing if name.rsplit('/', 1)[-1] == METADATA_FILE),
+                                key=lambda name: name.count('/'))
+            if not candidates:
+                raise FileNotFoundError(f"{METADATA_FILE} not found in {self.location}")
+            self._root = candidates[0][:-len(METADATA_FILE)]
+            self._files = {name[len(self._root):]: size for name, size in listing.items()
+                           if name.startswith(self._root)}
+        return self._files
+    
+    def read(self, name: str) -> bytes:
+        self.list_files()
+        return self._read(self._root + name)
+    
+    def iter_files(self, names: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+        """Yield (name, content) for the given names, in the order the source reads fastest"""
+        self.list_files()
+        root = self._root
+        for full_name, content in self._iter([root + name for name in names]):
+            yield full_name[len(root):], content
+    
+    def materialize_metadata(self, target_dir: Path) -> int:
+        """
+        Extract dataset.json and the ground truth (.json/.txt files) into target_dir
+        
+        Skipped when target_dir already holds the metadata of this exact source.
+        The stamp written next to it lets DatasetIndex find the source again
+        from the dataset path alone.
+        
+        Returns:
+            Number of files extracted
+        """
+        target_dir = Path(target_dir)
+        stamp_file = target_dir / SOURCE_STAMP
+        stamp = {'source': self.location, 'source_options': self.options, 'signature': self.signature()}
+        if stamp_file.exists() and (target_dir / METADATA_FILE).exists():
+            with open(stamp_file, 'r', encoding='utf-8') as f:
+                if json.load(f) == stamp:
+                    return 0
+        
+        names = [name for name in self.list_files() if name.lower().endswith(METADATA_SUFFIXES)]
+        # Check every name before writing anything
+        output_files = {name: safe_join(target_dir, name) for name in names}
+        for name, content in self.iter_files(names):
+            output_file = output_files[name]
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_file, 'wb') as f:
+                f.write(content)
+        with open(stamp_file, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+        return len(names)
+    
+    def logical_path(self, name: str) -> str:
+        """Path recorded in raw outputs for an image of this source"""
+        return f"{self.location}!/{name}"
+    
+    def close(self):
+        pass
+
+
+class TarSource(DatasetSource):
+    """
+    Images in a tar archive (optionally gzip/bzip2/xz compressed)
+    
+    Uncompressed archives are read with one seek per image; compressed ones are
+    read in a single sequential pass per iter_files() call, so images come out
+    in archive order.
+    """
+    
+    def __init__(self, location: str):
+        super().__init__(location)
+        self.path = Path(location)
+        with open(self.path, 'rb') as f:
+            magic = f.read(6)
+        self.compressed = magic[:2] == b'\x1f\x8b' or magic[:3] == b'BZh' or magic == b'\xfd7zXZ\x00'
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+    
+    def _list(self) -> Dict[str, int]:
+        with tarfile.open(self.path, 'r|*') as archive:
+            for member in archive:
+                if member.isfile():
+                    self._offsets[member.name] = (member.offset_data, member.size)
+        return {name: size for name, (_, size) in self._offsets.items()}
+    
+    def _read(self, full_name: str) -> bytes:
+        if self.compressed:
+            with tarfile.open(self.path, 'r:*') as archive:
+                return archive.extractfile(full_name).read()
+        offset, size = self._offsets[full_name]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'rb')
+            self._file.seek(offset)
+            return self._file.read(size)
+    
+    def _iter(self, full_names: List[str]) -> Iterator[Tuple[str, bytes]]:
+        if not self.compressed:
+            # Archive order keeps the reads sequential on disk
+            for full_name in sorted(full_names, key=lambda name: self._offsets[name][0]):
+                yield full_name, self._read(full_name)
+            return
+        wanted = set(full_names)
+        with tarfile.open(self.path, 'r|*') as archive:
+            for member in archive:
+                if member.name in wanted:
+                    yield member.name, archive.extractfile(member).read()
+                    wanted.discard(member.name)
+                    if not wanted:
+                        return
+    
+    def signature(self) -> Any:
+        stat = self.path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ZipSource(DatasetSource):
+    """Images in a zip archive, read in central-directory order"""
+    
+    def __init__(self, location: str):
+        super().__init__(location)
+        self.path = Path(location)
+        self.archive = zipfile.ZipFile(self.path)
+        self._order: Dict[str, int] = {}
+    
+    def _list(self) -> Dict[str, int]:
+        infos = [info for info in self.archive.infolist() if not info.is_dir()]
+        self._order = {info.filename: info.header_offset for info in infos}
+        return {info.filename: info.file_size for info in infos}
+    
+    def _read(self, full_name: str) -> bytes:
+        return self.archive.read(full_name)
+    
+    def _iter(self, full_names: List[str]) -> Iterator[Tuple[str, bytes]]:
+        for full_name in sorted(full_names, key=lambda name: self._order.get(name, 0)):
+            yield full_name, self._read(full_name)
+    
+    def signature(self) -> Any:
+        stat = self.path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+    
+    def close(self):
+        self.archive.close()
+
+
+class S3Source(DatasetSource):
+    """
+    Images under an S3 prefix (s3://bucket/prefix)
+    
+    Uses boto3 (credentials from the usual AWS chain) or, with anonymous: true
+    or without boto3, unsigned path-style HTTP requests, which is enough for
+    public buckets and local stand-ins. Several GETs are kept in flight while
+    images are handed out in order.
+    
+    Options:
+        endpoint_url: S3-compatible endpoint (MinIO, mock_s3_server.py)
+        anonymous: Send unsigned requests
+        prefetch: Objects downloaded ahead of the consumer (default 8)
+    """
+    
+    def __init__(self, location: str, options: Optional[Dict[str, Any]] = None):
+        super().__init__(location, options)
+        options = self.options
+        parsed = urlparse(location)
+        self.bucket = parsed.netloc
+        self.prefix = parsed.path.lstrip('/')
+        if self.prefix and not self.prefix.endswith('/'):
+            self.prefix += '/'
+        self.endpoint_url = options.get('endpoint_url')
+        self.prefetch = max(1, int(options.get('prefetch', 8)))
+        self._etags: Dict[str, str] = {}
+        
+        self.client = None
+        if boto3 is not None and not options.get('anonymous', False):
+            self.client = boto3.client('s3', endpoint_url=self.endpoint_url)
+        elif requests is None:
+            raise RuntimeError("S3 sources need boto3 or requests. Install with: pip install boto3")
+        elif not self.endpoint_url:
+            self.endpoint_url = "https://s3.amazonaws.com"
+        if self.client is None:
+            self.session = requests.Session()
+    
+    def _object_url(self, key: str) -> str:
+        return f"{self.endpoint_url.rstrip('/')}/{self.bucket}/{quote(key)}"
+    
+    def _list(self) -> Dict[str, int]:
+        files = {}
+        if self.client is not None:
+            paginator = self.client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+                for item in page.get('Contents', []):
+                    files[item['Key'][len(self.prefix):]] = item['Size']
+                    self._etags[item['Key'][len(self.prefix):]] = item.get('ETag', '')
+            return files
+        
+        namespace = {'s3': 'http://s3.amazonaws.com/doc/2006-03-01/'}
+        token = None
+        while True:
+            params = {'list-type': '2', 'prefix': self.prefix}
+            if token:
+                params['continuation-token'] = token
+            response = self.session.get(f"{self.endpoint_url.rstrip('/')}/{self.bucket}", params=params, timeout=60)
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+            for item in root.findall('s3:Contents', namespace):
+                key = item.find('s3:Key', namespace).text[len(self.prefix):]
+                files[key] = int(item.find('s3:Size', namespace).text)
+                etag = item.find('s3:ETag', namespace)
+                self._etags[key] = etag.text if etag is not None else ''
+            if root.findtext('s3:IsTruncated', namespaces=namespace) != 'true':
+                return files
+            token = root.findtext('s3:NextContinuationToken', namespaces=namespace)
+    
+    def _read(self, full_name: str) -> bytes:
+        if self.client is not None:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + full_name)['Body'].read()
+        response = self.session.get(self._object_url(self.prefix + full_name), timeout=300)
+        response.raise_for_status()
+        return response.content
+    
+    def _iter(self, full_names: List[str]) -> Iterator[Tuple[str, bytes]]:
+        with ThreadPoolExecutor(max_workers=self.prefetch) as executor:
+            pending = deque()
+            for full_name in full_names:
+                pending.append((full_name, executor.submit(self._read, full_name)))
+                if len(pending) >= self.prefetch:
+                    name, future = pending.popleft()
+                    yield name, future.result()
+            while pending:
+                name, future = pending.popleft()
+                yield name, future.result()
+    
+    def signature(self) -> Any:
+        # The ETag of dataset.json; a full listing would cost one request per 1000 objects
+        self.list_files()
+        return self._etags.get(self._root + METADATA_FILE)
+
+
+def open_dataset_source(dataset_config: Dict[str, Any]) -> Optional[DatasetSource]:
+    """
+    Open the source of a dataset config entry
+    
+    Returns:
+        DatasetSource, or None for a plain directory dataset (no 'source' key)
+    """
+    location = dataset_config.get('source')
+    if not location:
+        return None
+    options = dataset_config.get('source_options') or {}
+    if location.startswith('s3://'):
+        return S3Source(location, options)
+    if location.endswith('.zip'):
+        return ZipSource(location)
+    if tarfile.is_tarfile(location):
+        return TarSource(location)
+    raise ValueError(f"Unsupported dataset source: {location} (expected a tar/zip archive or s3:// URL)")
+
+
+def index_for_dataset(dataset_config: Dict[str, Any], index_dir: str = DEFAULT_INDEX_DIR) -> Optional[DatasetIndex]:
+    """
+    Open the compiled index of a dataset config entry, extracting an archived
+    dataset's metadata into its path first
+    
+    Returns:
+        DatasetIndex, or None without dataset.json
+    """
+    source = open_dataset_source(dataset_config)
+    try:
+        if source is not None:
+            source.materialize_metadata(Path(dataset_config['path']))
+        return open_dataset_index(dataset_config['name'], dataset_config['path'], index_dir, source=source)
+    except FileNotFoundError:
+        return None
+    finally:
+        if source is not None:
+            source.close()
+
+
+class ImageSpool:
+    """
+    Scratch files for images streamed from a source
+    
+    paths() writes each image to the spool directory just before the adapter
+    needs it and yields its path; release() deletes it once every consumer is
+    done with it (one per system in fan-out mode). At most ``window`` images are
+    on disk at a time, so neither the full unpack nor its inodes are paid.
+    
+    Args:
+        source: Dataset source to read from
+        spool_dir: Parent of the (temporary) spool directory, default the system temp dir
+        consumers: release() calls after which an image is deleted
+        window: Images on disk at most
+        directory: Exact spool directory, for callers needing stable paths (batch jobs resume by path)
+    """
+    
+    def __init__(self, source: DatasetSource, spool_dir: Optional[str] = None, consumers: int = 1,
+                 window: int = DEFAULT_SPOOL_WINDOW, directory: Optional[str] = None):
+        self.source = source
+        if directory is not None:
+            self.spool_dir = Path(directory)
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            if spool_dir is not None:
+                Path(spool_dir).mkdir(parents=True, exist_ok=True)
+            self.spool_dir = Path(tempfile.mkdtemp(prefix='ocr_spool_', dir=spool_dir))
+        self.consumers = consumers
+        self.window = max(1, window)
+        self._refs: Dict[str, int] = {}
+        self._names: Dict[str, str] = {}
+        self._cond = threading.Condition()
+    
+    def paths(self, names: Iterable[str]) -> Iterator[str]:
+        """Spool the images and yield their paths, in the source's read order"""
+        names = list(names)
+        # Check every name before writing anything
+        spool_paths = {name: safe_join(self.spool_dir, name) for name in names}
+        for name, content in self.source.iter_files(names):
+            with self._cond:
+                while len(self._refs) >= self.window:
+                    self._cond.wait()
+            path = spool_paths[name]
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+            with self._cond:
+                self._refs[str(path)] = self.consumers
+                self._names[str(path)] = name
+            yield str(path)
+    
+    def name_of(self, path: str) -> str:
+        """Dataset-relative name of a spooled image"""
+        return self._names[str(path)]
+    
+    def logical_path(self, path: str) -> str:
+        """Source path of a spooled image, as recorded in raw outputs"""
+        return self.source.logical_path(self._names[str(path)])
+    
+    def release(self, path: str):
+        """One consumer is done with the image; the file goes when all are"""
+        with self._cond:
+            path = str(path)
+            if path not in self._refs:
+                return
+            self._refs[path] -= 1
+            if self._refs[path] > 0:
+                return
+            del self._refs[path]
+            self._names.pop(path, None)
+            self._cond.notify_all()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    def close(self):
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
@@ -0,0 +1,337 @@
+"""
+Near-duplicate image detection before extraction
+Perceptual hashes (pHash, dHash) of every image are computed in batches with
+NumPy and compared by Hamming distance; each cluster of duplicates is
+extracted once, and the representative's raw output is copied to the others.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+HASH_METHODS = ('phash', 'dhash', 'both')
+DEFAULT_METHOD = 'both'
+# Bits (of 256) two hashes may differ by and still be duplicates
+DEFAULT_MAX_DISTANCE = 16
+DEFAULT_DEDUP_DIR = "results/dedup"
+# Images decoded and hashed per NumPy batch
+HASH_BATCH = 256
+# Rows of the Hamming distance matrix computed at once
+DISTANCE_BLOCK = 128
+# Raw output fields not copied to duplicates, so timing statistics count each extraction once
+TIMING_FIELDS = ('processing_time_seconds', 'processing_time_ns', 'phase_times_ns',
+                 'request_timing', 'cold_start')
+
+# 16x16 bits: 8x8 hashes cannot tell apart receipts printed on the same template
+_HASH_SIZE = 16
+_DCT_SIZE = 4 * _HASH_SIZE
+_HASH_WORDS = _HASH_SIZE * _HASH_SIZE // 64
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix, so a 2D DCT of X is D @ X @ D.T"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.sqrt(2 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    """Pack (N, 256) booleans into hashes of shape (N, 4) uint64"""
+    return np.packbits(bits.astype(np.uint8), axis=1).view('>u8').astype(np.uint64)
+
+
+def to_hex(hash_words: np.ndarray) -> str:
+    return hash_words.astype('>u8').tobytes().hex()
+
+
+def from_hex(text: str) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex(text), dtype='>u8').astype(np.uint64)
+
+
+def phash(thumbnails: np.ndarray) -> np.ndarray:
+    """
+    pHash of a batch of 64x64 grayscale thumbnails
+    
+    Args:
+        thumbnails: Array of shape (N, 64, 64)
+    
+    Returns:
+        Hashes of shape (N, 4): the low 16x16 DCT frequencies against their median
+    """
+    # Only the low frequencies are needed: rows of the DCT matrix below _HASH_SIZE
+    low_dct = _DCT[:_HASH_SIZE]
+    low = (low_dct @ thumbnails.astype(np.float64) @ low_dct.T).reshape(len(thumbnails), -1)
+    # The DC term only reflects overall brightness
+    medians = np.median(low[:, 1:], axis=1, keepdims=True)
+    return _pack(low > medians)
+
+
+def dhash(thumbnails: np.ndarray) -> np.ndarray:
+    """
+    dHash of a batch of 17x16 (width x height) grayscale thumbnails
+    
+    Args:
+        thumbnails: Array of shape (N, 16, 17)
+    
+    Returns:
+        Hashes of shape (N, 4): whether each pixel is brighter than its right neighbour
+    """
+    return _pack((thumbnails[:, :, 1:] > thumbnails[:, :, :-1]).reshape(len(thumbnails), -1))
+
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    # numpy < 2: count the bits byte by byte with a lookup table
+    _BYTE_POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+    
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        counts = _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)]
+        return counts.reshape(words.shape + (words.itemsize,)).sum(axis=-1, dtype=np.uint16)
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise Hamming distances between two arrays of hashes, shape (len(a), len(b))"""
+    # Word by word, so the temporaries stay (len(a), len(b))
+    distances = np.zeros((len(a), len(b)), dtype=np.uint16)
+    for word in range(a.shape[1]):
+        distances += _popcount(a[:, word, None] ^ b[None, :, word])
+    return distances
+
+
+def _thumbnails(content: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    from PIL import Image
+    with Image.open(io.BytesIO(content)) as image:
+        gray = image.convert('L')
+        return (np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float32),
+                np.asarray(gray.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.LANCZOS), dtype=np.int16))
+
+
+def hash_images(images: Iterable[Tuple[str, bytes]], cache: Optional[Dict[str, List[str]]] = None
+                ) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Perceptual hashes of images, reusing cached hashes of identical content
+    
+    Args:
+        images: (key, file content) pairs
+        cache: Content SHA-1 -> [phash hex, dhash hex]; updated in place
+    
+    Yields:
+        Tuple of (key, content sha1, phash hex, dhash hex)
+    """
+    cache = cache if cache is not None else {}
+    pending: List[Tuple[str, str, np.ndarray, np.ndarray]] = []
+    
+    def flush():
+        p_hashes = phash(np.stack([item[2] for item in pending]))
+        d_hashes = dhash(np.stack([item[3] for item in pending]))
+        for (key, sha1, _, _), p_hash, d_hash in zip(pending, p_hashes, d_hashes):
+            cache[sha1] = [to_hex(p_hash), to_hex(d_hash)]
+            yield key, sha1, cache[sha1][0], cache[sha1][1]
+        pending.clear()
+    
+    for key, content in images:
+        sha1 = hashlib.sha1(content).hexdigest()
+        if sha1 in cache:
+            p_hex, d_hex = cache[sha1]
+            yield key, sha1, p_hex, d_hex
+            continue
+        try:
+            pending.append((key, sha1, *_thumbnails(content)))
+        except OSError as e:
+            print(f"Warning: cannot hash {key}: {e}")
+            continue
+        if len(pending) >= HASH_BATCH:
+            yield from flush()
+    if pending:
+        yield from flush()
+
+
+def cluster_hashes(p_hashes: np.ndarray, d_hashes: np.ndarray, method: str = DEFAULT_METHOD,
+                   max_distance: int = DEFAULT_MAX_DISTANCE) -> List[int]:
+    """
+    Group images whose hashes are within max_distance bits of a cluster leader
+    
+    Args:
+        p_hashes: pHashes of shape (N, 4)
+        d_hashes: dHashes of shape (N, 4)
+        method: 'phash', 'dhash' or 'both'
+        max_distance: Largest Hamming distance of duplicates
+    
+    With method 'both' a pair must be close in pHash and in dHash, which keeps
+    different documents on the same template apart better than either alone.
+    
+    Clusters are built greedily in dataset order: the first unassigned image
+    leads a new cluster and takes every later unassigned image close to it.
+    Members are thus all within max_distance of the representative whose
+    output they receive; chains of near pairs are not merged transitively.
+    
+    Returns:
+        Index of each image's cluster root (the lowest index in its cluster)
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"Unknown hash method: {method} (expected one of {HASH_METHODS})")
+    n = len(p_hashes)
+    root = np.full(n, -1, dtype=np.int64)
+    
+    for start in range(0, n, DISTANCE_BLOCK):
+        stop = min(start + DISTANCE_BLOCK, n)
+        # Only pairs (i, j) with j > i, each block against itself and the rest
+        close = None
+        if method in ('phash', 'both'):
+            close = hamming(p_hashes[start:stop], p_hashes[start:]) <= max_distance
+        if method in ('dhash', 'both'):
+            d_close = hamming(d_hashes[start:stop], d_hashes[start:]) <= max_distance
+            close = d_close if close is None else close & d_close
+        for offset in range(stop - start):
+            leader = start + offset
+            if root[leader] >= 0:
+                continue
+            root[leader] = leader
+            members = np.flatnonzero(close[offset, offset + 1:]) + leader + 1
+            members = members[root[members] < 0]
+            root[members] = leader
+    return root.tolist()
+
+
+class DedupPlan:
+    """
+    Duplicate clusters of one dataset: representative key -> other member keys
+    
+    The representative is the cluster's first image in dataset order; only
+    representatives are extracted.
+    """
+    
+    def __init__(self, clusters: Dict[str, List[str]], settings: Optional[Dict[str, Any]] = None):
+        self.clusters = clusters
+        self.settings = settings or {}
+        self._duplicates = {member for members in clusters.values() for member in members}
+    
+    def representatives(self, keys: List[str]) -> List[str]:
+        """The keys that need extraction, in their original order"""
+        return [key for key in keys if key not in self._duplicates]
+    
+    def members(self, key: str) -> List[str]:
+        return self.clusters.get(key, [])
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            'clusters': len(self.clusters),
+            'duplicates': len(self._duplicates),
+            'largest_cluster': max((len(members) + 1 for members in self.clusters.values()), default=0)
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {'settings': self.settings, 'stats': self.stats(), 'clusters': self.clusters}
+
+
+def build_dedup_plan(dataset_name: str, dataset_path: str, keys: List[str], dedup_config: Dict[str, Any],
+                     source=None, sha1s: Optional[Dict[str, str]] = None,
+                     dedup_dir: str = DEFAULT_DEDUP_DIR) -> DedupPlan:
+    """
+    Hash a dataset's images and cluster the duplicates
+    
+    Hashes are cached by content SHA-1 in <dedup_dir>/<dataset>_hashes.json; with
+    the SHA-1s of the dataset index, images hashed before are not read again.
+    
+    Args:
+        dataset_name: Name of the dataset
+        dataset_path: Local dataset directory
+        keys: Dataset-relative image paths, in dataset order
+        dedup_config: ``dedup`` config section (method, max_distance)
+        source: Dataset source for archived datasets, None for a directory
+        sha1s: Known content SHA-1 per key (from the dataset index)
+        dedup_dir: Directory of the hash cache
+    
+    Returns:
+        DedupPlan over the keys
+    """
+    method = dedup_config.get('method', DEFAULT_METHOD)
+    max_distance = int(dedup_config.get('max_distance', DEFAULT_MAX_DISTANCE))
+    cache_file = Path(dedup_dir) / f"{dataset_name}_hashes.json"
+    cache: Dict[str, List[str]] = {}
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    
+    sha1s = sha1s or {}
+    hashes: Dict[str, Tuple[str, str]] = {}
+    to_read = []
+    for key in keys:
+        known = cache.get(sha1s.get(key) or '')
+        if known:
+            hashes[key] = (known[0], known[1])
+        else:
+            to_read.append(key)
+    
+    def contents() -> Iterator[Tuple[str, bytes]]:
+        if source is not None:
+            yield from source.iter_files(to_read)
+            return
+        for key in to_read:
+            try:
+                with open(Path(dataset_path) / key, 'rb') as f:
+                    yield key, f.read()
+            except OSError as e:
+                print(f"Warning: cannot read {key}: {e}")
+    
+    for key, _, p_hex, d_hex in hash_images(contents(), cache):
+        hashes[key] = (p_hex, d_hex)
+    
+    if to_read:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    
+    hashed = [key for key in keys if key in hashes]
+    shape = (len(hashed), _HASH_WORDS)
+    roots = cluster_hashes(np.array([from_hex(hashes[key][0]) for key in hashed], dtype=np.uint64).reshape(shape),
+                           np.array([from_hex(hashes[key][1]) for key in hashed], dtype=np.uint64).reshape(shape),
+                           method, max_distance)
+    clusters: Dict[str, List[str]] = {}
+    for key, root in zip(hashed, roots):
+        if hashed[root] != key:
+            clusters.setdefault(hashed[root], []).append(key)
+    return DedupPlan(clusters, {'method': method, 'max_distance': max_distance})
+
+
+def copy_to_duplicates(raw_dir: Path, plan: DedupPlan) -> int:
+    """
+    Copy each representative's raw output to the other members of its cluster
+    
+    The copies name their own image, record 'duplicate_of' and leave out the
+    timing fields.
+    
+    Returns:
+        Number of raw outputs written
+    """
+    written = 0
+    for representative, members in plan.clusters.items():
+        raw_file = raw_dir / f"{Path(representative).stem}_raw.json"
+        if not raw_file.exists():
+            continue
+        with open(raw_file, 'r') as f:
+            data = json.load(f)
+        for field in TIMING_FIELDS:
+            data.pop(field, None)
+        image_path = str(data.get('image_path', ''))
+        prefix = image_path[:-len(representative)] if image_path.endswith(representative) else ''
+        for member in members:
+            copy = dict(data, image_path=prefix + member, image_filename=Path(member).name,
+                        duplicate_of=representative)
+            with open(raw_dir / f"{Path(member).stem}_raw.json", 'w') as f:
+                json.dump(copy, f, indent=2)
+            written += 1
+    return written
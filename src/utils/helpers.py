@@ -12,7 +12,7 @@ def ensure_dir(path):
 def get_file_list(directory, extensions=None):
     """Get list of files from directory"""
     if extensions is None:
-        extensions = ['.jpg', '.png', '.tiff']
+        extensions = ['.jpg', '.jpeg', '.png', '.tif', '.tiff', '.pdf']
     
     files = []
     for ext in extensions:
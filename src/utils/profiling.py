@@ -0,0 +1,291 @@
+"""
+Profiling hooks for pipeline steps
+Wraps a block in cProfile and/or a sampling profiler and writes the results
+under results/profiles/
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import runpy
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_PROFILE_DIR = "results/profiles"
+PROFILE_MODES = ('cprofile', 'sampling')
+
+# Leaf frames of threads blocked waiting; kept in the stacks, left out of hotspots
+IDLE_FRAMES = ('wait (threading.py', '_wait_for_tstate_lock (threading.py', 'select (selectors.py',
+               'accept (socket.py', 'get (queue.py', '_worker (thread.py')
+
+
+class FrameSampler:
+    """
+    Stack sampler built on sys._current_frames()
+    
+    Every ``interval`` seconds it records the Python stack of every thread
+    (except its own) and counts identical stacks, the input of flamegraph tools.
+    It runs inside the process, so it needs no extra permissions, but it only
+    sees Python frames and only gets the GIL between bytecodes.
+    """
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.n_samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame))
+                    frame = frame.f_back
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.n_samples += 1
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="frame-sampler")
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+    
+    def write_collapsed(self, path: Path):
+        """Write stacks in collapsed format ("frame;frame;frame count" per line)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class PySpyRecorder:
+    """Run py-spy against the current process, writing collapsed stacks"""
+    
+    def __init__(self, output_file: Path, rate: int = 200):
+        self.output_file = output_file
+        self.rate = rate
+        self.process: Optional[subprocess.Popen] = None
+    
+    @staticmethod
+    def available() -> bool:
+        return shutil.which('py-spy') is not None
+    
+    def start(self) -> bool:
+        """Start recording; returns False when py-spy cannot attach (e.g. ptrace not permitted)"""
+        self.process = subprocess.Popen(
+            ['py-spy', 'record', '--pid', str(os.getpid()), '--rate', str(self.rate),
+             '--format', 'raw', '--output', str(self.output_file), '--subprocesses', '--nonblocking'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        time.sleep(0.5)
+        if self.process.poll() is not None:
+            error = self.process.stderr.read().decode('utf-8', errors='replace').strip()
+            print(f"py-spy could not attach ({error.splitlines()[-1] if error else 'unknown error'}), "
+                  f"using the built-in sampler")
+            return False
+        return True
+    
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+            try:
+                self.process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def collapsed_hotspots(path: Path, top: int = 20) -> Tuple[List[Tuple[str, int]], int]:
+    """
+    Frames with the most samples at the top of the stack (self time)
+    
+    Returns:
+        Tuple of ([(frame, samples), ...], total samples), both excluding idle waits
+    """
+    counts: Counter = Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                leaf = stack.rsplit(';', 1)[-1]
+                if not leaf.startswith(IDLE_FRAMES):
+                    counts[leaf] += int(count)
+    return counts.most_common(top), sum(counts.values())
+
+
+def run_script(script: Path, args: Sequence[str] = (), in_process: bool = False) -> int:
+    """
+    Run a Python script as a child process, or in this process
+    
+    A step profiled from the parent only sees a child process waiting in
+    waitpid; run in process, the script's own frames are profiled too.
+    
+    Args:
+        script: Path of the script
+        args: Command line arguments of the script
+        in_process: Run the script as __main__ of this process instead of a subprocess
+    
+    Returns:
+        Exit code of the script
+    """
+    if not in_process:
+        return subprocess.run([sys.executable, str(script), *args], capture_output=False, text=True).returncode
+    
+    saved_argv, saved_path = sys.argv, list(sys.path)
+    sys.argv = [str(script), *args]
+    # Like `python script.py`: the script's directory comes first on the path
+    sys.path.insert(0, str(Path(script).parent))
+    try:
+        runpy.run_path(str(script), run_name='__main__')
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code)
+        return 1
+    finally:
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+
+
+class StepProfiler:
+    """
+    Profile a block of code, e.g. one pipeline step
+    
+    Modes:
+        cprofile: deterministic cProfile (.prof, open with snakeviz or pstats)
+            plus the built-in sampler for a flamegraph; threads started in
+            the block (dispatcher, fan-out and queue workers) get their own
+            profiler, merged into the same statistics
+        sampling: py-spy when installed and allowed to attach, otherwise the
+            built-in sampler; low overhead, flamegraph only
+    
+    Collapsed-stack files can be rendered with flamegraph.pl or speedscope.
+    
+    Usage:
+        with StepProfiler('extract', 'cprofile'):
+            pipeline.step_extract_ocr()
+    """
+    
+    def __init__(self, step_name: str, mode: str = 'cprofile',
+                 output_dir: str = DEFAULT_PROFILE_DIR, top: int = 20):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+        self.step_name = step_name
+        self.mode = mode
+        self.top = top
+        self.output_dir = Path(output_dir)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.prefix = self.output_dir / f"{step_name}_{timestamp}"
+        self.files: Dict[str, Path] = {}
+        
+        self._profiler: Optional[cProfile.Profile] = None
+        self._thread_profilers: List[cProfile.Profile] = []
+        self._thread_lock = threading.Lock()
+        self._sampler: Optional[FrameSampler] = None
+        self._py_spy: Optional[PySpyRecorder] = None
+    
+    def __enter__(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        if self.mode == 'sampling' and PySpyRecorder.available():
+            self._py_spy = PySpyRecorder(self.prefix.with_suffix('.collapsed'))
+            if not self._py_spy.start():
+                self._py_spy = None
+        if self._py_spy is None:
+            self._sampler = FrameSampler()
+            self._sampler.start()
+        
+        if self.mode == 'cprofile':
+            # cProfile only traces the thread that enables it
+            threading.setprofile(self._profile_thread)
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+    
+    def _profile_thread(self, frame, event, arg):
+        """Profile hook of new threads: replaces itself with a cProfile profiler"""
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler, which sees every thread
+            return
+        with self._thread_lock:
+            self._thread_profilers.append(profiler)
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is not None:
+            self._profiler.disable()
+            threading.setprofile(None)
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._py_spy is not None:
+            self._py_spy.stop()
+        
+        collapsed_file = self.prefix.with_suffix('.collapsed')
+        if self._sampler is not None:
+            self._sampler.write_collapsed(collapsed_file)
+        if collapsed_file.exists():
+            self.files['collapsed'] = collapsed_file
+        
+        print(f"\n=== Profile: {self.step_name} ({self.mode}) ===")
+        if self._profiler is not None:
+            prof_file = self.prefix.with_suffix('.prof')
+            stats = pstats.Stats(self._profiler)
+            with self._thread_lock:
+                for profiler in self._thread_profilers:
+                    stats.add(profiler)
+                n_threads = len(self._thread_profilers)
+            stats.dump_stats(str(prof_file))
+            self.files['prof'] = prof_file
+            if n_threads:
+                print(f"Main thread and {n_threads} worker threads")
+            self._print_cprofile_hotspots(stats)
+        elif 'collapsed' in self.files:
+            self._print_sampled_hotspots()
+        
+        for kind, path in self.files.items():
+            print(f"[✓] {kind} written to {path}")
+        return False
+    
+    def _print_cprofile_hotspots(self, stats: pstats.Stats):
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.strip_dirs()
+        stats.sort_stats('tottime').print_stats(self.top)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        # Drop the pstats header lines, keep the tables
+        print('\n'.join(line for line in stream.getvalue().splitlines()
+                        if line.strip() and not line.lstrip().startswith(('Ordered by', 'List reduced'))))
+    
+    def _print_sampled_hotspots(self):
+        hotspots, total = collapsed_hotspots(self.files['collapsed'], self.top)
+        total = total or 1
+        print(f"Top {len(hotspots)} frames by samples on top of the stack (idle waits excluded):")
+        for frame, count in hotspots:
+            print(f"  {count:8d}  {count / total:6.1%}  {frame}")
@@ -0,0 +1,107 @@
+"""
+Deterministic sharding of extraction work across nodes
+Each image goes to the shard given by a hash of its dataset-relative path, so
+independent nodes agree on the split without talking to each other
+"""
+
+import hashlib
+import json
+import os
+import socket
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+DEFAULT_SHARDS_DIR = "results/shards"
+MANIFEST_FILE = "manifest.json"
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard spec "i/N" (0 <= i < N)
+    
+    Returns:
+        Tuple of (index, count)
+    """
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/N, e.g. 0/4") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', index must be in [0, {max(count, 1) - 1}]")
+    return index, count
+
+
+def shard_of(image_key: str, count: int) -> int:
+    """
+    Shard of an image
+    
+    The key is the image path as listed in dataset.json (not the absolute path,
+    which differs between nodes). The same image lands on the same shard for
+    every system, so its encoding is cached once per node.
+    """
+    digest = hashlib.sha1(image_key.replace('\\', '/').encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def shard_root(shards_dir: str, index: int, count: int) -> Path:
+    """Directory holding the raw outputs, timing index and manifest of one shard"""
+    return Path(shards_dir) / f"shard-{index:03d}-of-{count:03d}"
+
+
+class ShardManifest:
+    """
+    Manifest of what one shard was assigned and what it produced
+    
+    Rewritten (atomically) after every dataset and system, so a node that dies
+    leaves a manifest showing how far it got; 'complete' is only set at the end.
+    """
+    
+    def __init__(self, root: Path, index: int, count: int, config_path: str):
+        self.path = Path(root) / MANIFEST_FILE
+        with open(config_path, 'rb') as f:
+            config_sha1 = hashlib.sha1(f.read()).hexdigest()
+        self.data: Dict[str, Any] = {
+            'shard_index': index,
+            'shard_count': count,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'config_sha1': config_sha1,
+            'started': datetime.now().isoformat(),
+            'finished': None,
+            'complete': False,
+            'slices': {}
+        }
+    
+    def record_slice(self, dataset: str, system: str, images: List[str], processed: int, errors: int):
+        """Record the images assigned to a dataset/system slice and the outcome"""
+        self.data['slices'].setdefault(dataset, {})[system] = {
+            'images': images,
+            'processed': processed,
+            'errors': errors,
+            'finished': datetime.now().isoformat()
+        }
+        self.save()
+    
+    def finish(self):
+        self.data['finished'] = datetime.now().isoformat()
+        self.data['complete'] = True
+        self.save()
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def load_manifests(shards_dir: str) -> List[Dict[str, Any]]:
+    """Load the manifests of every shard found under shards_dir, with their directory"""
+    manifests = []
+    for manifest_file in sorted(Path(shards_dir).glob(f"shard-*/{MANIFEST_FILE}")):
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest['root'] = str(manifest_file.parent)
+        manifests.append(manifest)
+    return manifests
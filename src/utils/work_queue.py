@@ -0,0 +1,555 @@
+"""
+Pull-based work queue for distributed extraction
+A producer enqueues (dataset, system, image) tasks; workers on any node lease
+tasks for the systems they can run, ack them when done and get them back
+after a visibility timeout if they crash. Delivery is at-least-once.
+
+Backends (selected by URL):
+    sqlite:///results/queue/tasks.sqlite   one machine, any number of workers
+    file:///shared/queue                   nodes sharing a filesystem (atomic renames)
+    redis://host:6379/0                    Redis server (requires the redis package)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+from urllib.parse import urlparse
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+DEFAULT_QUEUE_URL = "sqlite:///results/queue/tasks.sqlite"
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+TASK_STATES = ('queued', 'leased', 'done', 'failed')
+
+
+def task_id(dataset: str, system: str, image: str) -> str:
+    """Deterministic task id, so enqueueing the same work twice is a no-op"""
+    return hashlib.sha1(f"{dataset}\0{system}\0{image}".encode('utf-8')).hexdigest()[:20]
+
+
+def make_task(dataset: str, system: str, image: str) -> Dict[str, Any]:
+    """
+    Build a task
+    
+    Args:
+        dataset: Dataset name
+        system: OCR system name
+        image: Image path relative to the dataset directory (as in dataset.json)
+    """
+    return {'id': task_id(dataset, system, image), 'dataset': dataset, 'system': system,
+            'image': image, 'attempts': 0}
+
+
+class WorkQueue(ABC):
+    """
+    Work queue interface
+    
+    A leased task carries a 'lease' token; ack/fail/extend must present it, so a
+    worker whose lease expired (and whose task was handed to another worker)
+    cannot complete it twice.
+    """
+    
+    def __init__(self, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+    
+    @abstractmethod
+    def enqueue(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        """Add tasks not already in the queue (in any state); returns the number added"""
+    
+    @abstractmethod
+    def lease(self, systems: Optional[List[str]], worker: str, n: int = 1) -> List[Dict[str, Any]]:
+        """Lease up to n queued (or expired) tasks of the given systems (None: any)"""
+    
+    @abstractmethod
+    def ack(self, task: Dict[str, Any]) -> bool:
+        """Mark a leased task done; False if the lease was lost"""
+    
+    @abstractmethod
+    def fail(self, task: Dict[str, Any], error: str) -> bool:
+        """Requeue a leased task, or mark it failed after max_attempts; False if the lease was lost"""
+    
+    @abstractmethod
+    def extend(self, task: Dict[str, Any]) -> bool:
+        """Renew the visibility timeout of a leased task; False if the lease was lost"""
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Task counts per system and state"""
+    
+    @abstractmethod
+    def failed_tasks(self) -> List[Dict[str, Any]]:
+        """Tasks that exhausted their attempts, with their last error"""
+    
+    @abstractmethod
+    def retry_failed(self) -> int:
+        """Put failed tasks back in the queue with their attempts reset"""
+    
+    def pending(self, systems: Optional[List[str]] = None) -> int:
+        """Queued plus leased tasks of the given systems"""
+        return sum(counts.get('queued', 0) + counts.get('leased', 0)
+                   for system, counts in self.stats().items() if systems is None or system in systems)
+    
+    def close(self):
+        pass
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a SQLite database
+    
+    Safe for many worker processes on one machine (or a local disk); SQLite
+    locking is unreliable on network filesystems, use FileWorkQueue there.
+    """
+    
+    def __init__(self, db_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY, dataset TEXT, system TEXT, image TEXT,
+                state TEXT, attempts INTEGER, lease TEXT, worker TEXT,
+                lease_expires REAL, error TEXT, updated REAL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (system, state, lease_expires)")
+    
+    def enqueue(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO tasks VALUES (?, ?, ?, ?, 'queued', 0, NULL, NULL, NULL, NULL, ?)",
+            ((task['id'], task['dataset'], task['system'], task['image'], now) for task in tasks))
+        self.conn.execute("COMMIT")
+        return self.conn.total_changes - before
+    
+    def lease(self, systems: Optional[List[str]], worker: str, n: int = 1) -> List[Dict[str, Any]]:
+        now = time.time()
+        system_filter = ""
+        params: list = [now]
+        if systems is not None:
+            system_filter = f"AND system IN ({','.join('?' * len(systems))})"
+            params += list(systems)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # An expired lease that used up its attempts crashed its worker every time: fail it
+            self.conn.execute(
+                f"UPDATE tasks SET state = 'failed', lease = NULL, error = COALESCE(error, 'lease expired'), "
+                f"updated = ? WHERE state = 'leased' AND lease_expires < ? AND attempts >= ? {system_filter}",
+                [now, now, self.max_attempts] + params[1:])
+            rows = self.conn.execute(
+                f"SELECT id, dataset, system, image, attempts FROM tasks "
+                f"WHERE (state = 'queued' OR (state = 'leased' AND lease_expires < ?)) {system_filter} "
+                f"ORDER BY attempts, updated LIMIT ?", params + [n]).fetchall()
+            tasks = []
+            for row_id, dataset, system, image, attempts in rows:
+                lease = uuid.uuid4().hex
+                self.conn.execute(
+                    "UPDATE tasks SET state = 'leased', lease = ?, worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (lease, worker, now + self.visibility_timeout, now, row_id))
+                tasks.append({'id': row_id, 'dataset': dataset, 'system': system, 'image': image,
+                              'attempts': attempts + 1, 'lease': lease})
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return tasks
+    
+    def _update_leased(self, task: Dict[str, Any], assignments: str, params: tuple) -> bool:
+        cursor = self.conn.execute(
+            f"UPDATE tasks SET {assignments}, updated = ? WHERE id = ? AND lease = ? AND state = 'leased'",
+            params + (time.time(), task['id'], task['lease']))
+        return cursor.rowcount == 1
+    
+    def ack(self, task: Dict[str, Any]) -> bool:
+        return self._update_leased(task, "state = 'done', lease = NULL, error = NULL", ())
+    
+    def fail(self, task: Dict[str, Any], error: str) -> bool:
+        state = 'failed' if task['attempts'] >= self.max_attempts else 'queued'
+        return self._update_leased(task, "state = ?, lease = NULL, error = ?", (state, error))
+    
+    def extend(self, task: Dict[str, Any]) -> bool:
+        return self._update_leased(task, "lease_expires = ?", (time.time() + self.visibility_timeout,))
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        now = time.time()
+        counts: Dict[str, Dict[str, int]] = {}
+        for system, state, expired, count in self.conn.execute(
+                "SELECT system, state, lease_expires < ?, COUNT(*) FROM tasks GROUP BY 1, 2, 3", (now,)):
+            # Expired leases are as good as queued
+            state = 'queued' if state == 'leased' and expired else state
+            counts.setdefault(system, {})
+            counts[system][state] = counts[system].get(state, 0) + count
+        return counts
+    
+    def failed_tasks(self) -> List[Dict[str, Any]]:
+        return [{'id': row[0], 'dataset': row[1], 'system': row[2], 'image': row[3],
+                 'attempts': row[4], 'error': row[5]} for row in self.conn.execute(
+            "SELECT id, dataset, system, image, attempts, error FROM tasks WHERE state = 'failed'")]
+    
+    def retry_failed(self) -> int:
+        cursor = self.conn.execute(
+            "UPDATE tasks SET state = 'queued', attempts = 0, updated = ? WHERE state = 'failed'", (time.time(),))
+        return cursor.rowcount
+    
+    def close(self):
+        self.conn.close()
+
+
+class FileWorkQueue(WorkQueue):
+    """
+    Work queue as files in a shared directory
+    
+    One JSON file per task, moved between <root>/<state>/<system>/ directories
+    with os.rename, which is atomic on local and NFS filesystems: of several
+    workers renaming the same queued file, exactly one succeeds. A leased file
+    stores its lease deadline (lease_expires); extend() touches the file, which
+    pushes the deadline to mtime + visibility_timeout.
+    """
+    
+    def __init__(self, root: str, **kwargs):
+        super().__init__(**kwargs)
+        self.root = Path(root)
+        for state in TASK_STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+    
+    def _path(self, state: str, task: Dict[str, Any], lease: Optional[str] = None) -> Path:
+        name = f"{task['id']}.{lease}.json" if lease else f"{task['id']}.json"
+        return self.root / state / task['system'] / name
+    
+    @staticmethod
+    def _write(path: Path, task: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({key: value for key, value in task.items() if key != 'lease'}, f)
+        os.replace(tmp_path, path)
+    
+    def _system_dirs(self, state: str, systems: Optional[List[str]]) -> List[Path]:
+        state_dir = self.root / state
+        if systems is None:
+            return [path for path in state_dir.iterdir() if path.is_dir()]
+        return [state_dir / system for system in systems if (state_dir / system).is_dir()]
+    
+    def enqueue(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        added = 0
+        for task in tasks:
+            exists = any(self._path(state, task).exists() for state in ('queued', 'done', 'failed'))
+            leased_dir = self.root / 'leased' / task['system']
+            if exists or (leased_dir.is_dir() and any(leased_dir.glob(f"{task['id']}.*.json"))):
+                continue
+            self._write(self._path('queued', task), task)
+            added += 1
+        return added
+    
+    def _lease_deadline(self, leased_file: Path) -> float:
+        """
+        Lease deadline of a leased file
+        
+        The stored lease_expires, or the last touch (extend) plus the visibility
+        timeout if later. A file just renamed from the queue has no deadline
+        yet: its ctime (set by the rename) stands for the lease start.
+        """
+        stat = leased_file.stat()
+        with open(leased_file, 'r', encoding='utf-8') as f:
+            task = json.load(f)
+        touched = max(stat.st_mtime, stat.st_ctime) if 'lease_expires' not in task else stat.st_mtime
+        return max(task.get('lease_expires') or 0.0, touched + self.visibility_timeout)
+    
+    def requeue_expired(self, systems: Optional[List[str]] = None) -> int:
+        """Move leased tasks whose lease deadline passed back to the queue"""
+        requeued = 0
+        now = time.time()
+        for system_dir in self._system_dirs('leased', systems):
+            for leased_file in system_dir.glob("*.json"):
+                try:
+                    if self._lease_deadline(leased_file) >= now:
+                        continue
+                    # Whoever renames it first requeues it
+                    claimed = leased_file.with_name(f".{leased_file.name}.{uuid.uuid4().hex}.requeue")
+                    os.rename(leased_file, claimed)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    continue
+                with open(claimed, 'r', encoding='utf-8') as f:
+                    task = json.load(f)
+                state = 'failed' if task['attempts'] >= self.max_attempts else 'queued'
+                task['error'] = task.get('error') or 'lease expired'
+                task.pop('lease_expires', None)
+                self._write(self._path(state, task), task)
+                claimed.unlink()
+                requeued += 1
+        return requeued
+    
+    def lease(self, systems: Optional[List[str]], worker: str, n: int = 1) -> List[Dict[str, Any]]:
+        self.requeue_expired(systems)
+        tasks = []
+        for system_dir in self._system_dirs('queued', systems):
+            for queued_file in sorted(system_dir.glob("*.json")):
+                if len(tasks) >= n:
+                    return tasks
+                lease = uuid.uuid4().hex
+                leased_file = self.root / 'leased' / system_dir.name / f"{queued_file.stem}.{lease}.json"
+                leased_file.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.rename(queued_file, leased_file)
+                    # The rename keeps the queued file's mtime: restart the clock now
+                    os.utime(leased_file)
+                except FileNotFoundError:
+                    # Another worker took it
+                    continue
+                with open(leased_file, 'r', encoding='utf-8') as f:
+                    task = json.load(f)
+                task['attempts'] += 1
+                task['worker'] = worker
+                task['lease_expires'] = time.time() + self.visibility_timeout
+                self._write(leased_file, task)
+                task['lease'] = lease
+                tasks.append(task)
+        return tasks
+    
+    def _finish(self, task: Dict[str, Any], state: str, error: Optional[str] = None) -> bool:
+        leased_file = self._path('leased', task, task['lease'])
+        claimed = leased_file.with_name(f".{leased_file.name}.done")
+        try:
+            os.rename(leased_file, claimed)
+        except FileNotFoundError:
+            return False
+        task = {key: value for key, value in task.items() if key not in ('lease', 'lease_expires')}
+        task['error'] = error
+        self._write(self._path(state, task), task)
+        claimed.unlink()
+        return True
+    
+    def ack(self, task: Dict[str, Any]) -> bool:
+        return self._finish(task, 'done')
+    
+    def fail(self, task: Dict[str, Any], error: str) -> bool:
+        return self._finish(task, 'failed' if task['attempts'] >= self.max_attempts else 'queued', error)
+    
+    def extend(self, task: Dict[str, Any]) -> bool:
+        try:
+            os.utime(self._path('leased', task, task['lease']))
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        now = time.time()
+        counts: Dict[str, Dict[str, int]] = {}
+        for state in TASK_STATES:
+            for system_dir in self._system_dirs(state, None):
+                for path in system_dir.glob("*.json"):
+                    effective = state
+                    if state == 'leased':
+                        try:
+                            if self._lease_deadline(path) < now:
+                                effective = 'queued'
+                        except (FileNotFoundError, json.JSONDecodeError):
+                            continue
+                    counts.setdefault(system_dir.name, {})
+                    counts[system_dir.name][effective] = counts[system_dir.name].get(effective, 0) + 1
+        return counts
+    
+    def failed_tasks(self) -> List[Dict[str, Any]]:
+        tasks = []
+        for system_dir in self._system_dirs('failed', None):
+            for path in system_dir.glob("*.json"):
+                with open(path, 'r', encoding='utf-8') as f:
+                    tasks.append(json.load(f))
+        return tasks
+    
+    def retry_failed(self) -> int:
+        retried = 0
+        for task in self.failed_tasks():
+            task['attempts'] = 0
+            self._write(self._path('queued', task), task)
+            self._path('failed', task).unlink()
+            retried += 1
+        return retried
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Work queue in Redis
+    
+    Per system: a list of queued task ids, a sorted set of leased ids scored by
+    lease expiry, and sets of done and failed ids; task bodies live in one hash.
+    Leasing and requeueing run as Lua scripts, so they are atomic.
+    """
+    
+    _LEASE_SCRIPT = """
+        local now, expires, n = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+        local max_attempts = tonumber(ARGV[4])
+        local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+        for _, id in ipairs(expired) do
+            redis.call('ZREM', KEYS[2], id)
+            local task = cjson.decode(redis.call('HGET', KEYS[3], id))
+            if task['attempts'] >= max_attempts then
+                if not task['error'] or task['error'] == cjson.null then
+                    task['error'] = 'lease expired'
+                    redis.call('HSET', KEYS[3], id, cjson.encode(task))
+                end
+                redis.call('SADD', KEYS[4], id)
+            else
+                redis.call('RPUSH', KEYS[1], id)
+            end
+        end
+        local leased = {}
+        for i = 1, n do
+            local id = redis.call('LPOP', KEYS[1])
+            if not id then break end
+            redis.call('ZADD', KEYS[2], expires, id)
+            table.insert(leased, id)
+        end
+        return leased
+    """
+    
+    def __init__(self, url: str, prefix: str = "ocrq", **kwargs):
+        super().__init__(**kwargs)
+        if redis is None:
+            raise RuntimeError("Redis work queue requires the redis package. Install with: pip install redis")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._lease_script = self.client.register_script(self._LEASE_SCRIPT)
+    
+    def _key(self, *parts: str) -> str:
+        return ':'.join((self.prefix,) + parts)
+    
+    def _systems(self, systems: Optional[List[str]]) -> List[str]:
+        known = sorted(self.client.smembers(self._key('systems')))
+        return known if systems is None else [system for system in systems if system in known]
+    
+    def enqueue(self, tasks: Iterable[Dict[str, Any]]) -> int:
+        added = 0
+        pipe = self.client.pipeline()
+        for task in tasks:
+            if self.client.hsetnx(self._key('tasks'), task['id'], json.dumps(task)):
+                pipe.sadd(self._key('systems'), task['system'])
+                pipe.rpush(self._key('queued', task['system']), task['id'])
+                added += 1
+        pipe.execute()
+        return added
+    
+    def lease(self, systems: Optional[List[str]], worker: str, n: int = 1) -> List[Dict[str, Any]]:
+        tasks = []
+        now = time.time()
+        for system in self._systems(systems):
+            if len(tasks) >= n:
+                break
+            ids = self._lease_script(keys=[self._key('queued', system), self._key('leased', system),
+                                           self._key('tasks'), self._key('failed', system)],
+                                     args=[now, now + self.visibility_timeout, n - len(tasks), self.max_attempts])
+            for leased_id in ids:
+                task = json.loads(self.client.hget(self._key('tasks'), leased_id))
+                task['attempts'] += 1
+                task['worker'] = worker
+                self.client.hset(self._key('tasks'), leased_id, json.dumps(task))
+                # The lease token is the expiry score the task was leased with
+                task['lease'] = repr(now + self.visibility_timeout)
+                tasks.append(task)
+        return tasks
+    
+    def _release(self, task: Dict[str, Any]) -> bool:
+        leased_key = self._key('leased', task['system'])
+        score = self.client.zscore(leased_key, task['id'])
+        if score is None or repr(score) != task['lease']:
+            return False
+        return self.client.zrem(leased_key, task['id']) == 1
+    
+    def ack(self, task: Dict[str, Any]) -> bool:
+        if not self._release(task):
+            return False
+        self.client.sadd(self._key('done', task['system']), task['id'])
+        return True
+    
+    def fail(self, task: Dict[str, Any], error: str) -> bool:
+        if not self._release(task):
+            return False
+        stored = json.loads(self.client.hget(self._key('tasks'), task['id']))
+        stored['error'] = error
+        self.client.hset(self._key('tasks'), task['id'], json.dumps(stored))
+        if task['attempts'] >= self.max_attempts:
+            self.client.sadd(self._key('failed', task['system']), task['id'])
+        else:
+            self.client.rpush(self._key('queued', task['system']), task['id'])
+        return True
+    
+    def extend(self, task: Dict[str, Any]) -> bool:
+        if not self._release(task):
+            return False
+        expires = time.time() + self.visibility_timeout
+        self.client.zadd(self._key('leased', task['system']), {task['id']: expires})
+        task['lease'] = repr(expires)
+        return True
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        now = time.time()
+        counts = {}
+        for system in self._systems(None):
+            leased_key = self._key('leased', system)
+            expired = self.client.zcount(leased_key, '-inf', now)
+            counts[system] = {
+                'queued': self.client.llen(self._key('queued', system)) + expired,
+                'leased': self.client.zcard(leased_key) - expired,
+                'done': self.client.scard(self._key('done', system)),
+                'failed': self.client.scard(self._key('failed', system))
+            }
+        return counts
+    
+    def failed_tasks(self) -> List[Dict[str, Any]]:
+        tasks = []
+        for system in self._systems(None):
+            for failed_id in self.client.smembers(self._key('failed', system)):
+                tasks.append(json.loads(self.client.hget(self._key('tasks'), failed_id)))
+        return tasks
+    
+    def retry_failed(self) -> int:
+        retried = 0
+        for task in self.failed_tasks():
+            task['attempts'] = 0
+            self.client.hset(self._key('tasks'), task['id'], json.dumps(task))
+            self.client.srem(self._key('failed', task['system']), task['id'])
+            self.client.rpush(self._key('queued', task['system']), task['id'])
+            retried += 1
+        return retried
+    
+    def close(self):
+        self.client.close()
+
+
+def open_work_queue(url: str = DEFAULT_QUEUE_URL, **kwargs) -> WorkQueue:
+    """
+    Open a work queue from its URL
+    
+    Args:
+        url: sqlite:///<path>, file:///<directory> or redis://host:port/db
+        **kwargs: visibility_timeout, max_attempts
+    
+    Returns:
+        WorkQueue instance
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == 'sqlite':
+        # sqlite:///relative/path or sqlite:////absolute/path
+        return SQLiteWorkQueue(url[len('sqlite:///'):], **kwargs)
+    if parsed.scheme == 'file':
+        return FileWorkQueue(parsed.netloc + parsed.path if parsed.netloc else parsed.path, **kwargs)
+    if parsed.scheme in ('redis', 'rediss'):
+        return RedisWorkQueue(url, **kwargs)
+    raise ValueError(f"Unsupported work queue URL: {url} (expected sqlite://, file:// or redis://)")